@@ -0,0 +1,46 @@
+"""Add attendance_forecasts table
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'h8i9j0k1l2m3'
+down_revision: Union[str, None] = 'g7h8i9j0k1l2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS attendance_forecasts (
+            id UUID PRIMARY KEY,
+            forecast_date DATE NOT NULL,
+            schedule_id UUID REFERENCES pool_schedules(id) ON DELETE SET NULL,
+            schedule_name VARCHAR(100) NOT NULL,
+            schedule_type scheduletype NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            expected_attendance DOUBLE PRECISION NOT NULL,
+            expected_high DOUBLE PRECISION NOT NULL,
+            closed_by_override BOOLEAN NOT NULL DEFAULT false,
+            computed_at TIMESTAMP NOT NULL DEFAULT now()
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_forecasts_forecast_date
+        ON attendance_forecasts (forecast_date);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP TABLE IF EXISTS attendance_forecasts;"))
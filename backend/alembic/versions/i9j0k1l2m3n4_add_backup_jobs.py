@@ -0,0 +1,52 @@
+"""Add backup_jobs table
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i9j0k1l2m3n4'
+down_revision: Union[str, None] = 'h8i9j0k1l2m3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS backup_jobs (
+            id UUID PRIMARY KEY,
+            kind VARCHAR(20),
+            trigger VARCHAR(20) NOT NULL DEFAULT 'manual',
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+            bytes_written BIGINT NOT NULL DEFAULT 0,
+            current_table VARCHAR(50),
+            table_seconds JSON,
+            result JSON,
+            error TEXT,
+            cancel_requested BOOLEAN NOT NULL DEFAULT false,
+            requested_by UUID REFERENCES users(id) ON DELETE SET NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_backup_jobs_status ON backup_jobs (status);
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_backup_jobs_created_at ON backup_jobs (created_at);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP TABLE IF EXISTS backup_jobs;"))
@@ -0,0 +1,59 @@
+"""Add terminal_payment_sessions table
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j0k1l2m3n4o5'
+down_revision: Union[str, None] = 'i9j0k1l2m3n4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS terminal_payment_sessions (
+            id UUID PRIMARY KEY,
+            request_key VARCHAR(100) NOT NULL,
+            member_id UUID NOT NULL REFERENCES members(id) ON DELETE CASCADE,
+            plan_id UUID NOT NULL REFERENCES plans(id),
+            amount NUMERIC(10, 2) NOT NULL,
+            credit_used NUMERIC(10, 2) NOT NULL DEFAULT 0,
+            save_card BOOLEAN NOT NULL DEFAULT false,
+            state VARCHAR(20) NOT NULL DEFAULT 'pending',
+            gateway_transaction_key VARCHAR(100),
+            card_last4 VARCHAR(4),
+            card_brand VARCHAR(50),
+            transaction_id UUID REFERENCES transactions(id) ON DELETE SET NULL,
+            membership_id UUID REFERENCES memberships(id) ON DELETE SET NULL,
+            error TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            expires_at TIMESTAMP NOT NULL,
+            completed_at TIMESTAMP
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_terminal_payment_sessions_request_key
+        ON terminal_payment_sessions (request_key);
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_terminal_payment_sessions_state ON terminal_payment_sessions (state);
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_terminal_payment_sessions_expires_at ON terminal_payment_sessions (expires_at);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP TABLE IF EXISTS terminal_payment_sessions;"))
@@ -0,0 +1,46 @@
+"""Add polling columns to terminal_payment_sessions
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k1l2m3n4o5p6'
+down_revision: Union[str, None] = 'j0k1l2m3n4o5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE terminal_payment_sessions
+            ADD COLUMN IF NOT EXISTS gateway_status VARCHAR(50),
+            ADD COLUMN IF NOT EXISTS poll_count INTEGER NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS last_polled_at TIMESTAMP;
+    """))
+    # The watcher only ever looks for pending sessions that are due
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_terminal_payment_sessions_next_poll_at
+        ON terminal_payment_sessions (next_poll_at) WHERE state = 'pending';
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_terminal_payment_sessions_next_poll_at;"))
+    conn.execute(sa.text("""
+        ALTER TABLE terminal_payment_sessions
+            DROP COLUMN IF EXISTS last_polled_at,
+            DROP COLUMN IF EXISTS next_poll_at,
+            DROP COLUMN IF EXISTS poll_count,
+            DROP COLUMN IF EXISTS gateway_status;
+    """))
@@ -0,0 +1,70 @@
+"""Add outbox_messages and auto_charge_runs tables
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l2m3n4o5p6q7'
+down_revision: Union[str, None] = 'k1l2m3n4o5p6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS outbox_messages (
+            id UUID PRIMARY KEY,
+            kind VARCHAR(50) NOT NULL,
+            payload JSON NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at TIMESTAMP NOT NULL DEFAULT now(),
+            last_error TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            sent_at TIMESTAMP
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_outbox_messages_status ON outbox_messages (status);
+    """))
+    # The dispatcher only looks for pending messages that are available
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_outbox_messages_available_at
+        ON outbox_messages (available_at) WHERE status = 'pending';
+    """))
+
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS auto_charge_runs (
+            id UUID PRIMARY KEY,
+            trigger VARCHAR(20) NOT NULL DEFAULT 'scheduled',
+            status VARCHAR(20) NOT NULL DEFAULT 'running',
+            processed INTEGER NOT NULL DEFAULT 0,
+            succeeded INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            report JSON,
+            error TEXT,
+            started_at TIMESTAMP NOT NULL DEFAULT now(),
+            finished_at TIMESTAMP
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_auto_charge_runs_status ON auto_charge_runs (status);
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_auto_charge_runs_started_at ON auto_charge_runs (started_at);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP TABLE IF EXISTS auto_charge_runs;"))
+    conn.execute(sa.text("DROP TABLE IF EXISTS outbox_messages;"))
@@ -0,0 +1,52 @@
+"""Add charge_attempts ledger and auto_charge_runs heartbeat
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm3n4o5p6q7r8'
+down_revision: Union[str, None] = 'l2m3n4o5p6q7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS charge_attempts (
+            id UUID PRIMARY KEY,
+            saved_card_id UUID REFERENCES saved_cards(id) ON DELETE SET NULL,
+            period DATE NOT NULL,
+            run_id UUID REFERENCES auto_charge_runs(id) ON DELETE SET NULL,
+            member_id UUID REFERENCES members(id) ON DELETE SET NULL,
+            plan_id UUID REFERENCES plans(id) ON DELETE SET NULL,
+            amount NUMERIC(10, 2) NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'claimed',
+            attempts INTEGER NOT NULL DEFAULT 1,
+            reference_id VARCHAR(255),
+            error TEXT,
+            claimed_at TIMESTAMP NOT NULL DEFAULT now(),
+            finished_at TIMESTAMP,
+            CONSTRAINT uq_charge_attempts_card_period UNIQUE (saved_card_id, period)
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_charge_attempts_status ON charge_attempts (status);
+    """))
+    conn.execute(sa.text("""
+        ALTER TABLE auto_charge_runs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE auto_charge_runs DROP COLUMN IF EXISTS heartbeat_at;"))
+    conn.execute(sa.text("DROP TABLE IF EXISTS charge_attempts;"))
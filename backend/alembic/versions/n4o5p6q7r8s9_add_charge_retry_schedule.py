@@ -0,0 +1,64 @@
+"""Add dunning schedule to charge_attempts and charge_attempt_events
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n4o5p6q7r8s9'
+down_revision: Union[str, None] = 'm3n4o5p6q7r8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE charge_attempts
+            ADD COLUMN IF NOT EXISTS next_attempt_on DATE,
+            ADD COLUMN IF NOT EXISTS first_attempt_at TIMESTAMP NOT NULL DEFAULT now();
+    """))
+    # Periods that failed before this migration get the old behaviour: retry on the next run
+    conn.execute(sa.text("""
+        UPDATE charge_attempts SET next_attempt_on = CURRENT_DATE
+        WHERE status IN ('declined', 'skipped', 'released');
+    """))
+    # Partial index: the daily run only ever looks for retries that are scheduled
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_charge_attempts_next_attempt_on
+        ON charge_attempts (next_attempt_on) WHERE next_attempt_on IS NOT NULL;
+    """))
+    conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS charge_attempt_events (
+            id UUID PRIMARY KEY,
+            attempt_id UUID NOT NULL REFERENCES charge_attempts(id) ON DELETE CASCADE,
+            run_id UUID REFERENCES auto_charge_runs(id) ON DELETE SET NULL,
+            attempt_number INTEGER NOT NULL,
+            outcome VARCHAR(20) NOT NULL,
+            reference_id VARCHAR(255),
+            error TEXT,
+            latency_seconds DOUBLE PRECISION,
+            created_at TIMESTAMP NOT NULL DEFAULT now()
+        );
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS ix_charge_attempt_events_attempt_id ON charge_attempt_events (attempt_id);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP TABLE IF EXISTS charge_attempt_events;"))
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_charge_attempts_next_attempt_on;"))
+    conn.execute(sa.text("""
+        ALTER TABLE charge_attempts
+            DROP COLUMN IF EXISTS first_attempt_at,
+            DROP COLUMN IF EXISTS next_attempt_on;
+    """))
@@ -0,0 +1,36 @@
+"""Add owner and heartbeat to backup_jobs
+
+Revision ID: o5p6q7r8s9t0
+Revises: n4o5p6q7r8s9
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o5p6q7r8s9t0'
+down_revision: Union[str, None] = 'n4o5p6q7r8s9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE backup_jobs
+            ADD COLUMN IF NOT EXISTS owner VARCHAR(100),
+            ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE backup_jobs
+            DROP COLUMN IF EXISTS heartbeat_at,
+            DROP COLUMN IF EXISTS owner;
+    """))
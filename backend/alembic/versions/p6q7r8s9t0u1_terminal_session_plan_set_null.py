@@ -0,0 +1,40 @@
+"""Keep terminal payment sessions when their plan is deleted
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p6q7r8s9t0u1'
+down_revision: Union[str, None] = 'o5p6q7r8s9t0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        ALTER TABLE terminal_payment_sessions
+            ALTER COLUMN plan_id DROP NOT NULL,
+            DROP CONSTRAINT IF EXISTS terminal_payment_sessions_plan_id_fkey,
+            ADD CONSTRAINT terminal_payment_sessions_plan_id_fkey
+                FOREIGN KEY (plan_id) REFERENCES plans(id) ON DELETE SET NULL;
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    # plan_id stays nullable: sessions may already have lost their plan
+    conn.execute(sa.text("""
+        ALTER TABLE terminal_payment_sessions
+            DROP CONSTRAINT IF EXISTS terminal_payment_sessions_plan_id_fkey,
+            ADD CONSTRAINT terminal_payment_sessions_plan_id_fkey
+                FOREIGN KEY (plan_id) REFERENCES plans(id);
+    """))
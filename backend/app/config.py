@@ -10,6 +10,23 @@ class Settings(BaseSettings):
 
     pool_name: str = "My Pool"
 
+    # Connection pool of each web process, and of the background worker (python -m app.worker)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    worker_db_pool_size: int = 4
+    worker_db_max_overflow: int = 6
+    # Run the scheduler, outbox dispatcher and backup job worker in the web process.
+    # Turn off when app.worker runs them.
+    web_background_jobs: bool = True
+
+    # Production server (gunicorn.conf.py): web worker processes, and requests
+    # after which a worker is recycled (0 = never)
+    web_workers: int = 1
+    web_max_requests: int = 0
+    # Where the rate limiter counts requests. memory:// counts per process, so
+    # several workers need a shared store such as redis://redis:6379
+    rate_limit_storage_uri: str = "memory://"
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -1,11 +1,16 @@
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def make_engine(pool_size: int, max_overflow: int) -> Engine:
+    return create_engine(settings.database_url, pool_pre_ping=True, pool_size=pool_size, max_overflow=max_overflow)
+
+
+engine = make_engine(settings.db_pool_size, settings.db_max_overflow)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
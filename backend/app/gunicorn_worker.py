@@ -0,0 +1,7 @@
+"""Uvicorn worker class for gunicorn (see gunicorn.conf.py)."""
+from uvicorn.workers import UvicornWorker
+
+
+class AsyncioUvicornWorker(UvicornWorker):
+    # Plain asyncio loop, as in single-process mode, for LXC compatibility
+    CONFIG_KWARGS = {"loop": "asyncio", "http": "auto", "lifespan": "on"}
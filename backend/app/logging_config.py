@@ -0,0 +1,54 @@
+import logging
+import logging.handlers
+import os
+import sys
+
+
+def configure_logging(suffix: str = "") -> None:
+    """Console and rotating file logging. `suffix` keeps another process type's log files apart ("-worker")."""
+    # Configure logging with both console and file output
+    log_dir = os.environ.get("LOG_DIR", "/app/logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    # Create formatters
+    log_format = logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(log_format)
+
+    # File handler with rotation (10MB, keep 5 backups)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, f"pool-kiosk{suffix}.log"),
+        maxBytes=10*1024*1024,
+        backupCount=5,
+        encoding="utf-8"
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(log_format)
+
+    # Payment-specific log file for easier debugging
+    payment_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, f"payments{suffix}.log"),
+        maxBytes=5*1024*1024,
+        backupCount=3,
+        encoding="utf-8"
+    )
+    payment_handler.setLevel(logging.DEBUG)
+    payment_handler.setFormatter(log_format)
+
+    # Configure root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    root_logger.addHandler(console_handler)
+    root_logger.addHandler(file_handler)
+
+    # Configure payment-specific loggers with extra detail
+    for logger_name in ["app.payments", "app.services.payment_service"]:
+        payment_logger = logging.getLogger(logger_name)
+        payment_logger.addHandler(payment_handler)
+        payment_logger.setLevel(logging.DEBUG)
@@ -12,6 +12,12 @@ from app.models.saved_card import SavedCard
 from app.models.activity_log import ActivityLog
 from app.models.pin_lockout import PinLockout
 from app.models.pool_schedule import PoolSchedule, ScheduleOverride, ScheduleType
+from app.models.attendance_forecast import AttendanceForecast
+from app.models.backup_job import BackupJob
+from app.models.terminal_payment_session import TerminalPaymentSession
+from app.models.outbox_message import OutboxMessage
+from app.models.auto_charge_run import AutoChargeRun
+from app.models.charge_attempt import ChargeAttempt, ChargeAttemptEvent
 
 __all__ = [
     "Member",
@@ -30,4 +36,11 @@ __all__ = [
     "PoolSchedule",
     "ScheduleOverride",
     "ScheduleType",
+    "AttendanceForecast",
+    "BackupJob",
+    "TerminalPaymentSession",
+    "OutboxMessage",
+    "AutoChargeRun",
+    "ChargeAttempt",
+    "ChargeAttemptEvent",
 ]
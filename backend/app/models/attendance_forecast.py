@@ -0,0 +1,25 @@
+import uuid
+from datetime import date, datetime, time
+
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, String, Time
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.pool_schedule import ScheduleType, schedule_type_enum
+
+
+class AttendanceForecast(Base):
+    """Expected attendance for one schedule block on one date, rebuilt nightly."""
+    __tablename__ = "attendance_forecasts"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    forecast_date: Mapped[date] = mapped_column(Date, index=True)
+    schedule_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("pool_schedules.id", ondelete="SET NULL"))
+    schedule_name: Mapped[str] = mapped_column(String(100))
+    schedule_type: Mapped[ScheduleType] = mapped_column(schedule_type_enum)
+    start_time: Mapped[time] = mapped_column(Time)
+    end_time: Mapped[time] = mapped_column(Time)
+    expected_attendance: Mapped[float] = mapped_column(Float)
+    expected_high: Mapped[float] = mapped_column(Float)  # mean + 1 std dev, for staffing headroom
+    closed_by_override: Mapped[bool] = mapped_column(Boolean, default=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
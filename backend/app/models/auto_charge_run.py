@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AutoChargeRun(Base):
+    """One run of the auto-charge engine and its throughput/latency report."""
+    __tablename__ = "auto_charge_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    trigger: Mapped[str] = mapped_column(String(20), default="scheduled")  # "scheduled" or "manual"
+    # running / succeeded / failed, or interrupted if its process died
+    status: Mapped[str] = mapped_column(String(20), default="running", index=True)
+    processed: Mapped[int] = mapped_column(Integer, default=0)
+    succeeded: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    report: Mapped[dict | None] = mapped_column(JSON)
+    error: Mapped[str | None] = mapped_column(Text)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime)  # refreshed after every chunk
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
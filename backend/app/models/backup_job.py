@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class BackupJob(Base):
+    """A requested backup, run in the background by the backup job worker."""
+    __tablename__ = "backup_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str | None] = mapped_column(String(20))  # "full" / "incremental"; None lets the job decide
+    trigger: Mapped[str] = mapped_column(String(20), default="manual")  # "manual" or "scheduled"
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)  # percent
+    bytes_written: Mapped[int] = mapped_column(BigInteger, default=0)
+    current_table: Mapped[str | None] = mapped_column(String(50))
+    table_seconds: Mapped[dict | None] = mapped_column(JSON)
+    result: Mapped[dict | None] = mapped_column(JSON)
+    error: Mapped[str | None] = mapped_column(Text)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    requested_by: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime)
+    owner: Mapped[str | None] = mapped_column(String(100))  # "host:pid" of the worker running it
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime)  # refreshed by the running worker every HEARTBEAT_SECONDS
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
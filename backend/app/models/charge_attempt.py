@@ -0,0 +1,56 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ChargeAttempt(Base):
+    """Ledger entry claiming one billing period of an auto-charge card, written before the gateway call."""
+    __tablename__ = "charge_attempts"
+    __table_args__ = (
+        UniqueConstraint("saved_card_id", "period", name="uq_charge_attempts_card_period"),
+        # Only periods waiting for a retry are indexed; the daily run reads just these
+        Index(
+            "ix_charge_attempts_next_attempt_on", "next_attempt_on",
+            postgresql_where=text("next_attempt_on IS NOT NULL"),
+            sqlite_where=text("next_attempt_on IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    saved_card_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("saved_cards.id", ondelete="SET NULL"))
+    period: Mapped[date] = mapped_column(Date)  # the card's next_charge_date being billed
+    run_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("auto_charge_runs.id", ondelete="SET NULL"))
+    member_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("members.id", ondelete="SET NULL"))
+    plan_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("plans.id", ondelete="SET NULL"))
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    # claimed -> succeeded / declined / skipped, or unknown if the run died mid-charge;
+    # declined and skipped periods are retried on the dunning schedule until exhausted;
+    # an admin can release an unknown attempt once it's confirmed nothing was charged
+    status: Mapped[str] = mapped_column(String(20), default="claimed", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    next_attempt_on: Mapped[date | None] = mapped_column(Date)  # set only while a retry is scheduled
+    first_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    reference_id: Mapped[str | None] = mapped_column(String(255))
+    error: Mapped[str | None] = mapped_column(Text)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+
+class ChargeAttemptEvent(Base):
+    """One gateway try (or skip) for a charge attempt."""
+    __tablename__ = "charge_attempt_events"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    attempt_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("charge_attempts.id", ondelete="CASCADE"), index=True)
+    run_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("auto_charge_runs.id", ondelete="SET NULL"))
+    attempt_number: Mapped[int] = mapped_column(Integer)
+    outcome: Mapped[str] = mapped_column(String(20))  # succeeded / declined / skipped / unknown
+    reference_id: Mapped[str | None] = mapped_column(String(255))
+    error: Mapped[str | None] = mapped_column(Text)
+    latency_seconds: Mapped[float | None] = mapped_column(Float)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -10,6 +10,10 @@ from app.models.plan import PlanType
 
 class Membership(Base):
     __tablename__ = "memberships"
+    __table_args__ = (
+        # Serves the expiring-soon report and expiry listing (active + valid_until range)
+        Index("ix_memberships_active_valid_until", "is_active", "valid_until"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     member_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("members.id"), index=True)
@@ -0,0 +1,23 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class OutboxMessage(Base):
+    """A webhook or email queued for delivery by the outbox dispatcher."""
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(50))  # handler name, e.g. "auto_charge_receipt"
+    payload: Mapped[dict] = mapped_column(JSON)  # keyword arguments for the handler
+    status: Mapped[str] = mapped_column(String(20), default="pending", index=True)  # pending / sent / failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # Not picked up before this: set on claim (a lease) and on failure (retry backoff)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime)
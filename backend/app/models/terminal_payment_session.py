@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TerminalPaymentSession(Base):
+    """A card payment started on the physical terminal, finalized once the gateway approves it."""
+    __tablename__ = "terminal_payment_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    request_key: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    member_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("members.id", ondelete="CASCADE"))
+    # Kept when the plan is deleted (or a restore replaces the plans); finalizing then fails the session
+    plan_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("plans.id", ondelete="SET NULL"))
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2))  # charged on the terminal
+    credit_used: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal("0.00"))
+    save_card: Mapped[bool] = mapped_column(Boolean, default=False)
+    # pending -> completed / declined / cancelled / expired (an expired session can still complete)
+    state: Mapped[str] = mapped_column(String(20), default="pending", index=True)
+    gateway_transaction_key: Mapped[str | None] = mapped_column(String(100))
+    card_last4: Mapped[str | None] = mapped_column(String(4))
+    card_brand: Mapped[str | None] = mapped_column(String(50))
+    transaction_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("transactions.id", ondelete="SET NULL"))
+    membership_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("memberships.id", ondelete="SET NULL"))
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime)
+    # Server-side watcher bookkeeping: last status reported by the gateway and the polling schedule
+    gateway_status: Mapped[str | None] = mapped_column(String(50))
+    poll_count: Mapped[int] = mapped_column(Integer, default=0)
+    next_poll_at: Mapped[datetime | None] = mapped_column(DateTime, index=True)
+    last_polled_at: Mapped[datetime | None] = mapped_column(DateTime)
@@ -1,7 +1,9 @@
 import enum
 from abc import ABC, abstractmethod
 from decimal import Decimal
+from functools import partial
 
+from anyio import to_thread
 from pydantic import BaseModel
 
 
@@ -46,6 +48,12 @@ class BasePaymentAdapter(ABC):
         """Test connectivity to the payment processor. Override in real adapters."""
         return True, "OK"
 
+    def warm_up(self) -> None:
+        """Prepare clients or connections ahead of the first payment. Override where useful."""
+
+    def close(self) -> None:
+        """Release clients or connections when the adapter is replaced. Override where useful."""
+
     @abstractmethod
     def initiate_payment(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
         ...
@@ -98,3 +106,44 @@ class BasePaymentAdapter(ABC):
             SavedCardChargeResult with success status and optional token
         """
         raise NotImplementedError("Manual card entry not supported by this adapter")
+
+    # ==================== ASYNC INTERFACE ====================
+    #
+    # Async routes await these instead of calling the blocking methods above.
+    # Adapters with an async HTTP client override them; the defaults run the
+    # sync method in a worker thread so every adapter supports the interface.
+
+    async def initiate_payment_async(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        return await to_thread.run_sync(partial(self.initiate_payment, amount, member_id, description))
+
+    async def check_status_async(self, session_id: str) -> PaymentStatus:
+        return await to_thread.run_sync(partial(self.check_status, session_id))
+
+    async def refund_async(self, transaction_id: str, amount: Decimal) -> RefundResult:
+        return await to_thread.run_sync(partial(self.refund, transaction_id, amount))
+
+    async def tokenize_card_async(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        return await to_thread.run_sync(partial(self.tokenize_card, card_last4, card_brand, member_id))
+
+    async def charge_saved_card_async(
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
+    ) -> SavedCardChargeResult:
+        return await to_thread.run_sync(
+            partial(self.charge_saved_card, token, amount, member_id, description, customer_name=customer_name)
+        )
+
+    async def process_manual_card_sale_async(
+        self,
+        card_number: str,
+        exp_date: str,
+        cvv: str,
+        amount: Decimal,
+        member_id: str,
+        description: str,
+        save_card: bool = False,
+        customer_name: str | None = None,
+    ) -> SavedCardChargeResult:
+        return await to_thread.run_sync(partial(
+            self.process_manual_card_sale, card_number, exp_date, cvv, amount, member_id, description,
+            save_card=save_card, customer_name=customer_name,
+        ))
@@ -46,7 +46,7 @@ class CashPaymentAdapter(BasePaymentAdapter):
         raise NotImplementedError("Cash adapter does not support card tokenization")
 
     def charge_saved_card(
-        self, token: str, amount: Decimal, member_id: str, description: str
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
         logger.warning("Saved card charge attempt on cash adapter — not supported")
         return SavedCardChargeResult(
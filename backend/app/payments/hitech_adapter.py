@@ -12,6 +12,7 @@ from app.payments.base import (
     RefundResult,
     SavedCardChargeResult,
 )
+from app.payments.http import gateway_timeout, get_async_http_client, get_http_client, warm_connection
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,10 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
         self._user_id = self.config.get("hitech_user_id", "")
         self._pin = self.config.get("hitech_pin", "")
 
+    def warm_up(self) -> None:
+        if self._merchant_id:
+            warm_connection("hitech", self._base_url)
+
     def _base_params(self) -> dict[str, str]:
         """Return common authentication parameters for all requests."""
         return {
@@ -50,8 +55,8 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
                 masked[key] = "****" + masked[key][-4:] if len(masked[key]) > 4 else "****"
         return masked
 
-    def _post_request(self, params: dict[str, str]) -> dict[str, str]:
-        """Send form-encoded POST to Converge and parse response."""
+    def _request_params(self, params: dict[str, str]) -> tuple[dict[str, str], str]:
+        """Full form parameters for a Converge request, logged with secrets masked."""
         all_params = {**self._base_params(), **params}
         txn_type = params.get("ssl_transaction_type", "unknown")
 
@@ -60,68 +65,91 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
             "[HITECH REQUEST] type=%s, url=%s, params=%s",
             txn_type, self._base_url, self._mask_sensitive(all_params)
         )
+        return all_params, txn_type
+
+    def _parse_response(self, resp: httpx.Response, txn_type: str) -> dict[str, str]:
+        """Parse Converge's key=value response body."""
+        # Log raw response
+        logger.debug("[HITECH RAW RESPONSE] status=%d, body=%s", resp.status_code, resp.text[:500])
+
+        resp.raise_for_status()
+
+        response_text = resp.text.strip()
+
+        # Check if response is HTML (error page) instead of key=value pairs
+        if "<html" in response_text.lower() or "<!doctype" in response_text.lower():
+            logger.error("[HITECH ERROR] API returned HTML page instead of data - likely invalid credentials")
+            # Try to extract error message from HTML
+            error_detail = "API returned HTML error page"
+            if "invalid" in response_text.lower():
+                error_detail = "Invalid credentials - check Merchant ID, User ID, and PIN"
+            elif "merchant" in response_text.lower() and "not found" in response_text.lower():
+                error_detail = "Merchant ID not found - must be numeric Converge account ID (not business name)"
+            elif "user" in response_text.lower() and "not found" in response_text.lower():
+                error_detail = "User ID not found or does not have API access"
+            elif "pin" in response_text.lower():
+                error_detail = "Invalid PIN - must be 64-character terminal identifier"
+            return {"ssl_result": "1", "ssl_result_message": error_detail, "_html_error": "true"}
+
+        # Converge returns key=value pairs, one per line
+        result = {}
+        for line in response_text.split("\n"):
+            if "=" in line:
+                key, value = line.split("=", 1)
+                result[key.strip()] = value.strip()
+
+        # Check if we got any valid response data
+        if not result:
+            logger.error("[HITECH ERROR] Empty or unparseable response")
+            return {"ssl_result": "1", "ssl_result_message": "Empty response from API - check credentials"}
+
+        # Log parsed response
+        ssl_result = result.get("ssl_result", "?")
+        ssl_result_msg = result.get("ssl_result_message", "")
+        ssl_txn_id = result.get("ssl_txn_id", "")
+        logger.info(
+            "[HITECH RESPONSE] type=%s, result=%s, message=%s, txn_id=%s",
+            txn_type, ssl_result, ssl_result_msg, ssl_txn_id
+        )
+
+        return result
 
+    @staticmethod
+    def _log_failure(txn_type: str, exc: Exception) -> None:
+        if isinstance(exc, httpx.TimeoutException):
+            logger.error("[HITECH TIMEOUT] type=%s, error=%s", txn_type, exc)
+        elif isinstance(exc, httpx.HTTPStatusError):
+            logger.error("[HITECH HTTP ERROR] type=%s, status=%d, error=%s", txn_type, exc.response.status_code, exc)
+        else:
+            logger.error("[HITECH ERROR] type=%s, error=%s", txn_type, exc)
+
+    def _post_request(self, params: dict[str, str]) -> dict[str, str]:
+        """Send form-encoded POST to Converge and parse response."""
+        all_params, txn_type = self._request_params(params)
         try:
-            resp = httpx.post(
+            resp = get_http_client("hitech").post(
                 self._base_url,
                 data=all_params,
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=30.0,
+                timeout=gateway_timeout(30.0),
             )
+            return self._parse_response(resp, txn_type)
+        except Exception as exc:
+            self._log_failure(txn_type, exc)
+            raise
 
-            # Log raw response
-            logger.debug("[HITECH RAW RESPONSE] status=%d, body=%s", resp.status_code, resp.text[:500])
-
-            resp.raise_for_status()
-
-            response_text = resp.text.strip()
-
-            # Check if response is HTML (error page) instead of key=value pairs
-            if "<html" in response_text.lower() or "<!doctype" in response_text.lower():
-                logger.error("[HITECH ERROR] API returned HTML page instead of data - likely invalid credentials")
-                # Try to extract error message from HTML
-                error_detail = "API returned HTML error page"
-                if "invalid" in response_text.lower():
-                    error_detail = "Invalid credentials - check Merchant ID, User ID, and PIN"
-                elif "merchant" in response_text.lower() and "not found" in response_text.lower():
-                    error_detail = "Merchant ID not found - must be numeric Converge account ID (not business name)"
-                elif "user" in response_text.lower() and "not found" in response_text.lower():
-                    error_detail = "User ID not found or does not have API access"
-                elif "pin" in response_text.lower():
-                    error_detail = "Invalid PIN - must be 64-character terminal identifier"
-                return {"ssl_result": "1", "ssl_result_message": error_detail, "_html_error": "true"}
-
-            # Converge returns key=value pairs, one per line
-            result = {}
-            for line in response_text.split("\n"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    result[key.strip()] = value.strip()
-
-            # Check if we got any valid response data
-            if not result:
-                logger.error("[HITECH ERROR] Empty or unparseable response")
-                return {"ssl_result": "1", "ssl_result_message": "Empty response from API - check credentials"}
-
-            # Log parsed response
-            ssl_result = result.get("ssl_result", "?")
-            ssl_result_msg = result.get("ssl_result_message", "")
-            ssl_txn_id = result.get("ssl_txn_id", "")
-            logger.info(
-                "[HITECH RESPONSE] type=%s, result=%s, message=%s, txn_id=%s",
-                txn_type, ssl_result, ssl_result_msg, ssl_txn_id
+    async def _post_request_async(self, params: dict[str, str]) -> dict[str, str]:
+        all_params, txn_type = self._request_params(params)
+        try:
+            resp = await get_async_http_client("hitech").post(
+                self._base_url,
+                data=all_params,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=gateway_timeout(30.0),
             )
-
-            return result
-
-        except httpx.TimeoutException as exc:
-            logger.error("[HITECH TIMEOUT] type=%s, error=%s", txn_type, exc)
-            raise
-        except httpx.HTTPStatusError as exc:
-            logger.error("[HITECH HTTP ERROR] type=%s, status=%d, error=%s", txn_type, exc.response.status_code, exc)
-            raise
+            return self._parse_response(resp, txn_type)
         except Exception as exc:
-            logger.error("[HITECH ERROR] type=%s, error=%s", txn_type, exc)
+            self._log_failure(txn_type, exc)
             raise
 
     def test_connection(self) -> tuple[bool, str]:
@@ -233,6 +261,10 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
                 message=str(exc),
             )
 
+    async def initiate_payment_async(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        # No gateway call until card data arrives
+        return self.initiate_payment(amount, member_id, description)
+
     def process_card_sale(
         self,
         amount: Decimal,
@@ -285,61 +317,104 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
                 message=str(exc),
             )
 
-    def check_status(self, session_id: str) -> PaymentStatus:
-        """Check transaction status."""
+    @staticmethod
+    def _payment_status(result: dict[str, str], session_id: str) -> PaymentStatus:
+        if result.get("ssl_result") == "0":
+            return PaymentStatus(
+                session_id=session_id,
+                status=PaymentStatusEnum.completed,
+                message=result.get("ssl_result_message", "Completed"),
+            )
+        return PaymentStatus(
+            session_id=session_id,
+            status=PaymentStatusEnum.failed,
+            message=result.get("ssl_result_message", "Not found"),
+        )
+
+    @staticmethod
+    def _status_failed(exc: Exception, session_id: str) -> PaymentStatus:
+        logger.exception("HiTech status check failed: session=%s", session_id)
+        return PaymentStatus(
+            session_id=session_id,
+            status=PaymentStatusEnum.failed,
+            message=str(exc),
+        )
+
+    @staticmethod
+    def _awaiting_card(session_id: str) -> PaymentStatus | None:
         if session_id.startswith("hitech_"):
             return PaymentStatus(
                 session_id=session_id,
                 status=PaymentStatusEnum.pending,
                 message="Awaiting card data",
             )
+        return None
+
+    def check_status(self, session_id: str) -> PaymentStatus:
+        """Check transaction status."""
+        pending = self._awaiting_card(session_id)
+        if pending:
+            return pending
         try:
             result = self._post_request({
                 "ssl_transaction_type": "txnquery",
                 "ssl_txn_id": session_id,
             })
-            if result.get("ssl_result") == "0":
-                return PaymentStatus(
-                    session_id=session_id,
-                    status=PaymentStatusEnum.completed,
-                    message=result.get("ssl_result_message", "Completed"),
-                )
-            return PaymentStatus(
-                session_id=session_id,
-                status=PaymentStatusEnum.failed,
-                message=result.get("ssl_result_message", "Not found"),
-            )
         except Exception as exc:
-            logger.exception("HiTech status check failed: session=%s", session_id)
-            return PaymentStatus(
-                session_id=session_id,
-                status=PaymentStatusEnum.failed,
-                message=str(exc),
+            return self._status_failed(exc, session_id)
+        return self._payment_status(result, session_id)
+
+    async def check_status_async(self, session_id: str) -> PaymentStatus:
+        pending = self._awaiting_card(session_id)
+        if pending:
+            return pending
+        try:
+            result = await self._post_request_async({
+                "ssl_transaction_type": "txnquery",
+                "ssl_txn_id": session_id,
+            })
+        except Exception as exc:
+            return self._status_failed(exc, session_id)
+        return self._payment_status(result, session_id)
+
+    @staticmethod
+    def _refund_params(transaction_id: str, amount: Decimal) -> dict[str, str]:
+        return {
+            "ssl_transaction_type": "ccreturn",
+            "ssl_txn_id": transaction_id,
+            "ssl_amount": f"{amount:.2f}",
+        }
+
+    @staticmethod
+    def _refund_result(result: dict[str, str], amount: Decimal) -> RefundResult:
+        if result.get("ssl_result") == "0":
+            refund_id = result.get("ssl_txn_id", "")
+            logger.info("HiTech refund completed: id=%s, amount=$%s", refund_id, amount)
+            return RefundResult(
+                success=True,
+                refund_id=refund_id,
+                message=result.get("ssl_result_message", "Refund processed"),
             )
+        error_msg = result.get("ssl_result_message", "Refund failed")
+        logger.warning("HiTech refund failed: %s", error_msg)
+        return RefundResult(success=False, message=error_msg)
 
     def refund(self, transaction_id: str, amount: Decimal) -> RefundResult:
         """Process a refund for a previous transaction."""
-        amount_str = f"{amount:.2f}"
         try:
-            result = self._post_request({
-                "ssl_transaction_type": "ccreturn",
-                "ssl_txn_id": transaction_id,
-                "ssl_amount": amount_str,
-            })
-            if result.get("ssl_result") == "0":
-                refund_id = result.get("ssl_txn_id", "")
-                logger.info("HiTech refund completed: id=%s, amount=$%s", refund_id, amount)
-                return RefundResult(
-                    success=True,
-                    refund_id=refund_id,
-                    message=result.get("ssl_result_message", "Refund processed"),
-                )
-            error_msg = result.get("ssl_result_message", "Refund failed")
-            logger.warning("HiTech refund failed: %s", error_msg)
-            return RefundResult(success=False, message=error_msg)
+            result = self._post_request(self._refund_params(transaction_id, amount))
         except Exception as exc:
             logger.exception("HiTech refund failed: tx=%s, amount=$%s", transaction_id, amount)
             return RefundResult(success=False, message=str(exc))
+        return self._refund_result(result, amount)
+
+    async def refund_async(self, transaction_id: str, amount: Decimal) -> RefundResult:
+        try:
+            result = await self._post_request_async(self._refund_params(transaction_id, amount))
+        except Exception as exc:
+            logger.exception("HiTech refund failed: tx=%s, amount=$%s", transaction_id, amount)
+            return RefundResult(success=False, message=str(exc))
+        return self._refund_result(result, amount)
 
     def tokenize_card(self, card_last4: str, card_brand: str, member_id: str) -> str:
         """Generate a token placeholder for a card."""
@@ -347,6 +422,9 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
         logger.info("HiTech token placeholder created: member=%s, last4=%s", member_id, card_last4)
         return token
 
+    async def tokenize_card_async(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        return self.tokenize_card(card_last4, card_brand, member_id)
+
     def generate_card_token(
         self, card_number: str, exp_date: str, member_id: str
     ) -> tuple[str, str, str]:
@@ -375,36 +453,53 @@ class HiTechPaymentAdapter(BasePaymentAdapter):
             logger.exception("HiTech tokenization failed: member=%s", member_id)
             raise RuntimeError(f"HiTech tokenization failed: {exc}")
 
+    @staticmethod
+    def _saved_card_params(token: str, amount: Decimal, member_id: str, description: str) -> dict[str, str]:
+        return {
+            "ssl_transaction_type": "ccsale",
+            "ssl_token": token,
+            "ssl_amount": f"{amount:.2f}",
+            "ssl_description": description,
+            "ssl_invoice_number": member_id,
+        }
+
+    @staticmethod
+    def _saved_card_result(result: dict[str, str], amount: Decimal, member_id: str) -> SavedCardChargeResult:
+        if result.get("ssl_result") == "0":
+            txn_id = result.get("ssl_txn_id", "")
+            logger.info(
+                "HiTech saved card charged: txn_id=%s, amount=$%s, member=%s",
+                txn_id, amount, member_id
+            )
+            return SavedCardChargeResult(
+                success=True,
+                reference_id=txn_id,
+                message=result.get("ssl_result_message", "Approved"),
+            )
+        error_msg = result.get("ssl_result_message", "Charge declined")
+        logger.warning("HiTech saved card charge declined: %s", error_msg)
+        return SavedCardChargeResult(success=False, message=error_msg)
+
     def charge_saved_card(
-        self, token: str, amount: Decimal, member_id: str, description: str
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
         """Charge a previously tokenized card."""
-        amount_str = f"{amount:.2f}"
         try:
-            result = self._post_request({
-                "ssl_transaction_type": "ccsale",
-                "ssl_token": token,
-                "ssl_amount": amount_str,
-                "ssl_description": description,
-                "ssl_invoice_number": member_id,
-            })
-            if result.get("ssl_result") == "0":
-                txn_id = result.get("ssl_txn_id", "")
-                logger.info(
-                    "HiTech saved card charged: txn_id=%s, amount=$%s, member=%s",
-                    txn_id, amount, member_id
-                )
-                return SavedCardChargeResult(
-                    success=True,
-                    reference_id=txn_id,
-                    message=result.get("ssl_result_message", "Approved"),
-                )
-            error_msg = result.get("ssl_result_message", "Charge declined")
-            logger.warning("HiTech saved card charge declined: %s", error_msg)
-            return SavedCardChargeResult(success=False, message=error_msg)
+            result = self._post_request(self._saved_card_params(token, amount, member_id, description))
+        except Exception as exc:
+            logger.exception("HiTech saved card charge failed: member=%s, amount=$%s", member_id, amount)
+            return SavedCardChargeResult(success=False, message=str(exc))
+        return self._saved_card_result(result, amount, member_id)
+
+    async def charge_saved_card_async(
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
+    ) -> SavedCardChargeResult:
+        try:
+            result = await self._post_request_async(self._saved_card_params(token, amount, member_id, description))
         except Exception as exc:
             logger.exception("HiTech saved card charge failed: member=%s, amount=$%s", member_id, amount)
             return SavedCardChargeResult(success=False, message=str(exc))
+        return self._saved_card_result(result, amount, member_id)
 
     def void_transaction(self, transaction_id: str) -> RefundResult:
         """Void a transaction (same-day cancellation before settlement)."""
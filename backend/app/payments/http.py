@@ -0,0 +1,244 @@
+"""
+Shared HTTP clients for payment gateways.
+
+Every gateway adapter sends its requests through one long-lived httpx.Client
+per processor, so TCP and TLS connections are kept alive and reused across
+card sales, refunds and terminal polls instead of being set up per request.
+The async adapter methods do the same with one httpx.AsyncClient per
+processor and event loop. HTTP/2 is used when the optional h2 package is
+installed.
+
+Timeouts are split by phase: connecting gives up quickly, while the read
+timeout is set per call (a card sale can legitimately take much longer than
+a status poll).
+
+Each request's latency is recorded in a per-processor histogram, exposed by
+GET /api/payments/latency.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - only needed for httpx's HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - h2 is optional
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+WRITE_TIMEOUT = 10.0
+POOL_TIMEOUT = 5.0
+
+# A kiosk site talks to one gateway host; a few warm connections cover
+# concurrent kiosks and the auto-charge run
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0)
+
+# Upper bounds (seconds) of the latency histogram buckets; slower requests land in +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_clients: dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+# AsyncClient connections belong to the loop that opened them, so there is one set per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def gateway_timeout(read: float = READ_TIMEOUT) -> httpx.Timeout:
+    """Per-phase timeout for a gateway call with the given read timeout."""
+    return httpx.Timeout(connect=CONNECT_TIMEOUT, read=read, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of request durations, safe to update from several threads."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (None if empty or beyond the last bucket)."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return None
+
+    def snapshot(self) -> dict:
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+        p99 = self.quantile(0.99)
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, self.counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.count
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "sum_seconds": round(self.total_seconds, 6),
+                "avg_seconds": round(self.total_seconds / self.count, 6) if self.count else None,
+                "p50_seconds": p50,
+                "p95_seconds": p95,
+                "p99_seconds": p99,
+                "buckets": buckets,
+            }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def latency_histogram(processor: str) -> LatencyHistogram:
+    histogram = _histograms.get(processor)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(processor, LatencyHistogram())
+    return histogram
+
+
+def latency_snapshot() -> dict[str, dict]:
+    """Latency histograms of every processor that has sent a request."""
+    return {processor: histogram.snapshot() for processor, histogram in sorted(_histograms.items())}
+
+
+def reset_latency() -> None:
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class TimedTransport(httpx.BaseTransport):
+    """Transport wrapper recording each request's duration in the processor's histogram."""
+
+    def __init__(self, processor: str, transport: httpx.BaseTransport):
+        self.processor = processor
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        histogram = latency_histogram(self.processor)
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except httpx.TransportError:
+            histogram.observe(time.perf_counter() - started, error=True)
+            raise
+        histogram.observe(time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class TimedAsyncTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of TimedTransport, feeding the same histograms."""
+
+    def __init__(self, processor: str, transport: httpx.AsyncBaseTransport):
+        self.processor = processor
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        histogram = latency_histogram(self.processor)
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            histogram.observe(time.perf_counter() - started, error=True)
+            raise
+        histogram.observe(time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def build_http_client(processor: str) -> httpx.Client:
+    transport = httpx.HTTPTransport(http2=HTTP2_AVAILABLE, limits=POOL_LIMITS)
+    return httpx.Client(
+        transport=TimedTransport(processor, transport),
+        timeout=gateway_timeout(),
+        headers={"User-Agent": "pool-kiosk/1.0"},
+    )
+
+
+def get_http_client(processor: str) -> httpx.Client:
+    """The shared keep-alive client for a processor, created on first use."""
+    client = _clients.get(processor)
+    if client is not None and not client.is_closed:
+        return client
+    with _clients_lock:
+        client = _clients.get(processor)
+        if client is None or client.is_closed:
+            client = build_http_client(processor)
+            _clients[processor] = client
+            logger.debug("Created HTTP client for %s (http2=%s)", processor, HTTP2_AVAILABLE)
+    return client
+
+
+def build_async_http_client(processor: str) -> httpx.AsyncClient:
+    transport = httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=POOL_LIMITS)
+    return httpx.AsyncClient(
+        transport=TimedAsyncTransport(processor, transport),
+        timeout=gateway_timeout(),
+        headers={"User-Agent": "pool-kiosk/1.0"},
+    )
+
+
+def get_async_http_client(processor: str) -> httpx.AsyncClient:
+    """The shared keep-alive async client for a processor on the running event loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(processor)
+    if client is None or client.is_closed:
+        client = build_async_http_client(processor)
+        clients[processor] = client
+    return client
+
+
+def warm_connection(processor: str, url: str) -> None:
+    """Open a pooled connection to the gateway (DNS, TCP, TLS) ahead of the first real request."""
+    try:
+        get_http_client(processor).head(url, timeout=gateway_timeout(read=5.0))
+    except httpx.HTTPError as exc:
+        logger.warning("Could not pre-connect to %s gateway: %s", processor, exc)
+
+
+def close_http_clients() -> None:
+    """Close every shared gateway client (shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def close_async_http_clients() -> None:
+    """Close the async gateway clients opened on the running event loop (shutdown)."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
@@ -12,6 +12,7 @@ from app.payments.base import (
     RefundResult,
     SavedCardChargeResult,
 )
+from app.payments.http import gateway_timeout, get_async_http_client, get_http_client, warm_connection
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,14 @@ class SolaPaymentAdapter(BasePaymentAdapter):
         self._api_secret = self.config.get("sola_api_secret", "")
         self._merchant_id = self.config.get("sola_merchant_id", "")
 
+    @property
+    def _client(self) -> httpx.Client:
+        return get_http_client("sola")
+
+    def warm_up(self) -> None:
+        if self._api_key:
+            warm_connection("sola", self._base_url)
+
     def _headers(self) -> dict[str, str]:
         return {
             "Authorization": f"Bearer {self._api_key}",
@@ -45,153 +54,226 @@ class SolaPaymentAdapter(BasePaymentAdapter):
         if not self._api_key:
             return False, "Sola API key not configured"
         try:
-            resp = httpx.get(f"{self._base_url}/merchant/info", headers=self._headers(), timeout=10.0)
+            resp = self._client.get(
+                f"{self._base_url}/merchant/info", headers=self._headers(), timeout=gateway_timeout(10.0)
+            )
             if resp.status_code == 200:
                 return True, "Connected to Sola successfully"
             return False, f"Sola API returned status {resp.status_code}: {resp.text[:200]}"
         except httpx.RequestError as exc:
             return False, f"Sola connection failed: {exc}"
 
-    def initiate_payment(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
-        amount_cents = int(amount * 100)
-        idempotency_key = uuid.uuid4().hex
-        try:
-            resp = httpx.post(
-                f"{self._base_url}/payments",
-                headers=self._headers(),
-                json={
-                    "idempotency_key": idempotency_key,
-                    "amount": amount_cents,
-                    "currency": "USD",
-                    "description": description,
-                    "metadata": {"member_id": member_id},
-                },
-                timeout=15.0,
-            )
-            if resp.status_code in (200, 201):
-                data = resp.json()
-                payment_id = data.get("id", idempotency_key)
-                logger.info("Sola payment created: id=%s, amount=$%s, member=%s", payment_id, amount, member_id)
-                return PaymentSession(
-                    session_id=payment_id,
-                    status=PaymentStatusEnum.completed,
-                    amount=amount,
-                    message="Payment completed",
-                )
-            error_msg = resp.text[:200]
-            logger.warning("Sola payment failed: status=%d, body=%s", resp.status_code, error_msg)
+    def _send(self, method: str, path: str, body: dict | None = None, read_timeout: float = 15.0) -> httpx.Response:
+        return self._client.request(
+            method, f"{self._base_url}/{path}", headers=self._headers(), json=body,
+            timeout=gateway_timeout(read_timeout),
+        )
+
+    async def _send_async(
+        self, method: str, path: str, body: dict | None = None, read_timeout: float = 15.0
+    ) -> httpx.Response:
+        return await get_async_http_client("sola").request(
+            method, f"{self._base_url}/{path}", headers=self._headers(), json=body,
+            timeout=gateway_timeout(read_timeout),
+        )
+
+    # Each operation builds its request body and parses the response in
+    # helpers shared by the sync and async variants.
+
+    @staticmethod
+    def _payment_body(amount: Decimal, member_id: str, description: str) -> dict:
+        return {
+            "idempotency_key": uuid.uuid4().hex,
+            "amount": int(amount * 100),
+            "currency": "USD",
+            "description": description,
+            "metadata": {"member_id": member_id},
+        }
+
+    @staticmethod
+    def _payment_session(resp: httpx.Response, body: dict, amount: Decimal, member_id: str) -> PaymentSession:
+        idempotency_key = body["idempotency_key"]
+        if resp.status_code in (200, 201):
+            data = resp.json()
+            payment_id = data.get("id", idempotency_key)
+            logger.info("Sola payment created: id=%s, amount=$%s, member=%s", payment_id, amount, member_id)
             return PaymentSession(
-                session_id=f"sola_err_{idempotency_key[:8]}",
-                status=PaymentStatusEnum.failed,
+                session_id=payment_id,
+                status=PaymentStatusEnum.completed,
                 amount=amount,
-                message=error_msg,
+                message="Payment completed",
             )
+        error_msg = resp.text[:200]
+        logger.warning("Sola payment failed: status=%d, body=%s", resp.status_code, error_msg)
+        return PaymentSession(
+            session_id=f"sola_err_{idempotency_key[:8]}",
+            status=PaymentStatusEnum.failed,
+            amount=amount,
+            message=error_msg,
+        )
+
+    @staticmethod
+    def _payment_failed(exc: Exception, amount: Decimal, member_id: str) -> PaymentSession:
+        logger.exception("Sola payment initiation failed: member=%s, amount=$%s", member_id, amount)
+        return PaymentSession(
+            session_id=f"sola_err_{uuid.uuid4().hex[:8]}",
+            status=PaymentStatusEnum.failed,
+            amount=amount,
+            message=str(exc),
+        )
+
+    def initiate_payment(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        body = self._payment_body(amount, member_id, description)
+        try:
+            return self._payment_session(self._send("POST", "payments", body), body, amount, member_id)
         except Exception as exc:
-            logger.exception("Sola payment initiation failed: member=%s, amount=$%s", member_id, amount)
-            return PaymentSession(
-                session_id=f"sola_err_{uuid.uuid4().hex[:8]}",
-                status=PaymentStatusEnum.failed,
-                amount=amount,
-                message=str(exc),
+            return self._payment_failed(exc, amount, member_id)
+
+    async def initiate_payment_async(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        body = self._payment_body(amount, member_id, description)
+        try:
+            return self._payment_session(await self._send_async("POST", "payments", body), body, amount, member_id)
+        except Exception as exc:
+            return self._payment_failed(exc, amount, member_id)
+
+    @staticmethod
+    def _payment_status(resp: httpx.Response, session_id: str) -> PaymentStatus:
+        if resp.status_code == 200:
+            data = resp.json()
+            sola_status = data.get("status", "unknown")
+            status_map = {
+                "completed": PaymentStatusEnum.completed,
+                "pending": PaymentStatusEnum.pending,
+                "failed": PaymentStatusEnum.failed,
+                "refunded": PaymentStatusEnum.refunded,
+            }
+            return PaymentStatus(
+                session_id=session_id,
+                status=status_map.get(sola_status, PaymentStatusEnum.pending),
+                message=sola_status,
             )
+        return PaymentStatus(session_id=session_id, status=PaymentStatusEnum.failed, message=resp.text[:200])
 
     def check_status(self, session_id: str) -> PaymentStatus:
         try:
-            resp = httpx.get(
-                f"{self._base_url}/payments/{session_id}",
-                headers=self._headers(),
-                timeout=10.0,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                sola_status = data.get("status", "unknown")
-                status_map = {
-                    "completed": PaymentStatusEnum.completed,
-                    "pending": PaymentStatusEnum.pending,
-                    "failed": PaymentStatusEnum.failed,
-                    "refunded": PaymentStatusEnum.refunded,
-                }
-                return PaymentStatus(
-                    session_id=session_id,
-                    status=status_map.get(sola_status, PaymentStatusEnum.pending),
-                    message=sola_status,
-                )
-            return PaymentStatus(session_id=session_id, status=PaymentStatusEnum.failed, message=resp.text[:200])
+            return self._payment_status(self._send("GET", f"payments/{session_id}", read_timeout=10.0), session_id)
         except Exception as exc:
             logger.exception("Sola status check failed: session=%s", session_id)
             return PaymentStatus(session_id=session_id, status=PaymentStatusEnum.failed, message=str(exc))
 
+    async def check_status_async(self, session_id: str) -> PaymentStatus:
+        try:
+            resp = await self._send_async("GET", f"payments/{session_id}", read_timeout=10.0)
+            return self._payment_status(resp, session_id)
+        except Exception as exc:
+            logger.exception("Sola status check failed: session=%s", session_id)
+            return PaymentStatus(session_id=session_id, status=PaymentStatusEnum.failed, message=str(exc))
+
+    @staticmethod
+    def _refund_body(transaction_id: str, amount: Decimal) -> dict:
+        return {
+            "payment_id": transaction_id,
+            "amount": int(amount * 100),
+            "idempotency_key": uuid.uuid4().hex,
+        }
+
+    @staticmethod
+    def _refund_result(resp: httpx.Response, amount: Decimal) -> RefundResult:
+        if resp.status_code in (200, 201):
+            data = resp.json()
+            refund_id = data.get("id", "")
+            logger.info("Sola refund created: id=%s, amount=$%s", refund_id, amount)
+            return RefundResult(success=True, refund_id=refund_id, message="Refund processed")
+        return RefundResult(success=False, message=resp.text[:200])
+
     def refund(self, transaction_id: str, amount: Decimal) -> RefundResult:
-        amount_cents = int(amount * 100)
         try:
-            resp = httpx.post(
-                f"{self._base_url}/refunds",
-                headers=self._headers(),
-                json={
-                    "payment_id": transaction_id,
-                    "amount": amount_cents,
-                    "idempotency_key": uuid.uuid4().hex,
-                },
-                timeout=15.0,
-            )
-            if resp.status_code in (200, 201):
-                data = resp.json()
-                refund_id = data.get("id", "")
-                logger.info("Sola refund created: id=%s, amount=$%s", refund_id, amount)
-                return RefundResult(success=True, refund_id=refund_id, message="Refund processed")
-            return RefundResult(success=False, message=resp.text[:200])
+            return self._refund_result(self._send("POST", "refunds", self._refund_body(transaction_id, amount)), amount)
         except Exception as exc:
             logger.exception("Sola refund failed: tx=%s, amount=$%s", transaction_id, amount)
             return RefundResult(success=False, message=str(exc))
 
+    async def refund_async(self, transaction_id: str, amount: Decimal) -> RefundResult:
+        try:
+            resp = await self._send_async("POST", "refunds", self._refund_body(transaction_id, amount))
+            return self._refund_result(resp, amount)
+        except Exception as exc:
+            logger.exception("Sola refund failed: tx=%s, amount=$%s", transaction_id, amount)
+            return RefundResult(success=False, message=str(exc))
+
+    @staticmethod
+    def _customer_body(card_last4: str, card_brand: str, member_id: str) -> dict:
+        return {
+            "reference_id": member_id,
+            "card_last4": card_last4,
+            "card_brand": card_brand,
+        }
+
+    @staticmethod
+    def _customer_id(resp: httpx.Response, member_id: str) -> str:
+        if resp.status_code in (200, 201):
+            data = resp.json()
+            customer_id = data.get("id", "")
+            logger.info("Sola customer created: id=%s, member=%s", customer_id, member_id)
+            return customer_id
+        raise RuntimeError(f"Sola tokenization failed: {resp.text[:200]}")
+
     def tokenize_card(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        body = self._customer_body(card_last4, card_brand, member_id)
         try:
-            resp = httpx.post(
-                f"{self._base_url}/customers",
-                headers=self._headers(),
-                json={
-                    "reference_id": member_id,
-                    "card_last4": card_last4,
-                    "card_brand": card_brand,
-                },
-                timeout=10.0,
-            )
-            if resp.status_code in (200, 201):
-                data = resp.json()
-                customer_id = data.get("id", "")
-                logger.info("Sola customer created: id=%s, member=%s", customer_id, member_id)
-                return customer_id
-            raise RuntimeError(f"Sola tokenization failed: {resp.text[:200]}")
+            resp = self._send("POST", "customers", body, read_timeout=10.0)
+        except httpx.RequestError as exc:
+            logger.exception("Sola tokenization failed: member=%s", member_id)
+            raise RuntimeError(f"Sola tokenization failed: {exc}")
+        return self._customer_id(resp, member_id)
+
+    async def tokenize_card_async(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        body = self._customer_body(card_last4, card_brand, member_id)
+        try:
+            resp = await self._send_async("POST", "customers", body, read_timeout=10.0)
         except httpx.RequestError as exc:
             logger.exception("Sola tokenization failed: member=%s", member_id)
             raise RuntimeError(f"Sola tokenization failed: {exc}")
+        return self._customer_id(resp, member_id)
+
+    @staticmethod
+    def _saved_card_body(token: str, amount: Decimal, member_id: str, description: str) -> dict:
+        return {
+            "idempotency_key": uuid.uuid4().hex,
+            "amount": int(amount * 100),
+            "currency": "USD",
+            "customer_id": token,
+            "description": description,
+            "metadata": {"member_id": member_id},
+        }
+
+    @staticmethod
+    def _saved_card_result(resp: httpx.Response, amount: Decimal, member_id: str) -> SavedCardChargeResult:
+        if resp.status_code in (200, 201):
+            data = resp.json()
+            payment_id = data.get("id", "")
+            logger.info("Sola saved card charged: id=%s, amount=$%s, member=%s", payment_id, amount, member_id)
+            return SavedCardChargeResult(success=True, reference_id=payment_id, message="Charge completed")
+        error_msg = resp.text[:200]
+        logger.warning("Sola saved card charge failed: %s", error_msg)
+        return SavedCardChargeResult(success=False, message=error_msg)
 
     def charge_saved_card(
-        self, token: str, amount: Decimal, member_id: str, description: str
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
-        amount_cents = int(amount * 100)
+        body = self._saved_card_body(token, amount, member_id, description)
         try:
-            resp = httpx.post(
-                f"{self._base_url}/payments",
-                headers=self._headers(),
-                json={
-                    "idempotency_key": uuid.uuid4().hex,
-                    "amount": amount_cents,
-                    "currency": "USD",
-                    "customer_id": token,
-                    "description": description,
-                    "metadata": {"member_id": member_id},
-                },
-                timeout=15.0,
-            )
-            if resp.status_code in (200, 201):
-                data = resp.json()
-                payment_id = data.get("id", "")
-                logger.info("Sola saved card charged: id=%s, amount=$%s, member=%s", payment_id, amount, member_id)
-                return SavedCardChargeResult(success=True, reference_id=payment_id, message="Charge completed")
-            error_msg = resp.text[:200]
-            logger.warning("Sola saved card charge failed: %s", error_msg)
-            return SavedCardChargeResult(success=False, message=error_msg)
+            return self._saved_card_result(self._send("POST", "payments", body), amount, member_id)
+        except Exception as exc:
+            logger.exception("Sola saved card charge failed: member=%s, amount=$%s", member_id, amount)
+            return SavedCardChargeResult(success=False, message=str(exc))
+
+    async def charge_saved_card_async(
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
+    ) -> SavedCardChargeResult:
+        body = self._saved_card_body(token, amount, member_id, description)
+        try:
+            return self._saved_card_result(await self._send_async("POST", "payments", body), amount, member_id)
         except Exception as exc:
             logger.exception("Sola saved card charge failed: member=%s, amount=$%s", member_id, amount)
             return SavedCardChargeResult(success=False, message=str(exc))
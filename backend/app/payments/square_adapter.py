@@ -156,7 +156,7 @@ class SquarePaymentAdapter(BasePaymentAdapter):
             raise RuntimeError(f"Square tokenization failed: {exc}")
 
     def charge_saved_card(
-        self, token: str, amount: Decimal, member_id: str, description: str
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
         if not self._client:
             raise RuntimeError("Square SDK not available")
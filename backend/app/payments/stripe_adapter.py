@@ -115,7 +115,7 @@ class StripePaymentAdapter(BasePaymentAdapter):
             raise RuntimeError(f"Stripe tokenization failed: {exc}")
 
     def charge_saved_card(
-        self, token: str, amount: Decimal, member_id: str, description: str
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
         if not self._stripe:
             raise RuntimeError("stripe package not installed")
@@ -56,3 +56,22 @@ class StubPaymentAdapter(BasePaymentAdapter):
             reference_id=ref_id,
             message="Saved card charge completed successfully",
         )
+
+    # Nothing here blocks, so the async variants answer directly instead of using a worker thread
+
+    async def initiate_payment_async(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        return self.initiate_payment(amount, member_id, description)
+
+    async def check_status_async(self, session_id: str) -> PaymentStatus:
+        return self.check_status(session_id)
+
+    async def refund_async(self, transaction_id: str, amount: Decimal) -> RefundResult:
+        return self.refund(transaction_id, amount)
+
+    async def tokenize_card_async(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        return self.tokenize_card(card_last4, card_brand, member_id)
+
+    async def charge_saved_card_async(
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
+    ) -> SavedCardChargeResult:
+        return self.charge_saved_card(token, amount, member_id, description, customer_name)
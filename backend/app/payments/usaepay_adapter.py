@@ -15,6 +15,7 @@ from app.payments.base import (
     RefundResult,
     SavedCardChargeResult,
 )
+from app.payments.http import gateway_timeout, get_async_http_client, get_http_client, warm_connection
 
 logger = logging.getLogger(__name__)
 
@@ -72,16 +73,64 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         return {
             "Content-Type": "application/json",
             "Authorization": f"Basic {self._get_auth_header()}",
-            "User-Agent": "pool-kiosk/1.0",
         }
 
+    @property
+    def _client(self) -> httpx.Client:
+        return get_http_client("usaepay")
+
+    def warm_up(self) -> None:
+        if self.api_key:
+            warm_connection("usaepay", self.base_url)
+
     def _make_request(self, endpoint: str, data: dict) -> dict:
         """Make authenticated request to USAePay API."""
         url = f"{self.base_url}/{endpoint}"
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, json=data, headers=self._get_headers())
-            response.raise_for_status()
-            return response.json()
+        response = self._client.post(url, json=data, headers=self._get_headers(), timeout=gateway_timeout(30.0))
+        response.raise_for_status()
+        return response.json()
+
+    async def _make_request_async(self, endpoint: str, data: dict) -> dict:
+        url = f"{self.base_url}/{endpoint}"
+        response = await get_async_http_client("usaepay").post(
+            url, json=data, headers=self._get_headers(), timeout=gateway_timeout(30.0)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _get(self, path: str) -> dict:
+        response = self._client.get(
+            f"{self.base_url}/{path}", headers=self._get_headers(), timeout=gateway_timeout(10.0)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _get_async(self, path: str) -> dict:
+        response = await get_async_http_client("usaepay").get(
+            f"{self.base_url}/{path}", headers=self._get_headers(), timeout=gateway_timeout(10.0)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _delete(self, path: str) -> None:
+        response = self._client.delete(
+            f"{self.base_url}/{path}", headers=self._get_headers(), timeout=gateway_timeout(10.0)
+        )
+        response.raise_for_status()
+
+    async def _delete_async(self, path: str) -> None:
+        response = await get_async_http_client("usaepay").delete(
+            f"{self.base_url}/{path}", headers=self._get_headers(), timeout=gateway_timeout(10.0)
+        )
+        response.raise_for_status()
+
+    @staticmethod
+    def _error_message(exc: httpx.HTTPStatusError, default: str) -> str:
+        """The gateway's error text from a failed response, if it sent one."""
+        try:
+            return exc.response.json().get("error", default)
+        except Exception:
+            return default
 
     def test_connection(self) -> tuple[bool, str]:
         if not self.api_key:
@@ -93,8 +142,7 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
             # Valid credentials will return 200 (possibly empty list)
             # Invalid credentials will return 401 with error details
             url = f"{self.base_url}/transactions"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(url, headers=self._get_headers())
+            response = self._client.get(url, headers=self._get_headers(), timeout=gateway_timeout(10.0))
 
             if response.status_code == 200:
                 return True, "Connected to USAePay successfully"
@@ -116,106 +164,181 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         except httpx.RequestError as exc:
             return False, f"USAePay connection failed: {exc}"
 
-    def initiate_payment(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
-        try:
-            data = {
-                "command": "sale",
-                "amount": str(amount),
-                "description": description,
-                "invoice": f"pool-{uuid.uuid4().hex[:8]}",
-                "custom_fields": {
-                    "member_id": member_id,
-                },
-            }
-            result = self._make_request("transactions", data)
+    # Each operation is split into request data, the HTTP call and result
+    # parsing, so the sync and async variants differ only in how they wait.
 
-            # USAePay returns result_code: A (approved), D (declined), E (error)
-            result_code = result.get("result_code", "E")
-            if result_code == "A":
-                status = PaymentStatusEnum.completed
-            elif result_code == "D":
-                status = PaymentStatusEnum.failed
-            else:
-                status = PaymentStatusEnum.pending
+    @staticmethod
+    def _sale_data(amount: Decimal, member_id: str, description: str) -> dict:
+        return {
+            "command": "sale",
+            "amount": str(amount),
+            "description": description,
+            "invoice": f"pool-{uuid.uuid4().hex[:8]}",
+            "custom_fields": {
+                "member_id": member_id,
+            },
+        }
 
-            transaction_key = result.get("key", f"usaepay_{uuid.uuid4().hex[:8]}")
-            logger.info(
-                "USAePay payment initiated: key=%s, amount=$%s, member=%s, result=%s",
-                transaction_key, amount, member_id, result_code
-            )
+    @staticmethod
+    def _payment_session(result: dict, amount: Decimal, member_id: str) -> PaymentSession:
+        # USAePay returns result_code: A (approved), D (declined), E (error)
+        result_code = result.get("result_code", "E")
+        if result_code == "A":
+            status = PaymentStatusEnum.completed
+        elif result_code == "D":
+            status = PaymentStatusEnum.failed
+        else:
+            status = PaymentStatusEnum.pending
+
+        transaction_key = result.get("key", f"usaepay_{uuid.uuid4().hex[:8]}")
+        logger.info(
+            "USAePay payment initiated: key=%s, amount=$%s, member=%s, result=%s",
+            transaction_key, amount, member_id, result_code
+        )
+
+        return PaymentSession(
+            session_id=transaction_key,
+            status=status,
+            amount=amount,
+            message=result.get("result", ""),
+        )
+
+    @staticmethod
+    def _payment_failed(exc: Exception, amount: Decimal, member_id: str) -> PaymentSession:
+        logger.exception("USAePay payment initiation failed: member=%s, amount=$%s", member_id, amount)
+        return PaymentSession(
+            session_id=f"usaepay_err_{uuid.uuid4().hex[:8]}",
+            status=PaymentStatusEnum.failed,
+            amount=amount,
+            message=str(exc),
+        )
 
-            return PaymentSession(
-                session_id=transaction_key,
-                status=status,
-                amount=amount,
-                message=result.get("result", ""),
-            )
+    def initiate_payment(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        try:
+            result = self._make_request("transactions", self._sale_data(amount, member_id, description))
         except httpx.RequestError as exc:
-            logger.exception("USAePay payment initiation failed: member=%s, amount=$%s", member_id, amount)
-            return PaymentSession(
-                session_id=f"usaepay_err_{uuid.uuid4().hex[:8]}",
-                status=PaymentStatusEnum.failed,
-                amount=amount,
-                message=str(exc),
-            )
+            return self._payment_failed(exc, amount, member_id)
+        return self._payment_session(result, amount, member_id)
+
+    async def initiate_payment_async(self, amount: Decimal, member_id: str, description: str) -> PaymentSession:
+        try:
+            result = await self._make_request_async("transactions", self._sale_data(amount, member_id, description))
+        except httpx.RequestError as exc:
+            return self._payment_failed(exc, amount, member_id)
+        return self._payment_session(result, amount, member_id)
+
+    @staticmethod
+    def _payment_status(result: dict, session_id: str) -> PaymentStatus:
+        result_code = result.get("result_code", "E")
+        status_map = {
+            "A": PaymentStatusEnum.completed,
+            "D": PaymentStatusEnum.failed,
+            "E": PaymentStatusEnum.failed,
+            "P": PaymentStatusEnum.pending,  # Partial approval
+            "V": PaymentStatusEnum.pending,  # Verification required
+        }
+        ps = status_map.get(result_code, PaymentStatusEnum.pending)
+
+        return PaymentStatus(
+            session_id=session_id,
+            status=ps,
+            message=result.get("result", result_code),
+        )
+
+    @staticmethod
+    def _status_failed(exc: Exception, session_id: str) -> PaymentStatus:
+        logger.exception("USAePay status check failed: session=%s", session_id)
+        return PaymentStatus(
+            session_id=session_id,
+            status=PaymentStatusEnum.failed,
+            message=str(exc),
+        )
 
     def check_status(self, session_id: str) -> PaymentStatus:
         try:
-            url = f"{self.base_url}/transactions/{session_id}"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(url, headers=self._get_headers())
-                response.raise_for_status()
-                result = response.json()
-
-            result_code = result.get("result_code", "E")
-            status_map = {
-                "A": PaymentStatusEnum.completed,
-                "D": PaymentStatusEnum.failed,
-                "E": PaymentStatusEnum.failed,
-                "P": PaymentStatusEnum.pending,  # Partial approval
-                "V": PaymentStatusEnum.pending,  # Verification required
-            }
-            ps = status_map.get(result_code, PaymentStatusEnum.pending)
-
-            return PaymentStatus(
-                session_id=session_id,
-                status=ps,
-                message=result.get("result", result_code),
-            )
+            result = self._get(f"transactions/{session_id}")
         except httpx.RequestError as exc:
-            logger.exception("USAePay status check failed: session=%s", session_id)
-            return PaymentStatus(
-                session_id=session_id,
-                status=PaymentStatusEnum.failed,
-                message=str(exc),
+            return self._status_failed(exc, session_id)
+        return self._payment_status(result, session_id)
+
+    async def check_status_async(self, session_id: str) -> PaymentStatus:
+        try:
+            result = await self._get_async(f"transactions/{session_id}")
+        except httpx.RequestError as exc:
+            return self._status_failed(exc, session_id)
+        return self._payment_status(result, session_id)
+
+    @staticmethod
+    def _refund_data(transaction_id: str, amount: Decimal) -> dict:
+        return {
+            "command": "refund",
+            "trankey": transaction_id,
+            "amount": str(amount),
+        }
+
+    @staticmethod
+    def _refund_result(result: dict, amount: Decimal) -> RefundResult:
+        result_code = result.get("result_code", "E")
+        if result_code == "A":
+            refund_key = result.get("key", "")
+            logger.info("USAePay refund processed: key=%s, amount=$%s", refund_key, amount)
+            return RefundResult(
+                success=True,
+                refund_id=refund_key,
+                message="Refund processed",
+            )
+        else:
+            return RefundResult(
+                success=False,
+                message=result.get("error", "Refund declined"),
             )
 
     def refund(self, transaction_id: str, amount: Decimal) -> RefundResult:
         try:
-            data = {
-                "command": "refund",
-                "trankey": transaction_id,
-                "amount": str(amount),
-            }
-            result = self._make_request("transactions", data)
+            result = self._make_request("transactions", self._refund_data(transaction_id, amount))
+        except httpx.RequestError as exc:
+            logger.exception("USAePay refund failed: tx=%s, amount=$%s", transaction_id, amount)
+            return RefundResult(success=False, message=str(exc))
+        return self._refund_result(result, amount)
 
-            result_code = result.get("result_code", "E")
-            if result_code == "A":
-                refund_key = result.get("key", "")
-                logger.info("USAePay refund processed: key=%s, amount=$%s", refund_key, amount)
-                return RefundResult(
-                    success=True,
-                    refund_id=refund_key,
-                    message="Refund processed",
-                )
-            else:
-                return RefundResult(
-                    success=False,
-                    message=result.get("error", "Refund declined"),
-                )
+    async def refund_async(self, transaction_id: str, amount: Decimal) -> RefundResult:
+        try:
+            result = await self._make_request_async("transactions", self._refund_data(transaction_id, amount))
         except httpx.RequestError as exc:
             logger.exception("USAePay refund failed: tx=%s, amount=$%s", transaction_id, amount)
             return RefundResult(success=False, message=str(exc))
+        return self._refund_result(result, amount)
+
+    @staticmethod
+    def _tokenize_data(card_last4: str, member_id: str) -> dict:
+        # Create a zero-dollar authorization to get a token
+        return {
+            "command": "authonly",
+            "amount": "0.00",
+            "save_card": True,
+            "description": f"Card tokenization for member {member_id}",
+            "custom_fields": {
+                "member_id": member_id,
+                "card_last4": card_last4,
+            },
+        }
+
+    @staticmethod
+    def _token_from(result: dict, member_id: str) -> str:
+        if result.get("result_code") != "A":
+            raise RuntimeError(f"Tokenization failed: {result.get('error', 'Unknown error')}")
+
+        # The savedcard key is the token
+        token = result.get("savedcard", {}).get("key", "")
+        if not token:
+            # Fall back to creditcard.token if savedcard not present
+            token = result.get("creditcard", {}).get("token", "")
+
+        if not token:
+            raise RuntimeError("No token returned from USAePay")
+
+        logger.info("USAePay card tokenized: member=%s, token=%s...", member_id, token[:8])
+        return token
 
     def tokenize_card(self, card_last4: str, card_brand: str, member_id: str) -> str:
         """
@@ -225,79 +348,82 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         This method creates a $0 auth to tokenize the card, then voids it.
         """
         try:
-            # Create a zero-dollar authorization to get a token
-            data = {
-                "command": "authonly",
-                "amount": "0.00",
-                "save_card": True,
-                "description": f"Card tokenization for member {member_id}",
-                "custom_fields": {
-                    "member_id": member_id,
-                    "card_last4": card_last4,
-                },
-            }
-            result = self._make_request("transactions", data)
-
-            if result.get("result_code") != "A":
-                raise RuntimeError(f"Tokenization failed: {result.get('error', 'Unknown error')}")
-
-            # The savedcard key is the token
-            token = result.get("savedcard", {}).get("key", "")
-            if not token:
-                # Fall back to creditcard.token if savedcard not present
-                token = result.get("creditcard", {}).get("token", "")
-
-            if not token:
-                raise RuntimeError("No token returned from USAePay")
-
-            logger.info("USAePay card tokenized: member=%s, token=%s...", member_id, token[:8])
-            return token
+            result = self._make_request("transactions", self._tokenize_data(card_last4, member_id))
+        except httpx.RequestError as exc:
+            logger.exception("USAePay tokenization failed: member=%s", member_id)
+            raise RuntimeError(f"USAePay tokenization failed: {exc}")
+        return self._token_from(result, member_id)
 
+    async def tokenize_card_async(self, card_last4: str, card_brand: str, member_id: str) -> str:
+        try:
+            result = await self._make_request_async("transactions", self._tokenize_data(card_last4, member_id))
         except httpx.RequestError as exc:
             logger.exception("USAePay tokenization failed: member=%s", member_id)
             raise RuntimeError(f"USAePay tokenization failed: {exc}")
+        return self._token_from(result, member_id)
+
+    @staticmethod
+    def _saved_card_data(
+        token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None
+    ) -> dict:
+        data = {
+            "command": "sale",
+            "amount": str(amount),
+            "description": description,
+            "creditcard": {
+                "number": token,  # Token goes in number field
+            },
+            "custom_fields": {
+                "member_id": member_id,
+            },
+        }
+        # Add billing info with customer name if provided
+        if customer_name:
+            data["billing"] = {"name": customer_name}
+        return data
+
+    @staticmethod
+    def _saved_card_result(result: dict, amount: Decimal, member_id: str) -> SavedCardChargeResult:
+        result_code = result.get("result_code", "E")
+        transaction_key = result.get("key", "")
+
+        if result_code == "A":
+            logger.info(
+                "USAePay saved card charged: key=%s, amount=$%s, member=%s",
+                transaction_key, amount, member_id
+            )
+            return SavedCardChargeResult(
+                success=True,
+                reference_id=transaction_key,
+                message="Payment successful",
+            )
+        else:
+            return SavedCardChargeResult(
+                success=False,
+                message=result.get("error", "Payment declined"),
+            )
 
     def charge_saved_card(
         self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
     ) -> SavedCardChargeResult:
+        data = self._saved_card_data(token, amount, member_id, description, customer_name)
         try:
-            data = {
-                "command": "sale",
-                "amount": str(amount),
-                "description": description,
-                "creditcard": {
-                    "number": token,  # Token goes in number field
-                },
-                "custom_fields": {
-                    "member_id": member_id,
-                },
-            }
-            # Add billing info with customer name if provided
-            if customer_name:
-                data["billing"] = {"name": customer_name}
             result = self._make_request("transactions", data)
+        except httpx.RequestError as exc:
+            logger.exception("USAePay saved card charge failed: member=%s, amount=$%s", member_id, amount)
+            return SavedCardChargeResult(success=False, message=str(exc))
+        return self._saved_card_result(result, amount, member_id)
 
-            result_code = result.get("result_code", "E")
-            transaction_key = result.get("key", "")
-
-            if result_code == "A":
-                logger.info(
-                    "USAePay saved card charged: key=%s, amount=$%s, member=%s",
-                    transaction_key, amount, member_id
-                )
-                return SavedCardChargeResult(
-                    success=True,
-                    reference_id=transaction_key,
-                    message="Payment successful",
-                )
-            else:
-                return SavedCardChargeResult(
-                    success=False,
-                    message=result.get("error", "Payment declined"),
-                )
+    async def charge_saved_card_async(
+        self, token: str, amount: Decimal, member_id: str, description: str, customer_name: str | None = None
+    ) -> SavedCardChargeResult:
+        data = self._saved_card_data(token, amount, member_id, description, customer_name)
+        try:
+            result = await self._make_request_async("transactions", data)
         except httpx.RequestError as exc:
             logger.exception("USAePay saved card charge failed: member=%s, amount=$%s", member_id, amount)
             return SavedCardChargeResult(success=False, message=str(exc))
+        return self._saved_card_result(result, amount, member_id)
 
     # ==================== TERMINAL PAYMENT METHODS ====================
 
@@ -305,6 +431,35 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         """Check if a terminal device is configured."""
         return bool(self.device_key)
 
+    def _terminal_data(
+        self, amount: Decimal, description: str, timeout: int, save_card: bool, prompt_tip: bool
+    ) -> dict:
+        return {
+            "devicekey": self.device_key,
+            "command": "sale",
+            "amount": str(amount),
+            "timeout": timeout,
+            "save_card": save_card,
+            "prompt_tip": prompt_tip,
+            "invoice": f"pool-{uuid.uuid4().hex[:8]}",
+            "description": description,
+        }
+
+    @staticmethod
+    def _terminal_started(result: dict, amount: Decimal, member_id: str) -> TerminalPaymentResult:
+        request_key = result.get("key", "")
+        status = result.get("status", "unknown")
+
+        logger.info(
+            "USAePay terminal payment initiated: request_key=%s, amount=$%s, member=%s, status=%s",
+            request_key, amount, member_id, status
+        )
+
+        return TerminalPaymentResult(
+            request_key=request_key,
+            status=status,
+        )
+
     def initiate_terminal_payment(
         self,
         amount: Decimal,
@@ -328,44 +483,49 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
             )
 
         try:
-            data = {
-                "devicekey": self.device_key,
-                "command": "sale",
-                "amount": str(amount),
-                "timeout": timeout,
-                "save_card": save_card,
-                "prompt_tip": prompt_tip,
-                "invoice": f"pool-{uuid.uuid4().hex[:8]}",
-                "description": description,
-            }
-
+            data = self._terminal_data(amount, description, timeout, save_card, prompt_tip)
             result = self._make_request("paymentengine/payrequests", data)
-
-            request_key = result.get("key", "")
-            status = result.get("status", "unknown")
-
-            logger.info(
-                "USAePay terminal payment initiated: request_key=%s, amount=$%s, member=%s, status=%s",
-                request_key, amount, member_id, status
+        except httpx.HTTPStatusError as exc:
+            logger.exception("USAePay terminal payment failed: member=%s, amount=$%s", member_id, amount)
+            return TerminalPaymentResult(
+                request_key="",
+                status="error",
+                error=self._error_message(exc, "Terminal payment request failed"),
             )
+        except httpx.RequestError as exc:
+            logger.exception("USAePay terminal payment failed: member=%s, amount=$%s", member_id, amount)
+            return TerminalPaymentResult(
+                request_key="",
+                status="error",
+                error=str(exc),
+            )
+        return self._terminal_started(result, amount, member_id)
 
+    async def initiate_terminal_payment_async(
+        self,
+        amount: Decimal,
+        member_id: str,
+        description: str,
+        timeout: int = 120,
+        save_card: bool = False,
+        prompt_tip: bool = False,
+    ) -> TerminalPaymentResult:
+        if not self.device_key:
             return TerminalPaymentResult(
-                request_key=request_key,
-                status=status,
+                request_key="",
+                status="error",
+                error="No terminal device configured",
             )
 
+        try:
+            data = self._terminal_data(amount, description, timeout, save_card, prompt_tip)
+            result = await self._make_request_async("paymentengine/payrequests", data)
         except httpx.HTTPStatusError as exc:
-            error_msg = "Terminal payment request failed"
-            try:
-                error_data = exc.response.json()
-                error_msg = error_data.get("error", error_msg)
-            except Exception:
-                pass
             logger.exception("USAePay terminal payment failed: member=%s, amount=$%s", member_id, amount)
             return TerminalPaymentResult(
                 request_key="",
                 status="error",
-                error=error_msg,
+                error=self._error_message(exc, "Terminal payment request failed"),
             )
         except httpx.RequestError as exc:
             logger.exception("USAePay terminal payment failed: member=%s, amount=$%s", member_id, amount)
@@ -374,6 +534,52 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
                 status="error",
                 error=str(exc),
             )
+        return self._terminal_started(result, amount, member_id)
+
+    @staticmethod
+    def _terminal_status(result: dict, request_key: str) -> TerminalPaymentResult:
+        status = result.get("status", "unknown")
+        complete = result.get("complete", False)
+
+        # Extract transaction details if complete
+        transaction = result.get("transaction", {})
+        approved = transaction.get("result_code") == "A" if transaction else False
+        transaction_key = transaction.get("key", "") if transaction else None
+        auth_code = transaction.get("authcode", "") if transaction else None
+
+        # Extract card info
+        card_info = transaction.get("creditcard", {}) if transaction else {}
+        card_last4 = card_info.get("number", "")[-4:] if card_info.get("number") else None
+        card_brand = card_info.get("type", None)
+
+        # Check for errors
+        error = result.get("error") or (transaction.get("error") if transaction else None)
+
+        logger.debug(
+            "USAePay terminal status: request_key=%s, status=%s, complete=%s, approved=%s",
+            request_key, status, complete, approved
+        )
+
+        return TerminalPaymentResult(
+            request_key=request_key,
+            status=status,
+            complete=complete,
+            approved=approved,
+            transaction_key=transaction_key,
+            auth_code=auth_code,
+            card_last4=card_last4,
+            card_brand=card_brand,
+            error=error,
+        )
+
+    @staticmethod
+    def _terminal_status_failed(exc: Exception, request_key: str) -> TerminalPaymentResult:
+        logger.exception("USAePay terminal status check failed: request_key=%s", request_key)
+        return TerminalPaymentResult(
+            request_key=request_key,
+            status="error",
+            error=str(exc),
+        )
 
     def check_terminal_payment_status(self, request_key: str) -> TerminalPaymentResult:
         """
@@ -382,71 +588,98 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         Poll this endpoint until 'complete' is True or the timeout expires.
         """
         try:
-            url = f"{self.base_url}/paymentengine/payrequests/{request_key}"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(url, headers=self._get_headers())
-                response.raise_for_status()
-                result = response.json()
-
-            status = result.get("status", "unknown")
-            complete = result.get("complete", False)
-
-            # Extract transaction details if complete
-            transaction = result.get("transaction", {})
-            approved = transaction.get("result_code") == "A" if transaction else False
-            transaction_key = transaction.get("key", "") if transaction else None
-            auth_code = transaction.get("authcode", "") if transaction else None
-
-            # Extract card info
-            card_info = transaction.get("creditcard", {}) if transaction else {}
-            card_last4 = card_info.get("number", "")[-4:] if card_info.get("number") else None
-            card_brand = card_info.get("type", None)
-
-            # Check for errors
-            error = result.get("error") or (transaction.get("error") if transaction else None)
-
-            logger.debug(
-                "USAePay terminal status: request_key=%s, status=%s, complete=%s, approved=%s",
-                request_key, status, complete, approved
-            )
-
-            return TerminalPaymentResult(
-                request_key=request_key,
-                status=status,
-                complete=complete,
-                approved=approved,
-                transaction_key=transaction_key,
-                auth_code=auth_code,
-                card_last4=card_last4,
-                card_brand=card_brand,
-                error=error,
-            )
+            result = self._get(f"paymentengine/payrequests/{request_key}")
+        except httpx.RequestError as exc:
+            return self._terminal_status_failed(exc, request_key)
+        return self._terminal_status(result, request_key)
 
+    async def check_terminal_payment_status_async(self, request_key: str) -> TerminalPaymentResult:
+        try:
+            result = await self._get_async(f"paymentengine/payrequests/{request_key}")
         except httpx.RequestError as exc:
-            logger.exception("USAePay terminal status check failed: request_key=%s", request_key)
-            return TerminalPaymentResult(
-                request_key=request_key,
-                status="error",
-                error=str(exc),
-            )
+            return self._terminal_status_failed(exc, request_key)
+        return self._terminal_status(result, request_key)
 
     def cancel_terminal_payment(self, request_key: str) -> bool:
         """Cancel a pending terminal payment request."""
         try:
-            url = f"{self.base_url}/paymentengine/payrequests/{request_key}"
-            with httpx.Client(timeout=10.0) as client:
-                response = client.delete(url, headers=self._get_headers())
-                response.raise_for_status()
-
-            logger.info("USAePay terminal payment cancelled: request_key=%s", request_key)
-            return True
+            self._delete(f"paymentengine/payrequests/{request_key}")
+        except httpx.RequestError:
+            logger.exception("USAePay terminal cancel failed: request_key=%s", request_key)
+            return False
+        logger.info("USAePay terminal payment cancelled: request_key=%s", request_key)
+        return True
 
-        except httpx.RequestError as exc:
+    async def cancel_terminal_payment_async(self, request_key: str) -> bool:
+        try:
+            await self._delete_async(f"paymentengine/payrequests/{request_key}")
+        except httpx.RequestError:
             logger.exception("USAePay terminal cancel failed: request_key=%s", request_key)
             return False
+        logger.info("USAePay terminal payment cancelled: request_key=%s", request_key)
+        return True
 
     # ==================== MANUAL CARD ENTRY METHODS ====================
 
+    @staticmethod
+    def _manual_sale_data(
+        card_number: str, exp_date: str, cvv: str, amount: Decimal, member_id: str, description: str,
+        save_card: bool, customer_name: str | None,
+    ) -> dict:
+        data = {
+            "command": "sale",
+            "amount": str(amount),
+            "creditcard": {
+                "number": card_number,
+                "expiration": exp_date,
+                "cvv": cvv,
+            },
+            "description": description,
+            "invoice": f"pool-{uuid.uuid4().hex[:8]}",
+            "save_card": save_card,
+            "custom_fields": {
+                "member_id": member_id,
+            },
+        }
+        # Add billing info with customer name if provided
+        if customer_name:
+            data["billing"] = {"name": customer_name}
+        return data
+
+    @staticmethod
+    def _manual_sale_result(result: dict, amount: Decimal, member_id: str, save_card: bool) -> SavedCardChargeResult:
+        result_code = result.get("result_code", "E")
+        transaction_key = result.get("key", "")
+
+        if result_code == "A":
+            # Extract saved card token if requested
+            card_token = None
+            if save_card:
+                card_token = result.get("savedcard", {}).get("key", "")
+                if not card_token:
+                    card_token = result.get("creditcard", {}).get("token", "")
+
+            logger.info(
+                "USAePay manual card sale processed: key=%s, amount=$%s, member=%s",
+                transaction_key, amount, member_id
+            )
+            return SavedCardChargeResult(
+                success=True,
+                reference_id=transaction_key,
+                message="Payment successful",
+                card_token=card_token,
+            )
+        else:
+            error_msg = result.get("error", "Payment declined")
+            logger.warning(
+                "USAePay manual card sale declined: member=%s, amount=$%s, error=%s",
+                member_id, amount, error_msg
+            )
+            return SavedCardChargeResult(
+                success=False,
+                message=error_msg,
+            )
+
     def process_manual_card_sale(
         self,
         card_number: str,
@@ -464,70 +697,39 @@ class UsaepayPaymentAdapter(BasePaymentAdapter):
         This is used when the terminal is not available and card details
         are entered manually (e.g., phone orders, backup payment method).
         """
+        data = self._manual_sale_data(
+            card_number, exp_date, cvv, amount, member_id, description, save_card, customer_name
+        )
         try:
-            data = {
-                "command": "sale",
-                "amount": str(amount),
-                "creditcard": {
-                    "number": card_number,
-                    "expiration": exp_date,
-                    "cvv": cvv,
-                },
-                "description": description,
-                "invoice": f"pool-{uuid.uuid4().hex[:8]}",
-                "save_card": save_card,
-                "custom_fields": {
-                    "member_id": member_id,
-                },
-            }
-            # Add billing info with customer name if provided
-            if customer_name:
-                data["billing"] = {"name": customer_name}
-
             result = self._make_request("transactions", data)
-
-            result_code = result.get("result_code", "E")
-            transaction_key = result.get("key", "")
-
-            if result_code == "A":
-                # Extract saved card token if requested
-                card_token = None
-                if save_card:
-                    card_token = result.get("savedcard", {}).get("key", "")
-                    if not card_token:
-                        card_token = result.get("creditcard", {}).get("token", "")
-
-                logger.info(
-                    "USAePay manual card sale processed: key=%s, amount=$%s, member=%s",
-                    transaction_key, amount, member_id
-                )
-                return SavedCardChargeResult(
-                    success=True,
-                    reference_id=transaction_key,
-                    message="Payment successful",
-                    card_token=card_token,
-                )
-            else:
-                error_msg = result.get("error", "Payment declined")
-                logger.warning(
-                    "USAePay manual card sale declined: member=%s, amount=$%s, error=%s",
-                    member_id, amount, error_msg
-                )
-                return SavedCardChargeResult(
-                    success=False,
-                    message=error_msg,
-                )
-
         except httpx.HTTPStatusError as exc:
-            error_msg = "Payment processing failed"
-            try:
-                error_data = exc.response.json()
-                error_msg = error_data.get("error", error_msg)
-            except Exception:
-                pass
             logger.exception("USAePay manual card sale failed: member=%s, amount=$%s", member_id, amount)
-            return SavedCardChargeResult(success=False, message=error_msg)
+            return SavedCardChargeResult(success=False, message=self._error_message(exc, "Payment processing failed"))
+        except httpx.RequestError as exc:
+            logger.exception("USAePay manual card sale failed: member=%s, amount=$%s", member_id, amount)
+            return SavedCardChargeResult(success=False, message=str(exc))
+        return self._manual_sale_result(result, amount, member_id, save_card)
 
+    async def process_manual_card_sale_async(
+        self,
+        card_number: str,
+        exp_date: str,
+        cvv: str,
+        amount: Decimal,
+        member_id: str,
+        description: str,
+        save_card: bool = False,
+        customer_name: str | None = None,
+    ) -> SavedCardChargeResult:
+        data = self._manual_sale_data(
+            card_number, exp_date, cvv, amount, member_id, description, save_card, customer_name
+        )
+        try:
+            result = await self._make_request_async("transactions", data)
+        except httpx.HTTPStatusError as exc:
+            logger.exception("USAePay manual card sale failed: member=%s, amount=$%s", member_id, amount)
+            return SavedCardChargeResult(success=False, message=self._error_message(exc, "Payment processing failed"))
         except httpx.RequestError as exc:
             logger.exception("USAePay manual card sale failed: member=%s, amount=$%s", member_id, amount)
             return SavedCardChargeResult(success=False, message=str(exc))
+        return self._manual_sale_result(result, amount, member_id, save_card)
@@ -1,8 +1,9 @@
 import logging
+import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -23,27 +24,13 @@ from app.models.setting import Setting
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.services.auth_service import get_current_user
+from app.services.backup_service import BACKUP_TABLES
+from app.services.row_serializers import dumps, serialize_model
 from app.services.settings_service import get_setting
 
 router = APIRouter()
 
 
-def serialize_model(obj):
-    """Convert a SQLAlchemy model to a dict, handling dates and enums."""
-    result = {}
-    for column in obj.__table__.columns:
-        value = getattr(obj, column.name)
-        if value is None:
-            result[column.name] = None
-        elif hasattr(value, 'isoformat'):
-            result[column.name] = value.isoformat()
-        elif hasattr(value, 'value'):  # Enum
-            result[column.name] = value.value
-        else:
-            result[column.name] = str(value) if not isinstance(value, (str, int, float, bool)) else value
-    return result
-
-
 @router.get("/export")
 def export_system(
     db: Session = Depends(get_db),
@@ -72,8 +59,9 @@ def export_system(
         }
 
         logger.info("System export created by user=%s", current_user.id)
-        return JSONResponse(
-            content=export_data,
+        return Response(
+            content=dumps(export_data),
+            media_type="application/json",
             headers={
                 "Content-Disposition": f"attachment; filename=pool-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
             }
@@ -84,284 +72,174 @@ def export_system(
 
 
 @router.post("/import")
-async def import_system(
+def import_system(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Import system data from a backup JSON file. WARNING: This replaces all existing data!"""
-    import json
-    import uuid
-    from datetime import date, datetime as dt
-    from decimal import Decimal
+    """Import system data from a backup file (NDJSON/gzip, COPY archive or legacy JSON). WARNING: This replaces all existing data!
 
-    from app.models.checkin import CheckinType
-    from app.models.plan import PlanType
-    from app.models.transaction import PaymentMethod, TransactionType
+    The upload is parsed as a stream and loaded in committed batches. It is
+    validated in full first, so a truncated or malformed file is rejected
+    before any data is cleared. With dry_run, only the validation runs.
+    """
+    from app.services.restore_service import restore_file, validate_file
 
     try:
-        content = await file.read()
-        data = json.loads(content.decode('utf-8'))
-
-        if "export_version" not in data or "data" not in data:
-            raise HTTPException(status_code=400, detail="Invalid backup file format")
-
-        export_data = data["data"]
-
-        # Clear existing data in reverse dependency order
-        db.query(ActivityLog).delete()
-        db.query(PinLockout).delete()
-        db.query(Checkin).delete()
-        db.query(Transaction).delete()
-        db.query(MembershipFreeze).delete()
-        db.query(SavedCard).delete()
-        db.query(Membership).delete()
-        db.query(Card).delete()
-        db.query(GuestVisit).delete()
-        db.query(Member).delete()
-        db.query(Plan).delete()
-        db.query(User).delete()
-        db.query(Setting).delete()
-        db.commit()
-
-        def parse_date(val):
-            if val is None:
-                return None
-            if isinstance(val, str):
-                return date.fromisoformat(val.split('T')[0]) if 'T' in val else date.fromisoformat(val)
-            return val
-
-        def parse_datetime(val):
-            if val is None:
-                return None
-            if isinstance(val, str):
-                return dt.fromisoformat(val.replace('Z', '+00:00').replace('+00:00', ''))
-            return val
-
-        def parse_uuid(val):
-            if val is None:
-                return None
-            return uuid.UUID(val) if isinstance(val, str) else val
-
-        def parse_decimal(val):
-            if val is None:
-                return None
-            return Decimal(str(val))
-
-        # Import settings
-        for s in export_data.get("settings", []):
-            db.add(Setting(
-                id=parse_uuid(s["id"]),
-                key=s["key"],
-                value=s["value"],
-            ))
-
-        # Import users
-        for u in export_data.get("users", []):
-            db.add(User(
-                id=parse_uuid(u["id"]),
-                username=u["username"],
-                password_hash=u["password_hash"],
-                email=u.get("email"),
-                password_reset_token=u.get("password_reset_token"),
-                password_reset_expires=parse_datetime(u.get("password_reset_expires")),
-                is_active=u.get("is_active", True),
-                created_at=parse_datetime(u.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import plans
-        for p in export_data.get("plans", []):
-            db.add(Plan(
-                id=parse_uuid(p["id"]),
-                name=p["name"],
-                plan_type=PlanType(p["plan_type"]),
-                price=parse_decimal(p["price"]),
-                swim_count=p.get("swim_count"),
-                duration_days=p.get("duration_days"),
-                description=p.get("description"),
-                display_order=p.get("display_order", 0),
-                is_active=p.get("is_active", True),
-                created_at=parse_datetime(p.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import members
-        for m in export_data.get("members", []):
-            db.add(Member(
-                id=parse_uuid(m["id"]),
-                first_name=m["first_name"],
-                last_name=m["last_name"],
-                email=m.get("email"),
-                phone=m.get("phone"),
-                pin_hash=m.get("pin_hash"),
-                credit_balance=parse_decimal(m.get("credit_balance", "0")),
-                notes=m.get("notes"),
-                is_active=m.get("is_active", True),
-                created_at=parse_datetime(m.get("created_at")) or dt.utcnow(),
-            ))
-
-        db.commit()
-
-        # Import cards
-        for c in export_data.get("cards", []):
-            db.add(Card(
-                id=parse_uuid(c["id"]),
-                member_id=parse_uuid(c["member_id"]),
-                rfid_uid=c["rfid_uid"],
-                is_active=c.get("is_active", True),
-                created_at=parse_datetime(c.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import memberships
-        for m in export_data.get("memberships", []):
-            db.add(Membership(
-                id=parse_uuid(m["id"]),
-                member_id=parse_uuid(m["member_id"]),
-                plan_id=parse_uuid(m.get("plan_id")),
-                plan_type=PlanType(m["plan_type"]),
-                swims_total=m.get("swims_total"),
-                swims_used=m.get("swims_used", 0),
-                valid_from=parse_date(m.get("valid_from")),
-                valid_until=parse_date(m.get("valid_until")),
-                is_active=m.get("is_active", True),
-                created_at=parse_datetime(m.get("created_at")) or dt.utcnow(),
-            ))
-
-        db.commit()
-
-        # Import membership freezes
-        for f in export_data.get("membership_freezes", []):
-            db.add(MembershipFreeze(
-                id=parse_uuid(f["id"]),
-                membership_id=parse_uuid(f["membership_id"]),
-                frozen_by=parse_uuid(f.get("frozen_by")),
-                freeze_start=parse_date(f["freeze_start"]),
-                freeze_end=parse_date(f.get("freeze_end")),
-                days_extended=f.get("days_extended", 0),
-                reason=f.get("reason"),
-                created_at=parse_datetime(f.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import saved cards
-        for c in export_data.get("saved_cards", []):
-            db.add(SavedCard(
-                id=parse_uuid(c["id"]),
-                member_id=parse_uuid(c["member_id"]),
-                processor_token=c["processor_token"],
-                card_last4=c["card_last4"],
-                card_brand=c.get("card_brand"),
-                friendly_name=c.get("friendly_name"),
-                is_default=c.get("is_default", False),
-                auto_charge_enabled=c.get("auto_charge_enabled", False),
-                auto_charge_plan_id=parse_uuid(c.get("auto_charge_plan_id")),
-                next_charge_date=parse_date(c.get("next_charge_date")),
-                created_at=parse_datetime(c.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import transactions
-        for t in export_data.get("transactions", []):
-            db.add(Transaction(
-                id=parse_uuid(t["id"]),
-                member_id=parse_uuid(t.get("member_id")),
-                transaction_type=TransactionType(t["transaction_type"]),
-                payment_method=PaymentMethod(t["payment_method"]) if t.get("payment_method") else None,
-                amount=parse_decimal(t["amount"]),
-                plan_id=parse_uuid(t.get("plan_id")),
-                membership_id=parse_uuid(t.get("membership_id")),
-                reference_id=t.get("reference_id"),
-                notes=t.get("notes"),
-                created_at=parse_datetime(t.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import checkins
-        for c in export_data.get("checkins", []):
-            db.add(Checkin(
-                id=parse_uuid(c["id"]),
-                member_id=parse_uuid(c["member_id"]),
-                membership_id=parse_uuid(c.get("membership_id")),
-                checkin_type=CheckinType(c["checkin_type"]),
-                guest_count=c.get("guest_count", 0),
-                notes=c.get("notes"),
-                checked_in_at=parse_datetime(c.get("checked_in_at")) or dt.utcnow(),
-            ))
-
-        # Import guest visits
-        for g in export_data.get("guest_visits", []):
-            db.add(GuestVisit(
-                id=parse_uuid(g["id"]),
-                name=g["name"],
-                phone=g.get("phone"),
-                payment_method=PaymentMethod(g["payment_method"]),
-                amount_paid=parse_decimal(g["amount_paid"]),
-                created_at=parse_datetime(g.get("created_at")) or dt.utcnow(),
-            ))
-
-        # Import pin lockouts
-        for p in export_data.get("pin_lockouts", []):
-            db.add(PinLockout(
-                id=parse_uuid(p["id"]),
-                member_id=parse_uuid(p["member_id"]),
-                failed_attempts=p.get("failed_attempts", 0),
-                locked_until=parse_datetime(p.get("locked_until")),
-                last_attempt_at=parse_datetime(p.get("last_attempt_at")),
-            ))
-
-        # Import activity logs
-        for a in export_data.get("activity_logs", []):
-            db.add(ActivityLog(
-                id=parse_uuid(a["id"]),
-                user_id=parse_uuid(a.get("user_id")),
-                action_type=a["action_type"],
-                entity_type=a.get("entity_type"),
-                entity_id=parse_uuid(a.get("entity_id")),
-                before_value=a.get("before_value"),
-                after_value=a.get("after_value"),
-                note=a.get("note"),
-                created_at=parse_datetime(a.get("created_at")) or dt.utcnow(),
-            ))
-
-        db.commit()
-
-        logger.info("System import completed by user=%s from file=%s", current_user.id, file.filename)
-
-        return {
-            "success": True,
-            "message": "System restored successfully",
-            "stats": {
-                "settings": len(export_data.get("settings", [])),
-                "users": len(export_data.get("users", [])),
-                "plans": len(export_data.get("plans", [])),
-                "members": len(export_data.get("members", [])),
-                "cards": len(export_data.get("cards", [])),
-                "memberships": len(export_data.get("memberships", [])),
-                "transactions": len(export_data.get("transactions", [])),
-                "checkins": len(export_data.get("checkins", [])),
-                "guest_visits": len(export_data.get("guest_visits", [])),
-            }
-        }
-
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON file")
+        result = validate_file(file.file)
+    except (ValueError, OSError, EOFError):
+        raise HTTPException(status_code=400, detail="Invalid backup file format")
+    if dry_run:
+        logger.info("Backup import dry run by user=%s, file=%s, valid=%s", current_user.id, file.filename, result["valid"])
+        return {"success": result["valid"], "dry_run": True, **result}
+    if not result["valid"]:
+        logger.warning("System import rejected: user=%s, file=%s, errors=%s", current_user.id, file.filename, result["errors"])
+        raise HTTPException(status_code=400, detail=f"Invalid backup data: {'; '.join(result['errors'])}")
+
+    # The upload is spooled to a temporary file, so it can be read again
+    file.file.seek(0)
+    try:
+        row_counts = restore_file(db, file.file, batch_commit=True)
+    except (ValueError, OSError) as e:
+        db.rollback()
+        logger.exception("System import failed on invalid data")
+        raise HTTPException(status_code=400, detail=f"Invalid backup data: {e}")
     except Exception as e:
         db.rollback()
         logger.exception("System import failed")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+    logger.info("System import completed by user=%s from file=%s", current_user.id, file.filename)
 
-@router.post("/run")
+    return {
+        "success": True,
+        "message": "System restored successfully",
+        "stats": {name: row_counts.get(name, 0) for name, _ in BACKUP_TABLES},
+    }
+
+
+@router.post("/run", status_code=status.HTTP_202_ACCEPTED)
 def run_backup_now(
+    kind: str | None = Query(None, pattern="^(full|incremental)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Manually trigger a backup using current settings."""
-    from app.services.backup_service import run_backup
+    """Queue a backup using current settings (full or incremental; automatic if omitted).
 
-    result = run_backup(db)
+    Returns the job to poll at /jobs/{id}. If a backup is already queued or
+    running, that job is returned instead of starting another.
+    """
+    from app.services.backup_jobs import enqueue_backup_job, serialize_job
 
-    if result["success"]:
-        logger.info("Manual backup triggered by user=%s, location=%s", current_user.id, result.get("location"))
-        return result
-    else:
-        raise HTTPException(status_code=500, detail=result.get("error", "Backup failed"))
+    job = enqueue_backup_job(db, kind=kind, user_id=current_user.id)
+    logger.info("Manual backup requested by user=%s, job=%s", current_user.id, job.id)
+    return serialize_job(job)
+
+
+@router.get("/jobs")
+def list_backup_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Recent backup jobs, newest first."""
+    from app.services.backup_jobs import list_jobs, serialize_job
+
+    return {"jobs": [serialize_job(job) for job in list_jobs(db, limit)]}
+
+
+@router.get("/jobs/{job_id}")
+def get_backup_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status of one backup job: progress, bytes written and per-table timings."""
+    from app.models.backup_job import BackupJob
+    from app.services.backup_jobs import serialize_job
+
+    job = db.get(BackupJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    return serialize_job(job)
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_backup_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Cancel a queued backup job, or stop a running one at its next checkpoint."""
+    from app.models.backup_job import BackupJob
+    from app.services.backup_jobs import request_cancel, serialize_job
+
+    job = db.get(BackupJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    if job.status not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Backup job is already {job.status}")
+
+    job = request_cancel(db, job)
+    logger.info("Backup job %s cancel requested by user=%s", job.id, current_user.id)
+    return serialize_job(job)
+
+
+@router.post("/restore")
+def restore_stored_backup(
+    filename: str = Query(..., min_length=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Restore a backup from configured storage, replaying its full + incremental chain.
+    WARNING: This replaces all existing data!"""
+    from app.services.backup_service import restore_from_storage
+    from app.services.backup_storage import is_backup_file
+
+    if not is_backup_file(filename) or "/" in filename:
+        raise HTTPException(status_code=400, detail="Invalid backup filename")
+
+    try:
+        result = restore_from_storage(db, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Backup not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Restore from storage failed")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    logger.info("Backup %s restored by user=%s (chain=%d)", filename, current_user.id, len(result["chain"]))
+    return {"success": True, **result}
+
+
+@router.get("/verify")
+def verify_stored_backup(
+    filename: str = Query(..., min_length=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Check a stored backup's file and per-table SHA-256 checksums against its manifest."""
+    from app.services.backup_service import verify_backup
+    from app.services.backup_storage import get_backup_storage, is_backup_file
+
+    if not is_backup_file(filename) or "/" in filename:
+        raise HTTPException(status_code=400, detail="Invalid backup filename")
+
+    try:
+        with get_backup_storage(db) as storage:
+            result = verify_backup(storage, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Backup not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Backup verification failed")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    logger.info("Backup %s verified by user=%s, valid=%s", filename, current_user.id, result["valid"])
+    return result
 
 
 @router.get("/status")
@@ -369,16 +247,23 @@ def get_backup_status(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get current backup configuration and last backup status."""
+    """Get current backup configuration, last backup status and any queued or running job."""
+    from app.services.backup_jobs import get_active_job, serialize_job
+
+    active_job = get_active_job(db)
     return {
         "enabled": get_setting(db, "backup_enabled", "false").lower() == "true",
         "schedule": get_setting(db, "backup_schedule", "daily"),
         "hour": int(get_setting(db, "backup_hour", "2")),
         "retention_count": int(get_setting(db, "backup_retention_count", "7")),
         "remote_type": get_setting(db, "backup_remote_type", "local"),
+        "incremental_enabled": get_setting(db, "backup_incremental_enabled", "false").lower() == "true",
+        "chain_base": get_setting(db, "backup_chain_base", ""),
+        "chain_last": get_setting(db, "backup_chain_last", ""),
         "last_run": get_setting(db, "backup_last_run", ""),
         "last_status": get_setting(db, "backup_last_status", ""),
         "last_location": get_setting(db, "backup_last_location", ""),
+        "active_job": serialize_job(active_job) if active_job is not None else None,
     }
 
 
@@ -388,25 +273,16 @@ def list_backups(
     current_user: User = Depends(get_current_user),
 ):
     """List available backups in configured storage."""
-    from app.services.backup_service import list_backups_local, list_backups_s3
+    from app.services.backup_service import is_incremental_backup
+    from app.services.backup_storage import get_backup_storage
 
     backup_type = get_setting(db, "backup_remote_type", "local")
 
     try:
-        if backup_type == "local":
-            path = get_setting(db, "backup_local_path", "/backups")
-            backups = list_backups_local(path)
-        elif backup_type == "s3":
-            bucket = get_setting(db, "backup_s3_bucket", "")
-            prefix = get_setting(db, "backup_s3_prefix", "backups")
-            access_key = get_setting(db, "backup_s3_access_key", "")
-            secret_key = get_setting(db, "backup_s3_secret_key", "")
-            region = get_setting(db, "backup_s3_region", "us-east-1")
-            endpoint_url = get_setting(db, "backup_s3_endpoint", "") or None
-            backups = list_backups_s3(bucket, prefix, access_key, secret_key, region, endpoint_url)
-        else:
-            # SFTP listing not implemented yet
-            backups = []
+        with get_backup_storage(db, backup_type) as storage:
+            backups = storage.list_backups()
+        for backup in backups:
+            backup["kind"] = "incremental" if is_incremental_backup(backup["filename"]) else "full"
 
         return {"backups": backups, "type": backup_type}
 
@@ -3,8 +3,11 @@ import uuid
 from calendar import monthrange
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -57,18 +60,29 @@ from app.schemas.kiosk import (
     TerminalInfoResponse,
 )
 from app.services.auto_charge_service import (
-    charge_saved_card_now,
+    charge_saved_card_now_async,
     disable_auto_charge,
     enable_auto_charge,
 )
 from app.services.checkin_service import perform_checkin
 from app.services.membership_service import create_membership, freeze_membership, unfreeze_membership
 from app.services.notification_service import notify_checkin, send_change_notification
-from app.services.payment_service import get_payment_adapter, process_card_payment, process_cash_payment
+from app.services.payment_service import get_payment_adapter, process_card_payment_async, process_cash_payment
 from app.services.auth_service import hash_pin
 from app.services.pin_service import verify_member_pin
 from app.services.rate_limit import limiter
 from app.services.settings_service import get_setting
+from app.services.terminal_payment_service import (
+    cancel_session as cancel_terminal_session,
+    create_session as create_terminal_session,
+    get_session as get_terminal_session,
+)
+from app.services.terminal_watcher import (
+    MAX_WAIT_SECONDS,
+    notify_session_changed,
+    wait_for_session_change,
+    wake_watcher,
+)
 
 router = APIRouter()
 
@@ -554,9 +568,11 @@ def pay_cash(data: CashPaymentRequest, request: Request, db: Session = Depends(g
     )
 
 
-@router.post("/pay/card", response_model=PaymentResponse)
-@limiter.limit("20/minute")
-def pay_card(data: CardPaymentRequest, request: Request, db: Session = Depends(get_db)):
+def _card_payment_quote(db: Session, data) -> tuple[Plan, Member, Decimal, Decimal]:
+    """PIN check and lookups for a card purchase, with any account credit applied (not yet committed).
+
+    Returns (plan, member, credit_used, amount left for the card).
+    """
     verify_member_pin(db, data.member_id, data.pin)
 
     plan = db.query(Plan).filter(Plan.id == data.plan_id).first()
@@ -577,81 +593,59 @@ def pay_card(data: CardPaymentRequest, request: Request, db: Session = Depends(g
         effective_price = base_price - credit_used
         member.credit_balance -= credit_used
 
-    # If credit covers entire amount, no card charge needed
-    if effective_price <= 0:
-        membership = create_membership(db, data.member_id, data.plan_id)
-        credit_tx = Transaction(
-            member_id=data.member_id,
-            transaction_type=TransactionType.payment,
-            payment_method=PaymentMethod.credit,
-            amount=credit_used,
-            plan_id=data.plan_id,
-            membership_id=membership.id,
-            notes="Paid with account credit",
-        )
-        db.add(credit_tx)
-        db.commit()
-        db.refresh(credit_tx)
-        logger.info("Kiosk credit-only payment: member=%s, plan=%s, credit=$%s", data.member_id, data.plan_id, credit_used)
-        return PaymentResponse(
-            success=True,
-            transaction_id=credit_tx.id,
-            membership_id=membership.id,
-            credit_used=credit_used,
-            message=f"Paid ${credit_used} with account credit.",
-        )
+    return plan, member, credit_used, effective_price
 
-    # Process card payment for remaining amount
-    if data.saved_card_id:
-        # Use saved card - note: charge_saved_card_now handles membership creation
-        tx = charge_saved_card_now(db, data.saved_card_id, data.plan_id, data.member_id)
 
-        # If credit was used, record credit transaction
-        if credit_used > 0:
-            credit_tx = Transaction(
-                member_id=data.member_id,
-                transaction_type=TransactionType.payment,
-                payment_method=PaymentMethod.credit,
-                amount=credit_used,
-                plan_id=data.plan_id,
-                membership_id=tx.membership_id,
-                notes="Credit portion of payment",
-            )
-            db.add(credit_tx)
-            db.commit()
+def _pay_with_credit_only(db: Session, data, credit_used: Decimal) -> PaymentResponse:
+    """Credit covers the entire amount, so no card charge is needed."""
+    membership = create_membership(db, data.member_id, data.plan_id)
+    credit_tx = Transaction(
+        member_id=data.member_id,
+        transaction_type=TransactionType.payment,
+        payment_method=PaymentMethod.credit,
+        amount=credit_used,
+        plan_id=data.plan_id,
+        membership_id=membership.id,
+        notes="Paid with account credit",
+    )
+    db.add(credit_tx)
+    db.commit()
+    db.refresh(credit_tx)
+    logger.info("Kiosk credit-only payment: member=%s, plan=%s, credit=$%s", data.member_id, data.plan_id, credit_used)
+    return PaymentResponse(
+        success=True,
+        transaction_id=credit_tx.id,
+        membership_id=membership.id,
+        credit_used=credit_used,
+        message=f"Paid ${credit_used} with account credit.",
+    )
 
-        logger.info("Kiosk card payment: member=%s, plan=%s, card=$%s, credit=$%s", data.member_id, data.plan_id, effective_price, credit_used)
-        return PaymentResponse(
-            success=True,
-            transaction_id=tx.id,
-            membership_id=tx.membership_id,
-            credit_used=credit_used,
-            message=f"Payment processed: ${credit_used} credit + ${effective_price} card." if credit_used > 0 else "Saved card payment processed successfully.",
-        )
 
-    # New card payment
-    tx = process_card_payment(db, data.member_id, data.plan_id)
+def _add_credit_portion(db: Session, data, membership_id: uuid.UUID, credit_used: Decimal) -> None:
+    db.add(Transaction(
+        member_id=data.member_id,
+        transaction_type=TransactionType.payment,
+        payment_method=PaymentMethod.credit,
+        amount=credit_used,
+        plan_id=data.plan_id,
+        membership_id=membership_id,
+        notes="Credit portion of payment",
+    ))
 
-    # If credit was used, record credit transaction
+
+def _finish_card_payment(
+    db: Session, data: CardPaymentRequest, tx: Transaction, credit_used: Decimal, effective_price: Decimal,
+    card_token: str | None, message: str,
+) -> PaymentResponse:
+    """Record the credit portion and the card to save after a successful charge."""
     if credit_used > 0:
-        credit_tx = Transaction(
-            member_id=data.member_id,
-            transaction_type=TransactionType.payment,
-            payment_method=PaymentMethod.credit,
-            amount=credit_used,
-            plan_id=data.plan_id,
-            membership_id=tx.membership_id,
-            notes="Credit portion of payment",
-        )
-        db.add(credit_tx)
+        _add_credit_portion(db, data, tx.membership_id, credit_used)
 
-    if data.save_card and data.card_last4:
-        adapter = get_payment_adapter(db)
-        token = adapter.tokenize_card(data.card_last4, data.card_brand or "", str(data.member_id))
+    if card_token:
         friendly = data.friendly_name or f"{data.card_brand or 'Card'} ending {data.card_last4}"
         card = SavedCard(
             member_id=data.member_id,
-            processor_token=token,
+            processor_token=card_token,
             card_last4=data.card_last4,
             card_brand=data.card_brand,
             friendly_name=friendly,
@@ -666,107 +660,49 @@ def pay_card(data: CardPaymentRequest, request: Request, db: Session = Depends(g
         transaction_id=tx.id,
         membership_id=tx.membership_id,
         credit_used=credit_used,
-        message=f"Payment processed: ${credit_used} credit + ${effective_price} card." if credit_used > 0 else "Card payment processed successfully.",
+        message=f"Payment processed: ${credit_used} credit + ${effective_price} card." if credit_used > 0 else message,
     )
 
 
-@router.post("/pay/card/manual", response_model=PaymentResponse)
-@limiter.limit("10/minute")
-def pay_card_manual(data: ManualCardPaymentRequest, request: Request, db: Session = Depends(get_db)):
-    """
-    Process a card-not-present payment with manual card entry.
-
-    Use this when the terminal is not available and card details must be entered manually.
-    Requires full card number, expiration, and CVV.
-    """
-    verify_member_pin(db, data.member_id, data.pin)
-
-    plan = db.query(Plan).filter(Plan.id == data.plan_id).first()
-    if not plan:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
-
-    member = db.query(Member).filter(Member.id == data.member_id).first()
-    if not member:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
-
-    # Validate card number format (basic validation)
-    card_number = data.card_number.replace(" ", "").replace("-", "")
-    if not card_number.isdigit() or len(card_number) < 13 or len(card_number) > 19:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid card number format"
-        )
-
-    # Validate expiration format (MMYY)
-    if not data.exp_date.isdigit() or len(data.exp_date) != 4:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Expiration must be in MMYY format"
-        )
-
-    # Validate CVV format
-    if not data.cvv.isdigit() or len(data.cvv) < 3 or len(data.cvv) > 4:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="CVV must be 3-4 digits"
-        )
-
-    credit_used = Decimal("0.00")
-    base_price = get_plan_effective_price(plan)
-    effective_price = base_price
+# The async payment routes run their PIN checks (bcrypt) and database work in
+# the thread pool, so only the gateway calls are awaited on the event loop.
 
-    # Apply account credit if requested
-    if data.use_credit and member.credit_balance > 0:
-        credit_used = min(member.credit_balance, base_price)
-        effective_price = base_price - credit_used
-        member.credit_balance -= credit_used
+@router.post("/pay/card", response_model=PaymentResponse)
+@limiter.limit("20/minute")
+async def pay_card(data: CardPaymentRequest, request: Request, db: Session = Depends(get_db)):
+    plan, member, credit_used, effective_price = await to_thread.run_sync(_card_payment_quote, db, data)
 
     # If credit covers entire amount, no card charge needed
     if effective_price <= 0:
-        membership = create_membership(db, data.member_id, data.plan_id)
-        credit_tx = Transaction(
-            member_id=data.member_id,
-            transaction_type=TransactionType.payment,
-            payment_method=PaymentMethod.credit,
-            amount=credit_used,
-            plan_id=data.plan_id,
-            membership_id=membership.id,
-            notes="Paid with account credit",
-        )
-        db.add(credit_tx)
-        db.commit()
-        db.refresh(credit_tx)
-        logger.info("Kiosk credit-only payment: member=%s, plan=%s, credit=$%s", data.member_id, data.plan_id, credit_used)
-        return PaymentResponse(
-            success=True,
-            transaction_id=credit_tx.id,
-            membership_id=membership.id,
-            credit_used=credit_used,
-            message=f"Paid ${credit_used} with account credit.",
+        return await to_thread.run_sync(_pay_with_credit_only, db, data, credit_used)
+
+    # Process card payment for remaining amount
+    if data.saved_card_id:
+        # Use saved card - note: charge_saved_card_now handles membership creation
+        tx = await charge_saved_card_now_async(db, data.saved_card_id, data.plan_id, data.member_id)
+        return await to_thread.run_sync(
+            _finish_card_payment, db, data, tx, credit_used, effective_price, None,
+            "Saved card payment processed successfully.",
         )
 
-    # Process manual card payment
-    adapter = get_payment_adapter(db)
+    # New card payment
+    tx = await process_card_payment_async(db, data.member_id, data.plan_id)
 
-    # Check if adapter supports manual card entry
-    if not hasattr(adapter, 'process_manual_card_sale'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Manual card entry not supported by current payment processor"
-        )
+    token = None
+    if data.save_card and data.card_last4:
+        adapter = await to_thread.run_sync(get_payment_adapter, db)
+        token = await adapter.tokenize_card_async(data.card_last4, data.card_brand or "", str(data.member_id))
 
-    customer_name = f"{member.first_name} {member.last_name}"
-    charge_result = adapter.process_manual_card_sale(
-        card_number=card_number,
-        exp_date=data.exp_date,
-        cvv=data.cvv,
-        amount=effective_price,
-        member_id=str(data.member_id),
-        description=f"Purchase: {plan.name}",
-        save_card=data.save_card,
-        customer_name=customer_name,
+    return await to_thread.run_sync(
+        _finish_card_payment, db, data, tx, credit_used, effective_price, token,
+        "Card payment processed successfully.",
     )
 
+
+def _record_manual_card_payment(
+    db: Session, data: ManualCardPaymentRequest, member: Member, card_number: str,
+    credit_used: Decimal, effective_price: Decimal, charge_result,
+) -> PaymentResponse:
     if not charge_result.success:
         # Restore credit if payment failed
         if credit_used > 0:
@@ -782,16 +718,7 @@ def pay_card_manual(data: ManualCardPaymentRequest, request: Request, db: Sessio
 
     # Record credit transaction if credit was used
     if credit_used > 0:
-        credit_tx = Transaction(
-            member_id=data.member_id,
-            transaction_type=TransactionType.payment,
-            payment_method=PaymentMethod.credit,
-            amount=credit_used,
-            plan_id=data.plan_id,
-            membership_id=membership.id,
-            notes="Credit portion of payment",
-        )
-        db.add(credit_tx)
+        _add_credit_portion(db, data, membership.id, credit_used)
 
     # Record card payment transaction
     card_last4 = card_number[-4:]
@@ -844,6 +771,70 @@ def pay_card_manual(data: ManualCardPaymentRequest, request: Request, db: Sessio
     )
 
 
+@router.post("/pay/card/manual", response_model=PaymentResponse)
+@limiter.limit("10/minute")
+async def pay_card_manual(data: ManualCardPaymentRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Process a card-not-present payment with manual card entry.
+
+    Use this when the terminal is not available and card details must be entered manually.
+    Requires full card number, expiration, and CVV.
+    """
+    plan, member, credit_used, effective_price = await to_thread.run_sync(_card_payment_quote, db, data)
+
+    # Validate card number format (basic validation)
+    card_number = data.card_number.replace(" ", "").replace("-", "")
+    if not card_number.isdigit() or len(card_number) < 13 or len(card_number) > 19:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid card number format"
+        )
+
+    # Validate expiration format (MMYY)
+    if not data.exp_date.isdigit() or len(data.exp_date) != 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expiration must be in MMYY format"
+        )
+
+    # Validate CVV format
+    if not data.cvv.isdigit() or len(data.cvv) < 3 or len(data.cvv) > 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CVV must be 3-4 digits"
+        )
+
+    # If credit covers entire amount, no card charge needed
+    if effective_price <= 0:
+        return await to_thread.run_sync(_pay_with_credit_only, db, data, credit_used)
+
+    # Process manual card payment
+    adapter = await to_thread.run_sync(get_payment_adapter, db)
+
+    # Check if adapter supports manual card entry
+    if not hasattr(adapter, 'process_manual_card_sale'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Manual card entry not supported by current payment processor"
+        )
+
+    customer_name = f"{member.first_name} {member.last_name}"
+    charge_result = await adapter.process_manual_card_sale_async(
+        card_number=card_number,
+        exp_date=data.exp_date,
+        cvv=data.cvv,
+        amount=effective_price,
+        member_id=str(data.member_id),
+        description=f"Purchase: {plan.name}",
+        save_card=data.save_card,
+        customer_name=customer_name,
+    )
+
+    return await to_thread.run_sync(
+        _record_manual_card_payment, db, data, member, card_number, credit_used, effective_price, charge_result,
+    )
+
+
 def _detect_card_brand(card_number: str) -> str:
     """Detect card brand from card number prefix."""
     if card_number.startswith("4"):
@@ -862,9 +853,10 @@ def _detect_card_brand(card_number: str) -> str:
         return "Card"
 
 
-@router.post("/pay/split", response_model=PaymentResponse)
-@limiter.limit("10/minute")
-def pay_split(data: SplitPaymentRequest, request: Request, db: Session = Depends(get_db)):
+def _split_payment_context(
+    db: Session, data: SplitPaymentRequest
+) -> tuple[Plan, Member, SavedCard | None, PaymentResponse | None]:
+    """PIN check and lookups for a split payment; the response is set when cash alone covered the plan."""
     split_enabled = get_setting(db, "split_payment_enabled", "true")
     if split_enabled != "true":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Split payments are disabled")
@@ -881,7 +873,7 @@ def pay_split(data: SplitPaymentRequest, request: Request, db: Session = Depends
 
     if data.cash_amount >= plan.price:
         tx, change_due, credit_added = process_cash_payment(db, data.member_id, data.plan_id, data.cash_amount)
-        return PaymentResponse(
+        return plan, member, None, PaymentResponse(
             success=True,
             transaction_id=tx.id,
             membership_id=tx.membership_id,
@@ -895,34 +887,19 @@ def pay_split(data: SplitPaymentRequest, request: Request, db: Session = Depends
             detail="Cash amount must be greater than zero for split payment",
         )
 
-    card_amount = plan.price - data.cash_amount
-
-    # Charge the card portion
-    adapter = get_payment_adapter(db)
+    saved_card = None
     if data.saved_card_id:
         saved_card = db.query(SavedCard).filter(
             SavedCard.id == data.saved_card_id, SavedCard.member_id == data.member_id
         ).first()
         if not saved_card:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Saved card not found")
-        customer_name = f"{member.first_name} {member.last_name}"
-        charge_result = adapter.charge_saved_card(
-            token=saved_card.processor_token,
-            amount=card_amount,
-            member_id=str(data.member_id),
-            description=f"Split payment (card portion): {plan.name}",
-            customer_name=customer_name,
-        )
-        if not charge_result.success:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail=charge_result.message or "Card charge failed",
-            )
-        card_reference = charge_result.reference_id
-    else:
-        session = adapter.initiate_payment(card_amount, str(data.member_id), f"Split payment (card portion): {plan.name}")
-        card_reference = session.session_id
+    return plan, member, saved_card, None
 
+
+def _record_split_payment(
+    db: Session, data: SplitPaymentRequest, card_amount: Decimal, card_reference: str | None
+) -> PaymentResponse:
     # Create the membership once
     membership = create_membership(db, data.member_id, data.plan_id)
 
@@ -963,6 +940,39 @@ def pay_split(data: SplitPaymentRequest, request: Request, db: Session = Depends
     )
 
 
+@router.post("/pay/split", response_model=PaymentResponse)
+@limiter.limit("10/minute")
+async def pay_split(data: SplitPaymentRequest, request: Request, db: Session = Depends(get_db)):
+    plan, member, saved_card, settled = await to_thread.run_sync(_split_payment_context, db, data)
+    if settled is not None:
+        return settled
+
+    card_amount = plan.price - data.cash_amount
+
+    # Charge the card portion
+    adapter = await to_thread.run_sync(get_payment_adapter, db)
+    if saved_card is not None:
+        customer_name = f"{member.first_name} {member.last_name}"
+        charge_result = await adapter.charge_saved_card_async(
+            token=saved_card.processor_token,
+            amount=card_amount,
+            member_id=str(data.member_id),
+            description=f"Split payment (card portion): {plan.name}",
+            customer_name=customer_name,
+        )
+        if not charge_result.success:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail=charge_result.message or "Card charge failed",
+            )
+        card_reference = charge_result.reference_id
+    else:
+        session = await adapter.initiate_payment_async(card_amount, str(data.member_id), f"Split payment (card portion): {plan.name}")
+        card_reference = session.session_id
+
+    return await to_thread.run_sync(_record_split_payment, db, data, card_amount, card_reference)
+
+
 @router.post("/pay/credit", response_model=PaymentResponse)
 @limiter.limit("20/minute")
 def pay_credit(data: CreditPaymentRequest, request: Request, db: Session = Depends(get_db)):
@@ -1110,12 +1120,23 @@ def save_card(data: SavedCardRequest, request: Request, member_id: uuid.UUID = N
     return card
 
 
+def _verified_adapter(db: Session, member_id: uuid.UUID, pin: str):
+    verify_member_pin(db, member_id, pin)
+    return get_payment_adapter(db)
+
+
+def _save_card(db: Session, card: SavedCard) -> SavedCardResponse:
+    db.add(card)
+    db.commit()
+    db.refresh(card)
+    return SavedCardResponse.model_validate(card)
+
+
 @router.post("/saved-cards/tokenize", response_model=SavedCardResponse, status_code=201)
 @limiter.limit("10/minute")
-def tokenize_and_save_card(data: TokenizeCardRequest, request: Request, db: Session = Depends(get_db)):
-    verify_member_pin(db, data.member_id, data.pin)
-    adapter = get_payment_adapter(db)
-    token = adapter.tokenize_card(data.card_last4, data.card_brand or "", str(data.member_id))
+async def tokenize_and_save_card(data: TokenizeCardRequest, request: Request, db: Session = Depends(get_db)):
+    adapter = await to_thread.run_sync(_verified_adapter, db, data.member_id, data.pin)
+    token = await adapter.tokenize_card_async(data.card_last4, data.card_brand or "", str(data.member_id))
     friendly = data.friendly_name or f"{data.card_brand or 'Card'} ending {data.card_last4}"
     card = SavedCard(
         member_id=data.member_id,
@@ -1124,10 +1145,8 @@ def tokenize_and_save_card(data: TokenizeCardRequest, request: Request, db: Sess
         card_brand=data.card_brand,
         friendly_name=friendly,
     )
-    db.add(card)
-    db.commit()
-    db.refresh(card)
-    return card
+    return await to_thread.run_sync(_save_card, db, card)
+
 
 
 @router.post("/saved-cards/tokenize-swipe", response_model=SavedCardResponse, status_code=201)
@@ -1432,10 +1451,6 @@ def _build_member_status(db: Session, member: Member) -> MemberStatus:
 
 # ==================== TERMINAL PAYMENT ENDPOINTS ====================
 
-# In-memory storage for pending terminal payments (request_key -> member_id, plan_id, etc.)
-_pending_terminal_payments: dict[str, dict] = {}
-
-
 @router.get("/terminal/info", response_model=TerminalInfoResponse)
 @limiter.limit("30/minute")
 def get_terminal_info(request: Request, db: Session = Depends(get_db)):
@@ -1453,17 +1468,8 @@ def get_terminal_info(request: Request, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/terminal/pay", response_model=TerminalPaymentInitResponse)
-@limiter.limit("10/minute")
-def initiate_terminal_payment(
-    data: TerminalPaymentRequest, request: Request, db: Session = Depends(get_db)
-):
-    """
-    Initiate a card payment on the physical terminal.
-
-    The terminal will prompt the customer to tap/insert their card.
-    Poll /terminal/status/{request_key} for the result.
-    """
+def _terminal_payment_quote(db: Session, data: TerminalPaymentRequest) -> tuple[Plan, object, Decimal, Decimal]:
+    """PIN check, lookups and terminal checks; returns (plan, adapter, credit_used, amount for the terminal)."""
     verify_member_pin(db, data.member_id, data.pin)
 
     plan = db.query(Plan).filter(Plan.id == data.plan_id).first()
@@ -1503,35 +1509,58 @@ def initiate_terminal_payment(
             detail="Account credit covers entire purchase. Use credit payment instead.",
         )
 
+    return plan, adapter, credit_used, effective_price
+
+
+@router.post("/terminal/pay", response_model=TerminalPaymentInitResponse)
+@limiter.limit("10/minute")
+async def initiate_terminal_payment(
+    data: TerminalPaymentRequest, request: Request, db: Session = Depends(get_db)
+):
+    """
+    Initiate a card payment on the physical terminal.
+
+    The terminal will prompt the customer to tap/insert their card. The server
+    watches the gateway for the result; follow it with
+    /terminal/status/{request_key}?wait=N or /terminal/events/{request_key}.
+    """
+    plan, adapter, credit_used, effective_price = await to_thread.run_sync(_terminal_payment_quote, db, data)
+    plan_name = plan.name
+
     # Initiate payment on terminal
-    result = adapter.initiate_terminal_payment(
+    result = await adapter.initiate_terminal_payment_async(
         amount=effective_price,
         member_id=str(data.member_id),
-        description=f"Purchase: {plan.name}",
+        description=f"Purchase: {plan_name}",
         save_card=data.save_card,
     )
 
     if result.error:
         logger.warning(
             "Terminal payment init failed: member=%s, plan=%s, error=%s",
-            data.member_id, plan.name, result.error
+            data.member_id, plan_name, result.error
         )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=result.error,
         )
 
-    # Store pending payment info for when it completes
-    _pending_terminal_payments[result.request_key] = {
-        "member_id": data.member_id,
-        "plan_id": data.plan_id,
-        "credit_used": credit_used,
-        "save_card": data.save_card,
-    }
+    # Record the pending payment so any worker can finalize it when it completes
+    await to_thread.run_sync(partial(
+        create_terminal_session,
+        db,
+        request_key=result.request_key,
+        member_id=data.member_id,
+        plan_id=data.plan_id,
+        amount=effective_price,
+        credit_used=credit_used,
+        save_card=data.save_card,
+    ))
+    wake_watcher()
 
     logger.info(
         "Terminal payment initiated: member=%s, plan=%s, amount=$%s, request_key=%s",
-        data.member_id, plan.name, effective_price, result.request_key
+        data.member_id, plan_name, effective_price, result.request_key
     )
 
     return TerminalPaymentInitResponse(
@@ -1541,113 +1570,117 @@ def initiate_terminal_payment(
     )
 
 
+def _terminal_status_response(session) -> TerminalPaymentStatusResponse:
+    """Status response for a terminal payment session, as recorded by the watcher."""
+    complete = session.state != "pending"
+    error = session.error
+    if session.state == "failed":
+        error = f"Payment approved but failed to create membership: {session.error}"
+    elif session.state == "cancelled":
+        error = error or "Payment cancelled"
+    elif session.state == "expired":
+        error = error or "Terminal payment timed out"
+    return TerminalPaymentStatusResponse(
+        request_key=session.request_key,
+        status=session.state if complete else (session.gateway_status or "pending"),
+        complete=complete,
+        approved=session.state in ("completed", "failed"),
+        transaction_id=session.transaction_id,
+        membership_id=session.membership_id,
+        card_last4=session.card_last4,
+        card_brand=session.card_brand,
+        error=error,
+    )
+
+
 @router.get("/terminal/status/{request_key}", response_model=TerminalPaymentStatusResponse)
 @limiter.limit("60/minute")
-def check_terminal_payment_status(
-    request_key: str, request: Request, db: Session = Depends(get_db)
+async def check_terminal_payment_status(
+    request_key: str,
+    request: Request,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    db: Session = Depends(get_db),
 ):
     """
     Check the status of a terminal payment.
 
-    Poll this endpoint until 'complete' is True.
+    The server watches the gateway and finalizes the payment itself; this only
+    reads the recorded session. With ?wait=N the request is held open for up to
+    N seconds until the status changes (long-poll). Repeat until 'complete' is True.
     """
-    adapter = get_payment_adapter(db)
-    if not hasattr(adapter, "check_terminal_payment_status"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Terminal payments not supported",
-        )
+    session = await to_thread.run_sync(get_terminal_session, db, request_key)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Terminal payment not found")
 
-    result = adapter.check_terminal_payment_status(request_key)
-
-    response = TerminalPaymentStatusResponse(
-        request_key=request_key,
-        status=result.status,
-        complete=result.complete,
-        approved=result.approved,
-        card_last4=result.card_last4,
-        card_brand=result.card_brand,
-        error=result.error,
-    )
+    if wait > 0:
+        session = await wait_for_session_change(db, session, wait)
 
-    # If payment is complete and approved, finalize the transaction
-    if result.complete and result.approved:
-        pending = _pending_terminal_payments.get(request_key)
-        if pending:
-            try:
-                # Create membership and transaction
-                member = db.query(Member).filter(Member.id == pending["member_id"]).first()
-                plan = db.query(Plan).filter(Plan.id == pending["plan_id"]).first()
-
-                if member and plan:
-                    # Apply credit if used
-                    if pending["credit_used"] > 0:
-                        member.credit_balance -= pending["credit_used"]
-                        credit_tx = Transaction(
-                            member_id=pending["member_id"],
-                            transaction_type=TransactionType.credit_use,
-                            payment_method=PaymentMethod.credit,
-                            amount=pending["credit_used"],
-                            notes="Applied to terminal payment",
-                        )
-                        db.add(credit_tx)
-
-                    # Create membership
-                    membership = create_membership(db, pending["member_id"], pending["plan_id"])
-
-                    # Create card payment transaction
-                    effective_price = get_plan_effective_price(plan) - pending["credit_used"]
-                    tx = Transaction(
-                        member_id=pending["member_id"],
-                        transaction_type=TransactionType.payment,
-                        payment_method=PaymentMethod.card,
-                        amount=effective_price,
-                        plan_id=pending["plan_id"],
-                        membership_id=membership.id,
-                        reference_id=result.transaction_key,
-                        notes=f"Terminal payment - {result.card_brand or 'Card'} ****{result.card_last4 or '????'}",
-                    )
-                    db.add(tx)
-                    db.commit()
+    return _terminal_status_response(session)
 
-                    response.transaction_id = tx.id
-                    response.membership_id = membership.id
 
-                    logger.info(
-                        "Terminal payment completed: member=%s, plan=%s, tx=%s",
-                        pending["member_id"], plan.name, tx.id
-                    )
+# Comment line sent while nothing changes, so proxies keep the stream open
+SSE_KEEPALIVE_SECONDS = 15.0
 
-                # Clean up pending payment
-                del _pending_terminal_payments[request_key]
 
-            except Exception as exc:
-                logger.exception("Failed to finalize terminal payment: request_key=%s", request_key)
-                response.error = f"Payment approved but failed to create membership: {exc}"
+@router.get("/terminal/events/{request_key}")
+@limiter.limit("10/minute")
+async def terminal_payment_events(
+    request_key: str, request: Request, db: Session = Depends(get_db)
+):
+    """
+    Server-sent events for a terminal payment.
 
-    return response
+    Sends a 'status' event (same body as /terminal/status) right away and on
+    every change, and closes the stream once the payment is complete.
+    """
+    if await to_thread.run_sync(get_terminal_session, db, request_key) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Terminal payment not found")
+
+    # The request's session is closed before the response streams, so the stream opens its own
+    bind = db.get_bind()
+
+    async def events():
+        with Session(bind=bind) as stream_db:
+            session = await to_thread.run_sync(get_terminal_session, stream_db, request_key)
+            yield f"event: status\ndata: {_terminal_status_response(session).model_dump_json()}\n\n"
+            while session is not None and session.state == "pending":
+                if await request.is_disconnected():
+                    return
+                seen = (session.state, session.gateway_status)
+                session = await wait_for_session_change(stream_db, session, SSE_KEEPALIVE_SECONDS)
+                if session is None:
+                    return
+                if (session.state, session.gateway_status) == seen:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: status\ndata: {_terminal_status_response(session).model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.delete("/terminal/cancel/{request_key}")
 @limiter.limit("10/minute")
-def cancel_terminal_payment(
+async def cancel_terminal_payment(
     request_key: str, request: Request, db: Session = Depends(get_db)
 ):
     """Cancel a pending terminal payment."""
-    adapter = get_payment_adapter(db)
+    adapter = await to_thread.run_sync(get_payment_adapter, db)
     if not hasattr(adapter, "cancel_terminal_payment"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Terminal payments not supported",
         )
 
-    success = adapter.cancel_terminal_payment(request_key)
-
-    # Clean up pending payment
-    if request_key in _pending_terminal_payments:
-        del _pending_terminal_payments[request_key]
+    success = await adapter.cancel_terminal_payment_async(request_key)
 
     if success:
+        # Left pending if the cancel failed, so an approval still gets finalized
+        if await to_thread.run_sync(cancel_terminal_session, db, request_key):
+            notify_session_changed(request_key)
         logger.info("Terminal payment cancelled: request_key=%s", request_key)
         return {"status": "cancelled"}
     else:
@@ -655,28 +655,37 @@ def export_members_csv(
     current_user: User = Depends(get_current_user),
 ):
     """Export all members as CSV."""
-    members = db.query(Member).order_by(Member.last_name, Member.first_name).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["First Name", "Last Name", "Phone", "Email", "Credit Balance", "Notes", "Is Active", "Created At"])
-
-    for m in members:
-        writer.writerow([
-            m.first_name,
-            m.last_name,
-            m.phone or "",
-            m.email or "",
-            str(m.credit_balance),
-            m.notes or "",
-            "Yes" if m.is_active else "No",
-            m.created_at.isoformat() if m.created_at else "",
-        ])
-
-    logger.info("Members CSV export: %d members by user=%s", len(members), current_user.id)
-    output.seek(0)
+    from sqlalchemy import select
+
+    from app.services.row_serializers import iter_csv, row_serializer
+
+    columns = ["first_name", "last_name", "phone", "email", "credit_balance", "notes", "is_active", "created_at"]
+    table = Member.__table__
+    serialize = row_serializer(table, columns)
+    # Fetched up front: the session is closed before the response streams
+    result = db.execute(
+        select(*(table.c[name] for name in columns))
+        .order_by(table.c.last_name, table.c.first_name)
+    ).mappings().all()
+
+    def rows():
+        for row in result:
+            m = serialize(row)
+            yield [
+                m["first_name"],
+                m["last_name"],
+                m["phone"] or "",
+                m["email"] or "",
+                m["credit_balance"],
+                m["notes"] or "",
+                "Yes" if m["is_active"] else "No",
+                m["created_at"] or "",
+            ]
+
+    logger.info("Members CSV export: %d members by user=%s", len(result), current_user.id)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter_csv(["First Name", "Last Name", "Phone", "Email", "Credit Balance", "Notes", "Is Active", "Created At"],
+                 rows()),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=members.csv"},
     )
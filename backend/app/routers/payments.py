@@ -1,6 +1,92 @@
 import logging
+import uuid
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.services.auth_service import get_current_user, require_admin
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+
+
+@router.get("/latency")
+def get_gateway_latency(current_user: User = Depends(get_current_user)):
+    """Per-processor gateway request latency histograms since startup."""
+    from app.payments.http import HTTP2_AVAILABLE, latency_snapshot
+
+    return {"http2": HTTP2_AVAILABLE, "processors": latency_snapshot()}
+
+
+@router.get("/auto-charge/runs")
+def list_auto_charge_runs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Recent auto-charge runs with their throughput and latency reports, newest first."""
+    from app.services.auto_charge_service import list_runs
+
+    return [
+        {
+            "id": str(run.id),
+            "trigger": run.trigger,
+            "status": run.status,
+            "processed": run.processed,
+            "succeeded": run.succeeded,
+            "failed": run.failed,
+            "report": run.report,
+            "error": run.error,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        }
+        for run in list_runs(db, limit)
+    ]
+
+
+def _serialize_attempt(attempt) -> dict:
+    return {
+        "id": str(attempt.id),
+        "saved_card_id": str(attempt.saved_card_id) if attempt.saved_card_id else None,
+        "period": attempt.period.isoformat(),
+        "run_id": str(attempt.run_id) if attempt.run_id else None,
+        "member_id": str(attempt.member_id) if attempt.member_id else None,
+        "plan_id": str(attempt.plan_id) if attempt.plan_id else None,
+        "amount": str(attempt.amount),
+        "status": attempt.status,
+        "attempts": attempt.attempts,
+        "next_attempt_on": attempt.next_attempt_on.isoformat() if attempt.next_attempt_on else None,
+        "reference_id": attempt.reference_id,
+        "error": attempt.error,
+        "claimed_at": attempt.claimed_at.isoformat() if attempt.claimed_at else None,
+        "finished_at": attempt.finished_at.isoformat() if attempt.finished_at else None,
+    }
+
+
+@router.get("/auto-charge/attempts")
+def list_charge_attempts(
+    status: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Charge-attempt ledger, newest first. status=unknown lists charges interrupted mid-flight."""
+    from app.services.auto_charge_service import list_attempts
+
+    return [_serialize_attempt(attempt) for attempt in list_attempts(db, status, limit)]
+
+
+@router.post("/auto-charge/attempts/{attempt_id}/release")
+def release_charge_attempt(
+    attempt_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """Allow an interrupted (unknown) charge to be retried, after confirming on the gateway it wasn't charged."""
+    from app.services.auto_charge_service import release_attempt
+
+    attempt = release_attempt(db, attempt_id)
+    logger.info("Charge attempt %s released by %s", attempt.id, current_user.username)
+    return _serialize_attempt(attempt)
@@ -1,5 +1,3 @@
-import csv
-import io
 import logging
 from datetime import date, timedelta
 
@@ -13,13 +11,20 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.report import (
     DashboardResponse,
+    ExpiringMembershipListResponse,
+    ForecastResponse,
     MembershipReportResponse,
+    RetentionReportResponse,
     RevenueReportResponse,
     SwimReportResponse,
 )
+from app.services.analytics_service import get_retention_report
 from app.services.auth_service import get_current_user
+from app.services.forecast_service import compute_forecast, get_forecast
+from app.services.report_cache import report_cache
 from app.services.report_service import (
     get_dashboard_stats,
+    get_expiring_memberships,
     get_membership_report,
     get_revenue_report,
     get_swim_report,
@@ -66,6 +71,61 @@ def membership_report(
     return get_membership_report(db)
 
 
+@router.get("/memberships/expiring", response_model=ExpiringMembershipListResponse)
+def expiring_memberships(
+    days: int = Query(7, ge=0, le=365),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(25, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    items, total = get_expiring_memberships(db, days, page, per_page)
+    return ExpiringMembershipListResponse(items=items, total=total, page=page, per_page=per_page)
+
+
+@router.get("/retention", response_model=RetentionReportResponse)
+def retention_report(
+    months: int = Query(12, ge=1, le=36),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Cohort retention, churn risk, visit frequency and RFM scores (cached per day)."""
+    return get_retention_report(db, months)
+
+
+@router.get("/forecast", response_model=ForecastResponse)
+def attendance_forecast(
+    start_date: date = Query(default_factory=date.today),
+    days: int = Query(14, ge=1, le=14),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Expected attendance per schedule block, as precomputed by the nightly forecast job."""
+    items = get_forecast(db, start_date, days)
+    computed_at = max((f.computed_at for f in items), default=None)
+    return ForecastResponse(computed_at=computed_at, items=items)
+
+
+@router.post("/forecast/refresh", response_model=ForecastResponse)
+def refresh_attendance_forecast(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Recompute the attendance forecast now instead of waiting for the nightly job."""
+    items = compute_forecast(db)
+    logger.info("Attendance forecast refreshed by user=%s", current_user.id)
+    computed_at = items[0].computed_at if items else None
+    return ForecastResponse(computed_at=computed_at, items=items)
+
+
+@router.get("/cache")
+def report_cache_stats(
+    current_user: User = Depends(get_current_user),
+):
+    """Hit/miss counters for the report result cache."""
+    return report_cache.stats()
+
+
 @router.get("/export")
 def export_csv(
     start_date: date = Query(default_factory=lambda: date.today() - timedelta(days=30)),
@@ -74,29 +134,37 @@ def export_csv(
     current_user: User = Depends(get_current_user),
 ):
     from datetime import datetime
+    from sqlalchemy import select
     from app.models.transaction import Transaction
+    from app.services.row_serializers import iter_csv, row_serializer
 
     start = datetime.combine(start_date, datetime.min.time())
     end = datetime.combine(end_date, datetime.max.time())
-    transactions = db.query(Transaction).filter(Transaction.created_at.between(start, end)).order_by(Transaction.created_at).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Date", "Type", "Method", "Amount", "Member ID", "Notes"])
-    for tx in transactions:
-        writer.writerow([
-            tx.created_at.isoformat(),
-            tx.transaction_type.value,
-            tx.payment_method.value,
-            str(tx.amount),
-            str(tx.member_id) if tx.member_id else "",
-            tx.notes or "",
-        ])
-
-    logger.info("CSV export: %d transactions, range=%s to %s", len(transactions), start_date, end_date)
-    output.seek(0)
+    columns = ["created_at", "transaction_type", "payment_method", "amount", "member_id", "notes"]
+    table = Transaction.__table__
+    serialize = row_serializer(table, columns)
+    # Fetched up front: the session is closed before the response streams
+    result = db.execute(
+        select(*(table.c[name] for name in columns))
+        .where(table.c.created_at.between(start, end))
+        .order_by(table.c.created_at)
+    ).mappings().all()
+
+    def rows():
+        for row in result:
+            tx = serialize(row)
+            yield [
+                tx["created_at"],
+                tx["transaction_type"],
+                tx["payment_method"],
+                tx["amount"],
+                tx["member_id"] or "",
+                tx["notes"] or "",
+            ]
+
+    logger.info("CSV export: %d transactions, range=%s to %s", len(result), start_date, end_date)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter_csv(["Date", "Type", "Method", "Amount", "Member ID", "Notes"], rows()),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=transactions_{start_date}_{end_date}.csv"},
     )
@@ -0,0 +1,181 @@
+"""
+Scheduled jobs.
+
+The jobs run on an APScheduler BackgroundScheduler, in the web app's lifespan
+or in the dedicated worker process (python -m app.worker). Whichever processes
+start it, only the elected leader (app.services.leader) runs the jobs.
+"""
+import logging
+from datetime import date, timedelta
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.membership import Membership
+from app.models.plan import PlanType
+from app.services.auto_charge_service import process_due_charges
+from app.services.leader import LeaderElection, make_leader_lock
+from app.services.notification_service import (
+    notify_daily_summary,
+    notify_membership_expired,
+    notify_membership_expiring,
+)
+from app.services.report_service import get_dashboard_stats
+from app.services.settings_service import get_setting
+
+logger = logging.getLogger(__name__)
+
+
+def run_auto_charge_job():
+    """Daily job to process auto-charge on saved cards."""
+    db = SessionLocal()
+    try:
+        results = process_due_charges(db)
+        logger.info("Auto-charge job completed: %s", results)
+    except Exception:
+        logger.exception("Auto-charge job failed")
+    finally:
+        db.close()
+
+
+def run_membership_expiry_check():
+    """Daily job to check for expiring/expired memberships and fire webhooks."""
+    db: Session = SessionLocal()
+    try:
+        warning_days = int(get_setting(db, "membership_expiry_warning_days", "7"))
+        today = date.today()
+        warning_date = today + timedelta(days=warning_days)
+
+        active_monthly = (
+            db.query(Membership)
+            .filter(
+                Membership.is_active.is_(True),
+                Membership.plan_type == PlanType.monthly,
+                Membership.valid_until.isnot(None),
+            )
+            .all()
+        )
+
+        expiring_count = 0
+        expired_count = 0
+
+        for m in active_monthly:
+            member = m.member
+            if not member:
+                continue
+            member_name = f"{member.first_name} {member.last_name}"
+            plan_name = m.plan.name if m.plan else "Monthly"
+
+            if m.valid_until < today:
+                notify_membership_expired(db, member_name, str(member.id), plan_name)
+                if member.email:
+                    from app.services.email_service import send_membership_expired_email
+                    send_membership_expired_email(db, member.email, member_name, plan_name)
+                expired_count += 1
+            elif m.valid_until <= warning_date:
+                days_remaining = (m.valid_until - today).days
+                notify_membership_expiring(db, member_name, str(member.id), days_remaining, plan_name)
+                if member.email:
+                    from app.services.email_service import send_membership_expiring_email
+                    send_membership_expiring_email(db, member.email, member_name, plan_name, days_remaining)
+                expiring_count += 1
+
+        logger.info("Membership expiry check: %d expiring, %d expired", expiring_count, expired_count)
+    except Exception:
+        logger.exception("Membership expiry check failed")
+    finally:
+        db.close()
+
+
+def run_daily_summary():
+    """Daily job to send a summary webhook with today's stats."""
+    db: Session = SessionLocal()
+    try:
+        stats = get_dashboard_stats(db)
+        pool_name = get_setting(db, "pool_name", "Pool")
+        notify_daily_summary(db, {
+            "pool_name": pool_name,
+            "date": str(date.today()),
+            "total_checkins_today": stats["total_checkins_today"],
+            "unique_members_today": stats["unique_members_today"],
+            "revenue_today": str(stats["revenue_today"]),
+            "active_memberships": stats["active_memberships"],
+            "guests_today": stats["guests_today"],
+        })
+        logger.info("Daily summary webhook sent")
+    except Exception:
+        logger.exception("Daily summary job failed")
+    finally:
+        db.close()
+
+
+def run_attendance_forecast():
+    """Nightly job to rebuild the attendance forecast for the next 14 days."""
+    db: Session = SessionLocal()
+    try:
+        from app.services.forecast_service import compute_forecast
+        compute_forecast(db)
+    except Exception:
+        logger.exception("Attendance forecast job failed")
+    finally:
+        db.close()
+
+
+def run_scheduled_backup():
+    """Scheduled job to queue automatic backups based on settings; the backup job worker runs them."""
+    db: Session = SessionLocal()
+    try:
+        backup_enabled = get_setting(db, "backup_enabled", "false").lower() == "true"
+        if not backup_enabled:
+            return
+
+        from app.services.backup_jobs import enqueue_backup_job
+        job = enqueue_backup_job(db, trigger="scheduled")
+        logger.info("Scheduled backup queued: job %s (%s)", job.id, job.status)
+    except Exception:
+        logger.exception("Scheduled backup job failed")
+    finally:
+        db.close()
+
+
+def run_terminal_session_sweep():
+    """Expire abandoned terminal payment sessions and purge old ones."""
+    db: Session = SessionLocal()
+    try:
+        from app.services.terminal_payment_service import sweep_sessions
+        result = sweep_sessions(db)
+        if result["expired"] or result["purged"]:
+            logger.info("Terminal session sweep: %s", result)
+    except Exception:
+        logger.exception("Terminal session sweep failed")
+    finally:
+        db.close()
+
+
+def start_scheduler(engine: Engine) -> tuple[BackgroundScheduler, LeaderElection]:
+    """Start the scheduler paused and the leader election that resumes it in one process."""
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(run_auto_charge_job, "cron", hour=6, minute=0, id="auto_charge_daily")
+    scheduler.add_job(run_membership_expiry_check, "cron", hour=7, minute=0, id="membership_expiry_check")
+    scheduler.add_job(run_daily_summary, "cron", hour=21, minute=0, id="daily_summary")
+    scheduler.add_job(run_attendance_forecast, "cron", hour=3, minute=30, id="attendance_forecast")
+    # Run backup check every hour - the job itself checks if it's time based on settings
+    scheduler.add_job(run_scheduled_backup, "cron", minute=0, id="scheduled_backup")
+    scheduler.add_job(run_terminal_session_sweep, "interval", minutes=5, id="terminal_session_sweep")
+    # Jobs run only in the process holding the leader lock; the rest stay paused
+    scheduler.start(paused=True)
+    election = LeaderElection(make_leader_lock(engine), on_elected=scheduler.resume, on_demoted=scheduler.pause)
+    election.start()
+    logger.info(
+        "APScheduler started — 6 jobs scheduled: auto-charge 06:00, expiry check 07:00, daily summary 21:00, "
+        "attendance forecast 03:30, backup hourly, terminal session sweep every 5 min"
+    )
+    return scheduler, election
+
+
+def stop_scheduler(scheduler: BackgroundScheduler, election: LeaderElection) -> None:
+    election.stop()
+    scheduler.shutdown(wait=False)
+    logger.info("APScheduler shut down")
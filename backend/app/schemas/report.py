@@ -1,8 +1,12 @@
-from datetime import date
+import uuid
+from datetime import date, datetime, time
 from decimal import Decimal
 
 from pydantic import BaseModel
 
+from app.models.plan import PlanType
+from app.models.pool_schedule import ScheduleType
+
 
 class DashboardResponse(BaseModel):
     total_checkins_today: int
@@ -36,3 +40,63 @@ class MembershipReportResponse(BaseModel):
     total_active: int
     by_plan: dict[str, int]
     expiring_soon: int
+
+
+class ExpiringMembershipItem(BaseModel):
+    membership_id: uuid.UUID
+    member_id: uuid.UUID
+    member_name: str
+    plan_name: str | None
+    plan_type: PlanType
+    valid_until: date
+    days_remaining: int
+
+
+class ExpiringMembershipListResponse(BaseModel):
+    items: list[ExpiringMembershipItem]
+    total: int
+    page: int
+    per_page: int
+
+
+class CohortRetentionRow(BaseModel):
+    cohort: str
+    size: int
+    retention: list[float]
+
+
+class AtRiskMember(BaseModel):
+    member_id: uuid.UUID
+    member_name: str
+    days_since_last_visit: int | None
+    visits_last_90_days: int
+    spend_last_365_days: Decimal
+
+
+class RetentionReportResponse(BaseModel):
+    generated_at: datetime
+    cohorts: list[CohortRetentionRow]
+    churn_risk: dict[str, int]
+    visit_frequency: dict[str, int]
+    rfm_segments: dict[str, int]
+    rfm_distribution: dict[str, dict[str, int]]
+    at_risk_members: list[AtRiskMember]
+
+
+class ForecastItem(BaseModel):
+    forecast_date: date
+    schedule_id: uuid.UUID | None
+    schedule_name: str
+    schedule_type: ScheduleType
+    start_time: time
+    end_time: time
+    expected_attendance: float
+    expected_high: float
+    closed_by_override: bool
+
+    model_config = {"from_attributes": True}
+
+
+class ForecastResponse(BaseModel):
+    computed_at: datetime | None
+    items: list[ForecastItem]
@@ -0,0 +1,288 @@
+"""Batch retention/churn analytics over check-in, membership and payment history.
+
+History is pulled once as compact columnar NumPy arrays (member index, timestamp,
+type) and every metric is computed with array operations — no per-row Python
+loops beyond the unavoidable driver fetch. Results are cached for the rest of
+the day since the inputs only matter at day granularity.
+"""
+
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+from app.models.checkin import Checkin, CheckinType
+from app.models.member import Member
+from app.models.membership import Membership
+from app.models.transaction import Transaction, TransactionType
+from app.services.report_cache import report_cache
+
+FETCH_CHUNK_SIZE = 10_000
+
+CHECKIN_TYPES = list(CheckinType)
+_CHECKIN_TYPE_CODES = {t: i for i, t in enumerate(CHECKIN_TYPES)}
+
+# Days since last visit -> churn bucket (upper bounds are inclusive)
+CHURN_BUCKETS = [(14, "active"), (30, "cooling"), (60, "at_risk")]
+CHURN_LAPSED = "lapsed"
+
+# Visits in the last 30 days -> histogram label
+FREQUENCY_EDGES = np.array([1, 2, 4, 8, 16])
+FREQUENCY_LABELS = ["0", "1", "2-3", "4-7", "8-15", "16+"]
+
+FREQUENCY_WINDOW_DAYS = 90
+MONETARY_WINDOW_DAYS = 365
+AT_RISK_LIST_SIZE = 25
+
+# Recency assigned to members who never visited; finite so quantiles stay defined
+NEVER_VISITED_DAYS = 100_000
+
+def _to_days(stamps: np.ndarray) -> np.ndarray:
+    return stamps.astype("datetime64[D]").astype(np.int64)
+
+
+def _to_months(stamps: np.ndarray) -> np.ndarray:
+    return stamps.astype("datetime64[M]").astype(np.int64)
+
+
+def _month_label(month_index: int) -> str:
+    return str(np.datetime64(int(month_index), "M"))
+
+
+def load_member_columns(db: Session) -> tuple[dict[uuid.UUID, int], dict]:
+    """Return (member_id -> row index, columns) for all members."""
+    rows = db.execute(select(Member.id, Member.created_at, Member.is_active, Member.first_name, Member.last_name)).all()
+    index = {row[0]: i for i, row in enumerate(rows)}
+    columns = {
+        "id": [row[0] for row in rows],
+        "name": [f"{row[3]} {row[4]}" for row in rows],
+        "signup": np.array([row[1] for row in rows], dtype="datetime64[s]"),
+        "is_active": np.array([bool(row[2]) for row in rows], dtype=bool),
+    }
+
+    has_active_membership = np.zeros(len(rows), dtype=bool)
+    active_ids = db.execute(
+        select(Membership.member_id).where(Membership.is_active.is_(True)).distinct()
+    ).scalars()
+    idx = np.fromiter((index.get(m, -1) for m in active_ids), dtype=np.int64)
+    has_active_membership[idx[idx >= 0]] = True
+    columns["has_active_membership"] = has_active_membership
+    return index, columns
+
+
+def load_checkin_columns(db: Session, member_index: dict[uuid.UUID, int]) -> dict[str, np.ndarray]:
+    """Fetch every check-in as (member index, timestamp, type code) arrays."""
+    stmt = select(Checkin.member_id, Checkin.checked_in_at, Checkin.checkin_type).execution_options(
+        yield_per=FETCH_CHUNK_SIZE
+    )
+    members, stamps, types = [], [], []
+    for chunk in db.execute(stmt).partitions():
+        ids, ts, tp = zip(*chunk)
+        members.append(np.fromiter((member_index.get(i, -1) for i in ids), dtype=np.int32, count=len(ids)))
+        stamps.append(np.array(ts, dtype="datetime64[s]"))
+        types.append(np.fromiter((_CHECKIN_TYPE_CODES[t] for t in tp), dtype=np.int8, count=len(tp)))
+
+    if not members:
+        return {
+            "member": np.empty(0, dtype=np.int32),
+            "timestamp": np.empty(0, dtype="datetime64[s]"),
+            "type": np.empty(0, dtype=np.int8),
+        }
+    member = np.concatenate(members)
+    keep = member >= 0  # drop check-ins whose member no longer exists
+    return {
+        "member": member[keep],
+        "timestamp": np.concatenate(stamps)[keep],
+        "type": np.concatenate(types)[keep],
+    }
+
+
+def load_payment_columns(db: Session, member_index: dict[uuid.UUID, int], since: datetime) -> dict[str, np.ndarray]:
+    """Fetch member payments since `since` as (member index, amount) arrays."""
+    stmt = (
+        select(Transaction.member_id, Transaction.amount)
+        .where(
+            Transaction.transaction_type == TransactionType.payment,
+            Transaction.member_id.isnot(None),
+            Transaction.created_at >= since,
+        )
+        .execution_options(yield_per=FETCH_CHUNK_SIZE)
+    )
+    members, amounts = [], []
+    for chunk in db.execute(stmt).partitions():
+        ids, amt = zip(*chunk)
+        members.append(np.fromiter((member_index.get(i, -1) for i in ids), dtype=np.int32, count=len(ids)))
+        amounts.append(np.array(amt, dtype=np.float64))
+
+    if not members:
+        return {"member": np.empty(0, dtype=np.int32), "amount": np.empty(0, dtype=np.float64)}
+    member = np.concatenate(members)
+    keep = member >= 0
+    return {"member": member[keep], "amount": np.concatenate(amounts)[keep]}
+
+
+def cohort_retention(
+    signup_month: np.ndarray, checkin_member: np.ndarray, checkin_month: np.ndarray, current_month: int, months: int
+) -> list[dict]:
+    """Share of each signup-month cohort that visited N months after signing up."""
+    first_cohort = current_month - months + 1
+    cohort = signup_month - first_cohort
+    cohort[(cohort < 0) | (cohort >= months)] = -1
+
+    member_cohort = cohort[checkin_member]
+    offset = checkin_month - signup_month[checkin_member]
+    mask = (member_cohort >= 0) & (offset >= 0) & (offset < months)
+
+    # One hit per (member, month offset), however many visits that month
+    key = np.unique(checkin_member[mask].astype(np.int64) * months + offset[mask])
+    hit_member = key // months
+    hit_offset = key % months
+
+    active = np.zeros((months, months), dtype=np.int64)
+    np.add.at(active, (cohort[hit_member], hit_offset), 1)
+    sizes = np.bincount(cohort[cohort >= 0], minlength=months)
+
+    rows = []
+    for c in range(months):
+        if not sizes[c]:
+            continue
+        observable = months - c  # months elapsed since this cohort, inclusive
+        rates = active[c, :observable] / sizes[c]
+        rows.append({
+            "cohort": _month_label(first_cohort + c),
+            "size": int(sizes[c]),
+            "retention": [round(float(r), 3) for r in rates],
+        })
+    return rows
+
+
+def quintile_scores(values: np.ndarray, higher_is_better: bool = True) -> np.ndarray:
+    """Score each value 1-5 by the quintile it falls in."""
+    if values.size == 0:
+        return np.empty(0, dtype=np.int8)
+    edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+    if higher_is_better:
+        return (1 + np.searchsorted(edges, values, side="left")).astype(np.int8)
+    return (5 - np.searchsorted(edges, values, side="right")).astype(np.int8)
+
+
+def rfm_segments(recency_score: np.ndarray, frequency_score: np.ndarray) -> dict[str, int]:
+    champions = (recency_score >= 4) & (frequency_score >= 4)
+    loyal = ~champions & (frequency_score >= 4)
+    at_risk = (recency_score <= 2) & (frequency_score >= 3) & ~loyal
+    hibernating = (recency_score <= 2) & (frequency_score <= 2)
+    others = ~(champions | loyal | at_risk | hibernating)
+    return {
+        "champions": int(champions.sum()),
+        "loyal": int(loyal.sum()),
+        "at_risk": int(at_risk.sum()),
+        "hibernating": int(hibernating.sum()),
+        "others": int(others.sum()),
+    }
+
+
+def _score_counts(scores: np.ndarray) -> dict[str, int]:
+    counts = np.bincount(scores, minlength=6)
+    return {str(score): int(counts[score]) for score in range(1, 6)}
+
+
+def _compute_retention_report(db: Session, today: date, months: int) -> dict:
+    member_index, members = load_member_columns(db)
+    checkins = load_checkin_columns(db, member_index)
+    since = datetime.combine(today - timedelta(days=MONETARY_WINDOW_DAYS), datetime.min.time())
+    payments = load_payment_columns(db, member_index, since)
+
+    n = len(member_index)
+    today_day = int(np.datetime64(today, "D").astype(np.int64))
+    current_month = int(np.datetime64(today, "M").astype(np.int64))
+
+    ck_member = checkins["member"]
+    ck_day = _to_days(checkins["timestamp"])
+
+    cohorts = cohort_retention(
+        _to_months(members["signup"]), ck_member, _to_months(checkins["timestamp"]), current_month, months
+    )
+
+    # Recency / frequency / monetary per member
+    last_visit = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last_visit, ck_member, ck_day)
+    never = last_visit == np.iinfo(np.int64).min
+    recency = np.where(never, NEVER_VISITED_DAYS, today_day - last_visit)
+    frequency = np.bincount(ck_member[ck_day > today_day - FREQUENCY_WINDOW_DAYS], minlength=n)
+    monetary = np.bincount(payments["member"], weights=payments["amount"], minlength=n)
+    visits_30d = np.bincount(ck_member[ck_day > today_day - 30], minlength=n)
+
+    population = members["is_active"]
+    r_score = quintile_scores(recency[population], higher_is_better=False)
+    f_score = quintile_scores(frequency[population])
+    m_score = quintile_scores(monetary[population])
+
+    # Churn risk among members who are paying for access
+    paying = population & members["has_active_membership"]
+    bounds = np.array([b for b, _ in CHURN_BUCKETS])
+    bucket = np.searchsorted(bounds, recency[paying], side="left")
+    bucket_counts = np.bincount(bucket, minlength=len(CHURN_BUCKETS) + 1)
+    churn_risk = {label: int(bucket_counts[i]) for i, (_, label) in enumerate(CHURN_BUCKETS)}
+    churn_risk[CHURN_LAPSED] = int(bucket_counts[len(CHURN_BUCKETS)])
+
+    freq_bins = np.bincount(np.searchsorted(FREQUENCY_EDGES, visits_30d[population], side="right"),
+                            minlength=len(FREQUENCY_LABELS))
+    visit_frequency = {label: int(freq_bins[i]) for i, label in enumerate(FREQUENCY_LABELS)}
+
+    # Paying members furthest past the "cooling" threshold, most valuable first
+    risk_idx = np.flatnonzero(paying & (recency > CHURN_BUCKETS[1][0]))
+    risk_idx = risk_idx[np.lexsort((-recency[risk_idx], -monetary[risk_idx]))][:AT_RISK_LIST_SIZE]
+    at_risk_members = [
+        {
+            "member_id": members["id"][i],
+            "member_name": members["name"][i],
+            "days_since_last_visit": None if never[i] else int(recency[i]),
+            "visits_last_90_days": int(frequency[i]),
+            "spend_last_365_days": Decimal(str(round(float(monetary[i]), 2))),
+        }
+        for i in risk_idx
+    ]
+
+    return {
+        "generated_at": datetime.utcnow(),
+        "cohorts": cohorts,
+        "churn_risk": churn_risk,
+        "visit_frequency": visit_frequency,
+        "rfm_segments": rfm_segments(r_score, f_score),
+        "rfm_distribution": {
+            "recency": _score_counts(r_score),
+            "frequency": _score_counts(f_score),
+            "monetary": _score_counts(m_score),
+        },
+        "at_risk_members": at_risk_members,
+    }
+
+
+def get_retention_report(db: Session, months: int = 12) -> dict:
+    """Retention/churn analytics, computed at most once per day per parameter set.
+
+    Cached in the report cache keyed by (today, months) without write
+    invalidation: the figures are daily, so the day's first result is kept.
+    """
+    today = date.today()
+    return report_cache.get_or_compute(
+        "retention", (today, months), None, None, (),
+        lambda: _compute_logged(db, today, months),
+        valid_on=today,
+    )
+
+
+def _compute_logged(db: Session, today: date, months: int) -> dict:
+    started = datetime.utcnow()
+    result = _compute_retention_report(db, today, months)
+    logger.info(
+        "Retention analytics computed: months=%d, cohorts=%d, elapsed_ms=%d",
+        months, len(result["cohorts"]), (datetime.utcnow() - started).total_seconds() * 1000,
+    )
+    return result
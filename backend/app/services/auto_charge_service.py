@@ -1,117 +1,567 @@
 import logging
+import threading
+import time
 import uuid
-from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
+from anyio import to_thread
 from fastapi import HTTPException, status
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from app.models.auto_charge_run import AutoChargeRun
+from app.models.charge_attempt import ChargeAttempt, ChargeAttemptEvent
 from app.models.member import Member
 from app.models.plan import Plan, PlanType
 from app.models.saved_card import SavedCard
 from app.models.transaction import PaymentMethod, Transaction, TransactionType
+from app.services.dunning import next_attempt_on, retry_policy
 from app.services.membership_service import create_membership
-from app.services.notification_service import notify_auto_charge_failed, notify_auto_charge_success
+from app.services.outbox import enqueue, wake_dispatcher
 from app.services.payment_service import get_payment_adapter
+from app.services.settings_service import get_setting
 
 logger = logging.getLogger(__name__)
 
+# Gateway calls in flight at once during an auto-charge run, by processor. Kept
+# below each gateway's rate limits and the shared HTTP pool (20 connections).
+PROCESSOR_CONCURRENCY = {
+    "usaepay": 8,
+    "sola": 8,
+    "stripe": 10,
+    "square": 8,
+    "hitech": 4,
+    "stub": 8,
+}
+DEFAULT_PROCESSOR_CONCURRENCY = 4
+AUTO_CHARGE_WORKERS = 16
+# Due cards are claimed and charged this many at a time; a rerun resumes at the next unclaimed card
+CHUNK_SIZE = 100
+# Charge results are committed this many at a time
+COMMIT_BATCH_SIZE = 25
+# A run whose heartbeat is older than this is presumed dead (a chunk takes well under a minute)
+RUN_STALE_SECONDS = 900
+
+_processor_slots_by_name: dict[str, threading.BoundedSemaphore] = {}
+_processor_slots_lock = threading.Lock()
+
+
+def processor_concurrency(processor: str) -> int:
+    """How many charges may be in flight on a processor's gateway at once."""
+    return PROCESSOR_CONCURRENCY.get(processor, DEFAULT_PROCESSOR_CONCURRENCY)
+
+
+def _processor_slots(processor: str) -> threading.BoundedSemaphore:
+    """Process-wide limiter for a processor, shared by overlapping runs."""
+    with _processor_slots_lock:
+        slots = _processor_slots_by_name.get(processor)
+        if slots is None:
+            slots = threading.BoundedSemaphore(processor_concurrency(processor))
+            _processor_slots_by_name[processor] = slots
+        return slots
+
+
+def _charge(adapter, slots: threading.BoundedSemaphore, charge: dict):
+    """Worker: one gateway call. Returns (ChargeResult or None, error, seconds)."""
+    with slots:
+        started = time.perf_counter()
+        try:
+            result = adapter.charge_saved_card(
+                token=charge["token"],
+                amount=charge["amount"],
+                member_id=str(charge["member_id"]),
+                description=f"Auto-charge: {charge['plan_name']}",
+                customer_name=charge["member_name"],
+            )
+            return result, None, time.perf_counter() - started
+        except Exception as exc:
+            logger.exception("Auto-charge gateway call failed for card %s", charge["card_id"])
+            return None, str(exc), time.perf_counter() - started
+
+
+def _latency_summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"avg_seconds": None, "p50_seconds": None, "p95_seconds": None, "max_seconds": None}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "avg_seconds": round(sum(ordered) / len(ordered), 3),
+        "p50_seconds": percentile(0.5),
+        "p95_seconds": percentile(0.95),
+        "max_seconds": round(ordered[-1], 3),
+    }
+
+
+def _enqueue_failure(db: Session, charge: dict, reason: str) -> None:
+    enqueue(
+        db, "auto_charge_failed",
+        member_name=charge["member_name"] or str(charge["member_id"]),
+        member_id=str(charge["member_id"]), plan_name=charge["plan_name"],
+        amount=str(charge["amount"]), card_last4=charge["card_last4"], reason=reason,
+    )
 
-def process_due_charges(db: Session) -> dict:
-    """Find all saved cards with auto-charge due today or earlier and charge them."""
-    today = date.today()
-    due_cards = (
-        db.query(SavedCard)
+
+def _finish_attempt(db: Session, attempt_id: uuid.UUID, status: str, **values) -> None:
+    db.execute(
+        update(ChargeAttempt)
+        .where(ChargeAttempt.id == attempt_id)
+        .values(status=status, finished_at=datetime.utcnow(), **values)
+    )
+
+
+def _record_event(db: Session, charge: dict, outcome: str, seconds: float | None = None,
+                  reference_id: str | None = None, error: str | None = None) -> None:
+    db.add(ChargeAttemptEvent(
+        attempt_id=charge["attempt_id"], run_id=charge["run_id"], attempt_number=charge["attempt_number"],
+        outcome=outcome, reference_id=reference_id, error=error,
+        latency_seconds=round(seconds, 3) if seconds is not None else None,
+    ))
+
+
+def _attempt_failed(db: Session, charge: dict, outcome: str, reason: str, policy, today: date,
+                    seconds: float | None = None) -> str:
+    """Record a declined or skipped attempt and schedule its retry. Returns the outcome, or 'exhausted'."""
+    number = charge["attempt_number"]
+    retry_on = next_attempt_on(policy, number, charge["first_attempt_on"], today)
+    _record_event(db, charge, outcome, seconds, error=reason)
+    if retry_on is None:
+        _finish_attempt(db, charge["attempt_id"], "exhausted", error=reason)
+        db.execute(update(SavedCard).where(SavedCard.id == charge["card_id"]).values(auto_charge_enabled=False))
+        logger.warning("Auto-charge for card %s exhausted after %d attempt(s); auto-charge turned off",
+                       charge["card_id"], number)
+        _enqueue_failure(db, charge, f"{reason} (attempt {number}, no retries left; auto-charge turned off)")
+        return "exhausted"
+    _finish_attempt(db, charge["attempt_id"], outcome, error=reason, next_attempt_on=retry_on)
+    _enqueue_failure(db, charge, f"{reason} (attempt {number}, next retry {retry_on.isoformat()})")
+    return outcome
+
+
+def _record_charge(db: Session, charge: dict, plan: Plan, charge_result, error: str | None,
+                   seconds: float, policy, today: date) -> str:
+    """Add the outcome of one gateway call to the current batch.
+
+    Returns 'succeeded', 'declined', 'exhausted' or 'unknown'.
+    """
+    if charge_result is None:
+        # The call raised, so the gateway may or may not have taken the money: never retried automatically
+        logger.warning("Auto-charge outcome unknown for card %s: %s", charge["card_id"], error)
+        _finish_attempt(db, charge["attempt_id"], "unknown", error=error)
+        _record_event(db, charge, "unknown", seconds, error=error)
+        _enqueue_failure(db, charge, f"Needs review: {error}")
+        return "unknown"
+    if not charge_result.success:
+        reason = charge_result.message or "Charge declined"
+        logger.warning("Auto-charge failed for card %s: %s", charge["card_id"], reason)
+        return _attempt_failed(db, charge, "declined", reason, policy, today, seconds)
+
+    # A savepoint, so a record that can't be written doesn't take the rest of the batch with it
+    try:
+        with db.begin_nested():
+            membership = create_membership(db, charge["member_id"], plan.id, plan=plan, commit=False)
+            db.add(Transaction(
+                member_id=charge["member_id"],
+                transaction_type=TransactionType.payment,
+                payment_method=PaymentMethod.card,
+                amount=charge["amount"],
+                plan_id=plan.id,
+                membership_id=membership.id,
+                saved_card_id=charge["card_id"],
+                reference_id=charge_result.reference_id,
+                notes="Auto-charge",
+            ))
+            db.execute(
+                update(SavedCard)
+                .where(SavedCard.id == charge["card_id"])
+                .values(next_charge_date=today + timedelta(days=plan.duration_days or 30))
+            )
+            _finish_attempt(db, charge["attempt_id"], "succeeded", reference_id=charge_result.reference_id)
+            _record_event(db, charge, "succeeded", seconds, reference_id=charge_result.reference_id)
+    except Exception as exc:
+        logger.exception(
+            "Auto-charge for card %s was approved (reference %s) but could not be recorded",
+            charge["card_id"], charge_result.reference_id,
+        )
+        error = f"Charged but not recorded: {exc}"
+        _finish_attempt(db, charge["attempt_id"], "unknown", reference_id=charge_result.reference_id, error=error)
+        _record_event(db, charge, "unknown", seconds, reference_id=charge_result.reference_id, error=error)
+        _enqueue_failure(db, charge, f"Charged but not recorded (reference {charge_result.reference_id}): {exc}")
+        return "unknown"
+
+    logger.info("Auto-charge succeeded for member %s, plan %s", charge["member_id"], plan.name)
+    enqueue(
+        db, "auto_charge_success",
+        member_name=charge["member_name"], member_id=str(charge["member_id"]),
+        plan_name=plan.name, amount=str(charge["amount"]), card_last4=charge["card_last4"],
+    )
+    if charge["email"]:
+        enqueue(
+            db, "auto_charge_receipt",
+            to_email=charge["email"], member_name=charge["member_name"], plan_name=plan.name,
+            amount=str(charge["amount"]), card_last4=charge["card_last4"],
+        )
+    return "succeeded"
+
+
+def _insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's database."""
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def claim_attempt(
+    db: Session, charge: dict, run_id: uuid.UUID, now: datetime | None = None, today: date | None = None
+) -> tuple[uuid.UUID, int, date] | None:
+    """Claim a card's billing period for this run before anything is sent to the gateway.
+
+    The ledger row is inserted with ON CONFLICT DO NOTHING on (card, period), so
+    a period is only ever claimed once. A declined, skipped or released attempt
+    whose retry is due (next_attempt_on <= today) is claimed again. Returns
+    (attempt id, attempt number, date of the first attempt), or None if the
+    period is taken or not due for a retry. Not committed.
+    """
+    now = now or datetime.utcnow()
+    today = today or date.today()
+    attempt_id = uuid.uuid4()
+    inserted = db.execute(
+        _insert(db)(ChargeAttempt)
+        .values(
+            id=attempt_id, saved_card_id=charge["card_id"], period=charge["period"], run_id=run_id,
+            member_id=charge["member_id"], plan_id=charge["plan_id"], amount=charge["amount"],
+            status="claimed", attempts=1, claimed_at=now, first_attempt_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["saved_card_id", "period"])
+    ).rowcount
+    if inserted:
+        return attempt_id, 1, today
+
+    row = db.execute(
+        update(ChargeAttempt)
+        .where(
+            ChargeAttempt.saved_card_id == charge["card_id"],
+            ChargeAttempt.period == charge["period"],
+            ChargeAttempt.next_attempt_on <= today,
+        )
+        .values(
+            status="claimed", run_id=run_id, attempts=ChargeAttempt.attempts + 1, next_attempt_on=None,
+            amount=charge["amount"], plan_id=charge["plan_id"], claimed_at=now,
+            error=None, reference_id=None, finished_at=None,
+        )
+        .returning(ChargeAttempt.id, ChargeAttempt.attempts, ChargeAttempt.first_attempt_at)
+    ).first()
+    if row is None:
+        return None
+    return row[0], row[1], row[2].date()
+
+
+def reconcile_interrupted_runs(db: Session, now: datetime | None = None) -> int:
+    """Close out runs whose process died, and flag the charges they left in flight.
+
+    A run is considered dead once its heartbeat is older than RUN_STALE_SECONDS.
+    Its claimed-but-unfinished attempts become 'unknown': the gateway may have
+    taken the money, so they are never retried automatically. They keep the
+    period claimed until an admin checks the gateway and releases them.
+    Returns the number of attempts flagged.
+    """
+    now = now or datetime.utcnow()
+    stale = now - timedelta(seconds=RUN_STALE_SECONDS)
+    dead_runs = db.execute(
+        update(AutoChargeRun)
+        .where(
+            AutoChargeRun.status == "running",
+            func.coalesce(AutoChargeRun.heartbeat_at, AutoChargeRun.started_at) < stale,
+        )
+        .values(status="interrupted", error="Interrupted by restart", finished_at=now)
+        .returning(AutoChargeRun.id)
+    ).scalars().all()
+
+    live_runs = select(AutoChargeRun.id).where(AutoChargeRun.status == "running")
+    orphaned = (
+        db.query(ChargeAttempt)
         .filter(
-            SavedCard.auto_charge_enabled.is_(True),
-            SavedCard.next_charge_date <= today,
-            SavedCard.auto_charge_plan_id.isnot(None),
+            ChargeAttempt.status == "claimed",
+            (ChargeAttempt.run_id.is_(None)) | ChargeAttempt.run_id.notin_(live_runs),
         )
         .all()
     )
+    for attempt in orphaned:
+        attempt.status = "unknown"
+        attempt.finished_at = now
+        attempt.error = "Run interrupted before the gateway result was recorded; check the gateway before releasing"
+        enqueue(
+            db, "auto_charge_failed",
+            member_name=str(attempt.member_id), member_id=str(attempt.member_id), plan_name="",
+            amount=str(attempt.amount), card_last4="", reason="Needs review: " + attempt.error,
+        )
+    db.commit()
+    if dead_runs or orphaned:
+        logger.warning(
+            "Auto-charge reconciliation: %d interrupted run(s), %d charge attempt(s) need review",
+            len(dead_runs), len(orphaned),
+        )
+    return len(orphaned)
+
+
+def process_due_charges(db: Session, trigger: str = "scheduled") -> dict:
+    """Charge every saved card with auto-charge due today or earlier.
+
+    Runs left behind by a dead process are reconciled first. Due cards are
+    then taken CHUNK_SIZE at a time: each card's billing period is claimed in
+    the charge_attempts ledger and committed before any gateway call, so a
+    period is never charged twice, even by concurrent runs or a rerun after a
+    crash (the rerun simply continues with the cards not yet claimed).
+
+    A declined or skipped period is retried on the dunning schedule
+    (app.services.dunning): only attempts whose next_attempt_on has come are
+    read, and after the last allowed attempt the period is marked exhausted
+    and auto-charge is turned off for the card. Every gateway call is logged
+    in charge_attempt_events.
+
+    Within a chunk, plans and members are loaded in bulk and gateway calls run
+    on a thread pool, at most processor_concurrency(processor) at a time; only
+    this thread touches the session. Results are committed every
+    COMMIT_BATCH_SIZE charges, and webhooks and receipts go through the outbox
+    in the same commits. The run and its report are recorded in auto_charge_runs.
+    """
+    reconciled = reconcile_interrupted_runs(db)
+
+    run = AutoChargeRun(trigger=trigger, heartbeat_at=datetime.utcnow())
+    db.add(run)
+    db.commit()
+    run_id = run.id
+    started = time.perf_counter()
+
+    try:
+        report = _run_due_charges(db, run_id)
+    except Exception as exc:
+        db.rollback()
+        db.execute(
+            update(AutoChargeRun)
+            .where(AutoChargeRun.id == run_id)
+            .values(status="failed", error=str(exc), finished_at=datetime.utcnow())
+        )
+        # Its claimed attempts can't be trusted either
+        reconcile_interrupted_runs(db)
+        wake_dispatcher()
+        raise
+
+    report["reconciled"] = reconciled
+    report["duration_seconds"] = round(time.perf_counter() - started, 3)
+    db.execute(
+        update(AutoChargeRun)
+        .where(AutoChargeRun.id == run_id)
+        .values(
+            status="succeeded", processed=report["processed"], succeeded=report["succeeded"],
+            failed=report["failed"], report=report, finished_at=datetime.utcnow(),
+        )
+    )
+    db.commit()
+    wake_dispatcher()
+    report["run_id"] = str(run_id)
+    logger.info(
+        "Auto-charge run %s: %d processed, %d succeeded, %d failed in %.1fs (%.2f charges/s, p95 %ss)",
+        run_id, report["processed"], report["succeeded"], report["failed"], report["duration_seconds"],
+        report["charges_per_second"] or 0, report["latency"]["p95_seconds"],
+    )
+    return report
 
-    results = {"processed": 0, "succeeded": 0, "failed": 0}
-    adapter = get_payment_adapter(db)
 
-    for card in due_cards:
-        results["processed"] += 1
-        plan = db.query(Plan).filter(Plan.id == card.auto_charge_plan_id).first()
-        if not plan:
-            logger.warning("Auto-charge skipped: plan %s not found for card %s", card.auto_charge_plan_id, card.id)
-            member = db.query(Member).filter(Member.id == card.member_id).first()
-            if member:
-                notify_auto_charge_failed(
-                    db, member_name=f"{member.first_name} {member.last_name}",
-                    member_id=str(card.member_id), plan_name="Unknown",
-                    amount="0.00", card_last4=card.card_last4 or "", reason="Plan not found",
-                )
-            results["failed"] += 1
-            continue
+_CARD_COLUMNS = (
+    SavedCard.id, SavedCard.member_id, SavedCard.auto_charge_plan_id,
+    SavedCard.processor_token, SavedCard.card_last4, SavedCard.next_charge_date,
+)
 
-        member = db.query(Member).filter(Member.id == card.member_id, Member.is_active.is_(True)).first()
-        if not member:
-            logger.warning("Auto-charge skipped: member %s inactive for card %s", card.member_id, card.id)
-            notify_auto_charge_failed(
-                db, member_name=str(card.member_id),
-                member_id=str(card.member_id), plan_name=plan.name,
-                amount=str(plan.price), card_last4=card.card_last4 or "", reason="Member inactive",
-            )
-            results["failed"] += 1
-            continue
 
-        customer_name = f"{member.first_name} {member.last_name}"
-        charge_result = adapter.charge_saved_card(
-            token=card.processor_token,
-            amount=plan.price,
-            member_id=str(card.member_id),
-            description=f"Auto-charge: {plan.name}",
-            customer_name=customer_name,
-        )
+def _next_chunk(db: Session, today: date) -> list:
+    """The next cards due for an attempt: scheduled retries first, then periods never tried."""
+    enabled = (
+        SavedCard.auto_charge_enabled.is_(True),
+        SavedCard.next_charge_date <= today,
+        SavedCard.auto_charge_plan_id.isnot(None),
+    )
+    # Served by the partial index on next_attempt_on: cards waiting out their
+    # retry delay are never read, let alone charged
+    retries = (
+        db.query(*_CARD_COLUMNS)
+        .join(ChargeAttempt, (ChargeAttempt.saved_card_id == SavedCard.id)
+              & (ChargeAttempt.period == SavedCard.next_charge_date))
+        .filter(ChargeAttempt.next_attempt_on <= today, *enabled)
+        .order_by(ChargeAttempt.next_attempt_on, SavedCard.id)
+        .limit(CHUNK_SIZE)
+        .all()
+    )
+    if len(retries) == CHUNK_SIZE:
+        return retries
 
-        if not charge_result.success:
-            logger.warning("Auto-charge failed for card %s: %s", card.id, charge_result.message)
-            notify_auto_charge_failed(
-                db, member_name=f"{member.first_name} {member.last_name}",
-                member_id=str(card.member_id), plan_name=plan.name,
-                amount=str(plan.price), card_last4=card.card_last4 or "",
-                reason=charge_result.message or "Charge declined",
-            )
-            results["failed"] += 1
-            continue
+    tried = exists().where(
+        ChargeAttempt.saved_card_id == SavedCard.id,
+        ChargeAttempt.period == SavedCard.next_charge_date,
+    )
+    fresh = (
+        db.query(*_CARD_COLUMNS)
+        .filter(*enabled, ~tried)
+        .order_by(SavedCard.id)
+        .limit(CHUNK_SIZE - len(retries))
+        .all()
+    )
+    return retries + fresh
 
-        membership = create_membership(db, card.member_id, plan.id)
-
-        tx = Transaction(
-            member_id=card.member_id,
-            transaction_type=TransactionType.payment,
-            payment_method=PaymentMethod.card,
-            amount=plan.price,
-            plan_id=plan.id,
-            membership_id=membership.id,
-            saved_card_id=card.id,
-            reference_id=charge_result.reference_id,
-            notes="Auto-charge",
-        )
-        db.add(tx)
 
-        card.next_charge_date = today + timedelta(days=plan.duration_days or 30)
+def _run_due_charges(db: Session, run_id: uuid.UUID) -> dict:
+    today = date.today()
+    processor = get_setting(db, "payment_processor", "stub") or "stub"
+    workers = min(AUTO_CHARGE_WORKERS, processor_concurrency(processor))
+    policy = retry_policy(db)
+    results = {"processed": 0, "succeeded": 0, "failed": 0}
+    report = {
+        "processor": processor,
+        "workers": workers,
+        "retries": 0,
+        "exhausted": 0,
+        "chunks": 0,
+        "batches": 0,
+        "claimed_elsewhere": 0,
+        "charges_per_second": None,
+        "gateway_seconds": 0.0,
+    }
+    adapter = None
+    slots = _processor_slots(processor)
+    latencies = []
+    charged = 0
+    gateway_seconds = 0.0
+
+    while True:
+        due_cards = _next_chunk(db, today)
+        if not due_cards:
+            break
+        report["chunks"] += 1
+
+        # Two queries per chunk instead of two per card
+        plan_ids = {card.auto_charge_plan_id for card in due_cards}
+        member_ids = {card.member_id for card in due_cards}
+        plans = {plan.id: plan for plan in db.query(Plan).filter(Plan.id.in_(plan_ids))}
+        members = {member.id: member for member in db.query(Member).filter(Member.id.in_(member_ids))}
+
+        charges = []
+        for card in due_cards:
+            plan = plans.get(card.auto_charge_plan_id)
+            member = members.get(card.member_id)
+            charge = {
+                "card_id": card.id,
+                "period": card.next_charge_date,
+                "member_id": card.member_id,
+                "token": card.processor_token,
+                "card_last4": card.card_last4 or "",
+                "plan_id": card.auto_charge_plan_id,
+                "plan_name": plan.name if plan else "Unknown",
+                "amount": plan.price if plan else Decimal("0.00"),
+                "member_name": f"{member.first_name} {member.last_name}" if member else None,
+                "email": member.email if member else None,
+            }
+            claim = claim_attempt(db, charge, run_id, today=today)
+            if claim is None:
+                report["claimed_elsewhere"] += 1
+                continue
+            charge["run_id"] = run_id
+            charge["attempt_id"], charge["attempt_number"], charge["first_attempt_on"] = claim
+            results["processed"] += 1
+            if charge["attempt_number"] > 1:
+                report["retries"] += 1
+
+            if not plan:
+                logger.warning("Auto-charge skipped: plan %s not found for card %s", card.auto_charge_plan_id, card.id)
+                if not member:
+                    charge["member_name"] = None
+                if _attempt_failed(db, charge, "skipped", "Plan not found", policy, today) == "exhausted":
+                    report["exhausted"] += 1
+                results["failed"] += 1
+                continue
+            if not member or not member.is_active:
+                logger.warning("Auto-charge skipped: member %s inactive for card %s", card.member_id, card.id)
+                charge["member_name"] = None
+                if _attempt_failed(db, charge, "skipped", "Member inactive", policy, today) == "exhausted":
+                    report["exhausted"] += 1
+                results["failed"] += 1
+                continue
+            charges.append(charge)
+        # Claims are durable before the first gateway call
+        db.execute(update(AutoChargeRun).where(AutoChargeRun.id == run_id).values(heartbeat_at=datetime.utcnow()))
         db.commit()
 
-        logger.info("Auto-charge succeeded for member %s, plan %s", card.member_id, plan.name)
-        member_name = f"{member.first_name} {member.last_name}"
-        notify_auto_charge_success(
-            db, member_name=member_name,
-            member_id=str(card.member_id), plan_name=plan.name,
-            amount=str(plan.price), card_last4=card.card_last4 or "",
+        if not charges:
+            continue
+        if adapter is None:
+            adapter = get_payment_adapter(db)
+
+        in_batch = 0
+        gateway_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-charge") as pool:
+            futures = {pool.submit(_charge, adapter, slots, charge): charge for charge in charges}
+            for future in as_completed(futures):
+                charge = futures[future]
+                charge_result, error, seconds = future.result()
+                latencies.append(seconds)
+                outcome = _record_charge(
+                    db, charge, plans[charge["plan_id"]], charge_result, error, seconds, policy, today
+                )
+                if outcome == "succeeded":
+                    results["succeeded"] += 1
+                else:
+                    results["failed"] += 1
+                    if outcome == "exhausted":
+                        report["exhausted"] += 1
+                in_batch += 1
+                if in_batch >= COMMIT_BATCH_SIZE:
+                    db.commit()
+                    report["batches"] += 1
+                    in_batch = 0
+                    wake_dispatcher()
+        if in_batch:
+            db.commit()
+            report["batches"] += 1
+        gateway_seconds += time.perf_counter() - gateway_started
+        charged += len(charges)
+
+    report["gateway_seconds"] = round(gateway_seconds, 3)
+    report["charges_per_second"] = round(charged / gateway_seconds, 2) if gateway_seconds else None
+    report["latency"] = _latency_summary(latencies)
+    return {**results, **report}
+
+
+def list_attempts(db: Session, status: str | None = None, limit: int = 100) -> list[ChargeAttempt]:
+    query = db.query(ChargeAttempt)
+    if status:
+        query = query.filter(ChargeAttempt.status == status)
+    return query.order_by(ChargeAttempt.claimed_at.desc()).limit(limit).all()
+
+
+def release_attempt(db: Session, attempt_id: uuid.UUID) -> ChargeAttempt:
+    """Let today's run retry an 'unknown' attempt, once an admin has confirmed the gateway didn't charge it."""
+    attempt = db.query(ChargeAttempt).filter(ChargeAttempt.id == attempt_id).first()
+    if not attempt:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Charge attempt not found")
+    if attempt.status != "unknown":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only attempts with unknown outcome can be released (this one is {attempt.status})",
         )
-        if member.email:
-            from app.services.email_service import send_auto_charge_receipt
-            send_auto_charge_receipt(
-                db, member.email, member_name, plan.name,
-                str(plan.price), card.card_last4 or "",
-            )
-        results["succeeded"] += 1
+    attempt.status = "released"
+    attempt.finished_at = datetime.utcnow()
+    attempt.next_attempt_on = date.today()
+    db.commit()
+    db.refresh(attempt)
+    logger.warning("Charge attempt %s released for retry (card %s, period %s)",
+                   attempt.id, attempt.saved_card_id, attempt.period)
+    return attempt
+
 
-    return results
+def list_runs(db: Session, limit: int = 20) -> list[AutoChargeRun]:
+    return db.query(AutoChargeRun).order_by(AutoChargeRun.started_at.desc()).limit(limit).all()
 
 
 def enable_auto_charge(
@@ -168,10 +618,9 @@ def disable_auto_charge(
     return card
 
 
-def charge_saved_card_now(
+def _saved_card_charge_context(
     db: Session, saved_card_id: uuid.UUID, plan_id: uuid.UUID, member_id: uuid.UUID
-) -> Transaction:
-    """Charge a saved card on-demand for a kiosk payment."""
+) -> tuple[SavedCard, Plan, str | None]:
     card = db.query(SavedCard).filter(
         SavedCard.id == saved_card_id, SavedCard.member_id == member_id
     ).first()
@@ -184,23 +633,19 @@ def charge_saved_card_now(
 
     member = db.query(Member).filter(Member.id == member_id).first()
     customer_name = f"{member.first_name} {member.last_name}" if member else None
+    return card, plan, customer_name
 
-    adapter = get_payment_adapter(db)
-    charge_result = adapter.charge_saved_card(
-        token=card.processor_token,
-        amount=plan.price,
-        member_id=str(member_id),
-        description=f"Purchase: {plan.name}",
-        customer_name=customer_name,
-    )
 
+def _record_saved_card_charge(
+    db: Session, card: SavedCard, plan: Plan, member_id: uuid.UUID, charge_result
+) -> Transaction:
     if not charge_result.success:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail=charge_result.message or "Card charge failed",
         )
 
-    membership = create_membership(db, member_id, plan_id)
+    membership = create_membership(db, member_id, plan.id)
 
     tx = Transaction(
         member_id=member_id,
@@ -216,3 +661,37 @@ def charge_saved_card_now(
     db.commit()
     db.refresh(tx)
     return tx
+
+
+def charge_saved_card_now(
+    db: Session, saved_card_id: uuid.UUID, plan_id: uuid.UUID, member_id: uuid.UUID
+) -> Transaction:
+    """Charge a saved card on-demand for a kiosk payment."""
+    card, plan, customer_name = _saved_card_charge_context(db, saved_card_id, plan_id, member_id)
+    adapter = get_payment_adapter(db)
+    charge_result = adapter.charge_saved_card(
+        token=card.processor_token,
+        amount=plan.price,
+        member_id=str(member_id),
+        description=f"Purchase: {plan.name}",
+        customer_name=customer_name,
+    )
+    return _record_saved_card_charge(db, card, plan, member_id, charge_result)
+
+
+async def charge_saved_card_now_async(
+    db: Session, saved_card_id: uuid.UUID, plan_id: uuid.UUID, member_id: uuid.UUID
+) -> Transaction:
+    """charge_saved_card_now for async routes: database work runs in the thread pool, the gateway call on the loop."""
+    card, plan, customer_name = await to_thread.run_sync(
+        _saved_card_charge_context, db, saved_card_id, plan_id, member_id
+    )
+    adapter = await to_thread.run_sync(get_payment_adapter, db)
+    charge_result = await adapter.charge_saved_card_async(
+        token=card.processor_token,
+        amount=plan.price,
+        member_id=str(member_id),
+        description=f"Purchase: {plan.name}",
+        customer_name=customer_name,
+    )
+    return await to_thread.run_sync(_record_saved_card_charge, db, card, plan, member_id, charge_result)
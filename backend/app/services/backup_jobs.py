@@ -0,0 +1,371 @@
+"""
+Background backup jobs.
+
+POST /api/backup/run and the hourly scheduler only enqueue a BackupJob row.
+One worker thread runs queued jobs oldest first and records progress, bytes
+written and per-table timings on the row as it goes, so the admin UI can
+poll GET /api/backup/jobs/{id} without touching the backup itself.
+
+Cancelling a running job sets cancel_requested; the worker notices at the
+next stored part or exported table and abandons the upload.
+
+Every process may run a worker. The running job records its owner and a
+heartbeat refreshed by a timer thread every HEARTBEAT_SECONDS, independent of
+progress (one large table can export for many minutes without any); a job
+whose heartbeat is older than JOB_STALE_SECONDS died with its process and is
+marked failed by whichever worker polls next. The outcome is only written
+while the job is still running under this owner, so a job failed that way
+is never overwritten.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.backup_job import BackupJob
+from app.services.backup_service import BACKUP_TABLES, BackupCancelled, choose_backup_kind, run_backup
+from app.services.settings_service import get_setting
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+# Progress is written to the job row (and the cancel flag read back) at most this often
+PROGRESS_FLUSH_SECONDS = 1.0
+# The worker also wakes this often to pick up jobs queued by other processes
+POLL_SECONDS = 30
+# A running job whose heartbeat is older than this is taken to have died with its process
+JOB_STALE_SECONDS = 600
+HEARTBEAT_SECONDS = 60
+
+_worker_thread = None
+_worker_stop_event = threading.Event()
+_worker_wake_event = threading.Event()
+
+
+def serialize_job(job: BackupJob) -> dict:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "trigger": job.trigger,
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 1),
+        "bytes_written": job.bytes_written or 0,
+        "current_table": job.current_table,
+        "table_seconds": job.table_seconds or {},
+        "result": job.result,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "owner": job.owner,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def get_active_job(db: Session) -> BackupJob | None:
+    return (
+        db.query(BackupJob)
+        .filter(BackupJob.status.in_(ACTIVE_STATUSES))
+        .order_by(BackupJob.created_at)
+        .first()
+    )
+
+
+def enqueue_backup_job(db: Session, kind: str | None = None, trigger: str = "manual",
+                       user_id: uuid.UUID | None = None) -> BackupJob:
+    """Queue a backup, or return the one already queued or running — backups never overlap."""
+    job = get_active_job(db)
+    if job is not None:
+        return job
+
+    job = BackupJob(kind=kind, trigger=trigger, requested_by=user_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _worker_wake_event.set()
+    logger.info("Backup job %s queued (%s, kind=%s)", job.id, trigger, kind or "auto")
+    return job
+
+
+def list_jobs(db: Session, limit: int = 20) -> list[BackupJob]:
+    return db.query(BackupJob).order_by(BackupJob.created_at.desc()).limit(limit).all()
+
+
+def request_cancel(db: Session, job: BackupJob) -> BackupJob:
+    """Cancel a queued job at once, or ask the worker to stop a running one."""
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def recover_interrupted_jobs(db: Session, now: datetime | None = None) -> int:
+    """Mark running jobs whose heartbeat went stale as failed; live jobs in other processes are left alone."""
+    now = now or datetime.utcnow()
+    stale = now - timedelta(seconds=JOB_STALE_SECONDS)
+    dead = db.execute(
+        update(BackupJob)
+        .where(
+            BackupJob.status == "running",
+            func.coalesce(BackupJob.heartbeat_at, BackupJob.started_at) < stale,
+        )
+        .values(status="failed", error="Interrupted by restart", finished_at=now)
+        .returning(BackupJob.id, BackupJob.owner)
+    ).all()
+    db.commit()
+    for job_id, owner in dead:
+        logger.warning("Backup job %s (owner %s) stopped heartbeating; marked failed", job_id, owner)
+    return len(dead)
+
+
+def _expected_bytes(db: Session, kind: str) -> int:
+    """Size of the last completed backup of this kind, used to estimate progress."""
+    last = (
+        db.query(BackupJob.bytes_written)
+        .filter(BackupJob.status == "succeeded", BackupJob.kind == kind, BackupJob.bytes_written > 0)
+        .order_by(BackupJob.finished_at.desc())
+        .first()
+    )
+    return last[0] if last else 0
+
+
+class _JobProgress:
+    """on_progress callback for run_backup that mirrors progress onto the job row."""
+
+    def __init__(self, db: Session, job: BackupJob, expected_bytes: int):
+        self.db = db
+        self.job = job
+        self.expected_bytes = expected_bytes
+        self.bytes_written = 0
+        self.tables_done = 0
+        self.table_seconds: dict[str, float] = {}
+        self.current_table: str | None = None
+        self._last_flush = 0.0
+
+    def __call__(self, event: dict) -> None:
+        if "table" in event:
+            self.tables_done += 1
+            self.table_seconds[event["table"]] = event["seconds"]
+            self.current_table = event["table"]
+        else:
+            self.bytes_written = event["bytes_written"]
+        if time.monotonic() - self._last_flush >= PROGRESS_FLUSH_SECONDS:
+            self.flush()
+
+    def percent(self) -> float:
+        if self.expected_bytes:
+            estimate = 100.0 * self.bytes_written / self.expected_bytes
+        else:
+            estimate = 100.0 * self.tables_done / len(BACKUP_TABLES)
+        # Only a finished job is at 100%
+        return min(estimate, 99.0)
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        self.job.progress = self.percent()
+        self.job.bytes_written = self.bytes_written
+        self.job.current_table = self.current_table
+        self.job.table_seconds = dict(self.table_seconds)
+        self.db.commit()
+        cancel_requested = (
+            self.db.query(BackupJob.cancel_requested).filter(BackupJob.id == self.job.id).scalar()
+        )
+        if cancel_requested:
+            raise BackupCancelled()
+
+
+class _Heartbeat:
+    """Thread refreshing a running job's heartbeat_at every HEARTBEAT_SECONDS."""
+
+    def __init__(self, job_id: uuid.UUID, owner: str, session_factory: Callable[[], Session]):
+        self.job_id = job_id
+        self.owner = owner
+        self.session_factory = session_factory
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def beat(self) -> bool:
+        """Refresh the heartbeat; False once the job is no longer running under this owner."""
+        db = self.session_factory()
+        try:
+            alive = db.execute(
+                update(BackupJob)
+                .where(BackupJob.id == self.job_id, BackupJob.status == "running", BackupJob.owner == self.owner)
+                .values(heartbeat_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+            return bool(alive)
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(HEARTBEAT_SECONDS):
+            try:
+                if not self.beat():
+                    logger.warning("Backup job %s is no longer running under %s", self.job_id, self.owner)
+                    return
+            except Exception:
+                logger.exception("Backup job %s heartbeat failed", self.job_id)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="backup-job-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def run_job(job_id: uuid.UUID, session_factory: Callable[[], Session] = SessionLocal,
+            owner: str | None = None) -> None:
+    """Run one claimed job to completion, recording the outcome on its row.
+
+    The job row is updated through its own session so progress commits never
+    touch the backup's read transaction.
+    """
+    owner = owner or _owner()
+    db = session_factory()
+    backup_db = session_factory()
+    heartbeat = _Heartbeat(job_id, owner, session_factory)
+    heartbeat.start()
+    try:
+        job = db.get(BackupJob, job_id)
+        kind = job.kind or choose_backup_kind(backup_db, get_setting(backup_db, "backup_remote_type", "local"))
+        job.kind = kind
+        db.commit()
+        progress = _JobProgress(db, job, _expected_bytes(db, kind))
+
+        outcome: dict = {}
+        try:
+            result = run_backup(backup_db, kind=kind, on_progress=progress)
+        except BackupCancelled:
+            outcome["status"] = "cancelled"
+            logger.info("Backup job %s cancelled", job_id)
+        except Exception as e:
+            logger.exception("Backup job %s failed", job_id)
+            outcome.update(status="failed", error=str(e))
+        else:
+            if result["success"]:
+                outcome.update(
+                    status="succeeded",
+                    progress=100.0,
+                    bytes_written=result.get("bytes_written", progress.bytes_written),
+                    table_seconds=result.get("table_seconds", progress.table_seconds),
+                    current_table=None,
+                )
+            else:
+                outcome.update(status="failed", error=result.get("error", "Backup failed"))
+            outcome["result"] = {k: v for k, v in result.items() if k != "table_seconds"}
+        heartbeat.stop()
+
+        db.rollback()
+        # Only while still ours: another worker may have failed it as stale in the meantime
+        recorded = db.execute(
+            update(BackupJob)
+            .where(BackupJob.id == job_id, BackupJob.status == "running", BackupJob.owner == owner)
+            .values(finished_at=datetime.utcnow(), **outcome)
+        ).rowcount
+        db.commit()
+        if not recorded:
+            logger.warning("Backup job %s was closed by another worker; outcome %s not recorded",
+                           job_id, outcome["status"])
+    finally:
+        heartbeat.stop()
+        backup_db.close()
+        db.close()
+
+
+def process_next_job(session_factory: Callable[[], Session] = SessionLocal) -> bool:
+    """Claim and run the oldest queued job. Returns False if there was none."""
+    db = session_factory()
+    try:
+        job_id = (
+            db.query(BackupJob.id)
+            .filter(BackupJob.status == "queued")
+            .order_by(BackupJob.created_at)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return False
+        # Conditional update, so a job cancelled in the meantime is never started
+        now = datetime.utcnow()
+        owner = _owner()
+        claimed = db.execute(
+            update(BackupJob)
+            .where(BackupJob.id == job_id, BackupJob.status == "queued")
+            .values(status="running", started_at=now, owner=owner, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+
+    if claimed:
+        logger.info("Backup job %s started", job_id)
+        run_job(job_id, session_factory, owner)
+    return True
+
+
+def worker_loop():
+    """Background thread that runs queued backup jobs one at a time."""
+    logger.info("Backup job worker started")
+
+    while not _worker_stop_event.is_set():
+        try:
+            db = SessionLocal()
+            try:
+                recover_interrupted_jobs(db)
+            finally:
+                db.close()
+            while not _worker_stop_event.is_set() and process_next_job():
+                pass
+        except Exception:
+            logger.exception("Backup job worker error")
+
+        _worker_wake_event.wait(POLL_SECONDS)
+        _worker_wake_event.clear()
+
+    logger.info("Backup job worker stopped")
+
+
+def start_job_worker():
+    """Start the backup job worker thread."""
+    global _worker_thread
+
+    if _worker_thread is not None and _worker_thread.is_alive():
+        logger.info("Backup job worker already running")
+        return
+
+    _worker_stop_event.clear()
+    _worker_thread = threading.Thread(target=worker_loop, name="backup-jobs", daemon=True)
+    _worker_thread.start()
+
+
+def stop_job_worker():
+    """Stop the worker thread; a running backup finishes in the background (daemon thread)."""
+    global _worker_thread
+
+    _worker_stop_event.set()
+    _worker_wake_event.set()
+    if _worker_thread is not None:
+        _worker_thread.join(timeout=5)
+        _worker_thread = None
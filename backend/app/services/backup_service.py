@@ -1,27 +1,62 @@
 """
 Automated backup service with remote storage support.
-Supports: Local filesystem, S3, SFTP
+Supports: Local filesystem, S3, SFTP (see backup_storage)
+
+Backups are written as gzip-compressed NDJSON, streamed table by table from
+yield_per cursors straight into the target file or upload stream, so memory
+use stays flat regardless of database size. Each line is one JSON record:
+
+    {"header": {"export_version": "2.0", "kind": "full", "tables": [...], ...}}
+    {"table": "members", "row": {...}}
+    ...
+    {"footer": {"row_counts": {"members": 123, ...}}}
+
+With backup_incremental_enabled, only the nightly run (at backup_hour) is a
+full backup; other runs are incremental and export just the rows of
+DELTA_COLUMNS tables whose timestamp is at or after the previous backup's
+watermark (minus WATERMARK_OVERLAP), plus a full copy of the small tables that
+have no reliable change timestamp. Every backup gets a sidecar manifest
+(pool-backup-<ts>.manifest.json) naming its base full backup and the previous
+link of its chain, so restore_from_storage() can replay full + increments.
+
+On PostgreSQL, tables are exported in parallel from one consistent snapshot
+(see write_backup_stream).
+
+Deleted rows are not carried by increments; they disappear on the next full.
+
+With backup_format=pgcopy on PostgreSQL, full backups are COPY archives
+(pool-backup-<ts>.pgcopy.tar.gz, see pgcopy_backup) instead of NDJSON.
 """
+import gzip
+import hashlib
 import io
 import json
 import logging
-import os
+import re
+import shutil
+import tempfile
 import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
+from sqlalchemy import Connection, inspect, select, text
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models.activity_log import ActivityLog
+from app.models.auto_charge_run import AutoChargeRun
 from app.models.card import Card
+from app.models.charge_attempt import ChargeAttempt, ChargeAttemptEvent
 from app.models.checkin import Checkin
 from app.models.guest_visit import GuestVisit
 from app.models.member import Member
 from app.models.membership import Membership
 from app.models.membership_freeze import MembershipFreeze
+from app.models.outbox_message import OutboxMessage
 from app.models.pin_lockout import PinLockout
 from app.models.plan import Plan
 from app.models.pool_schedule import PoolSchedule, ScheduleOverride
@@ -29,7 +64,19 @@ from app.models.saved_card import SavedCard
 from app.models.setting import Setting
 from app.models.transaction import Transaction
 from app.models.user import User
-from app.services.settings_service import get_setting
+from app.services.backup_storage import (
+    BACKUP_FILE_PREFIX,
+    BACKUP_FILE_SUFFIX,
+    LEGACY_BACKUP_FILE_SUFFIX,
+    PGCOPY_FILE_SUFFIX,
+    BaseBackupStorage,
+    BackupWriter,
+    get_backup_storage,
+    is_backup_file,
+    manifest_name,
+)
+from app.services.row_serializers import dumps, row_serializer
+from app.services.settings_service import get_setting, set_setting
 
 logger = logging.getLogger(__name__)
 
@@ -37,244 +84,757 @@ logger = logging.getLogger(__name__)
 _scheduler_thread = None
 _scheduler_stop_event = threading.Event()
 
+BACKUP_FORMAT_VERSION = "2.0"
+MANIFEST_VERSION = 2
+INCREMENTAL_FILE_TAG = "-incr"
+EXPORT_BATCH_SIZE = 1000
+PROGRESS_LOG_BYTES = 64 * 1024 * 1024
+# Tables exported concurrently (PostgreSQL only); each worker holds one DB connection
+EXPORT_WORKERS = 4
+# Per-table chunks stay in memory up to this size, then spill to a temp file
+CHUNK_SPOOL_BYTES = 4 * 1024 * 1024
+CHUNK_COPY_BYTES = 1024 * 1024
+READ_CHUNK_CHARS = 256 * 1024
+# Rows committed shortly before a watermark can carry an earlier timestamp than
+# rows already exported, so each increment re-reads this much of the previous window.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+# Force a full backup if the chain's base is older than this
+MAX_FULL_AGE = timedelta(hours=25)
+# on_table(table, rows, seconds), called as each table finishes exporting
+TableCallback = Callable[[str, int, float], None]
+# on_progress({"bytes_written": n} or {"table", "rows", "seconds"}); may raise BackupCancelled
+BackupProgress = Callable[[dict], None]
+
+
+class BackupCancelled(Exception):
+    """Raised from a progress callback to stop a running backup."""
+
+
+# Settings that track the current full + incremental chain
+CHAIN_STATE_KEYS = ("backup_chain_base", "backup_chain_last", "backup_chain_watermark",
+                    "backup_chain_started", "backup_chain_storage")
+# Settings describing the backups themselves: left out of backups, so an
+# unchanged database produces unchanged backups and restores don't bring back stale state
+BACKUP_STATE_KEYS = ("backup_last_run", "backup_last_status", "backup_last_location") + CHAIN_STATE_KEYS
+
+# Backed-up tables in dependency order (parents before children)
+BACKUP_TABLES: list[tuple[str, type]] = [
+    ("settings", Setting),
+    ("users", User),
+    ("plans", Plan),
+    ("members", Member),
+    ("cards", Card),
+    ("memberships", Membership),
+    ("membership_freezes", MembershipFreeze),
+    ("saved_cards", SavedCard),
+    ("transactions", Transaction),
+    # The charge ledger keeps a restore from billing a period twice
+    ("auto_charge_runs", AutoChargeRun),
+    ("charge_attempts", ChargeAttempt),
+    ("charge_attempt_events", ChargeAttemptEvent),
+    ("checkins", Checkin),
+    ("guest_visits", GuestVisit),
+    ("pin_lockouts", PinLockout),
+    ("activity_logs", ActivityLog),
+    ("pool_schedules", PoolSchedule),
+    ("schedule_overrides", ScheduleOverride),
+    # Receipts and webhooks not yet delivered
+    ("outbox_messages", OutboxMessage),
+]
+
+# Tables exported incrementally, with the column that marks a row as new or changed.
+# Every other table is small and exported whole in each increment.
+DELTA_COLUMNS: dict[str, str] = {
+    "settings": "updated_at",
+    "members": "updated_at",
+    "transactions": "created_at",
+    "checkins": "checked_in_at",
+    "guest_visits": "created_at",
+    "activity_logs": "created_at",
+    "charge_attempt_events": "created_at",
+}
+
+
+def export_select(model, since: datetime | None = None, since_column: str | None = None):
+    """SELECT of the rows of model's table that go into a backup."""
+    table = model.__table__
+    stmt = select(table)
+    if model is Setting:
+        stmt = stmt.where(table.c.key.not_in(BACKUP_STATE_KEYS))
+    if since is not None:
+        stmt = stmt.where(table.c[since_column] >= since)
+    return stmt
+
+
+def iter_table_rows(db: Session | Connection, model, since: datetime | None = None,
+                    since_column: str | None = None) -> Iterator[dict]:
+    """Yield rows of model's table as serialized dicts, EXPORT_BATCH_SIZE rows at a time.
+
+    With `since`, only rows whose `since_column` is at or after it are returned.
+    """
+    serialize = row_serializer(model.__table__)
+    stmt = export_select(model, since, since_column)
+    result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for row in result.mappings():
+        yield serialize(row)
+
+
+class DigestWriter:
+    """Pass-through writer that counts bytes and hashes them, overall and per named segment.
+
+    Segment offsets and digests land in the backup manifest so verify_backup
+    can check each table by streaming the file, without decoding any rows.
+    """
+
+    def __init__(self, out: BinaryIO):
+        self._out = out
+        self._file_hash = hashlib.sha256()
+        self._segment: tuple[str, Any, int] | None = None
+        self.position = 0
+        self.segments: dict[str, dict] = {}
+
+    def write(self, data) -> int:
+        self._out.write(data)
+        self._file_hash.update(data)
+        if self._segment is not None:
+            self._segment[1].update(data)
+        self.position += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def begin(self, name: str) -> None:
+        self._segment = (name, hashlib.sha256(), self.position)
+
+    def end(self, rows: int) -> None:
+        name, digest, start = self._segment
+        self.segments[name] = {"rows": rows, "offset": start, "length": self.position - start,
+                               "sha256": digest.hexdigest()}
+        self._segment = None
+
+    @property
+    def sha256(self) -> str:
+        return self._file_hash.hexdigest()
+
+    def content_sha256(self) -> str:
+        """Digest of the table data only — equal for two backups of unchanged data."""
+        combined = hashlib.sha256()
+        for name, segment in self.segments.items():
+            combined.update(f"{name}:{segment['sha256']}\n".encode())
+        return combined.hexdigest()
+
+
+def schema_revision(db: Session) -> str | None:
+    """The Alembic revision the database is at, if migrations are in use."""
+    if not inspect(db.get_bind()).has_table("alembic_version"):
+        return None
+    return db.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _export_table(conn: Session | Connection, name: str, model, since: datetime | None, out: BinaryIO) -> int:
+    """Write one table's rows into `out` as a self-contained gzip member; returns the row count."""
+    count = 0
+    lines: list[bytes] = []
+    delta_column = DELTA_COLUMNS.get(name) if since is not None else None
+    table_since = since if delta_column else None
+    # mtime=0 keeps the compressed bytes identical for identical rows
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6, mtime=0) as gz:
+        for row in iter_table_rows(conn, model, table_since, delta_column):
+            lines.append(dumps({"table": name, "row": row}))
+            count += 1
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                gz.write(b"\n".join(lines) + b"\n")
+                lines.clear()
+        if lines:
+            gz.write(b"\n".join(lines) + b"\n")
+    return count
+
+
+@contextmanager
+def snapshot_connections(db: Session) -> Iterator[Callable[[], AbstractContextManager[Connection]] | None]:
+    """Yield a factory of read-only connections that all see one snapshot of the database.
+
+    Uses an exported snapshot on PostgreSQL; yields None on other databases,
+    where the export runs sequentially on `db` instead.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql" or EXPORT_WORKERS <= 1:
+        yield None
+        return
 
-def serialize_model(obj) -> dict:
-    """Convert a SQLAlchemy model to a dict, handling dates and enums."""
-    result = {}
-    for column in obj.__table__.columns:
-        value = getattr(obj, column.name)
-        if value is None:
-            result[column.name] = None
-        elif hasattr(value, 'isoformat'):
-            result[column.name] = value.isoformat()
-        elif hasattr(value, 'value'):  # Enum
-            result[column.name] = value.value
+    engine = bind.engine
+    snapshot_options = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+    # The exporting transaction must stay open until every worker has imported the snapshot
+    with engine.connect().execution_options(**snapshot_options) as coordinator, coordinator.begin():
+        snapshot_id = coordinator.execute(text("SELECT pg_export_snapshot()")).scalar_one()
+        if not re.fullmatch(r"[0-9A-Fa-f-]+", snapshot_id):
+            raise ValueError(f"Unexpected snapshot id: {snapshot_id!r}")
+
+        @contextmanager
+        def connect() -> Iterator[Connection]:
+            with engine.connect().execution_options(**snapshot_options) as conn, conn.begin():
+                conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+                yield conn
+
+        yield connect
+
+
+def export_table_chunks(connect: Callable[[], AbstractContextManager[Connection]],
+                        export_table: Callable[[Connection, str, type, BinaryIO], int],
+                        consume: Callable[[str, BinaryIO, int], None],
+                        row_counts: dict[str, int], table_seconds: dict[str, float],
+                        on_table: TableCallback | None = None) -> None:
+    """Export every backed-up table concurrently into its own chunk file.
+
+    export_table(conn, name, model, chunk) runs on EXPORT_WORKERS threads, each
+    with a connection from `connect`, and returns the row count. Finished
+    chunks (rewound) are passed to consume(name, chunk, count) on the calling
+    thread in dependency order, then closed; on_table follows each one.
+    """
+    def export(name: str, model) -> tuple[BinaryIO, int, float]:
+        started = time.monotonic()
+        chunk = tempfile.SpooledTemporaryFile(max_size=CHUNK_SPOOL_BYTES)
+        try:
+            with connect() as conn:
+                count = export_table(conn, name, model, chunk)
+        except BaseException:
+            chunk.close()
+            raise
+        return chunk, count, time.monotonic() - started
+
+    pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="backup-export")
+    futures = []
+    try:
+        for name, model in BACKUP_TABLES:
+            futures.append((name, pool.submit(export, name, model)))
+        # Consume chunks in dependency order as they become ready
+        for name, future in futures:
+            chunk, count, seconds = future.result()
+            with chunk:
+                chunk.seek(0)
+                consume(name, chunk, count)
+            row_counts[name] = count
+            table_seconds[name] = round(seconds, 3)
+            if on_table is not None:
+                on_table(name, count, table_seconds[name])
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for _, future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result()[0].close()
+        raise
+    pool.shutdown(wait=True)
+
+
+def write_backup_stream(db: Session, out: BinaryIO, export_type: str = "automatic",
+                        since: datetime | None = None, base: str | None = None,
+                        on_table: TableCallback | None = None) -> dict:
+    """Write a gzip-compressed NDJSON backup into `out`.
+
+    Without `since` this is a full backup of every table. With `since`, it is an
+    incremental backup on top of the full backup named `base`: DELTA_COLUMNS
+    tables only include rows changed at or after `since`.
+
+    The header, each table and the footer are separate gzip members (a valid
+    multi-member gzip stream). On PostgreSQL, tables are exported concurrently
+    by EXPORT_WORKERS threads into per-table chunk files, all reading one
+    exported REPEATABLE READ snapshot, and the chunks are appended in order.
+
+    Returns {"row_counts", "table_seconds", "tables", "sha256", "content_sha256",
+    "bytes", "schema_revision", "offsets"} — the last five describe the file for
+    its manifest; table offsets are into the compressed file.
+    """
+    row_counts: dict[str, int] = {}
+    table_seconds: dict[str, float] = {}
+    revision = schema_revision(db)
+    header = {
+        "export_version": BACKUP_FORMAT_VERSION,
+        "export_date": datetime.utcnow().isoformat(),
+        "export_type": export_type,
+        "kind": "full" if since is None else "incremental",
+        "since": since.isoformat() if since is not None else None,
+        "base": base,
+        "schema_revision": revision,
+        "tables": [name for name, _ in BACKUP_TABLES],
+    }
+    writer = DigestWriter(out)
+    writer.write(gzip.compress((json.dumps({"header": header}) + "\n").encode("utf-8"), compresslevel=6, mtime=0))
+
+    def append_chunk(name: str, chunk: BinaryIO, count: int) -> None:
+        writer.begin(name)
+        shutil.copyfileobj(chunk, writer, CHUNK_COPY_BYTES)
+        writer.end(count)
+
+    with snapshot_connections(db) as connect:
+        if connect is None:
+            for name, model in BACKUP_TABLES:
+                started = time.monotonic()
+                writer.begin(name)
+                row_counts[name] = _export_table(db, name, model, since, writer)
+                writer.end(row_counts[name])
+                table_seconds[name] = round(time.monotonic() - started, 3)
+                if on_table is not None:
+                    on_table(name, row_counts[name], table_seconds[name])
         else:
-            result[column.name] = str(value) if not isinstance(value, (str, int, float, bool)) else value
-    return result
-
-
-def create_backup_data(db: Session) -> dict:
-    """Create a complete backup of all system data."""
+            export_table_chunks(
+                connect,
+                lambda conn, name, model, chunk: _export_table(conn, name, model, since, chunk),
+                append_chunk, row_counts, table_seconds, on_table,
+            )
+
+    footer = {"footer": {"row_counts": row_counts}}
+    writer.write(gzip.compress((json.dumps(footer) + "\n").encode("utf-8"), compresslevel=6, mtime=0))
     return {
-        "export_version": "1.1",
-        "export_date": datetime.utcnow().isoformat(),
-        "export_type": "automatic",
-        "data": {
-            "settings": [serialize_model(s) for s in db.query(Setting).all()],
-            "users": [serialize_model(u) for u in db.query(User).all()],
-            "plans": [serialize_model(p) for p in db.query(Plan).all()],
-            "members": [serialize_model(m) for m in db.query(Member).all()],
-            "cards": [serialize_model(c) for c in db.query(Card).all()],
-            "memberships": [serialize_model(m) for m in db.query(Membership).all()],
-            "membership_freezes": [serialize_model(f) for f in db.query(MembershipFreeze).all()],
-            "transactions": [serialize_model(t) for t in db.query(Transaction).all()],
-            "checkins": [serialize_model(c) for c in db.query(Checkin).all()],
-            "saved_cards": [serialize_model(c) for c in db.query(SavedCard).all()],
-            "guest_visits": [serialize_model(g) for g in db.query(GuestVisit).all()],
-            "pin_lockouts": [serialize_model(p) for p in db.query(PinLockout).all()],
-            "activity_logs": [serialize_model(a) for a in db.query(ActivityLog).all()],
-            "pool_schedules": [serialize_model(s) for s in db.query(PoolSchedule).all()],
-            "schedule_overrides": [serialize_model(o) for o in db.query(ScheduleOverride).all()],
-        }
+        "row_counts": row_counts,
+        "table_seconds": table_seconds,
+        "tables": writer.segments,
+        "sha256": writer.sha256,
+        "content_sha256": writer.content_sha256(),
+        "bytes": writer.position,
+        "schema_revision": revision,
+        "offsets": "compressed",
     }
 
 
-def save_to_local(backup_data: dict, path: str, filename: str) -> str:
-    """Save backup to local filesystem."""
-    full_path = Path(path)
-    full_path.mkdir(parents=True, exist_ok=True)
-
-    file_path = full_path / filename
-    with open(file_path, 'w') as f:
-        json.dump(backup_data, f, indent=2)
-
-    logger.info("Backup saved to local path: %s", file_path)
-    return str(file_path)
+class _ReadableStream(io.RawIOBase):
+    """Adapts any object with read(n) to RawIOBase so it can be buffered."""
+
+    def __init__(self, source):
+        self._source = source
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def decompressed_stream(fileobj: BinaryIO) -> BinaryIO:
+    """Wrap `fileobj` as a peekable stream, transparently un-gzipping it if compressed."""
+    if not hasattr(fileobj, "peek"):
+        # Uploads and remote streams (S3 bodies, SFTP files) may not support seeking back after sniffing
+        fileobj = io.BufferedReader(_ReadableStream(fileobj))
+    if fileobj.peek(2)[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    return fileobj
+
+
+class _JsonScanner:
+    """Incremental reader for one large JSON document, so legacy backups never load whole."""
+
+    def __init__(self, text: io.TextIOBase):
+        self._text = text
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._text.read(READ_CHUNK_CHARS)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError("Invalid backup file format")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def lines(self) -> Iterator[str]:
+        """Remaining input, line by line."""
+        lines = io.StringIO(self._buf[self._pos:]).readlines()
+        self._buf, self._pos = "", 0
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += self._text.readline()
+        yield from lines
+        yield from self._text
+
+
+def _legacy_records(scanner: _JsonScanner) -> Iterator[tuple[str, dict]]:
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        table = scanner.value()
+        scanner.expect(":")
+        scanner.expect("[")
+        if scanner.peek() == "]":
+            scanner.expect("]")
+        else:
+            while True:
+                yield table, scanner.value()
+                if scanner.expect(",]") == "]":
+                    break
+        if scanner.expect(",}") == "}":
+            return
 
 
-def save_to_s3(backup_data: dict, bucket: str, prefix: str, filename: str,
-               access_key: str, secret_key: str, region: str = "us-east-1",
-               endpoint_url: str = None) -> str:
-    """Save backup to S3 or S3-compatible storage."""
+def open_backup(fileobj: BinaryIO) -> tuple[dict, Iterator[tuple[str, dict]]]:
+    """Open a backup (gzip NDJSON, plain NDJSON, or legacy single-document JSON).
+
+    Returns (header, records) where records lazily yields (table, row) pairs;
+    neither format is ever held in memory whole. Malformed input raises
+    ValueError, possibly only once records is consumed that far. Once an NDJSON
+    backup's records are consumed, header["footer"] holds its footer.
+    """
+    scanner = _JsonScanner(io.TextIOWrapper(decompressed_stream(fileobj), encoding="utf-8"))
+
+    scanner.expect("{")
+    key = scanner.value()
+    if key == "header":
+        scanner.expect(":")
+        header = scanner.value()
+        scanner.expect("}")
+
+        def ndjson_records() -> Iterator[tuple[str, dict]]:
+            for line in scanner.lines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "table" in record:
+                    yield record["table"], record["row"]
+                elif "footer" in record:
+                    # Lets validate_backup tell a complete file from a truncated one
+                    header["footer"] = record["footer"]
+        return header, ndjson_records()
+
+    # Legacy format: {"export_version": ..., "export_date": ..., "data": {table: [rows]}}
+    header = {}
+    while True:
+        scanner.expect(":")
+        if key == "data":
+            break
+        header[key] = scanner.value()
+        if scanner.expect(",}") == "}":
+            raise ValueError("Invalid backup file format")
+        key = scanner.value()
+    if "export_version" not in header:
+        raise ValueError("Invalid backup file format")
+    return header, _legacy_records(scanner)
+
+
+def backup_timestamp(name: str) -> str:
+    """The YYYYmmdd-HHMMSS stamp embedded in a backup or manifest filename."""
+    return name[len(BACKUP_FILE_PREFIX):len(BACKUP_FILE_PREFIX) + 15]
+
+
+def is_incremental_backup(name: str) -> bool:
+    return name.endswith(INCREMENTAL_FILE_TAG + BACKUP_FILE_SUFFIX)
+
+
+def use_copy_format(db: Session) -> bool:
+    """Whether full backups should use the PostgreSQL COPY format (see pgcopy_backup)."""
+    if get_setting(db, "backup_format", "ndjson") != "pgcopy":
+        return False
+    if db.get_bind().dialect.name != "postgresql":
+        logger.warning("backup_format=pgcopy needs PostgreSQL; writing NDJSON instead")
+        return False
+    return True
+
+
+def choose_backup_kind(db: Session, storage_type: str, now: datetime | None = None) -> str:
+    """Decide whether the next backup is "full" or "incremental"."""
+    if get_setting(db, "backup_incremental_enabled", "false").lower() != "true":
+        return "full"
+    if not get_setting(db, "backup_chain_base", "") or not get_setting(db, "backup_chain_watermark", ""):
+        return "full"
+    # The chain must live in the storage we're about to write to
+    if get_setting(db, "backup_chain_storage", "") != storage_type:
+        return "full"
+
+    now = now or datetime.now()
     try:
-        import boto3
-        from botocore.config import Config
-    except ImportError:
-        raise RuntimeError("boto3 not installed. Run: pip install boto3")
-
-    config = Config(signature_version='s3v4')
-
-    client_kwargs = {
-        'aws_access_key_id': access_key,
-        'aws_secret_access_key': secret_key,
-        'region_name': region,
-        'config': config,
+        last_full = datetime.fromisoformat(get_setting(db, "backup_chain_started", ""))
+    except ValueError:
+        return "full"
+    age = now - last_full
+    if age >= MAX_FULL_AGE:
+        return "full"
+    # One full per night at the configured hour; the rest of the day is increments
+    if now.hour == int(get_setting(db, "backup_hour", "2")) and age >= timedelta(hours=1):
+        return "full"
+    return "incremental"
+
+
+def build_manifest(filename: str, kind: str, watermark: datetime, since: datetime | None,
+                   base: str, previous: str | None, stats: dict) -> dict:
+    """Manifest stored next to a backup: its place in the chain plus what verify_backup checks.
+
+    `tables` maps each table to its rows and the offset, length and SHA-256 of
+    its byte range; `offsets` says whether ranges index the file as stored
+    ("compressed") or its gzip-decompressed stream ("uncompressed").
+    """
+    return {
+        "manifest_version": MANIFEST_VERSION,
+        "backup": filename,
+        "kind": kind,
+        "format": stats.get("format", "ndjson"),
+        "created_at": datetime.utcnow().isoformat(),
+        "watermark": watermark.isoformat(),
+        "since": since.isoformat() if since is not None else None,
+        "base": base,
+        "previous": previous,
+        "delta_tables": sorted(DELTA_COLUMNS) if kind == "incremental" else [],
+        "schema_revision": stats.get("schema_revision"),
+        "row_counts": stats.get("row_counts", {}),
+        "bytes": stats.get("bytes"),
+        "sha256": stats.get("sha256"),
+        "content_sha256": stats.get("content_sha256"),
+        "offsets": stats.get("offsets", "compressed"),
+        "tables": stats.get("tables", {}),
     }
-    if endpoint_url:
-        client_kwargs['endpoint_url'] = endpoint_url
 
-    s3 = boto3.client('s3', **client_kwargs)
 
-    key = f"{prefix.strip('/')}/{filename}" if prefix else filename
-    body = json.dumps(backup_data, indent=2).encode('utf-8')
-
-    s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType='application/json')
-
-    location = f"s3://{bucket}/{key}"
-    logger.info("Backup saved to S3: %s", location)
-    return location
-
-
-def save_to_sftp(backup_data: dict, host: str, port: int, username: str,
-                 password: str, remote_path: str, filename: str,
-                 private_key_path: str = None) -> str:
-    """Save backup to SFTP server."""
+def read_manifest(storage: BaseBackupStorage, backup_name: str) -> dict | None:
+    """The manifest of `backup_name`, or None for backups written before manifests existed."""
     try:
-        import paramiko
-    except ImportError:
-        raise RuntimeError("paramiko not installed. Run: pip install paramiko")
-
-    transport = paramiko.Transport((host, port))
-
-    try:
-        if private_key_path and os.path.exists(private_key_path):
-            private_key = paramiko.RSAKey.from_private_key_file(private_key_path)
-            transport.connect(username=username, pkey=private_key)
+        return json.loads(storage.read_bytes(manifest_name(backup_name)))
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+
+def resolve_backup_chain(storage: BaseBackupStorage, backup_name: str) -> list[str]:
+    """Backups to replay, oldest first, to restore the state captured by `backup_name`."""
+    chain = [backup_name]
+    name = backup_name
+    while is_incremental_backup(name):
+        manifest = read_manifest(storage, name)
+        if manifest is None or not manifest.get("previous"):
+            raise ValueError(f"Backup chain is broken at {name}: manifest missing")
+        name = manifest["previous"]
+        if name in chain:
+            raise ValueError(f"Backup chain loops at {name}")
+        chain.append(name)
+    chain.reverse()
+    return chain
+
+
+class _HashingReader:
+    """Read-through wrapper that counts and hashes the bytes read from `source`."""
+
+    def __init__(self, source):
+        self._source = source
+        self._hash = hashlib.sha256()
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._source.read(size)
+        self._hash.update(data)
+        self.position += len(data)
+        return data
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _hash_ranges(stream: BinaryIO, ranges: dict[str, tuple[int, int]]) -> tuple[dict[str, str], int, str]:
+    """Read `stream` once; return (sha256 per named byte range, total bytes, sha256 of everything)."""
+    ordered = sorted(ranges.items(), key=lambda item: item[1][0])
+    digests: dict[str, str] = {}
+    whole = hashlib.sha256()
+    position = 0
+    index = 0
+    current = None
+    while True:
+        block = stream.read(CHUNK_COPY_BYTES)
+        if not block:
+            break
+        whole.update(block)
+        block_start = position
+        position += len(block)
+        # Feed every range overlapping this block
+        while index < len(ordered) or current is not None:
+            if current is None:
+                name, (offset, length) = ordered[index]
+                if offset >= position:
+                    break
+                current = (name, offset, offset + length, hashlib.sha256())
+                index += 1
+            name, start, end, digest = current
+            digest.update(block[max(start - block_start, 0):min(end, position) - block_start])
+            if end > position:
+                break
+            digests[name] = digest.hexdigest()
+            current = None
+    if current is not None:
+        digests[current[0]] = current[3].hexdigest()
+    return digests, position, whole.hexdigest()
+
+
+def verify_backup(storage: BaseBackupStorage, backup_name: str) -> dict:
+    """Check a stored backup against its manifest by streaming it once.
+
+    Verifies the size and SHA-256 of the whole file and of every table's byte
+    range, without decoding rows. Returns {"valid", "backup", "schema_revision",
+    "tables": {table: ok}, "errors"}. Raises ValueError if the backup has no
+    manifest or one without checksums.
+    """
+    manifest = read_manifest(storage, backup_name)
+    if manifest is None or not manifest.get("sha256"):
+        raise ValueError(f"Backup {backup_name} has no checksum manifest")
+
+    tables = manifest.get("tables", {})
+    ranges = {name: (t["offset"], t["length"]) for name, t in tables.items()}
+    errors: list[str] = []
+    with storage.open(backup_name) as f:
+        if manifest.get("offsets") == "uncompressed":
+            # Table ranges index the decompressed stream; hash the stored bytes as they're read
+            stored = _HashingReader(f)
+            try:
+                with gzip.GzipFile(fileobj=stored, mode="rb") as data:
+                    digests, _, _ = _hash_ranges(data, ranges)
+            except (OSError, EOFError) as e:
+                errors.append(f"Unreadable backup data: {e}")
+                digests = {}
+            while stored.read(CHUNK_COPY_BYTES):
+                pass
+            size, sha256 = stored.position, stored.sha256
         else:
-            transport.connect(username=username, password=password)
-
-        sftp = paramiko.SFTPClient.from_transport(transport)
-
-        # Ensure remote directory exists
-        remote_dir = remote_path.rstrip('/')
-        try:
-            sftp.stat(remote_dir)
-        except FileNotFoundError:
-            # Create directory recursively
-            parts = remote_dir.split('/')
-            current = ''
-            for part in parts:
-                if part:
-                    current += '/' + part
-                    try:
-                        sftp.stat(current)
-                    except FileNotFoundError:
-                        sftp.mkdir(current)
-
-        remote_file = f"{remote_dir}/{filename}"
-
-        # Write backup data
-        with sftp.file(remote_file, 'w') as f:
-            f.write(json.dumps(backup_data, indent=2))
-
-        logger.info("Backup saved to SFTP: %s:%s", host, remote_file)
-        return f"sftp://{host}{remote_file}"
-
-    finally:
-        transport.close()
-
-
-def cleanup_old_backups_local(path: str, retention_count: int):
-    """Remove old backups from local storage, keeping only retention_count newest."""
-    full_path = Path(path)
-    if not full_path.exists():
-        return
-
-    backup_files = sorted(
-        [f for f in full_path.glob("pool-backup-*.json")],
-        key=lambda x: x.stat().st_mtime,
-        reverse=True
-    )
-
-    for old_file in backup_files[retention_count:]:
-        old_file.unlink()
-        logger.info("Deleted old backup: %s", old_file)
-
-
-def cleanup_old_backups_s3(bucket: str, prefix: str, retention_count: int,
-                           access_key: str, secret_key: str, region: str = "us-east-1",
-                           endpoint_url: str = None):
-    """Remove old backups from S3, keeping only retention_count newest."""
-    try:
-        import boto3
-        from botocore.config import Config
-    except ImportError:
-        return
+            digests, size, sha256 = _hash_ranges(f, ranges)
+
+    if size != manifest.get("bytes"):
+        errors.append(f"Size mismatch: {size} bytes, manifest says {manifest.get('bytes')}")
+    if sha256 != manifest["sha256"]:
+        errors.append("File checksum mismatch")
+    results = {}
+    for name, table in tables.items():
+        results[name] = digests.get(name) == table["sha256"]
+        if not results[name]:
+            errors.append(f"{name}: checksum mismatch")
 
-    config = Config(signature_version='s3v4')
-    client_kwargs = {
-        'aws_access_key_id': access_key,
-        'aws_secret_access_key': secret_key,
-        'region_name': region,
-        'config': config,
+    return {
+        "valid": not errors,
+        "backup": backup_name,
+        "schema_revision": manifest.get("schema_revision"),
+        "tables": results,
+        "errors": errors,
     }
-    if endpoint_url:
-        client_kwargs['endpoint_url'] = endpoint_url
-
-    s3 = boto3.client('s3', **client_kwargs)
-
-    prefix_path = prefix.strip('/') + '/' if prefix else ''
-    response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix_path)
-
-    if 'Contents' not in response:
-        return
-
-    # Filter to only backup files and sort by date
-    backup_objects = sorted(
-        [obj for obj in response['Contents'] if obj['Key'].endswith('.json') and 'pool-backup-' in obj['Key']],
-        key=lambda x: x['LastModified'],
-        reverse=True
-    )
-
-    for old_obj in backup_objects[retention_count:]:
-        s3.delete_object(Bucket=bucket, Key=old_obj['Key'])
-        logger.info("Deleted old S3 backup: s3://%s/%s", bucket, old_obj['Key'])
-
-
-def cleanup_old_backups_sftp(host: str, port: int, username: str, password: str,
-                              remote_path: str, retention_count: int,
-                              private_key_path: str = None):
-    """Remove old backups from SFTP, keeping only retention_count newest."""
-    try:
-        import paramiko
-    except ImportError:
-        return
 
-    transport = paramiko.Transport((host, port))
 
+def select_expired_backups(names: list[str], retention_count: int) -> list[str]:
+    """Backups outside the newest `retention_count` full backups and their increments."""
+    fulls = sorted((n for n in names if not is_incremental_backup(n)), key=backup_timestamp, reverse=True)
+    if not fulls:
+        return []
+    # Anything older than the oldest kept full — including increments with no base left — goes
+    oldest_kept = fulls[min(max(retention_count, 1), len(fulls)) - 1]
+    cutoff = backup_timestamp(oldest_kept)
+    return [n for n in names if backup_timestamp(n) < cutoff]
+
+
+def cleanup_old_backups(storage: BaseBackupStorage, retention_count: int) -> list[str]:
+    """Delete expired backups and their manifests, keeping whole chains."""
+    expired = select_expired_backups([b["filename"] for b in storage.list_backups()], retention_count)
+    if expired:
+        storage.delete_many(expired + [manifest_name(name) for name in expired])
+        for name in expired:
+            logger.info("Deleted old backup: %s", storage.location(name))
+    return expired
+
+
+def restore_from_storage(db: Session, backup_name: str, storage: BaseBackupStorage | None = None) -> dict:
+    """Restore the database to the state captured by `backup_name`, replaying its chain.
+
+    Runs in one transaction: either the whole chain applies or nothing changes.
+    """
+    from app.services.restore_service import restore_file
+
+    if storage is None:
+        with get_backup_storage(db) as storage:
+            return restore_from_storage(db, backup_name, storage)
+    chain = resolve_backup_chain(storage, backup_name)
+    row_counts: dict[str, int] = {}
     try:
-        if private_key_path and os.path.exists(private_key_path):
-            private_key = paramiko.RSAKey.from_private_key_file(private_key_path)
-            transport.connect(username=username, pkey=private_key)
-        else:
-            transport.connect(username=username, password=password)
-
-        sftp = paramiko.SFTPClient.from_transport(transport)
-
-        remote_dir = remote_path.rstrip('/')
-        try:
-            files = sftp.listdir_attr(remote_dir)
-        except FileNotFoundError:
-            return
+        for name in chain:
+            with storage.open(name) as f:
+                for table, count in restore_file(db, f).items():
+                    row_counts[table] = row_counts.get(table, 0) + count
+        # Chain state was restored along with the settings table; the next
+        # backup must start a fresh chain for the restored data.
+        db.query(Setting).filter(Setting.key.in_(CHAIN_STATE_KEYS)).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info("Restored backup %s (chain of %d)", backup_name, len(chain))
+    return {"backup": backup_name, "chain": chain, "row_counts": row_counts}
+
+
+def is_unchanged(last_manifest: dict | None, stats: dict) -> bool:
+    """True if a freshly written backup holds exactly the data of `last_manifest`'s backup."""
+    if not last_manifest or not last_manifest.get("content_sha256"):
+        return False
+    return (
+        last_manifest["content_sha256"] == stats.get("content_sha256")
+        and last_manifest.get("format", "ndjson") == stats.get("format", "ndjson")
+        and last_manifest.get("schema_revision") == stats.get("schema_revision")
+    )
 
-        # Filter to backup files and sort by mtime
-        backup_files = sorted(
-            [f for f in files if f.filename.startswith('pool-backup-') and f.filename.endswith('.json')],
-            key=lambda x: x.st_mtime,
-            reverse=True
-        )
 
-        for old_file in backup_files[retention_count:]:
-            sftp.remove(f"{remote_dir}/{old_file.filename}")
-            logger.info("Deleted old SFTP backup: %s", old_file.filename)
+def _record_unchanged_backup(db: Session, kind: str, existing: str, watermark: datetime,
+                             now: datetime, backup_type: str) -> dict:
+    """Settings and result for a backup that was dropped because `existing` already holds its data."""
+    set_setting(db, "backup_last_run", datetime.utcnow().isoformat())
+    set_setting(db, "backup_last_status", "success (unchanged)")
+    set_setting(db, "backup_chain_watermark", watermark.isoformat())
+    if kind == "full":
+        # The existing full is as good as a new one: restart the chain from it
+        set_setting(db, "backup_chain_last", existing)
+        set_setting(db, "backup_chain_started", now.isoformat())
+    return {
+        "success": True,
+        "skipped": True,
+        "reason": "unchanged",
+        "filename": existing,
+        "type": backup_type,
+        "kind": kind,
+    }
 
-    finally:
-        transport.close()
 
+def run_backup(db: Session = None, kind: str | None = None, on_progress: BackupProgress | None = None) -> dict:
+    """Execute a backup based on current settings.
 
-def run_backup(db: Session = None) -> dict:
-    """Execute a backup based on current settings."""
+    `kind` forces "full" or "incremental"; by default choose_backup_kind decides.
+    on_progress is called after every stored part and every exported table; if it
+    raises BackupCancelled the upload is abandoned and the exception propagates.
+    """
     close_db = False
     if db is None:
         db = SessionLocal()
@@ -285,46 +845,73 @@ def run_backup(db: Session = None) -> dict:
         backup_type = get_setting(db, "backup_remote_type", "local")
         retention_count = int(get_setting(db, "backup_retention_count", "7"))
 
+        kind = kind or choose_backup_kind(db, backup_type)
+        since = None
+        base = previous = None
+        if kind == "incremental":
+            base = get_setting(db, "backup_chain_base", "")
+            previous = get_setting(db, "backup_chain_last", "") or base
+            if not base:
+                raise ValueError("No full backup to base an incremental backup on")
+            since = datetime.fromisoformat(get_setting(db, "backup_chain_watermark", "")) - WATERMARK_OVERLAP
+
         # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        filename = f"pool-backup-{timestamp}.json"
-
-        # Create backup data
-        backup_data = create_backup_data(db)
-
-        # Save based on type
-        if backup_type == "local":
-            path = get_setting(db, "backup_local_path", "/backups")
-            location = save_to_local(backup_data, path, filename)
-            cleanup_old_backups_local(path, retention_count)
-
-        elif backup_type == "s3":
-            bucket = get_setting(db, "backup_s3_bucket", "")
-            prefix = get_setting(db, "backup_s3_prefix", "backups")
-            access_key = get_setting(db, "backup_s3_access_key", "")
-            secret_key = get_setting(db, "backup_s3_secret_key", "")
-            region = get_setting(db, "backup_s3_region", "us-east-1")
-            endpoint_url = get_setting(db, "backup_s3_endpoint", "") or None
-
-            location = save_to_s3(backup_data, bucket, prefix, filename,
-                                  access_key, secret_key, region, endpoint_url)
-            cleanup_old_backups_s3(bucket, prefix, retention_count,
-                                   access_key, secret_key, region, endpoint_url)
-
-        elif backup_type == "sftp":
-            host = get_setting(db, "backup_sftp_host", "")
-            port = int(get_setting(db, "backup_sftp_port", "22"))
-            username = get_setting(db, "backup_sftp_username", "")
-            password = get_setting(db, "backup_sftp_password", "")
-            remote_path = get_setting(db, "backup_sftp_path", "/backups")
-            private_key = get_setting(db, "backup_sftp_key_path", "") or None
-
-            location = save_to_sftp(backup_data, host, port, username, password,
-                                    remote_path, filename, private_key)
-            cleanup_old_backups_sftp(host, port, username, password, remote_path,
-                                     retention_count, private_key)
-        else:
-            raise ValueError(f"Unknown backup type: {backup_type}")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d-%H%M%S")
+        tag = INCREMENTAL_FILE_TAG if kind == "incremental" else ""
+        use_copy = kind == "full" and use_copy_format(db)
+        suffix = PGCOPY_FILE_SUFFIX if use_copy else BACKUP_FILE_SUFFIX
+        filename = f"{BACKUP_FILE_PREFIX}{timestamp}{tag}{suffix}"
+        if kind == "full":
+            base = filename
+        # Rows written from here on belong to the next increment
+        watermark = datetime.utcnow()
+
+        stats: dict = {}
+
+        def write_backup(out: BinaryIO) -> dict:
+            on_table = None
+            if on_progress is not None:
+                on_table = lambda name, rows, seconds: on_progress(  # noqa: E731
+                    {"table": name, "rows": rows, "seconds": seconds})
+            if use_copy:
+                from app.services.pgcopy_backup import write_copy_backup_stream
+                stats.update(write_copy_backup_stream(db, out, on_table=on_table), format="pgcopy")
+            else:
+                stats.update(write_backup_stream(db, out, since=since, base=base, on_table=on_table),
+                             format="ndjson")
+            return stats
+
+        progress = {"bytes": 0, "next_log": PROGRESS_LOG_BYTES}
+
+        def report_progress(bytes_written: int) -> None:
+            progress["bytes"] = bytes_written
+            if bytes_written >= progress["next_log"]:
+                logger.info("Backup %s: %.0f MiB written", filename, bytes_written / 2 ** 20)
+                progress["next_log"] += PROGRESS_LOG_BYTES
+            if on_progress is not None:
+                on_progress({"bytes_written": bytes_written})
+
+        with get_backup_storage(db, backup_type) as storage:
+            # The last backup of the same kind in this chain; if ours has the
+            # same content there's no point keeping a second copy.
+            same_kind = get_setting(db, "backup_chain_base" if kind == "full" else "backup_chain_last", "")
+            chain_storage = get_setting(db, "backup_chain_storage", "")
+            last_manifest = None
+            if same_kind and chain_storage == backup_type and (kind == "full") != is_incremental_backup(same_kind):
+                last_manifest = read_manifest(storage, same_kind)
+
+            def keep() -> bool:
+                return not is_unchanged(last_manifest, stats)
+
+            location = storage.write(filename, write_backup, report_progress, keep=keep)
+            if location is None:
+                logger.info("Backup %s skipped: content unchanged since %s", filename, same_kind)
+                return _record_unchanged_backup(db, kind, same_kind, watermark, now, backup_type)
+            manifest = build_manifest(filename, kind, watermark, since, base, previous, stats)
+            storage.write_bytes(manifest_name(filename), json.dumps(manifest, indent=2).encode("utf-8"))
+            logger.info("Backup saved: %s", location)
+            cleanup_old_backups(storage, retention_count)
 
         result = {
             "success": True,
@@ -332,23 +919,39 @@ def run_backup(db: Session = None) -> dict:
             "filename": filename,
             "timestamp": timestamp,
             "type": backup_type,
+            "kind": kind,
+            "format": "pgcopy" if use_copy else "ndjson",
+            "base": base,
+            "bytes_written": progress["bytes"],
+            "row_counts": stats.get("row_counts", {}),
+            "table_seconds": stats.get("table_seconds", {}),
         }
 
-        # Save last backup info
-        from app.services.settings_service import set_setting
+        # Save last backup info and advance the chain
         set_setting(db, "backup_last_run", datetime.utcnow().isoformat())
         set_setting(db, "backup_last_status", "success")
         set_setting(db, "backup_last_location", location)
-
-        logger.info("Backup completed successfully: %s", location)
+        set_setting(db, "backup_chain_base", base)
+        set_setting(db, "backup_chain_last", filename)
+        set_setting(db, "backup_chain_watermark", watermark.isoformat())
+        set_setting(db, "backup_chain_storage", backup_type)
+        if kind == "full":
+            set_setting(db, "backup_chain_started", now.isoformat())
+
+        logger.info("Backup completed successfully: %s (%s)", location, kind)
         return result
 
+    except BackupCancelled:
+        logger.info("Backup cancelled")
+        set_setting(db, "backup_last_run", datetime.utcnow().isoformat())
+        set_setting(db, "backup_last_status", "cancelled")
+        raise
+
     except Exception as e:
         logger.exception("Backup failed")
 
         # Save failure info
         try:
-            from app.services.settings_service import set_setting
             set_setting(db, "backup_last_run", datetime.utcnow().isoformat())
             set_setting(db, "backup_last_status", f"failed: {str(e)}")
         except:
@@ -420,8 +1023,9 @@ def scheduler_loop():
                             should_run = True
 
                     if should_run:
-                        logger.info("Running scheduled backup")
-                        run_backup(db)
+                        from app.services.backup_jobs import enqueue_backup_job
+                        logger.info("Queueing scheduled backup")
+                        enqueue_backup_job(db, trigger="scheduled")
 
             finally:
                 db.close()
@@ -458,62 +1062,3 @@ def stop_scheduler():
         _scheduler_thread.join(timeout=5)
         _scheduler_thread = None
     logger.info("Backup scheduler thread stopped")
-
-
-def list_backups_local(path: str) -> list[dict]:
-    """List backups in local storage."""
-    full_path = Path(path)
-    if not full_path.exists():
-        return []
-
-    backups = []
-    for f in sorted(full_path.glob("pool-backup-*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
-        stat = f.stat()
-        backups.append({
-            "filename": f.name,
-            "location": str(f),
-            "size": stat.st_size,
-            "created": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-        })
-
-    return backups
-
-
-def list_backups_s3(bucket: str, prefix: str, access_key: str, secret_key: str,
-                    region: str = "us-east-1", endpoint_url: str = None) -> list[dict]:
-    """List backups in S3."""
-    try:
-        import boto3
-        from botocore.config import Config
-    except ImportError:
-        return []
-
-    config = Config(signature_version='s3v4')
-    client_kwargs = {
-        'aws_access_key_id': access_key,
-        'aws_secret_access_key': secret_key,
-        'region_name': region,
-        'config': config,
-    }
-    if endpoint_url:
-        client_kwargs['endpoint_url'] = endpoint_url
-
-    s3 = boto3.client('s3', **client_kwargs)
-
-    prefix_path = prefix.strip('/') + '/' if prefix else ''
-    response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix_path)
-
-    if 'Contents' not in response:
-        return []
-
-    backups = []
-    for obj in sorted(response['Contents'], key=lambda x: x['LastModified'], reverse=True):
-        if 'pool-backup-' in obj['Key'] and obj['Key'].endswith('.json'):
-            backups.append({
-                "filename": obj['Key'].split('/')[-1],
-                "location": f"s3://{bucket}/{obj['Key']}",
-                "size": obj['Size'],
-                "created": obj['LastModified'].isoformat(),
-            })
-
-    return backups
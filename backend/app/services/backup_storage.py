@@ -0,0 +1,601 @@
+"""
+Backup storage targets: local filesystem, S3 (or compatible) and SFTP.
+
+Every target exposes the same small interface — stream a backup in, open one
+for reading, list, delete — so backup, retention and restore logic is written
+once in backup_service.
+
+get_backup_storage(db) returns a shared target per configuration, so the S3
+client and the SFTP transport are reused across backups, listings and
+restores. Each call takes a reference that leaving its `with` block releases;
+a target replaced after a settings change or dropped connection is closed
+once its last user releases it, so an upload in flight is never cut off.
+Targets built directly hold their own connection and are closed on exit.
+
+Remote targets keep an index of known backups: new files are picked up with
+a listing that starts after the newest known name (backup names sort by
+timestamp), the index is reloaded in full every INDEX_TTL_SECONDS, and this
+process's own writes and deletes update it directly.
+"""
+import io
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+from sqlalchemy.orm import Session
+
+from app.services.settings_service import get_setting
+
+logger = logging.getLogger(__name__)
+
+BACKUP_FILE_PREFIX = "pool-backup-"
+BACKUP_FILE_SUFFIX = ".ndjson.gz"
+LEGACY_BACKUP_FILE_SUFFIX = ".json"
+PGCOPY_FILE_SUFFIX = ".pgcopy.tar.gz"
+MANIFEST_SUFFIX = ".manifest.json"
+# Output is cut into parts of this size; memory use per upload is one part
+S3_PART_SIZE = 8 * 1024 * 1024  # S3 requires >= 5 MiB for all but the last part
+SFTP_CHUNK_SIZE = 1024 * 1024
+LOCAL_CHUNK_SIZE = 1024 * 1024
+PART_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+# Remote listings are reloaded in full this often, to notice changes made elsewhere
+INDEX_TTL_SECONDS = 600
+S3_DELETE_BATCH = 1000  # delete_objects limit
+SFTP_KEEPALIVE_SECONDS = 30
+
+BackupWriter = Callable[[BinaryIO], dict]
+ProgressCallback = Callable[[int], None]
+
+
+def is_backup_file(name: str) -> bool:
+    if not name.startswith(BACKUP_FILE_PREFIX) or name.endswith(MANIFEST_SUFFIX):
+        return False
+    return name.endswith((BACKUP_FILE_SUFFIX, PGCOPY_FILE_SUFFIX, LEGACY_BACKUP_FILE_SUFFIX))
+
+
+def manifest_name(backup_name: str) -> str:
+    for suffix in (BACKUP_FILE_SUFFIX, PGCOPY_FILE_SUFFIX, LEGACY_BACKUP_FILE_SUFFIX):
+        if backup_name.endswith(suffix):
+            return backup_name[: -len(suffix)] + MANIFEST_SUFFIX
+    return backup_name + MANIFEST_SUFFIX
+
+
+class PartWriter(io.RawIOBase):
+    """Write-only stream that cuts its input into fixed-size parts.
+
+    Each full part is handed to send_part(part_number, offset, data), retried up
+    to `retries` times with exponential backoff, and progress(bytes_written) is
+    called after every part. Call finish() to send the final, short part.
+    """
+
+    def __init__(self, part_size: int, send_part: Callable[[int, int, bytes], None],
+                 progress: ProgressCallback | None = None, retries: int = PART_RETRIES):
+        self.part_size = part_size
+        self._send_part = send_part
+        self._progress = progress
+        self._retries = retries
+        self._buffer = bytearray()
+        self.parts_sent = 0
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._flush_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def finish(self) -> None:
+        if self._buffer or self.parts_sent == 0:
+            self._flush_part(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _flush_part(self, data: bytes) -> None:
+        part_number = self.parts_sent + 1
+        for attempt in range(1, self._retries + 1):
+            try:
+                self._send_part(part_number, self.bytes_written, data)
+                break
+            except Exception as e:
+                if attempt == self._retries:
+                    raise
+                delay = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logger.warning("Backup part %d failed (attempt %d/%d), retrying in %.0fs: %s",
+                               part_number, attempt, self._retries, delay, e)
+                time.sleep(delay)
+        self.parts_sent = part_number
+        self.bytes_written += len(data)
+        if self._progress is not None:
+            self._progress(self.bytes_written)
+
+
+class BaseBackupStorage(ABC):
+    type: str = ""
+    # Seconds the listing index stays valid; None lists every time
+    index_ttl: float | None = None
+    # Set on targets handed out by get_backup_storage, which outlive a `with` block
+    shared = False
+
+    def __init__(self):
+        self._index: dict[str, dict] | None = None
+        self._index_loaded = 0.0
+        self._index_lock = threading.Lock()
+        # Shared targets only: references from get_backup_storage, and whether it was replaced
+        self._users = 0
+        self._retired = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.shared:
+            _release_storage(self)
+        else:
+            self.close()
+
+    def close(self) -> None:
+        """Release any connection held by the target."""
+
+    def is_connected(self) -> bool:
+        """False once a held connection has dropped and the target must be rebuilt."""
+        return True
+
+    @abstractmethod
+    def location(self, name: str) -> str:
+        """Human-readable location of `name`, e.g. s3://bucket/key."""
+        ...
+
+    @abstractmethod
+    def write(self, name: str, write_backup: BackupWriter, progress: ProgressCallback | None = None,
+              keep: Callable[[], bool] | None = None) -> str | None:
+        """Stream a backup into `name`; returns its location. Partial files are never visible.
+
+        progress, if given, is called with the total bytes stored after each part.
+        keep, if given, is called once the backup is fully written; if it returns
+        False the upload is discarded instead of published and None is returned.
+        """
+        ...
+
+    @abstractmethod
+    def write_bytes(self, name: str, data: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def open(self, name: str) -> Iterator[BinaryIO]:
+        """Context manager yielding a readable binary stream for `name`."""
+        ...
+
+    def read_bytes(self, name: str) -> bytes:
+        with self.open(name) as f:
+            return f.read()
+
+    @abstractmethod
+    def _list_entries(self, start_after: str | None = None) -> Iterator[dict]:
+        """Backup files (not manifests) whose names sort after `start_after`, in any order."""
+        ...
+
+    def list_backups(self) -> list[dict]:
+        """Backup files (not manifests), newest first: filename, location, size, created."""
+        if self.index_ttl is None:
+            backups = list(self._list_entries())
+        else:
+            with self._index_lock:
+                if self._index is None or time.monotonic() - self._index_loaded >= self.index_ttl:
+                    self._index = {b["filename"]: b for b in self._list_entries()}
+                    self._index_loaded = time.monotonic()
+                else:
+                    for b in self._list_entries(start_after=max(self._index, default=None)):
+                        self._index[b["filename"]] = b
+                backups = list(self._index.values())
+        backups.sort(key=lambda b: b["filename"], reverse=True)
+        return backups
+
+    def _remember(self, name: str, size: int) -> None:
+        """Add a file this process just wrote to the listing index."""
+        with self._index_lock:
+            if self._index is not None and is_backup_file(name):
+                self._index[name] = {
+                    "filename": name,
+                    "location": self.location(name),
+                    "size": size,
+                    "created": datetime.now().isoformat(),
+                }
+
+    def _forget(self, names: list[str]) -> None:
+        with self._index_lock:
+            if self._index is not None:
+                for name in names:
+                    self._index.pop(name, None)
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """Delete `name`; missing files are ignored."""
+        ...
+
+    def delete_many(self, names: list[str]) -> None:
+        """Delete several files; missing files are ignored."""
+        for name in names:
+            self.delete(name)
+
+
+class LocalBackupStorage(BaseBackupStorage):
+    type = "local"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+
+    def location(self, name: str) -> str:
+        return str(self.path / name)
+
+    def write(self, name: str, write_backup: BackupWriter, progress: ProgressCallback | None = None,
+              keep: Callable[[], bool] | None = None) -> str | None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_path = self.path / name
+        partial_path = self.path / f".{name}.part"
+        try:
+            with open(partial_path, 'wb') as f:
+                writer = PartWriter(LOCAL_CHUNK_SIZE, lambda number, offset, data: f.write(data),
+                                    progress, retries=1)
+                write_backup(writer)
+                writer.finish()
+            if keep is not None and not keep():
+                return None
+            os.replace(partial_path, file_path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+        return str(file_path)
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        return self.write(name, lambda f: f.write(data))
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[BinaryIO]:
+        with open(self.path / name, 'rb') as f:
+            yield f
+
+    def _list_entries(self, start_after: str | None = None) -> Iterator[dict]:
+        if not self.path.exists():
+            return
+        for f in self.path.glob(f"{BACKUP_FILE_PREFIX}*"):
+            if not is_backup_file(f.name) or (start_after is not None and f.name <= start_after):
+                continue
+            stat = f.stat()
+            yield {
+                "filename": f.name,
+                "location": str(f),
+                "size": stat.st_size,
+                "created": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            }
+
+    def delete(self, name: str) -> None:
+        try:
+            (self.path / name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3BackupStorage(BaseBackupStorage):
+    type = "s3"
+    index_ttl = INDEX_TTL_SECONDS
+
+    def __init__(self, bucket: str, prefix: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", endpoint_url: str = None):
+        super().__init__()
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("boto3 not installed. Run: pip install boto3")
+
+        client_kwargs = {
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key,
+            'region_name': region,
+            'config': Config(signature_version='s3v4'),
+        }
+        if endpoint_url:
+            client_kwargs['endpoint_url'] = endpoint_url
+
+        self.client = boto3.client('s3', **client_kwargs)
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix else ''
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def location(self, name: str) -> str:
+        return f"s3://{self.bucket}/{self._key(name)}"
+
+    def write(self, name: str, write_backup: BackupWriter, progress: ProgressCallback | None = None,
+              keep: Callable[[], bool] | None = None) -> str | None:
+        # Multipart upload fed part by part as the backup is generated, so at most
+        # one S3_PART_SIZE buffer is held and nothing is spooled to disk.
+        key = self._key(name)
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType='application/gzip',
+        )['UploadId']
+        parts: list[dict] = []
+
+        def send_part(part_number: int, offset: int, data: bytes) -> None:
+            response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                               PartNumber=part_number, Body=data)
+            parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+
+        try:
+            writer = PartWriter(S3_PART_SIZE, send_part, progress)
+            write_backup(writer)
+            writer.finish()
+            if keep is not None and not keep():
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+                return None
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                  MultipartUpload={'Parts': parts})
+        except BaseException:
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                logger.warning("Failed to abort multipart upload for %s", key)
+            raise
+        self._remember(name, writer.bytes_written)
+        return self.location(name)
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(name), Body=data)
+        self._remember(name, len(data))
+        return self.location(name)
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[BinaryIO]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self._key(name))['Body']
+        try:
+            yield body
+        finally:
+            body.close()
+
+    def _list_entries(self, start_after: str | None = None) -> Iterator[dict]:
+        # list_objects_v2 returns at most 1,000 keys per call
+        params = {'Bucket': self.bucket, 'Prefix': self.prefix}
+        if start_after is not None:
+            params['StartAfter'] = self._key(start_after)
+        for page in self.client.get_paginator('list_objects_v2').paginate(**params):
+            for obj in page.get('Contents', []):
+                filename = obj['Key'].split('/')[-1]
+                if is_backup_file(filename):
+                    yield {
+                        "filename": filename,
+                        "location": f"s3://{self.bucket}/{obj['Key']}",
+                        "size": obj['Size'],
+                        "created": obj['LastModified'].isoformat(),
+                    }
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+        self._forget([name])
+
+    def delete_many(self, names: list[str]) -> None:
+        for start in range(0, len(names), S3_DELETE_BATCH):
+            batch = names[start:start + S3_DELETE_BATCH]
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': self._key(name)} for name in batch], 'Quiet': True},
+            )
+            for error in response.get('Errors', []):
+                logger.warning("Failed to delete %s: %s", error.get('Key'), error.get('Message'))
+        self._forget(names)
+
+
+class SftpBackupStorage(BaseBackupStorage):
+    type = "sftp"
+    index_ttl = INDEX_TTL_SECONDS
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 remote_path: str, private_key_path: str = None):
+        super().__init__()
+        try:
+            import paramiko
+        except ImportError:
+            raise RuntimeError("paramiko not installed. Run: pip install paramiko")
+
+        self.host = host
+        self.remote_dir = remote_path.rstrip('/')
+        self._dir_ready = False
+        self.transport = paramiko.Transport((host, port))
+        try:
+            if private_key_path and os.path.exists(private_key_path):
+                private_key = paramiko.RSAKey.from_private_key_file(private_key_path)
+                self.transport.connect(username=username, pkey=private_key)
+            else:
+                self.transport.connect(username=username, password=password)
+            # Keeps a shared, mostly idle transport from being dropped by NAT/firewalls
+            self.transport.set_keepalive(SFTP_KEEPALIVE_SECONDS)
+            self.sftp = paramiko.SFTPClient.from_transport(self.transport)
+        except Exception:
+            self.transport.close()
+            raise
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def is_connected(self) -> bool:
+        return self.transport.is_active()
+
+    def _path(self, name: str) -> str:
+        return f"{self.remote_dir}/{name}"
+
+    def location(self, name: str) -> str:
+        return f"sftp://{self.host}{self._path(name)}"
+
+    def _ensure_dir(self) -> None:
+        if self._dir_ready:
+            return
+        try:
+            self.sftp.stat(self.remote_dir)
+        except FileNotFoundError:
+            # Create directory recursively
+            current = ''
+            for part in self.remote_dir.split('/'):
+                if part:
+                    current += '/' + part
+                    try:
+                        self.sftp.stat(current)
+                    except FileNotFoundError:
+                        self.sftp.mkdir(current)
+        self._dir_ready = True
+
+    def write(self, name: str, write_backup: BackupWriter, progress: ProgressCallback | None = None,
+              keep: Callable[[], bool] | None = None) -> str | None:
+        self._ensure_dir()
+        partial_file = self._path(f".{name}.part")
+        # Stream backup data in SFTP_CHUNK_SIZE chunks, each written at its own
+        # offset so a failed chunk can be rewritten in place, then move the file
+        # into place so listings never see a partial file.
+        try:
+            with self.sftp.open(partial_file, 'wb') as f:
+                f.set_pipelined(True)
+
+                def send_part(part_number: int, offset: int, data: bytes) -> None:
+                    f.seek(offset)
+                    f.write(data)
+                    f.flush()
+
+                writer = PartWriter(SFTP_CHUNK_SIZE, send_part, progress)
+                write_backup(writer)
+                writer.finish()
+        except BaseException:
+            # Failed or cancelled: don't leave the partial file behind
+            try:
+                self.sftp.remove(partial_file)
+            except OSError:
+                pass
+            raise
+        if keep is not None and not keep():
+            self.sftp.remove(partial_file)
+            return None
+        self.sftp.posix_rename(partial_file, self._path(name))
+        self._remember(name, writer.bytes_written)
+        return self.location(name)
+
+    def write_bytes(self, name: str, data: bytes) -> str:
+        return self.write(name, lambda f: f.write(data))
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[BinaryIO]:
+        with self.sftp.open(self._path(name), 'rb') as f:
+            f.prefetch()
+            yield f
+
+    def _list_entries(self, start_after: str | None = None) -> Iterator[dict]:
+        # SFTP can't list from a given name, but one READDIR pass is cheap
+        # next to the connection setup the shared transport saves.
+        try:
+            files = self.sftp.listdir_attr(self.remote_dir)
+        except FileNotFoundError:
+            return
+        for f in files:
+            if is_backup_file(f.filename) and (start_after is None or f.filename > start_after):
+                yield {
+                    "filename": f.filename,
+                    "location": self.location(f.filename),
+                    "size": f.st_size,
+                    "created": datetime.fromtimestamp(f.st_mtime).isoformat(),
+                }
+
+    def delete(self, name: str) -> None:
+        try:
+            self.sftp.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+        self._forget([name])
+
+
+_storages: dict[tuple, BaseBackupStorage] = {}
+_storages_lock = threading.Lock()
+
+
+def _storage_config(db: Session, backup_type: str) -> dict:
+    if backup_type == "local":
+        return {"path": get_setting(db, "backup_local_path", "/backups")}
+    if backup_type == "s3":
+        return {
+            "bucket": get_setting(db, "backup_s3_bucket", ""),
+            "prefix": get_setting(db, "backup_s3_prefix", "backups"),
+            "access_key": get_setting(db, "backup_s3_access_key", ""),
+            "secret_key": get_setting(db, "backup_s3_secret_key", ""),
+            "region": get_setting(db, "backup_s3_region", "us-east-1"),
+            "endpoint_url": get_setting(db, "backup_s3_endpoint", "") or None,
+        }
+    if backup_type == "sftp":
+        return {
+            "host": get_setting(db, "backup_sftp_host", ""),
+            "port": int(get_setting(db, "backup_sftp_port", "22")),
+            "username": get_setting(db, "backup_sftp_username", ""),
+            "password": get_setting(db, "backup_sftp_password", ""),
+            "remote_path": get_setting(db, "backup_sftp_path", "/backups"),
+            "private_key_path": get_setting(db, "backup_sftp_key_path", "") or None,
+        }
+    raise ValueError(f"Unknown backup type: {backup_type}")
+
+
+_STORAGE_CLASSES = {"local": LocalBackupStorage, "s3": S3BackupStorage, "sftp": SftpBackupStorage}
+
+
+def get_backup_storage(db: Session, backup_type: str | None = None) -> BaseBackupStorage:
+    """The configured backup storage target, shared per configuration.
+
+    A target is rebuilt when its settings change or its connection has dropped.
+    Use it as a context manager: the reference each call takes is released on exit.
+    """
+    backup_type = backup_type or get_setting(db, "backup_remote_type", "local")
+    config = _storage_config(db, backup_type)
+    key = (backup_type, tuple(sorted(config.items())))
+
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is not None and storage.is_connected():
+            storage._users += 1
+            return storage
+        storage = _STORAGE_CLASSES[backup_type](**config)
+        storage.shared = True
+        storage._users = 1
+        # Settings changed (or the connection dropped): retire the old target of
+        # this type, closing it now only if nobody is still using it
+        idle = []
+        for stale_key in [k for k in _storages if k[0] == backup_type]:
+            stale = _storages.pop(stale_key)
+            stale._retired = True
+            if not stale._users:
+                idle.append(stale)
+        _storages[key] = storage
+    for stale in idle:
+        stale.close()
+    return storage
+
+
+def _release_storage(storage: BaseBackupStorage) -> None:
+    """Drop one reference to a shared target; a retired one closes with its last user."""
+    with _storages_lock:
+        storage._users -= 1
+        idle = storage._retired and not storage._users
+    if idle:
+        storage.close()
+
+
+def close_backup_storages() -> None:
+    """Close every shared target (on shutdown)."""
+    with _storages_lock:
+        for storage in _storages.values():
+            storage.close()
+        _storages.clear()
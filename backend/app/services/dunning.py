@@ -0,0 +1,58 @@
+"""
+Retry policy (dunning) for failed auto-charges.
+
+A declined or skipped billing period is retried on a schedule rather than at
+every daily run: auto_charge_retry_days lists the retries as days after the
+first attempt ("1,3,7" retries one, three and seven days later), and
+auto_charge_max_attempts caps the total number of attempts, the first one
+included. Once either runs out the period is exhausted and the card's
+auto-charge is turned off.
+"""
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.services.settings_service import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_DAYS = (1, 3, 7)
+DEFAULT_MAX_ATTEMPTS = 4
+
+
+def parse_retry_days(value: str) -> tuple[int, ...]:
+    """'1,3,7' -> (1, 3, 7). Raises ValueError unless the days are positive and increasing."""
+    days = tuple(int(part) for part in value.replace(" ", "").split(",") if part)
+    if any(day <= 0 for day in days) or list(days) != sorted(set(days)):
+        raise ValueError(f"Retry days must be positive and increasing: {value!r}")
+    return days
+
+
+def retry_policy(db: Session) -> tuple[tuple[int, ...], int]:
+    """(retry days, max attempts) from settings; invalid settings fall back to the defaults."""
+    values = get_settings(db, ["auto_charge_retry_days", "auto_charge_max_attempts"])
+    try:
+        retry_days = parse_retry_days(values["auto_charge_retry_days"])
+    except ValueError:
+        logger.warning("Invalid auto_charge_retry_days %r, using %s",
+                       values["auto_charge_retry_days"], DEFAULT_RETRY_DAYS)
+        retry_days = DEFAULT_RETRY_DAYS
+    try:
+        max_attempts = max(1, int(values["auto_charge_max_attempts"]))
+    except ValueError:
+        logger.warning("Invalid auto_charge_max_attempts %r, using %d",
+                       values["auto_charge_max_attempts"], DEFAULT_MAX_ATTEMPTS)
+        max_attempts = DEFAULT_MAX_ATTEMPTS
+    return retry_days, max_attempts
+
+
+def next_attempt_on(
+    policy: tuple[tuple[int, ...], int], attempt_number: int, first_attempt_on: date, today: date
+) -> date | None:
+    """When to retry after attempt `attempt_number` failed, or None once retries are exhausted."""
+    retry_days, max_attempts = policy
+    if attempt_number >= max_attempts or attempt_number > len(retry_days):
+        return None
+    # Never the same day, even if a late run is already past the scheduled date
+    return max(first_attempt_on + timedelta(days=retry_days[attempt_number - 1]), today + timedelta(days=1))
@@ -0,0 +1,181 @@
+"""Attendance forecasting per pool schedule block.
+
+A nightly job aggregates recent check-ins (plus their guests) and walk-in guest
+visits into local-time hourly counts, fits an exponentially weighted
+day-of-week x hour profile with NumPy, and projects it onto the active
+PoolSchedule blocks for the next FORECAST_DAYS days. Results are stored in
+attendance_forecasts so the report endpoint is a plain table read.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+from app.models.attendance_forecast import AttendanceForecast
+from app.models.checkin import Checkin
+from app.models.guest_visit import GuestVisit
+from app.models.pool_schedule import PoolSchedule, ScheduleOverride, ScheduleType
+from app.services.settings_service import get_setting
+
+FORECAST_DAYS = 14
+HISTORY_WEEKS = 12
+HALF_LIFE_WEEKS = 4  # a visit pattern from 4 weeks ago counts half as much as this week's
+
+CLOSED_TYPES = (ScheduleType.closed, ScheduleType.maintenance)
+
+
+def _load_hourly_counts(db: Session, since_utc: datetime) -> tuple[np.ndarray, np.ndarray]:
+    """Return (utc_hour_index, attendance) for every UTC hour with activity since `since_utc`."""
+    checkins = db.execute(
+        select(Checkin.checked_in_at, Checkin.guest_count).where(Checkin.checked_in_at >= since_utc)
+    ).all()
+    guests = db.execute(
+        select(GuestVisit.created_at).where(GuestVisit.created_at >= since_utc)
+    ).scalars().all()
+
+    stamps = np.array([row[0] for row in checkins] + list(guests), dtype="datetime64[h]")
+    weights = np.concatenate([
+        1 + np.array([row[1] or 0 for row in checkins], dtype=np.float64),
+        np.ones(len(guests), dtype=np.float64),
+    ])
+    if stamps.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    hours, inverse = np.unique(stamps.astype(np.int64), return_inverse=True)
+    return hours, np.bincount(inverse, weights=weights)
+
+
+def fit_profile(day_counts: np.ndarray, day_of_week: np.ndarray, day_age: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Weighted mean and std dev of attendance per (day of week, hour).
+
+    day_counts is [days, 24]; day_of_week and day_age (days before today) are [days].
+    """
+    weights = 0.5 ** (day_age / (7 * HALF_LIFE_WEEKS))
+    onehot = np.zeros((day_counts.shape[0], 7))
+    onehot[np.arange(day_counts.shape[0]), day_of_week] = 1.0
+    dow_weights = onehot * weights[:, None]  # [days, 7]
+
+    totals = dow_weights.sum(axis=0)[:, None]  # [7, 1]
+    safe_totals = np.where(totals > 0, totals, 1.0)
+    mean = dow_weights.T @ day_counts / safe_totals  # [7, 24]
+    second = dow_weights.T @ (day_counts ** 2) / safe_totals
+    std = np.sqrt(np.maximum(second - mean ** 2, 0.0))
+    return mean, std
+
+
+def block_hour_overlap(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Fraction of each clock hour covered by each [start, end) block, as [blocks, 24]."""
+    hours = np.arange(24)[None, :]
+    return np.clip(np.minimum(ends[:, None], hours + 1) - np.maximum(starts[:, None], hours), 0.0, 1.0)
+
+
+def _hours(t: time) -> float:
+    return t.hour + t.minute / 60 + t.second / 3600
+
+
+def compute_forecast(db: Session, today: date | None = None) -> list[AttendanceForecast]:
+    """Replace attendance_forecasts with today .. today + FORECAST_DAYS - 1."""
+    tz = ZoneInfo(get_setting(db, "timezone", "America/New_York"))
+    today = today or datetime.now(tz).date()
+    history_start = today - timedelta(weeks=HISTORY_WEEKS)
+    since_utc = datetime.combine(history_start, time.min, tzinfo=tz).astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+
+    utc_hours, counts = _load_hourly_counts(db, since_utc)
+
+    # Map each active UTC hour to a local (date, hour) cell — a few thousand buckets at most
+    local = [datetime.fromtimestamp(int(h) * 3600, tz) for h in utc_hours]
+    first_day = min((d.date() for d in local), default=today)
+    first_day = max(first_day, history_start)
+    n_days = (today - first_day).days  # today is partial, so it is excluded from fitting
+
+    day_counts = np.zeros((max(n_days, 0), 24))
+    if n_days > 0 and local:
+        day_idx = np.array([(d.date() - first_day).days for d in local])
+        hour_idx = np.array([d.hour for d in local])
+        in_range = (day_idx >= 0) & (day_idx < n_days)
+        np.add.at(day_counts, (day_idx[in_range], hour_idx[in_range]), counts[in_range])
+
+    days = [first_day + timedelta(days=i) for i in range(max(n_days, 0))]
+    mean, std = fit_profile(
+        day_counts,
+        np.array([d.weekday() for d in days], dtype=np.int64),
+        np.array([(today - d).days for d in days], dtype=np.float64),
+    )
+
+    schedules = db.query(PoolSchedule).filter(PoolSchedule.is_active.is_(True)).all()
+    horizon_end = datetime.combine(today + timedelta(days=FORECAST_DAYS), time.min)
+    closures = (
+        db.query(ScheduleOverride)
+        .filter(
+            ScheduleOverride.is_active.is_(True),
+            ScheduleOverride.schedule_type.in_(CLOSED_TYPES),
+            ScheduleOverride.start_datetime < horizon_end,
+            ScheduleOverride.end_datetime > datetime.combine(today, time.min),
+        )
+        .all()
+    )
+
+    computed_at = datetime.utcnow()
+    forecasts: list[AttendanceForecast] = []
+    for offset in range(FORECAST_DAYS):
+        day = today + timedelta(days=offset)
+        blocks = [s for s in schedules if s.day_of_week == day.weekday()]
+        if not blocks:
+            continue
+        starts = np.array([_hours(b.start_time) for b in blocks])
+        # An end of 00:00 means the block runs until midnight
+        ends = np.array([_hours(b.end_time) or 24.0 for b in blocks])
+        overlap = block_hour_overlap(starts, ends)
+        expected = overlap @ mean[day.weekday()]
+        # Hourly deviations treated as independent, so variances add
+        spread = np.sqrt((overlap ** 2) @ (std[day.weekday()] ** 2))
+
+        for block, exp, dev in zip(blocks, expected, spread):
+            block_start = datetime.combine(day, block.start_time)
+            block_end = datetime.combine(day, block.end_time)
+            if block.end_time <= block.start_time:
+                block_end = datetime.combine(day + timedelta(days=1), time.min)
+            closed = block.schedule_type in CLOSED_TYPES or any(
+                c.start_datetime <= block_start and c.end_datetime >= block_end for c in closures
+            )
+            forecasts.append(AttendanceForecast(
+                forecast_date=day,
+                schedule_id=block.id,
+                schedule_name=block.name,
+                schedule_type=block.schedule_type,
+                start_time=block.start_time,
+                end_time=block.end_time,
+                expected_attendance=0.0 if closed else round(float(exp), 1),
+                expected_high=0.0 if closed else round(float(exp + dev), 1),
+                closed_by_override=closed and block.schedule_type not in CLOSED_TYPES,
+                computed_at=computed_at,
+            ))
+
+    # Past days are dropped too; only the current horizon is kept
+    db.query(AttendanceForecast).delete()
+    db.add_all(forecasts)
+    db.commit()
+
+    logger.info(
+        "Attendance forecast computed: start=%s, days=%d, blocks=%d, history_days=%d",
+        today, FORECAST_DAYS, len(forecasts), n_days,
+    )
+    return forecasts
+
+
+def get_forecast(db: Session, start_date: date, days: int = FORECAST_DAYS) -> list[AttendanceForecast]:
+    return (
+        db.query(AttendanceForecast)
+        .filter(
+            AttendanceForecast.forecast_date >= start_date,
+            AttendanceForecast.forecast_date < start_date + timedelta(days=days),
+        )
+        .order_by(AttendanceForecast.forecast_date, AttendanceForecast.start_time)
+        .all()
+    )
@@ -0,0 +1,193 @@
+"""
+Leader election for scheduled jobs.
+
+Every app process starts the APScheduler, but only the process holding the
+leader lock runs its jobs; the others keep theirs paused. The elector thread
+tries to take the lock every ELECTION_INTERVAL_SECONDS, so when the leader
+stops or dies another process takes over within that interval.
+
+On PostgreSQL the lock is a session-level advisory lock held on a dedicated
+connection. The server releases it as soon as that connection closes, which
+also covers a leader that was killed outright. On SQLite (tests, single-box
+setups) an exclusive flock on a lock file stands in for it; the OS releases
+that when the process exits.
+
+Only the scheduler needs this. The outbox dispatcher, backup job worker and
+terminal watcher claim their work row by row and are safe to run everywhere;
+the backup job worker only fails a running job once its heartbeat goes stale,
+so it never touches a job another process is still running.
+"""
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by every process of this app ("pool" in ASCII)
+SCHEDULER_LOCK_KEY = 0x706F6F6C
+# How often followers try to take over, and the leader checks it still holds the lock
+ELECTION_INTERVAL_SECONDS = 10.0
+
+
+class AdvisoryLock:
+    """PostgreSQL session-level advisory lock on its own connection."""
+
+    def __init__(self, engine: Engine, key: int = SCHEDULER_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self._conn: Connection | None = None
+
+    def acquire(self) -> bool:
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            # The lock belongs to the session, not the transaction; don't sit idle in one
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def is_held(self) -> bool:
+        """True while the lock's connection is alive (the server drops the lock with it)."""
+        if self._conn is None:
+            return False
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception:
+            logger.warning("Lost the connection holding the scheduler lock")
+            self._conn.invalidate()
+            self._conn = None
+            return False
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._conn.commit()
+        except Exception:
+            logger.warning("Could not unlock the scheduler lock; closing its connection releases it")
+        finally:
+            self._conn.close()
+            self._conn = None
+
+
+class FileLock:
+    """Exclusive, non-blocking flock on a lock file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    def acquire(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def is_held(self) -> bool:
+        return self._fd is not None
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+def default_lock_file(engine: Engine) -> str:
+    """Lock file next to a SQLite database file, or in the temp dir for in-memory databases."""
+    database = engine.url.database
+    if database and database != ":memory:":
+        return os.path.abspath(database) + ".scheduler.lock"
+    return os.path.join(tempfile.gettempdir(), "pool-kiosk-scheduler.lock")
+
+
+def make_leader_lock(engine: Engine) -> AdvisoryLock | FileLock:
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLock(engine)
+    return FileLock(default_lock_file(engine))
+
+
+class LeaderElection:
+    """Keeps trying to hold `lock`; calls on_elected/on_demoted as leadership changes."""
+
+    def __init__(
+        self,
+        lock: AdvisoryLock | FileLock,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        interval: float = ELECTION_INTERVAL_SECONDS,
+    ):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.interval = interval
+        self.is_leader = False
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def step(self) -> bool:
+        """One election round: keep, lose or take the lock. Returns whether this process leads."""
+        if self.is_leader:
+            if not self.lock.is_held():
+                self.is_leader = False
+                logger.warning("Scheduler leadership lost; pausing scheduled jobs")
+                self.on_demoted()
+            return self.is_leader
+        try:
+            acquired = self.lock.acquire()
+        except Exception:
+            logger.exception("Scheduler leader election failed")
+            return False
+        if acquired:
+            self.is_leader = True
+            logger.info("Elected scheduler leader (pid %d); running scheduled jobs", os.getpid())
+            self.on_elected()
+        return self.is_leader
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.step()
+            except Exception:
+                logger.exception("Scheduler leader election error")
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> None:
+        """Run the first round now, then keep electing on a thread."""
+        self._stop_event.clear()
+        self.step()
+        if not self.is_leader:
+            logger.info("Another process leads the scheduler; standing by")
+        self._thread = threading.Thread(target=self._loop, name="scheduler-election", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop electing and give up leadership so another process takes over right away."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.is_leader:
+            self.is_leader = False
+            self.on_demoted()
+        self.lock.release()
@@ -14,8 +14,16 @@ from app.models.plan import Plan, PlanType
 from app.services.activity_service import log_activity
 
 
-def create_membership(db: Session, member_id: uuid.UUID, plan_id: uuid.UUID) -> Membership:
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+def create_membership(
+    db: Session, member_id: uuid.UUID, plan_id: uuid.UUID, plan: Plan | None = None, commit: bool = True
+) -> Membership:
+    """Create (or, for swim passes, top up) a membership.
+
+    Pass an already loaded `plan` to skip looking it up. With commit=False the
+    changes are only flushed, for callers committing many at once.
+    """
+    if plan is None:
+        plan = db.query(Plan).filter(Plan.id == plan_id).first()
     if not plan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
 
@@ -38,8 +46,11 @@ def create_membership(db: Session, member_id: uuid.UUID, plan_id: uuid.UUID) ->
             if remaining > 0:
                 # Add new swims to existing balance
                 existing.swims_total = (existing.swims_total or 0) + plan.swim_count
-                db.commit()
-                db.refresh(existing)
+                if commit:
+                    db.commit()
+                    db.refresh(existing)
+                else:
+                    db.flush()
                 logger.info(
                     "Swim pass stacked: member=%s, plan=%s, added=%d swims, new_total=%d, membership=%s",
                     member_id, plan.name, plan.swim_count, existing.swims_total, existing.id
@@ -79,8 +90,11 @@ def create_membership(db: Session, member_id: uuid.UUID, plan_id: uuid.UUID) ->
         membership.swims_used = 0
 
     db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    if commit:
+        db.commit()
+        db.refresh(membership)
+    else:
+        db.flush()
     logger.info("Membership created: member=%s, plan=%s, type=%s, membership=%s", member_id, plan.name, plan.plan_type.value, membership.id)
     return membership
 
@@ -3,12 +3,20 @@ NFC Reader Service - WebSocket client management for card scan broadcasts.
 
 This service manages WebSocket connections from admin browsers and broadcasts
 NFC card scan events when cards are tapped at the kiosk.
+
+Each process only knows its own WebSocket clients. On PostgreSQL a scan is
+relayed to every process (app.services.process_events), so browsers connected
+to any web worker receive it.
 """
+import asyncio
 import logging
 from typing import Set
 
+from anyio import to_thread
 from fastapi import WebSocket
 
+from app.services.process_events import NFC_CARD_SCAN, listener_running, publish_now, subscribe
+
 logger = logging.getLogger(__name__)
 
 # Set of connected WebSocket clients
@@ -27,7 +35,7 @@ async def unregister_client(websocket: WebSocket) -> None:
     logger.info("NFC WebSocket client disconnected. Total clients: %d", len(connected_clients))
 
 
-async def broadcast_card_scan(uid: str) -> int:
+async def broadcast_card_scan(uid: str) -> int | None:
     """
     Broadcast a card scan event to all connected admin browsers.
 
@@ -35,8 +43,17 @@ async def broadcast_card_scan(uid: str) -> int:
         uid: The RFID/NFC card UID that was scanned
 
     Returns:
-        Number of clients successfully notified
+        Number of clients successfully notified, or None when the scan was
+        relayed to every process (the other processes' counts aren't known here)
     """
+    if listener_running():
+        await to_thread.run_sync(publish_now, NFC_CARD_SCAN, uid)
+        return None
+    return await send_card_scan(uid)
+
+
+async def send_card_scan(uid: str) -> int:
+    """Send a card scan event to the clients connected to this process."""
     if not connected_clients:
         logger.debug("No connected clients to broadcast card scan")
         return 0
@@ -63,3 +80,11 @@ async def broadcast_card_scan(uid: str) -> int:
 def get_client_count() -> int:
     """Return the number of connected WebSocket clients."""
     return len(connected_clients)
+
+
+def _on_relayed_card_scan(uid: str | None) -> None:
+    if uid is not None:
+        asyncio.ensure_future(send_card_scan(uid))
+
+
+subscribe(NFC_CARD_SCAN, _on_relayed_card_scan)
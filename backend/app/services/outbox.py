@@ -0,0 +1,190 @@
+"""
+Transactional outbox for webhooks and emails.
+
+Work that would otherwise send a webhook or an email inline (and wait on a
+slow SMTP server or webhook endpoint) adds an OutboxMessage row in its own
+transaction instead. The message therefore exists exactly when the change it
+describes was committed. A dispatcher thread delivers pending messages
+oldest first.
+
+A message is claimed by moving available_at forward (a lease) with a
+conditional UPDATE, so several processes can dispatch without sending the
+same message twice. A handler that raises is retried with backoff until
+MAX_ATTEMPTS; a crashed dispatcher's claims simply become available again
+when the lease runs out.
+"""
+import logging
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.outbox_message import OutboxMessage
+from app.services.email_service import send_auto_charge_receipt
+from app.services.notification_service import notify_auto_charge_failed, notify_auto_charge_success
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(db, **payload)
+HANDLERS: dict[str, Callable[..., bool]] = {
+    "auto_charge_success": notify_auto_charge_success,
+    "auto_charge_failed": notify_auto_charge_failed,
+    "auto_charge_receipt": send_auto_charge_receipt,
+}
+
+MAX_ATTEMPTS = 5
+# A claimed message is invisible to other dispatchers this long
+CLAIM_LEASE_SECONDS = 120
+# Retry delay after the n-th failed attempt: 1, 2, 4, 8 minutes
+RETRY_BASE_SECONDS = 60
+DISPATCH_BATCH_SIZE = 100
+# Sent and failed messages are kept this long, then purged
+RETENTION_DAYS = 14
+# The dispatcher also wakes this often to pick up messages from other processes
+POLL_SECONDS = 10
+PURGE_INTERVAL_SECONDS = 3600
+
+_dispatcher_thread = None
+_dispatcher_stop_event = threading.Event()
+_dispatcher_wake_event = threading.Event()
+
+
+def enqueue(db: Session, kind: str, **payload) -> OutboxMessage:
+    """Add a message to the caller's transaction; it is delivered once the caller commits."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown outbox message kind: {kind}")
+    message = OutboxMessage(kind=kind, payload=payload, available_at=datetime.utcnow())
+    db.add(message)
+    return message
+
+
+def wake_dispatcher() -> None:
+    """Deliver newly committed messages now rather than at the next poll."""
+    _dispatcher_wake_event.set()
+
+
+def _claim_batch(db: Session, now: datetime) -> list[OutboxMessage]:
+    candidates = (
+        db.query(OutboxMessage.id)
+        .filter(OutboxMessage.status == "pending", OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.created_at)
+        .limit(DISPATCH_BATCH_SIZE)
+        .all()
+    )
+    lease = now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+    claimed = []
+    for (message_id,) in candidates:
+        won = db.execute(
+            update(OutboxMessage)
+            .where(
+                OutboxMessage.id == message_id,
+                OutboxMessage.status == "pending",
+                OutboxMessage.available_at <= now,
+            )
+            .values(available_at=lease, attempts=OutboxMessage.attempts + 1)
+        ).rowcount
+        if won:
+            claimed.append(message_id)
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(OutboxMessage).filter(OutboxMessage.id.in_(claimed)).order_by(OutboxMessage.created_at).all()
+
+
+def dispatch_pending(session_factory: Callable[[], Session] = SessionLocal, now: datetime | None = None) -> dict:
+    """Deliver one batch of due messages. Returns counts of sent, retried and failed messages."""
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    db = session_factory()
+    try:
+        now = now or datetime.utcnow()
+        for message in _claim_batch(db, now):
+            try:
+                HANDLERS[message.kind](db, **message.payload)
+            except Exception as exc:
+                db.rollback()
+                message.last_error = str(exc)
+                if message.attempts >= MAX_ATTEMPTS:
+                    message.status = "failed"
+                    counts["failed"] += 1
+                    logger.error("Outbox message %s (%s) failed permanently: %s", message.id, message.kind, exc)
+                else:
+                    delay = RETRY_BASE_SECONDS * 2 ** (message.attempts - 1)
+                    message.available_at = datetime.utcnow() + timedelta(seconds=delay)
+                    counts["retried"] += 1
+                    logger.warning("Outbox message %s (%s) failed, retrying in %ds: %s",
+                                   message.id, message.kind, delay, exc)
+            else:
+                message.status = "sent"
+                message.sent_at = datetime.utcnow()
+                counts["sent"] += 1
+            db.commit()
+    finally:
+        db.close()
+    return counts
+
+
+def purge_old_messages(db: Session, now: datetime | None = None) -> int:
+    """Delete sent and failed messages older than RETENTION_DAYS."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=RETENTION_DAYS)
+    count = (
+        db.query(OutboxMessage)
+        .filter(OutboxMessage.status.in_(("sent", "failed")), OutboxMessage.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def dispatcher_loop():
+    """Background thread delivering outbox messages."""
+    logger.info("Outbox dispatcher started")
+    last_purge = 0.0
+
+    while not _dispatcher_stop_event.is_set():
+        try:
+            while not _dispatcher_stop_event.is_set():
+                counts = dispatch_pending()
+                if not any(counts.values()):
+                    break
+            if time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                last_purge = time.monotonic()
+                db = SessionLocal()
+                try:
+                    purge_old_messages(db)
+                finally:
+                    db.close()
+        except Exception:
+            logger.exception("Outbox dispatcher error")
+
+        _dispatcher_wake_event.wait(POLL_SECONDS)
+        _dispatcher_wake_event.clear()
+
+    logger.info("Outbox dispatcher stopped")
+
+
+def start_outbox_dispatcher():
+    """Start the outbox dispatcher thread."""
+    global _dispatcher_thread
+
+    if _dispatcher_thread is not None and _dispatcher_thread.is_alive():
+        logger.info("Outbox dispatcher already running")
+        return
+
+    _dispatcher_stop_event.clear()
+    _dispatcher_thread = threading.Thread(target=dispatcher_loop, name="outbox-dispatcher", daemon=True)
+    _dispatcher_thread.start()
+
+
+def stop_outbox_dispatcher():
+    """Stop the dispatcher thread; undelivered messages stay pending for the next start."""
+    global _dispatcher_thread
+
+    _dispatcher_stop_event.set()
+    _dispatcher_wake_event.set()
+    if _dispatcher_thread is not None:
+        _dispatcher_thread.join(timeout=5)
+        _dispatcher_thread = None
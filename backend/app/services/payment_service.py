@@ -1,7 +1,11 @@
+import hashlib
+import json
 import logging
+import threading
 import uuid
 from decimal import Decimal
 
+from anyio import to_thread
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -20,25 +24,79 @@ from app.payments.hitech_adapter import HiTechPaymentAdapter
 from app.payments.usaepay_adapter import UsaepayPaymentAdapter
 from app.services.membership_service import create_membership
 from app.services.notification_service import notify_low_balance
-from app.services.settings_service import get_processor_config, get_setting
+from app.services.settings_service import PROCESSOR_CONFIG_KEYS, get_setting, get_settings
+
+
+_ADAPTER_CLASSES: dict[str, type[BasePaymentAdapter]] = {
+    "stub": StubPaymentAdapter,
+    "cash": CashPaymentAdapter,
+    "stripe": StripePaymentAdapter,
+    "square": SquarePaymentAdapter,
+    "sola": SolaPaymentAdapter,
+    "hitech": HiTechPaymentAdapter,
+    "usaepay": UsaepayPaymentAdapter,
+}
+
+_SETTING_KEYS = ["payment_processor"] + [k for keys in PROCESSOR_CONFIG_KEYS.values() for k in keys]
+
+# One adapter per (processor, config hash); a settings change yields a new key
+_adapters: dict[tuple[str, str], BasePaymentAdapter] = {}
+_adapters_lock = threading.Lock()
+
+
+def _config_hash(config: dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
 
 
 def get_payment_adapter(db: Session) -> BasePaymentAdapter:
-    """Instantiate the configured payment adapter from DB settings."""
-    processor = get_setting(db, "payment_processor", "stub")
-    adapter_map: dict[str, type[BasePaymentAdapter]] = {
-        "stub": StubPaymentAdapter,
-        "cash": CashPaymentAdapter,
-        "stripe": StripePaymentAdapter,
-        "square": SquarePaymentAdapter,
-        "sola": SolaPaymentAdapter,
-        "hitech": HiTechPaymentAdapter,
-        "usaepay": UsaepayPaymentAdapter,
-    }
-    adapter_cls = adapter_map.get(processor, StubPaymentAdapter)
-    config = get_processor_config(db, processor)
-    logger.debug("Using payment adapter: %s (processor=%s)", adapter_cls.__name__, processor)
-    return adapter_cls(config=config)
+    """The configured payment adapter, reused until its processor settings change.
+
+    The processor and its config are read in one query; an adapter is only
+    constructed when that (processor, config) pair hasn't been seen before.
+    """
+    values = get_settings(db, _SETTING_KEYS)
+    processor = values["payment_processor"] or "stub"
+    config = {k: values[k] for k in PROCESSOR_CONFIG_KEYS.get(processor, [])}
+    key = (processor, _config_hash(config))
+
+    adapter = _adapters.get(key)
+    if adapter is not None:
+        return adapter
+
+    with _adapters_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter_cls = _ADAPTER_CLASSES.get(processor, StubPaymentAdapter)
+            logger.info("Building payment adapter: %s (processor=%s)", adapter_cls.__name__, processor)
+            adapter = adapter_cls(config=config)
+            stale = [k for k in _adapters if k[0] == processor]
+            for stale_key in stale:
+                _close_adapter(_adapters.pop(stale_key))
+            _adapters[key] = adapter
+    return adapter
+
+
+def _close_adapter(adapter: BasePaymentAdapter) -> None:
+    try:
+        adapter.close()
+    except Exception:
+        logger.exception("Error closing payment adapter %s", type(adapter).__name__)
+
+
+def warm_up_payment_adapter(db: Session) -> BasePaymentAdapter:
+    """Build the configured adapter and let it open its clients, so the first payment isn't slow."""
+    adapter = get_payment_adapter(db)
+    adapter.warm_up()
+    return adapter
+
+
+def clear_payment_adapters() -> None:
+    """Drop and close every cached adapter (shutdown and tests)."""
+    with _adapters_lock:
+        adapters = list(_adapters.values())
+        _adapters.clear()
+    for adapter in adapters:
+        _close_adapter(adapter)
 
 
 def process_cash_payment(
@@ -104,11 +162,7 @@ def process_cash_payment(
     return tx, change_due, credit_added
 
 
-def process_card_payment(
-    db: Session,
-    member_id: uuid.UUID,
-    plan_id: uuid.UUID,
-) -> Transaction:
+def _card_payment_context(db: Session, member_id: uuid.UUID, plan_id: uuid.UUID) -> Plan:
     member = db.query(Member).filter(Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
@@ -116,21 +170,22 @@ def process_card_payment(
     plan = db.query(Plan).filter(Plan.id == plan_id).first()
     if not plan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return plan
 
-    adapter = get_payment_adapter(db)
-    session = adapter.initiate_payment(plan.price, str(member_id), f"Purchase: {plan.name}")
-    logger.info("Card payment initiated: member=%s, plan=%s, amount=$%s, session=%s", member_id, plan.name, plan.price, session.session_id)
 
-    membership = create_membership(db, member_id, plan_id)
+def _record_card_payment(db: Session, member_id: uuid.UUID, plan: Plan, session_id: str) -> Transaction:
+    logger.info("Card payment initiated: member=%s, plan=%s, amount=$%s, session=%s", member_id, plan.name, plan.price, session_id)
+
+    membership = create_membership(db, member_id, plan.id)
 
     tx = Transaction(
         member_id=member_id,
         transaction_type=TransactionType.payment,
         payment_method=PaymentMethod.card,
         amount=plan.price,
-        plan_id=plan_id,
+        plan_id=plan.id,
         membership_id=membership.id,
-        reference_id=session.session_id,
+        reference_id=session_id,
     )
     db.add(tx)
     db.commit()
@@ -139,6 +194,29 @@ def process_card_payment(
     return tx
 
 
+def process_card_payment(
+    db: Session,
+    member_id: uuid.UUID,
+    plan_id: uuid.UUID,
+) -> Transaction:
+    plan = _card_payment_context(db, member_id, plan_id)
+    adapter = get_payment_adapter(db)
+    session = adapter.initiate_payment(plan.price, str(member_id), f"Purchase: {plan.name}")
+    return _record_card_payment(db, member_id, plan, session.session_id)
+
+
+async def process_card_payment_async(
+    db: Session,
+    member_id: uuid.UUID,
+    plan_id: uuid.UUID,
+) -> Transaction:
+    """process_card_payment for async routes: database work runs in the thread pool, the gateway call on the loop."""
+    plan = await to_thread.run_sync(_card_payment_context, db, member_id, plan_id)
+    adapter = await to_thread.run_sync(get_payment_adapter, db)
+    session = await adapter.initiate_payment_async(plan.price, str(member_id), f"Purchase: {plan.name}")
+    return await to_thread.run_sync(_record_card_payment, db, member_id, plan, session.session_id)
+
+
 def process_credit_payment(
     db: Session,
     member_id: uuid.UUID,
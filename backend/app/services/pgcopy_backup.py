@@ -0,0 +1,266 @@
+"""
+PostgreSQL-native backup format built on COPY.
+
+Each table is dumped with COPY ... TO STDOUT through psycopg2's copy_expert
+and loaded back with COPY ... FROM STDIN, skipping per-row Python work on
+both sides. The archive is a gzip-compressed tar
+(pool-backup-<ts>.pgcopy.tar.gz):
+
+    header.json    {"export_version": "2.0", "format": "pgcopy", "kind": "full", "tables": [...], "columns": {...}}
+    settings.csv   COPY CSV output with a header row
+    ...            one member per table, in dependency order
+    footer.json    {"row_counts": {...}}
+
+CSV is used rather than COPY's binary format, which is tied to the exact column
+types and can't be validated or inspected without a database. COPY backups are
+always full backups; increments stay NDJSON and replay on top of them.
+"""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import tarfile
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import BinaryIO
+
+from sqlalchemy import Connection, delete
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+from app.services.backup_service import (
+    BACKUP_FORMAT_VERSION,
+    BACKUP_TABLES,
+    DigestWriter,
+    TableCallback,
+    export_select,
+    export_table_chunks,
+    schema_revision,
+    snapshot_connections,
+)
+
+HEADER_MEMBER = "header.json"
+FOOTER_MEMBER = "footer.json"
+COPY_BUFFER_BYTES = 1024 * 1024
+
+_TABLES = {name: model.__table__ for name, model in BACKUP_TABLES}
+_TABLE_ORDER = [name for name, _ in BACKUP_TABLES]
+
+
+def is_copy_archive(stream: BinaryIO) -> bool:
+    """True if the (decompressed, peekable) stream starts with a tar header."""
+    return stream.peek(512)[257:262] == b"ustar"
+
+
+def _add_member(tar: tarfile.TarFile, name: str, fileobj: BinaryIO, size: int) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(time.time())
+    tar.addfile(info, fileobj)
+
+
+def _add_json(tar: tarfile.TarFile, name: str, value: dict) -> None:
+    data = json.dumps(value).encode("utf-8")
+    _add_member(tar, name, io.BytesIO(data), len(data))
+
+
+def write_copy_backup_stream(db: Session, out: BinaryIO, export_type: str = "automatic",
+                             on_table: TableCallback | None = None) -> dict:
+    """Write a full COPY-format backup into `out` (PostgreSQL only).
+
+    Tables are dumped concurrently from one snapshot, like write_backup_stream,
+    and returns the same stats; table offsets point at each CSV member's data
+    in the uncompressed tar.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql":
+        raise ValueError("COPY backups require PostgreSQL")
+
+    revision = schema_revision(db)
+    header = {
+        "export_version": BACKUP_FORMAT_VERSION,
+        "export_date": datetime.utcnow().isoformat(),
+        "export_type": export_type,
+        "format": "pgcopy",
+        "kind": "full",
+        "since": None,
+        "base": None,
+        "schema_revision": revision,
+        "tables": _TABLE_ORDER,
+        "columns": {name: [c.name for c in table.columns] for name, table in _TABLES.items()},
+    }
+    row_counts: dict[str, int] = {}
+    table_seconds: dict[str, float] = {}
+
+    def export(conn: Connection, name: str, model, chunk: BinaryIO) -> int:
+        query = export_select(model).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)",
+                chunk, size=COPY_BUFFER_BYTES,
+            )
+            return max(cursor.rowcount, 0)
+        finally:
+            cursor.close()
+
+    writer = DigestWriter(out)
+    tables: dict[str, dict] = {}
+    with gzip.GzipFile(fileobj=writer, mode="wb", compresslevel=6, mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w|") as tar:
+        _add_json(tar, HEADER_MEMBER, header)
+
+        def consume(name: str, chunk: BinaryIO, count: int) -> None:
+            digest = hashlib.sha256()
+            for block in iter(lambda: chunk.read(COPY_BUFFER_BYTES), b""):
+                digest.update(block)
+            size = chunk.tell()
+            chunk.seek(0)
+            _add_member(tar, f"{name}.csv", chunk, size)
+            # tar.offset is now past the member's data, which is padded to whole blocks
+            blocks, remainder = divmod(size, tarfile.BLOCKSIZE)
+            offset = tar.offset - (blocks + (remainder > 0)) * tarfile.BLOCKSIZE
+            tables[name] = {"rows": count, "offset": offset, "length": size, "sha256": digest.hexdigest()}
+
+        with snapshot_connections(db) as connect:
+            if connect is None:
+                connect = lambda: nullcontext(db.connection())  # noqa: E731
+            export_table_chunks(connect, export, consume, row_counts, table_seconds, on_table)
+
+        _add_json(tar, FOOTER_MEMBER, {"row_counts": row_counts})
+
+    content = hashlib.sha256()
+    for name in _TABLE_ORDER:
+        if name in tables:
+            content.update(f"{name}:{tables[name]['sha256']}\n".encode())
+    return {
+        "row_counts": row_counts,
+        "table_seconds": table_seconds,
+        "tables": tables,
+        "sha256": writer.sha256,
+        "content_sha256": content.hexdigest(),
+        "bytes": writer.position,
+        "schema_revision": revision,
+        "offsets": "uncompressed",
+    }
+
+
+def _table_for_member(member_name: str):
+    name = member_name.removesuffix(".csv")
+    return name, _TABLES.get(name)
+
+
+def restore_copy_archive(db: Session, stream: BinaryIO, batch_commit: bool = False,
+                         progress=None) -> dict[str, int]:
+    """Load a COPY-format backup with COPY ... FROM STDIN, replacing the tables it contains.
+
+    With batch_commit, the clear and each table are committed as they finish.
+    Returns rows restored per table.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql":
+        raise ValueError("COPY backups can only be restored into PostgreSQL")
+
+    started = time.monotonic()
+    header = None
+    row_counts: dict[str, int] = {}
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            data = tar.extractfile(member)
+            if member.name == HEADER_MEMBER:
+                header = json.load(data)
+                for name in reversed(_TABLE_ORDER):
+                    if name in header.get("tables", []):
+                        db.execute(delete(_TABLES[name]))
+                if batch_commit:
+                    db.commit()
+                continue
+            if member.name == FOOTER_MEMBER:
+                continue
+            if header is None:
+                raise ValueError("Invalid backup file format: header missing")
+
+            name, table = _table_for_member(member.name)
+            if table is None:
+                logger.warning("Skipping unknown table in backup: %s", name)
+                continue
+            columns = header["columns"].get(name, [])
+            unknown = set(columns) - set(table.columns.keys())
+            if unknown:
+                raise ValueError(f"Backup table {name} has columns missing from the database: {', '.join(sorted(unknown))}")
+
+            quote = dialect.identifier_preparer.quote
+            cursor = db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {quote(table.name)} ({', '.join(quote(c) for c in columns)}) "
+                    f"FROM STDIN WITH (FORMAT csv, HEADER true)",
+                    data, size=COPY_BUFFER_BYTES,
+                )
+                row_counts[name] = max(cursor.rowcount, 0)
+            finally:
+                cursor.close()
+            if batch_commit:
+                db.commit()
+            if progress is not None:
+                progress(name, row_counts[name], sum(row_counts.values()))
+
+    if header is None:
+        raise ValueError("Invalid backup file format: header missing")
+    logger.info("Applied COPY backup: %d rows in %.1fs", sum(row_counts.values()), time.monotonic() - started)
+    return row_counts
+
+
+def validate_copy_archive(stream: BinaryIO) -> dict:
+    """Dry run for a COPY-format backup: check tables and columns and count CSV rows."""
+    header = None
+    footer = None
+    row_counts: dict[str, int] = {}
+    errors: list[str] = []
+    warnings: list[str] = []
+    try:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                data = tar.extractfile(member)
+                if member.name == HEADER_MEMBER:
+                    header = json.load(data)
+                    continue
+                if member.name == FOOTER_MEMBER:
+                    footer = json.load(data)
+                    continue
+                if header is None:
+                    continue
+                name, table = _table_for_member(member.name)
+                if table is None:
+                    warnings.append(f"Unknown table will be skipped: {name}")
+                    continue
+                # Members of a streamed tar aren't seekable, which rules out TextIOWrapper
+                reader = csv.reader(line.decode("utf-8") for line in data)
+                columns = next(reader, [])
+                unknown = set(columns) - set(table.columns.keys())
+                if unknown:
+                    errors.append(f"{name}: unknown columns {', '.join(sorted(unknown))}")
+                row_counts[name] = sum(1 for _ in reader)
+    except (tarfile.TarError, ValueError, OSError, EOFError) as e:
+        errors.append(f"Unreadable backup data: {e}")
+    else:
+        if header is None:
+            errors.append("Backup header missing")
+        elif footer is None:
+            errors.append("Backup is truncated: footer missing")
+        else:
+            for name, expected in footer.get("row_counts", {}).items():
+                if row_counts.get(name, 0) != expected:
+                    errors.append(f"{name}: {row_counts.get(name, 0)} rows, footer says {expected}")
+
+    return {
+        "valid": not errors,
+        "kind": "full",
+        "row_counts": row_counts,
+        "errors": errors,
+        "warnings": warnings,
+    }
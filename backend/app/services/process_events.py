@@ -0,0 +1,136 @@
+"""
+Events delivered to every app process through PostgreSQL LISTEN/NOTIFY.
+
+Some state lives in each process: the NFC WebSocket clients connected to it
+and its report cache. With several web workers (or the separate worker
+process writing transactions) an event raised in one process has to reach
+the others: an NFC scan posted to worker A must reach browsers connected to
+worker B, and a check-in committed by worker A must invalidate worker B's
+cached dashboard.
+
+publish() sends a NOTIFY on the caller's connection. Inside a transaction it
+is delivered only if that transaction commits. Each web process runs one
+listener task holding a dedicated connection. It calls the handlers
+subscribed to a channel on the event loop, including for events the process
+published itself. After (re)connecting it calls every handler with payload
+None, meaning events may have been missed.
+
+On SQLite there is only ever one process, so nothing is relayed:
+relay_available() is False and callers act locally.
+"""
+import asyncio
+import logging
+from collections.abc import Callable
+
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+NFC_CARD_SCAN = "nfc_card_scan"
+REPORT_CACHE_INVALIDATE = "report_cache_invalidate"
+
+RECONNECT_SECONDS = 5.0
+
+# channel -> handlers(payload); payload None after a (re)connect
+_handlers: dict[str, list[Callable[[str | None], None]]] = {}
+_task: asyncio.Task | None = None
+
+
+def relay_available() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def listener_running() -> bool:
+    return _task is not None and not _task.done()
+
+
+def subscribe(channel: str, handler: Callable[[str | None], None]) -> None:
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def publish(conn: Connection, channel: str, payload: str) -> None:
+    """NOTIFY every listening process; delivered when conn's transaction commits. No-op off PostgreSQL."""
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def publish_now(channel: str, payload: str) -> None:
+    with engine.begin() as conn:
+        publish(conn, channel, payload)
+
+
+def _dispatch(channel: str, payload: str | None) -> None:
+    for handler in _handlers.get(channel, ()):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Process event handler failed: channel=%s", channel)
+
+
+def _connect():
+    """A dedicated autocommit psycopg2 connection LISTENing on every subscribed channel."""
+    conn = engine.raw_connection()
+    # Never hand an autocommit connection back to the pool; close() now really closes it
+    conn.detach()
+    conn.driver_connection.autocommit = True
+    with conn.driver_connection.cursor() as cursor:
+        for channel in _handlers:
+            cursor.execute(f'LISTEN "{channel}"')
+    return conn
+
+
+async def _listen() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        conn = None
+        try:
+            conn = await to_thread.run_sync(_connect)
+            logger.info("Listening for process events on %s", ", ".join(sorted(_handlers)))
+            for channel in _handlers:
+                _dispatch(channel, None)
+            raw = conn.driver_connection
+            readable = asyncio.Event()
+            loop.add_reader(raw.fileno(), readable.set)
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    raw.poll()
+                    while raw.notifies:
+                        notify = raw.notifies.pop(0)
+                        _dispatch(notify.channel, notify.payload)
+            finally:
+                loop.remove_reader(raw.fileno())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Process event listener failed; reconnecting in %ss", RECONNECT_SECONDS)
+            await asyncio.sleep(RECONNECT_SECONDS)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def start_event_listener() -> None:
+    """Start the listener on the running event loop (PostgreSQL only, idempotent)."""
+    global _task
+    if not relay_available() or listener_running() or not _handlers:
+        return
+    _task = asyncio.create_task(_listen(), name="process-events")
+
+
+async def stop_event_listener() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -1,4 +1,6 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+from app.config import settings
+
+limiter = Limiter(key_func=get_remote_address, storage_uri=settings.rate_limit_storage_uri)
@@ -0,0 +1,263 @@
+"""In-process cache for admin report results.
+
+Entries are keyed by (report, params) and remember the date range and the
+tables they were computed from. Writes to those tables invalidate only the
+entries whose range covers the day of the written row, so closed periods stay
+cached indefinitely while anything touching today is recomputed after each
+check-in, payment or guest visit. Entries only meaningful for one calendar
+day (valid_on, e.g. the dashboard) are dropped once that day is over.
+
+Invalidation is collected on flush and applied after commit, so a rolled-back
+write never evicts anything and a concurrent report can't cache rows that were
+not yet visible to it.
+
+Each process has its own cache. On PostgreSQL the invalidations are also sent
+to the other processes (app.services.process_events) in the writing
+transaction, so a check-in handled by one web worker, or a charge recorded by
+the background worker, evicts the affected entries everywhere.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+from app.models.checkin import Checkin
+from app.models.guest_visit import GuestVisit
+from app.models.membership import Membership
+from app.models.plan import Plan
+from app.models.transaction import Transaction
+from app.services.process_events import REPORT_CACHE_INVALIDATE, publish, subscribe
+
+# Model -> (source name, timestamp column used to bucket the row by day).
+# A column of None means any write invalidates every entry for that source.
+TRACKED_MODELS: dict[type, tuple[str, str | None]] = {
+    Transaction: ("transactions", "created_at"),
+    Checkin: ("checkins", "checked_in_at"),
+    GuestVisit: ("guest_visits", "created_at"),
+    Membership: ("memberships", None),
+    # Reports show plan names
+    Plan: ("plans", None),
+}
+
+_PENDING_KEY = "report_cache_pending"
+# Pending source that clears the whole cache (see invalidate_all)
+ALL_SOURCES = "*"
+# NOTIFY payloads must stay under 8000 bytes; larger sets are sent as whole-table invalidations
+MAX_NOTIFY_PAYLOAD = 7000
+
+
+class ReportCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # key -> (value, start_date, end_date, sources, valid_on)
+        self._entries: dict[tuple, tuple[Any, date | None, date | None, frozenset[str], date | None]] = {}
+        self._generation = 0
+        self._expired_before: date | None = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_compute(
+        self,
+        report: str,
+        params: tuple,
+        start_date: date | None,
+        end_date: date | None,
+        sources: tuple[str, ...],
+        compute: Callable[[], Any],
+        valid_on: date | None = None,
+    ) -> Any:
+        """Return the cached result for (report, params), computing it on a miss.
+
+        start_date/end_date bound the days the result depends on (None = unbounded).
+        An entry with valid_on is evicted once that day has passed.
+        """
+        key = (report, params)
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Skip storing if an invalidation landed while we were computing —
+            # the result may predate that write.
+            if self._generation == generation:
+                self._entries[key] = (value, start_date, end_date, frozenset(sources), valid_on)
+        return value
+
+    def _evict_expired(self) -> None:
+        """Drop entries valid only on a past day (at most one scan per day; hold the lock)."""
+        today = date.today()
+        if self._expired_before == today:
+            return
+        self._expired_before = today
+        for key in [key for key, entry in self._entries.items() if entry[4] is not None and entry[4] < today]:
+            del self._entries[key]
+
+    def invalidate(self, source: str, day: date | None = None) -> int:
+        """Drop entries built from `source` whose range covers `day` (all of them if day is None)."""
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key
+                for key, (_, start, end, sources, _) in self._entries.items()
+                if source in sources
+                and (
+                    day is None
+                    or ((start is None or start <= day) and (end is None or day <= end))
+                )
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        if stale:
+            logger.debug("Report cache invalidated: source=%s, day=%s, entries=%d", source, day, len(stale))
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+report_cache = ReportCache()
+
+
+def _touched_days(obj, column: str) -> set[date]:
+    """Current and previous (if changed) day buckets of obj's timestamp column."""
+    history = inspect(obj).attrs[column].history
+    days = set()
+    for value in (*history.added, *history.unchanged, *history.deleted):
+        if isinstance(value, datetime):
+            days.add(value.date())
+        elif isinstance(value, date):
+            days.add(value)
+    if not days:
+        # Column default not applied yet — rows without a timestamp get "now"
+        days.add(datetime.utcnow().date())
+    return days
+
+
+def _encode(writes: set[tuple[str, date | None]]) -> str:
+    payload = ",".join(f"{source}|{day.isoformat() if day else ''}" for source, day in sorted(writes, key=str))
+    if len(payload) > MAX_NOTIFY_PAYLOAD:
+        payload = ",".join(f"{source}|" for source in sorted({source for source, _ in writes}))
+    return payload
+
+
+def _decode(payload: str) -> set[tuple[str, date | None]]:
+    writes = set()
+    for item in payload.split(","):
+        source, _, day = item.partition("|")
+        writes.add((source, date.fromisoformat(day) if day else None))
+    return writes
+
+
+def _publish_writes(session: Session, writes: set[tuple[str, date | None]]) -> None:
+    """Queue the invalidations for the other processes; sent only if the transaction commits."""
+    if writes:
+        publish(session.connection(), REPORT_CACHE_INVALIDATE, _encode(writes))
+
+
+def invalidate_all(session: Session) -> None:
+    """Clear the cache in every process once session's transaction commits.
+
+    For writes that bypass the tracked models, such as a restore's Core
+    deletes and inserts.
+    """
+    session.info.setdefault(_PENDING_KEY, set()).add((ALL_SOURCES, None))
+    _publish_writes(session, {(ALL_SOURCES, None)})
+
+
+def _apply(source: str, day: date | None) -> None:
+    if source == ALL_SOURCES:
+        report_cache.clear()
+    else:
+        report_cache.invalidate(source, day)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writes(session: Session, flush_context) -> None:
+    pending: set[tuple[str, date | None]] = session.info.setdefault(_PENDING_KEY, set())
+    writes = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked is None:
+            continue
+        source, column = tracked
+        if column is None:
+            writes.add((source, None))
+        else:
+            writes.update((source, day) for day in _touched_days(obj, column))
+    # Not deduplicated against pending: a NOTIFY inside a rolled-back savepoint is dropped
+    _publish_writes(session, writes)
+    pending.update(writes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state) -> None:
+    # query(...).delete()/update() bypass the unit of work, so we can't know
+    # which days they touched — drop every entry for the table.
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    mapper = orm_execute_state.bind_mapper
+    tracked = TRACKED_MODELS.get(mapper.class_) if mapper is not None else None
+    if tracked is not None:
+        orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).add((tracked[0], None))
+        _publish_writes(orm_execute_state.session, {(tracked[0], None)})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for source, day in pending:
+        _apply(source, day)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _on_remote_invalidation(payload: str | None) -> None:
+    if payload is None:
+        # The listener (re)connected and may have missed invalidations
+        report_cache.clear()
+        return
+    for source, day in _decode(payload):
+        _apply(source, day)
+
+
+subscribe(REPORT_CACHE_INVALIDATE, _on_remote_invalidation)
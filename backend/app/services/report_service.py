@@ -9,16 +9,27 @@ logger = logging.getLogger(__name__)
 
 from app.models.checkin import Checkin
 from app.models.guest_visit import GuestVisit
+from app.models.member import Member
 from app.models.membership import Membership
-from app.models.plan import PlanType
+from app.models.plan import Plan, PlanType
 from app.models.transaction import PaymentMethod, Transaction, TransactionType
+from app.services.report_cache import report_cache
 
 
 def get_dashboard_stats(db: Session) -> dict:
     # Use UTC for consistency with database timestamps
-    utc_now = datetime.utcnow()
-    today_start = datetime.combine(utc_now.date(), datetime.min.time())
-    today_end = datetime.combine(utc_now.date(), datetime.max.time())
+    today = datetime.utcnow().date()
+    return report_cache.get_or_compute(
+        "dashboard", (today,), today, today,
+        ("checkins", "transactions", "guest_visits", "memberships"),
+        lambda: _compute_dashboard_stats(db, today),
+        valid_on=today,
+    )
+
+
+def _compute_dashboard_stats(db: Session, today: date) -> dict:
+    today_start = datetime.combine(today, datetime.min.time())
+    today_end = datetime.combine(today, datetime.max.time())
 
     total_checkins = db.query(func.count(Checkin.id)).filter(
         Checkin.checked_in_at.between(today_start, today_end)
@@ -52,6 +63,16 @@ def get_dashboard_stats(db: Session) -> dict:
 
 def get_revenue_report(
     db: Session, start_date: date, end_date: date, group_by: str = "day"
+) -> tuple[list[dict], Decimal]:
+    return report_cache.get_or_compute(
+        "revenue", (start_date, end_date, group_by), start_date, end_date,
+        ("transactions",),
+        lambda: _compute_revenue_report(db, start_date, end_date, group_by),
+    )
+
+
+def _compute_revenue_report(
+    db: Session, start_date: date, end_date: date, group_by: str
 ) -> tuple[list[dict], Decimal]:
     start = datetime.combine(start_date, datetime.min.time())
     end = datetime.combine(end_date, datetime.max.time())
@@ -97,6 +118,14 @@ def get_revenue_report(
 
 
 def get_swim_report(db: Session, start_date: date, end_date: date) -> dict:
+    return report_cache.get_or_compute(
+        "swims", (start_date, end_date), start_date, end_date,
+        ("checkins",),
+        lambda: _compute_swim_report(db, start_date, end_date),
+    )
+
+
+def _compute_swim_report(db: Session, start_date: date, end_date: date) -> dict:
     start = datetime.combine(start_date, datetime.min.time())
     end = datetime.combine(end_date, datetime.max.time())
 
@@ -120,20 +149,95 @@ def get_swim_report(db: Session, start_date: date, end_date: date) -> dict:
 
 
 def get_membership_report(db: Session) -> dict:
-    active = db.query(Membership).filter(Membership.is_active.is_(True)).all()
+    # Keyed on today's date since "expiring soon" moves with the calendar
+    today = date.today()
+    return report_cache.get_or_compute(
+        "memberships", (today,), None, None,
+        ("memberships", "plans"),
+        lambda: _compute_membership_report(db, today),
+        valid_on=today,
+    )
 
-    by_plan: dict[str, int] = {}
-    expiring_soon = 0
-    threshold = date.today() + timedelta(days=7)
 
-    for m in active:
-        plan_name = m.plan.name if m.plan else "Unknown"
-        by_plan[plan_name] = by_plan.get(plan_name, 0) + 1
-        if m.valid_until and m.valid_until <= threshold:
-            expiring_soon += 1
+def _compute_membership_report(db: Session, today: date) -> dict:
+    threshold = today + timedelta(days=7)
+
+    # Count per plan in the database instead of loading every active Membership
+    # (and its selectin-loaded plan) into Python.
+    rows = (
+        db.query(Plan.name, func.count(Membership.id))
+        .select_from(Membership)
+        .outerjoin(Plan, Membership.plan_id == Plan.id)
+        .filter(Membership.is_active.is_(True))
+        .group_by(Plan.name)
+        .all()
+    )
+
+    by_plan: dict[str, int] = {}
+    total_active = 0
+    for plan_name, count in rows:
+        key = plan_name or "Unknown"
+        by_plan[key] = by_plan.get(key, 0) + count
+        total_active += count
+
+    # Range predicate on (is_active, valid_until) — served by ix_memberships_active_valid_until
+    expiring_soon = db.query(func.count(Membership.id)).filter(
+        Membership.is_active.is_(True),
+        Membership.valid_until.isnot(None),
+        Membership.valid_until <= threshold,
+    ).scalar() or 0
 
     return {
-        "total_active": len(active),
+        "total_active": total_active,
         "by_plan": by_plan,
         "expiring_soon": expiring_soon,
     }
+
+
+def get_expiring_memberships(
+    db: Session, days: int = 7, page: int = 1, per_page: int = 25
+) -> tuple[list[dict], int]:
+    """Active memberships whose valid_until falls on or before today + days, soonest first."""
+    threshold = date.today() + timedelta(days=days)
+    filters = (
+        Membership.is_active.is_(True),
+        Membership.valid_until.isnot(None),
+        Membership.valid_until <= threshold,
+    )
+
+    total = db.query(func.count(Membership.id)).filter(*filters).scalar() or 0
+
+    rows = (
+        db.query(
+            Membership.id,
+            Membership.member_id,
+            Member.first_name,
+            Member.last_name,
+            Plan.name,
+            Membership.plan_type,
+            Membership.valid_until,
+        )
+        .select_from(Membership)
+        .join(Member, Membership.member_id == Member.id)
+        .outerjoin(Plan, Membership.plan_id == Plan.id)
+        .filter(*filters)
+        .order_by(Membership.valid_until, Membership.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+
+    today = date.today()
+    items = [
+        {
+            "membership_id": row[0],
+            "member_id": row[1],
+            "member_name": f"{row[2]} {row[3]}",
+            "plan_name": row[4],
+            "plan_type": row[5],
+            "valid_until": row[6],
+            "days_remaining": (row[6] - today).days,
+        }
+        for row in rows
+    ]
+    return items, total
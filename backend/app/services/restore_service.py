@@ -0,0 +1,298 @@
+"""
+Restore backups written by backup_service.
+
+Rows are decoded generically from each table's column types, so every backed-up
+table round-trips without a per-model field list, and are loaded with batched
+executemany inserts of RESTORE_BATCH_SIZE rows. A full backup replaces the
+contents of every table it contains; an incremental backup is applied on top
+as an upsert by primary key.
+
+COPY-format archives (see pgcopy_backup) are detected and loaded with COPY.
+
+Backups in the current format list their rows in dependency order and stream
+straight through. Legacy (1.x) JSON exports don't, so their rows are first
+spooled per table and then loaded parents-first.
+"""
+import json
+import logging
+import tempfile
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+from time import monotonic
+
+from typing import BinaryIO
+
+from sqlalchemy import Date, DateTime, Enum, Float, Numeric, Table, Time, Uuid, delete, insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+from app.services.backup_service import BACKUP_TABLES, decompressed_stream, open_backup
+from app.services.report_cache import invalidate_all
+
+RESTORE_BATCH_SIZE = 1000
+PROGRESS_LOG_ROWS = 50_000
+# Legacy per-table spools stay in memory up to this size, then move to disk
+SPOOL_BYTES = 4 * 1024 * 1024
+MAX_VALIDATION_ERRORS = 20
+
+_TABLES: dict[str, Table] = {name: model.__table__ for name, model in BACKUP_TABLES}
+_TABLE_ORDER = [name for name, _ in BACKUP_TABLES]
+
+# progress(table, rows restored in that table, rows restored in total)
+RestoreProgress = Callable[[str, int, int], None]
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    return parsed
+
+
+def _deserialize_value(column, value):
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return _parse_datetime(value) if isinstance(value, str) else value
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+    if isinstance(column_type, Time):
+        return time.fromisoformat(value) if isinstance(value, str) else value
+    if isinstance(column_type, Uuid):
+        return uuid.UUID(value) if isinstance(value, str) else value
+    if isinstance(column_type, Enum):
+        return column_type.enum_class(value) if column_type.enum_class is not None else value
+    if isinstance(column_type, Float):
+        return float(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(str(value))
+    return value
+
+
+def deserialize_row(table: Table, row: dict) -> dict:
+    """Convert a serialized backup row back into column values; unknown keys are dropped."""
+    return {
+        column.name: _deserialize_value(column, row[column.name])
+        for column in table.columns
+        if column.name in row
+    }
+
+
+def _required_columns(table: Table) -> list[str]:
+    return [
+        c.name for c in table.columns
+        if not c.nullable and c.default is None and c.server_default is None
+    ]
+
+
+def _is_ordered(header: dict) -> bool:
+    return str(header.get("export_version", "")).startswith("2.")
+
+
+def _spool_by_table(records: Iterable[tuple[str, dict]]) -> tuple[list[str], Iterator[tuple[str, dict]]]:
+    """Buffer records per table; return (tables present, records in dependency order)."""
+    spools: dict[str, tempfile.SpooledTemporaryFile] = {}
+    for table_name, row in records:
+        spool = spools.get(table_name)
+        if spool is None:
+            spool = spools[table_name] = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, mode="w+")
+        spool.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+    ordered = sorted(spools, key=lambda n: _TABLE_ORDER.index(n) if n in _TABLES else len(_TABLE_ORDER))
+
+    def replay() -> Iterator[tuple[str, dict]]:
+        try:
+            for table_name in ordered:
+                spool = spools[table_name]
+                spool.seek(0)
+                for line in spool:
+                    yield table_name, json.loads(line)
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+    return ordered, replay()
+
+
+def _batches(records: Iterable[tuple[str, dict]]) -> Iterator[tuple[str, list[dict]]]:
+    """Group consecutive records of one table into lists of up to RESTORE_BATCH_SIZE rows."""
+    current_table = None
+    batch: list[dict] = []
+    for table_name, row in records:
+        if table_name != current_table or len(batch) >= RESTORE_BATCH_SIZE:
+            if batch:
+                yield current_table, batch
+            current_table, batch = table_name, []
+        batch.append(row)
+    if batch:
+        yield current_table, batch
+
+
+def _upsert(db: Session, table: Table, rows: list[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(f"Incremental restore is not supported on {dialect}")
+
+    stmt = dialect_insert(table)
+    key_columns = [c.name for c in table.primary_key.columns]
+    update_columns = {c.name: stmt.excluded[c.name] for c in table.columns if c.name not in key_columns}
+    db.execute(stmt.on_conflict_do_update(index_elements=key_columns, set_=update_columns), rows)
+
+
+def restore_backup(db: Session, header: dict, records: Iterable[tuple[str, dict]],
+                   batch_commit: bool = False, progress: RestoreProgress | None = None) -> dict[str, int]:
+    """Apply one opened backup (see backup_service.open_backup) to the database.
+
+    Full backups first clear every table the backup contains, children first.
+    With batch_commit, the clear and every batch are committed as they go, so
+    a large restore holds no long transaction (but a failure leaves it partly
+    applied); otherwise nothing is committed here.
+
+    Returns rows restored per table.
+    """
+    kind = header.get("kind", "full")
+    if _is_ordered(header) and header.get("tables"):
+        tables = list(header["tables"])
+    else:
+        tables, records = _spool_by_table(records)
+
+    if kind == "full":
+        for name in reversed(_TABLE_ORDER):
+            if name in tables:
+                db.execute(delete(_TABLES[name]))
+        if batch_commit:
+            db.commit()
+
+    started = monotonic()
+    row_counts: dict[str, int] = {}
+    total = 0
+    next_log = PROGRESS_LOG_ROWS
+    for table_name, rows in _batches(records):
+        table = _TABLES.get(table_name)
+        if table is None:
+            logger.warning("Skipping unknown table in backup: %s", table_name)
+            continue
+        values = [deserialize_row(table, row) for row in rows]
+        if kind == "full":
+            db.execute(insert(table), values)
+        else:
+            _upsert(db, table, values)
+        if batch_commit:
+            db.commit()
+
+        row_counts[table_name] = row_counts.get(table_name, 0) + len(values)
+        total += len(values)
+        if progress is not None:
+            progress(table_name, row_counts[table_name], total)
+        if total >= next_log:
+            logger.info("Restore progress: %d rows (%s)", total, table_name)
+            next_log += PROGRESS_LOG_ROWS
+
+    logger.info("Applied %s backup: %d rows in %.1fs", kind, total, monotonic() - started)
+    return row_counts
+
+
+def _check_footer(footer: dict | None, row_counts: dict[str, int], add_error: Callable[[str], None]) -> None:
+    """Compare the rows read against the footer's counts; a missing footer means a truncated file."""
+    if footer is None:
+        add_error("Backup is truncated: footer missing")
+        return
+    for table_name, expected in footer.get("row_counts", {}).items():
+        if row_counts.get(table_name, 0) != expected:
+            add_error(f"{table_name}: {row_counts.get(table_name, 0)} rows, footer says {expected}")
+
+
+def validate_backup(header: dict, records: Iterable[tuple[str, dict]]) -> dict:
+    """Dry run: decode every row and check required columns without touching the database.
+
+    Returns {"valid", "kind", "row_counts", "errors", "warnings"} with at most
+    MAX_VALIDATION_ERRORS error messages.
+    """
+    row_counts: dict[str, int] = {}
+    errors: list[str] = []
+    warnings: list[str] = []
+    required = {name: _required_columns(table) for name, table in _TABLES.items()}
+
+    def add_error(message: str) -> None:
+        if len(errors) < MAX_VALIDATION_ERRORS:
+            errors.append(message)
+
+    try:
+        for table_name, row in records:
+            index = row_counts.get(table_name, 0)
+            row_counts[table_name] = index + 1
+            table = _TABLES.get(table_name)
+            if table is None:
+                if index == 0:
+                    warnings.append(f"Unknown table will be skipped: {table_name}")
+                continue
+            try:
+                values = deserialize_row(table, row)
+            except (TypeError, ValueError, KeyError) as e:
+                add_error(f"{table_name} row {index + 1}: {e}")
+                continue
+            missing = [c for c in required[table_name] if values.get(c) is None]
+            if missing:
+                add_error(f"{table_name} row {index + 1}: missing {', '.join(missing)}")
+    except (ValueError, OSError, EOFError) as e:
+        add_error(f"Unreadable backup data after {sum(row_counts.values())} rows: {e}")
+    else:
+        if _is_ordered(header):
+            _check_footer(header.get("footer"), row_counts, add_error)
+
+    return {
+        "valid": not errors,
+        "kind": header.get("kind", "full"),
+        "row_counts": row_counts,
+        "errors": errors,
+        "warnings": warnings,
+    }
+
+
+def restore_file(db: Session, fileobj: BinaryIO, batch_commit: bool = False,
+                 progress: RestoreProgress | None = None) -> dict[str, int]:
+    """Restore any backup file: NDJSON (gzip or plain), legacy JSON or a COPY archive.
+
+    The restore bypasses the ORM, so the report cache is cleared explicitly
+    (in every process) when it commits. With batch_commit that also happens
+    after a failure, since earlier batches are already committed.
+    """
+    from app.services.pgcopy_backup import is_copy_archive, restore_copy_archive
+
+    stream = decompressed_stream(fileobj)
+    try:
+        if is_copy_archive(stream):
+            row_counts = restore_copy_archive(db, stream, batch_commit, progress)
+        else:
+            header, records = open_backup(stream)
+            row_counts = restore_backup(db, header, records, batch_commit, progress)
+    except Exception:
+        if batch_commit:
+            db.rollback()
+            invalidate_all(db)
+            db.commit()
+        raise
+    invalidate_all(db)
+    if batch_commit:
+        db.commit()
+    return row_counts
+
+
+def validate_file(fileobj: BinaryIO) -> dict:
+    """Dry run of restore_file: see validate_backup."""
+    from app.services.pgcopy_backup import is_copy_archive, validate_copy_archive
+
+    stream = decompressed_stream(fileobj)
+    if is_copy_archive(stream):
+        return validate_copy_archive(stream)
+    header, records = open_backup(stream)
+    return validate_backup(header, records)
@@ -0,0 +1,116 @@
+"""
+Compiled row serializers for backups and exports.
+
+row_serializer(table) looks at each column's type once and returns a function
+turning a row (a RowMapping or any mapping) into a JSON-ready dict: dates and
+times become ISO strings, UUIDs and Decimals strings, enums their values;
+everything else passes through untouched. Nothing is probed per cell, which
+matters on million-row exports. Output matches the old reflective
+serialize_model, so existing backups and consumers are unaffected.
+
+dumps() encodes with orjson when it is installed, falling back to the
+standard json module.
+"""
+import csv
+import io
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime, time
+
+from sqlalchemy import Date, DateTime, Enum, Float, Numeric, Table, Time, Uuid
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+    import json
+
+RowSerializer = Callable[[Mapping], dict]
+
+CSV_BATCH_ROWS = 1000
+
+_serializers: dict[tuple, RowSerializer] = {}
+
+
+def _isoformat(value: date | datetime | time) -> str:
+    return value.isoformat()
+
+
+def _enum_value(value):
+    return value.value
+
+
+def column_codec(column) -> Callable | None:
+    """The conversion a column's values need to become JSON, or None if they already are."""
+    column_type = column.type
+    if isinstance(column_type, (DateTime, Date, Time)):
+        return _isoformat
+    if isinstance(column_type, Uuid):
+        return str
+    if isinstance(column_type, Enum):
+        return _enum_value if column_type.enum_class is not None else None
+    if isinstance(column_type, Float):
+        return None
+    if isinstance(column_type, Numeric):
+        return str if column_type.asdecimal else None
+    return None
+
+
+def row_serializer(table: Table, columns: Sequence[str] | None = None) -> RowSerializer:
+    """Serializer for rows of `table` (all columns, or just `columns`, in that order); cached."""
+    key = (table, tuple(columns) if columns is not None else None)
+    serializer = _serializers.get(key)
+    if serializer is not None:
+        return serializer
+
+    names = list(columns) if columns is not None else [c.name for c in table.columns]
+    codecs = tuple((name, column_codec(table.c[name])) for name in names)
+
+    def serialize(row: Mapping) -> dict:
+        result = {}
+        for name, codec in codecs:
+            value = row[name]
+            result[name] = value if codec is None or value is None else codec(value)
+        return result
+
+    _serializers[key] = serialize
+    return serialize
+
+
+class _ModelRow:
+    """Mapping view of a model instance's column attributes."""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __getitem__(self, name: str):
+        return getattr(self.obj, name)
+
+
+def serialize_model(obj) -> dict:
+    """Convert a SQLAlchemy model instance to a JSON-ready dict of its columns."""
+    return row_serializer(obj.__table__)(_ModelRow(obj))
+
+
+if orjson is not None:
+    def dumps(value) -> bytes:
+        """Compact JSON encoding of already-serialized values, as UTF-8 bytes."""
+        return orjson.dumps(value)
+else:
+    def dumps(value) -> bytes:
+        """Compact JSON encoding of already-serialized values, as UTF-8 bytes."""
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    """CSV text for a StreamingResponse, CSV_BATCH_ROWS rows per chunk."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % CSV_BATCH_ROWS == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
@@ -23,6 +23,9 @@ DEFAULT_SETTINGS = {
     "pin_max_attempts": "3",
     "pin_length": "4",
     "auto_charge_enabled": "true",
+    # Failed auto-charges: retry days after the first attempt, and total attempts allowed
+    "auto_charge_retry_days": "1,3,7",
+    "auto_charge_max_attempts": "4",
     "guest_visit_enabled": "true",
     "senior_age_threshold": "65",
     "split_payment_enabled": "true",
@@ -97,6 +100,8 @@ DEFAULT_SETTINGS = {
     "backup_schedule": "daily",
     "backup_hour": "2",
     "backup_retention_count": "7",
+    "backup_incremental_enabled": "false",
+    "backup_format": "ndjson",  # ndjson | pgcopy (PostgreSQL COPY, full backups only)
     "backup_remote_type": "local",
     "backup_local_path": "/backups",
     # S3 backup settings
@@ -117,6 +122,12 @@ DEFAULT_SETTINGS = {
     "backup_last_run": "",
     "backup_last_status": "",
     "backup_last_location": "",
+    # Current full + incremental chain (maintained by backup_service)
+    "backup_chain_base": "",
+    "backup_chain_last": "",
+    "backup_chain_watermark": "",
+    "backup_chain_started": "",
+    "backup_chain_storage": "",
 }
 
 
@@ -167,17 +178,24 @@ def set_setting(db: Session, key: str, value: str) -> None:
     db.commit()
 
 
+def get_settings(db: Session, keys: list[str]) -> dict[str, str]:
+    """Several settings in one query, with DEFAULT_SETTINGS (or "") for missing keys."""
+    stored = dict(db.query(Setting.key, Setting.value).filter(Setting.key.in_(keys)).all())
+    return {key: stored[key] if key in stored else DEFAULT_SETTINGS.get(key, "") for key in keys}
+
+
+PROCESSOR_CONFIG_KEYS = {
+    "stripe": ["stripe_api_key", "stripe_secret_key", "stripe_webhook_secret"],
+    "square": ["square_access_token", "square_location_id", "square_environment"],
+    "sola": ["sola_api_key", "sola_api_secret", "sola_merchant_id", "sola_environment"],
+    "hitech": ["hitech_merchant_id", "hitech_user_id", "hitech_pin", "hitech_environment"],
+    "usaepay": ["usaepay_api_key", "usaepay_api_pin", "usaepay_device_key", "usaepay_environment"],
+}
+
+
 def get_processor_config(db: Session, processor: str) -> dict[str, str]:
     """Get processor-specific config dict from DB settings."""
-    prefix_map = {
-        "stripe": ["stripe_api_key", "stripe_secret_key", "stripe_webhook_secret"],
-        "square": ["square_access_token", "square_location_id", "square_environment"],
-        "sola": ["sola_api_key", "sola_api_secret", "sola_merchant_id", "sola_environment"],
-        "hitech": ["hitech_merchant_id", "hitech_user_id", "hitech_pin", "hitech_environment"],
-        "usaepay": ["usaepay_api_key", "usaepay_api_pin", "usaepay_device_key", "usaepay_environment"],
-    }
-    keys = prefix_map.get(processor, [])
-    return {k: get_setting(db, k, "") for k in keys}
+    return get_settings(db, PROCESSOR_CONFIG_KEYS.get(processor, []))
 
 
 def update_settings(db: Session, updates: dict[str, str]) -> dict[str, str]:
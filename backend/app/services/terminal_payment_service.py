@@ -0,0 +1,210 @@
+"""
+Terminal payment sessions.
+
+A card payment started on the physical terminal is recorded in
+terminal_payment_sessions until the gateway reports the outcome. Any worker
+process can then finalize it, and a restart loses nothing. Finalizing claims
+the row with a conditional UPDATE in the same transaction that creates the
+membership and transaction, so concurrent status polls (or a retry after an
+error) create them at most once.
+
+The terminal watcher (app.services.terminal_watcher) polls the gateway for
+each pending session and finalizes it; kiosks only read the session row.
+Sessions that never hear back are expired by the sweeper. An expired session
+can still be finalized if the gateway later reports the payment approved —
+the customer was charged, so they get their membership.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.member import Member
+from app.models.plan import Plan
+from app.models.terminal_payment_session import TerminalPaymentSession
+from app.models.transaction import PaymentMethod, Transaction, TransactionType
+from app.services.membership_service import create_membership
+
+logger = logging.getLogger(__name__)
+
+# The terminal gives up on the customer after 120s; allow generous slack for slow gateways
+SESSION_TTL_SECONDS = 900
+# Nobody taps a card faster than this, so the watcher's first gateway poll waits for it
+FIRST_POLL_DELAY_SECONDS = 2.0
+# Finished sessions are kept this long for troubleshooting, then purged by the sweeper
+FINISHED_RETENTION_DAYS = 30
+
+FINALIZABLE_STATES = ("pending", "expired")
+FINISHED_STATES = ("completed", "declined", "cancelled", "failed")
+
+
+def create_session(
+    db: Session,
+    request_key: str,
+    member_id: uuid.UUID,
+    plan_id: uuid.UUID,
+    amount: Decimal,
+    credit_used: Decimal,
+    save_card: bool,
+) -> TerminalPaymentSession:
+    now = datetime.utcnow()
+    session = TerminalPaymentSession(
+        request_key=request_key,
+        member_id=member_id,
+        plan_id=plan_id,
+        amount=amount,
+        credit_used=credit_used,
+        save_card=save_card,
+        expires_at=now + timedelta(seconds=SESSION_TTL_SECONDS),
+        next_poll_at=now + timedelta(seconds=FIRST_POLL_DELAY_SECONDS),
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+def get_session(db: Session, request_key: str) -> TerminalPaymentSession | None:
+    return db.query(TerminalPaymentSession).filter(TerminalPaymentSession.request_key == request_key).first()
+
+
+def _transition(db: Session, request_key: str, from_states: tuple[str, ...], **values) -> bool:
+    """Move a session to a new state only if it is still in one of from_states. Not committed."""
+    now = datetime.utcnow()
+    return bool(db.execute(
+        update(TerminalPaymentSession)
+        .where(TerminalPaymentSession.request_key == request_key, TerminalPaymentSession.state.in_(from_states))
+        .values(updated_at=now, **values)
+    ).rowcount)
+
+
+def finalize_session(db: Session, request_key: str, result) -> TerminalPaymentSession | None:
+    """Create the membership and transactions for an approved terminal payment, exactly once.
+
+    `result` is the adapter's TerminalPaymentResult. Returns the session (with
+    transaction_id/membership_id set once completed), or None if the request
+    key is unknown. Raises if the records can't be created; the session then
+    stays claimable and a later poll retries.
+    """
+    session = get_session(db, request_key)
+    if session is None:
+        return None
+
+    now = datetime.utcnow()
+    claimed = _transition(
+        db, request_key, FINALIZABLE_STATES,
+        state="completed", completed_at=now,
+        gateway_transaction_key=result.transaction_key,
+        card_last4=result.card_last4, card_brand=result.card_brand,
+    )
+    if not claimed:
+        # Another poll (or process) finalized or closed it already
+        db.rollback()
+        db.refresh(session)
+        return session
+
+    try:
+        member = db.query(Member).filter(Member.id == session.member_id).first()
+        plan = db.query(Plan).filter(Plan.id == session.plan_id).first()
+        if not member or not plan:
+            db.rollback()
+            _transition(db, request_key, FINALIZABLE_STATES, state="failed", completed_at=now,
+                        gateway_transaction_key=result.transaction_key,
+                        error="Member or plan no longer exists")
+            db.commit()
+            logger.error("Terminal payment approved but member/plan missing: request_key=%s", request_key)
+            db.refresh(session)
+            return session
+
+        # Apply credit if used
+        if session.credit_used > 0:
+            member.credit_balance -= session.credit_used
+            credit_tx = Transaction(
+                member_id=session.member_id,
+                transaction_type=TransactionType.credit_use,
+                payment_method=PaymentMethod.credit,
+                amount=session.credit_used,
+                notes="Applied to terminal payment",
+            )
+            db.add(credit_tx)
+
+        # Not committed on its own: the claim, credit, membership and transaction commit together
+        membership = create_membership(db, session.member_id, session.plan_id, plan=plan, commit=False)
+
+        tx = Transaction(
+            member_id=session.member_id,
+            transaction_type=TransactionType.payment,
+            payment_method=PaymentMethod.card,
+            amount=session.amount,
+            plan_id=session.plan_id,
+            membership_id=membership.id,
+            reference_id=result.transaction_key,
+            notes=f"Terminal payment - {result.card_brand or 'Card'} ****{result.card_last4 or '????'}",
+        )
+        db.add(tx)
+        db.flush()
+        session.transaction_id = tx.id
+        session.membership_id = membership.id
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        "Terminal payment completed: member=%s, plan=%s, tx=%s",
+        session.member_id, plan.name, session.transaction_id
+    )
+    db.refresh(session)
+    return session
+
+
+def decline_session(db: Session, request_key: str, error: str | None) -> bool:
+    """Record that the gateway finished the payment without approving it."""
+    changed = _transition(db, request_key, FINALIZABLE_STATES, state="declined",
+                          completed_at=datetime.utcnow(), error=error)
+    db.commit()
+    return changed
+
+
+def cancel_session(db: Session, request_key: str) -> bool:
+    """Mark a still-pending session cancelled (after the terminal accepted the cancel)."""
+    changed = _transition(db, request_key, ("pending",), state="cancelled", completed_at=datetime.utcnow())
+    db.commit()
+    return changed
+
+
+def expire_stale_sessions(db: Session, now: datetime | None = None) -> int:
+    """Expire pending sessions past their TTL."""
+    now = now or datetime.utcnow()
+    count = db.execute(
+        update(TerminalPaymentSession)
+        .where(TerminalPaymentSession.state == "pending", TerminalPaymentSession.expires_at < now)
+        .values(state="expired", updated_at=now)
+    ).rowcount
+    db.commit()
+    if count:
+        logger.info("Expired %d abandoned terminal payment session(s)", count)
+    return count
+
+
+def purge_finished_sessions(db: Session, now: datetime | None = None) -> int:
+    """Delete finished and expired sessions older than FINISHED_RETENTION_DAYS."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=FINISHED_RETENTION_DAYS)
+    count = (
+        db.query(TerminalPaymentSession)
+        .filter(
+            TerminalPaymentSession.state.in_(FINISHED_STATES + ("expired",)),
+            TerminalPaymentSession.updated_at < cutoff,
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def sweep_sessions(db: Session) -> dict:
+    """Scheduled sweep: expire abandoned sessions and purge old ones."""
+    return {"expired": expire_stale_sessions(db), "purged": purge_finished_sessions(db)}
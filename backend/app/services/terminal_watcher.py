@@ -0,0 +1,290 @@
+"""
+Server-side watcher for terminal payments.
+
+Instead of every kiosk polling the gateway on a fixed interval, one watcher
+loop per process polls the gateway once per pending terminal payment session
+and finalizes (or declines) it itself. Each session has its own schedule
+(next_poll_at): the first check waits for the customer to reach the terminal,
+then checks back off from about a second to MAX_POLL_DELAY while the terminal
+is still waiting for a card, and slow to SLOW_POLL_DELAY once the terminal
+itself has timed out. Sessions the sweeper has expired are still polled every
+SLOW_POLL_DELAY for EXPIRED_POLL_SECONDS past their expiry, so a payment the
+gateway approves late is still finalized.
+
+A session is claimed by moving its next_poll_at forward with a conditional
+UPDATE, so with several processes running a watcher each session is still
+polled by only one of them at a time.
+
+Kiosks read the session row: GET /api/kiosk/terminal/status/{key}?wait=N
+long-polls and GET /api/kiosk/terminal/events/{key} streams server-sent
+events. Waiters in this process are woken as soon as the watcher records a
+change; changes made by another process are picked up by re-reading the row
+every RECHECK_SECONDS.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from anyio import to_thread
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.terminal_payment_session import TerminalPaymentSession
+from app.services.payment_service import get_payment_adapter
+from app.services.terminal_payment_service import (
+    FINALIZABLE_STATES,
+    decline_session,
+    finalize_session,
+    get_session,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-session polling schedule (seconds)
+FIRST_BACKOFF_DELAY = 1.0
+POLL_BACKOFF = 1.5
+MAX_POLL_DELAY = 5.0
+# The terminal stops waiting for a card after 120s; after that the payment is
+# almost certainly settled one way or the other, so check rarely until expiry
+TERMINAL_TIMEOUT_SECONDS = 120
+SLOW_POLL_DELAY = 30.0
+# Expired sessions are still checked (at SLOW_POLL_DELAY) for this long past expires_at
+EXPIRED_POLL_SECONDS = 24 * 3600
+
+# How often the loop looks for due sessions when nothing wakes it
+WATCH_TICK_SECONDS = 1.0
+# Sessions claimed per tick, and gateway checks in flight at once
+CLAIM_BATCH_SIZE = 50
+MAX_CONCURRENT_POLLS = 10
+
+# Longest a status request may be held open, and how often waiters re-read the row
+MAX_WAIT_SECONDS = 25.0
+RECHECK_SECONDS = 1.0
+
+_task: asyncio.Task | None = None
+_wake: asyncio.Event | None = None
+_changed: dict[str, asyncio.Event] = {}
+# Waiters per request key in this process; the key's event is dropped with the last one
+_waiting: dict[str, int] = {}
+
+
+def next_poll_delay(poll_count: int, age_seconds: float, state: str = "pending") -> float:
+    """Seconds until a session that has been polled poll_count times is checked again."""
+    if state != "pending" or age_seconds > TERMINAL_TIMEOUT_SECONDS:
+        return SLOW_POLL_DELAY
+    return min(FIRST_BACKOFF_DELAY * POLL_BACKOFF ** poll_count, MAX_POLL_DELAY)
+
+
+def claim_due_sessions(db: Session, now: datetime | None = None) -> list[str]:
+    """Claim finalizable sessions whose next poll is due; returns their request keys.
+
+    Pending sessions are claimed until they finish; expired ones only within
+    EXPIRED_POLL_SECONDS of expires_at. Claiming schedules the following poll,
+    so a session whose check fails or whose process dies is simply picked up
+    again when that comes due.
+    """
+    now = now or datetime.utcnow()
+    pollable = (
+        TerminalPaymentSession.state.in_(FINALIZABLE_STATES),
+        or_(
+            TerminalPaymentSession.state == "pending",
+            TerminalPaymentSession.expires_at >= now - timedelta(seconds=EXPIRED_POLL_SECONDS),
+        ),
+        TerminalPaymentSession.next_poll_at <= now,
+    )
+    due = (
+        db.query(TerminalPaymentSession.id, TerminalPaymentSession.request_key, TerminalPaymentSession.state,
+                 TerminalPaymentSession.poll_count, TerminalPaymentSession.created_at)
+        .filter(*pollable)
+        .order_by(TerminalPaymentSession.next_poll_at)
+        .limit(CLAIM_BATCH_SIZE)
+        .all()
+    )
+    claimed = []
+    for session_id, request_key, state, poll_count, created_at in due:
+        delay = next_poll_delay(poll_count, (now - created_at).total_seconds(), state)
+        won = db.execute(
+            update(TerminalPaymentSession)
+            .where(TerminalPaymentSession.id == session_id, *pollable)
+            .values(
+                poll_count=TerminalPaymentSession.poll_count + 1,
+                last_polled_at=now,
+                next_poll_at=now + timedelta(seconds=delay),
+            )
+        ).rowcount
+        if won:
+            claimed.append(request_key)
+    db.commit()
+    return claimed
+
+
+def apply_poll_result(db: Session, request_key: str, result) -> bool:
+    """Record a gateway status check for a session; returns True if the session changed."""
+    if result.complete and result.approved:
+        try:
+            session = finalize_session(db, request_key, result)
+        except Exception:
+            # Left pending; the next scheduled poll retries
+            logger.exception("Failed to finalize terminal payment: request_key=%s", request_key)
+            return False
+        return session is not None
+    if result.complete:
+        return decline_session(db, request_key, result.error)
+    if result.status == "error":
+        # Gateway unreachable or confused; keep the last known status and try again later
+        logger.warning("Terminal status check failed: request_key=%s, error=%s", request_key, result.error)
+        return False
+
+    changed = bool(db.execute(
+        update(TerminalPaymentSession)
+        .where(
+            TerminalPaymentSession.request_key == request_key,
+            TerminalPaymentSession.state.in_(FINALIZABLE_STATES),
+            (TerminalPaymentSession.gateway_status != result.status)
+            | TerminalPaymentSession.gateway_status.is_(None),
+        )
+        .values(gateway_status=result.status, updated_at=datetime.utcnow())
+    ).rowcount)
+    db.commit()
+    return changed
+
+
+def _claim(session_factory: Callable[[], Session], now: datetime | None):
+    db = session_factory()
+    try:
+        request_keys = claim_due_sessions(db, now)
+        adapter = get_payment_adapter(db) if request_keys else None
+        return request_keys, adapter
+    finally:
+        db.close()
+
+
+def _apply(session_factory: Callable[[], Session], request_key: str, result) -> bool:
+    db = session_factory()
+    try:
+        return apply_poll_result(db, request_key, result)
+    finally:
+        db.close()
+
+
+async def poll_due_sessions(
+    session_factory: Callable[[], Session] = SessionLocal, now: datetime | None = None
+) -> int:
+    """Check every due session with the gateway once. Returns how many were checked."""
+    request_keys, adapter = await to_thread.run_sync(_claim, session_factory, now)
+    if not request_keys:
+        return 0
+    if not hasattr(adapter, "check_terminal_payment_status_async"):
+        # Processor switched away from a terminal-capable one; the sweeper expires these
+        logger.warning("Payment processor cannot check %d pending terminal payment(s)", len(request_keys))
+        return 0
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+
+    async def poll(request_key: str) -> None:
+        try:
+            async with semaphore:
+                result = await adapter.check_terminal_payment_status_async(request_key)
+            if await to_thread.run_sync(_apply, session_factory, request_key, result):
+                notify_session_changed(request_key)
+        except Exception:
+            logger.exception("Terminal status poll failed: request_key=%s", request_key)
+
+    await asyncio.gather(*(poll(request_key) for request_key in request_keys))
+    return len(request_keys)
+
+
+def notify_session_changed(request_key: str) -> None:
+    """Wake this process's waiters on a session (call from the event loop)."""
+    event = _changed.pop(request_key, None)
+    if event is not None:
+        event.set()
+
+
+def wake_watcher() -> None:
+    """Ask the watcher to look for due sessions now (e.g. right after one is created)."""
+    if _wake is not None:
+        _wake.set()
+
+
+def _reread_session(db: Session, request_key: str) -> TerminalPaymentSession | None:
+    db.expire_all()
+    return get_session(db, request_key)
+
+
+async def wait_for_session_change(
+    db: Session, session: TerminalPaymentSession, timeout: float
+) -> TerminalPaymentSession:
+    """Wait up to `timeout` seconds for a pending session's state or gateway status to change.
+
+    Returns the freshly read session (unchanged if the wait timed out).
+    """
+    request_key = session.request_key
+    seen = (session.state, session.gateway_status)
+    deadline = time.monotonic() + timeout
+    _waiting[request_key] = _waiting.get(request_key, 0) + 1
+    try:
+        while session.state == "pending":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = _changed.setdefault(request_key, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, RECHECK_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+            session = await to_thread.run_sync(_reread_session, db, request_key)
+            if session is None or (session.state, session.gateway_status) != seen:
+                break
+    finally:
+        _waiting[request_key] -= 1
+        if not _waiting[request_key]:
+            # Last waiter gone (timed out or disconnected): don't keep its event forever
+            del _waiting[request_key]
+            _changed.pop(request_key, None)
+    if session is None or session.state != "pending":
+        # Finished (possibly by another process): release any other waiters here too
+        notify_session_changed(request_key)
+    return session
+
+
+async def _watch() -> None:
+    logger.info("Terminal payment watcher started")
+    while True:
+        try:
+            await poll_due_sessions()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Terminal payment watcher tick failed")
+        try:
+            await asyncio.wait_for(_wake.wait(), WATCH_TICK_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_terminal_watcher() -> None:
+    """Start the watcher loop on the running event loop (idempotent)."""
+    global _task, _wake
+    if _task is not None and not _task.done():
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_watch(), name="terminal-watcher")
+
+
+async def stop_terminal_watcher() -> None:
+    global _task, _wake
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+    _wake = None
+    logger.info("Terminal payment watcher stopped")
@@ -0,0 +1,48 @@
+"""
+Checks that the app can run as several web worker processes.
+
+Anything one process keeps in memory is invisible to the others, so
+multi-worker mode is refused while such state is still process-local.
+Pending terminal payments are database rows, and scheduled jobs run in one
+elected process. The checks below cover what is left, plus the background
+jobs, which belong in the worker process rather than in every web worker.
+"""
+import logging
+
+from app.config import settings
+from app.services.process_events import relay_available
+
+logger = logging.getLogger(__name__)
+
+
+def process_local_state() -> list[str]:
+    """Process-local state that would break with several workers, one description each."""
+    problems = []
+    if settings.rate_limit_storage_uri.startswith("memory://"):
+        problems.append(
+            "the rate limiter counts in memory, so each worker would allow the full limit; "
+            "set RATE_LIMIT_STORAGE_URI to a shared store (e.g. redis://redis:6379)"
+        )
+    if not relay_available():
+        problems.append(
+            "NFC scan broadcasts and report cache invalidations only reach other workers through "
+            "PostgreSQL LISTEN/NOTIFY; DATABASE_URL is not PostgreSQL"
+        )
+    if settings.web_background_jobs:
+        problems.append(
+            "every web worker would also run the scheduler, outbox dispatcher and backup job worker; "
+            "set WEB_BACKGROUND_JOBS=false and run them in the worker process (python -m app.worker)"
+        )
+    return problems
+
+
+def check_multi_worker(workers: int) -> None:
+    """Raise RuntimeError if `workers` > 1 while process-local state is in use."""
+    if workers <= 1:
+        return
+    problems = process_local_state()
+    if problems:
+        raise RuntimeError(
+            f"Refusing to start {workers} workers: " + "; ".join(problems) + ". Set WEB_WORKERS=1 or fix the above."
+        )
+    logger.info("Multi-worker checks passed for %d workers", workers)
@@ -0,0 +1,81 @@
+"""
+Background worker process: python -m app.worker
+
+Runs the scheduled jobs, the outbox dispatcher (webhooks and emails) and the
+backup job worker outside the web process, so the 06:00 auto-charge run and
+backups don't compete with kiosk requests for threads, database connections
+and the GIL. Set WEB_BACKGROUND_JOBS=false on the web service when a worker
+is deployed.
+
+The worker has its own connection pool (WORKER_DB_POOL_SIZE and
+WORKER_DB_MAX_OVERFLOW). Several workers may run: the scheduler's leader
+election lets only one of them run the jobs, and outbox messages and backup
+jobs are claimed row by row. Stops cleanly on SIGTERM or SIGINT.
+"""
+import logging
+import signal
+import threading
+
+from app.logging_config import configure_logging
+
+configure_logging("-worker")
+
+from app.config import settings
+from app.database import SessionLocal, engine, make_engine
+from app.payments.http import close_http_clients
+from app.scheduler import start_scheduler, stop_scheduler
+from app.services.auto_charge_service import reconcile_interrupted_runs
+from app.services.backup_jobs import start_job_worker, stop_job_worker
+from app.services.backup_storage import close_backup_storages
+from app.services.outbox import start_outbox_dispatcher, stop_outbox_dispatcher
+from app.services.payment_service import clear_payment_adapters
+from app.services.seed import seed_default_settings
+
+logger = logging.getLogger(__name__)
+
+_stop_event = threading.Event()
+
+
+def _request_stop(signum, frame) -> None:
+    logger.info("Worker received signal %d, stopping", signum)
+    _stop_event.set()
+
+
+def main() -> None:
+    # Every SessionLocal() in this process draws from the worker's own pool
+    worker_engine = make_engine(settings.worker_db_pool_size, settings.worker_db_max_overflow)
+    SessionLocal.configure(bind=worker_engine)
+    engine.dispose()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    db = SessionLocal()
+    try:
+        seed_default_settings(db)
+        try:
+            reconcile_interrupted_runs(db)
+        except Exception:
+            logger.exception("Auto-charge reconciliation failed")
+    finally:
+        db.close()
+
+    scheduler, election = start_scheduler(worker_engine)
+    start_job_worker()
+    start_outbox_dispatcher()
+    logger.info("Worker started (pool %d+%d)", settings.worker_db_pool_size, settings.worker_db_max_overflow)
+
+    _stop_event.wait()
+
+    stop_scheduler(scheduler, election)
+    stop_job_worker()
+    stop_outbox_dispatcher()
+    close_backup_storages()
+    clear_payment_adapters()
+    close_http_clients()
+    worker_engine.dispose()
+    logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the production server.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Runs WEB_WORKERS uvicorn worker processes. The app is imported once in the
+master before forking (preload), so workers start fast and share its memory;
+each worker still runs the app lifespan itself. Startup is refused with more
+than one worker while process-local state is in use (app.startup_checks).
+
+Graceful restarts: `kill -HUP <master pid>` starts new workers and stops the
+old ones once they finish their requests (long polls last up to 25s). With
+WEB_MAX_REQUESTS set, workers are also recycled one at a time after that many
+requests. Code changes need a container restart, since the app is preloaded.
+"""
+from app.config import settings
+from app.startup_checks import check_multi_worker
+
+bind = "0.0.0.0:8000"
+workers = settings.web_workers
+worker_class = "app.gunicorn_worker.AsyncioUvicornWorker"
+preload_app = True
+
+# Longer than the longest held request (terminal status long poll, 25s)
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+max_requests = settings.web_max_requests
+max_requests_jitter = max(settings.web_max_requests // 10, 0)
+
+accesslog = None
+errorlog = "-"
+
+
+def on_starting(server):
+    check_multi_worker(server.cfg.workers)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master before the fork must not be shared
+    from app.database import engine
+    engine.dispose(close=False)
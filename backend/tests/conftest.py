@@ -19,6 +19,7 @@ from app.models.member import Member
 from app.models.plan import Plan, PlanType
 from app.models.user import User, UserRole
 from app.services.auth_service import create_access_token, hash_password, hash_pin
+from app.services.report_cache import report_cache
 
 
 # ---------------------------------------------------------------------------
@@ -41,6 +42,8 @@ def db():
         cursor.close()
 
     Base.metadata.create_all(bind=engine)
+    report_cache.clear()
+    report_cache.reset_stats()
     TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
     session = TestingSession()
     try:
@@ -0,0 +1,718 @@
+"""Tests for backup writing, listing and reading."""
+
+import gzip
+import io
+import json
+import tarfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.activity_log import ActivityLog
+from app.models.auto_charge_run import AutoChargeRun
+from app.models.backup_job import BackupJob
+from app.models.charge_attempt import ChargeAttempt, ChargeAttemptEvent
+from app.models.checkin import Checkin, CheckinType
+from app.models.member import Member
+from app.models.outbox_message import OutboxMessage
+from app.models.saved_card import SavedCard
+from app.models.setting import Setting
+from app.models.transaction import PaymentMethod, Transaction, TransactionType
+from app.services.backup_service import (
+    BACKUP_TABLES,
+    choose_backup_kind,
+    cleanup_old_backups,
+    decompressed_stream,
+    open_backup,
+    restore_from_storage,
+    run_backup,
+    select_expired_backups,
+    verify_backup,
+    write_backup_stream,
+)
+from app.services import backup_jobs, backup_storage
+from app.services.backup_jobs import (
+    JOB_STALE_SECONDS,
+    enqueue_backup_job,
+    process_next_job,
+    recover_interrupted_jobs,
+    request_cancel,
+)
+from app.services.backup_storage import (
+    LocalBackupStorage,
+    PartWriter,
+    S3BackupStorage,
+    get_backup_storage,
+    manifest_name,
+)
+from app.services.pgcopy_backup import is_copy_archive
+from app.services.row_serializers import dumps, row_serializer, serialize_model
+from app.services.report_service import get_swim_report
+from app.services.restore_service import restore_backup, restore_file, validate_file
+
+
+def _use_local_storage(db: Session, path) -> None:
+    db.add(Setting(key="backup_local_path", value=str(path)))
+    db.commit()
+
+
+class TestBackupStream:
+    def test_roundtrip(self, db: Session, member_with_pin, monthly_plan):
+        out = io.BytesIO()
+        stats = write_backup_stream(db, out)
+        assert stats["row_counts"]["members"] == 1
+        assert stats["row_counts"]["plans"] == 1
+
+        out.seek(0)
+        header, records = open_backup(out)
+        assert header["export_version"] == "2.0"
+        assert header["tables"] == [name for name, _ in BACKUP_TABLES]
+
+        rows = list(records)
+        members = [row for table, row in rows if table == "members"]
+        assert members[0]["id"] == str(member_with_pin.id)
+        assert members[0]["credit_balance"] == "0.00"
+        plans = [row for table, row in rows if table == "plans"]
+        assert plans[0]["plan_type"] == "monthly"
+
+    def test_parallel_export_assembles_chunks_in_table_order(self, tmp_path, monkeypatch):
+        from contextlib import contextmanager
+
+        from sqlalchemy import create_engine
+
+        from app.database import Base
+        from app.services import backup_service
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            session.add_all([Setting(key=f"k{i}", value=str(i)) for i in range(5)])
+            session.add(Member(first_name="A", last_name="B"))
+            session.commit()
+
+        @contextmanager
+        def connect():
+            with engine.connect() as conn, conn.begin():
+                yield conn
+
+        monkeypatch.setattr(backup_service, "CHUNK_SPOOL_BYTES", 16)  # force chunks onto disk
+        out = io.BytesIO()
+        row_counts, table_seconds = {}, {}
+        backup_service.export_table_chunks(
+            connect,
+            lambda conn, name, model, chunk: backup_service._export_table(conn, name, model, None, chunk),
+            lambda name, chunk, count: out.write(chunk.read()),
+            row_counts, table_seconds,
+        )
+        engine.dispose()
+
+        assert row_counts["settings"] == 5
+        assert row_counts["members"] == 1
+        assert set(table_seconds) == {name for name, _ in BACKUP_TABLES}
+        tables = [json.loads(line)["table"] for line in gzip.decompress(out.getvalue()).splitlines()]
+        order = [name for name, _ in BACKUP_TABLES]
+        assert tables == sorted(tables, key=order.index)
+
+    def test_reads_legacy_json(self):
+        legacy = {"export_version": "1.1", "data": {"plans": [{"id": "x"}], "members": []}}
+        header, records = open_backup(io.BytesIO(json.dumps(legacy, indent=2).encode()))
+        assert header["export_version"] == "1.1"
+        assert list(records) == [("plans", {"id": "x"})]
+
+
+class TestRowSerializers:
+    def _transaction(self, db: Session, member) -> Transaction:
+        tx = Transaction(member_id=member.id, transaction_type=TransactionType.payment,
+                         payment_method=PaymentMethod.card, amount=Decimal("12.50"), notes="Swim")
+        db.add(tx)
+        db.commit()
+        return tx
+
+    def test_serializer_output_matches_column_types(self, db: Session, member_with_pin):
+        tx = self._transaction(db, member_with_pin)
+        row = db.execute(select(Transaction.__table__)).mappings().one()
+
+        serialized = row_serializer(Transaction.__table__)(row)
+        assert serialized == serialize_model(tx)
+        assert serialized["id"] == str(tx.id)
+        assert serialized["amount"] == "12.50"
+        assert serialized["transaction_type"] == "payment"
+        assert serialized["created_at"] == tx.created_at.isoformat()
+        assert serialized["plan_id"] is None
+        assert json.loads(dumps(serialized)) == serialized
+
+    def test_transactions_csv_export(self, client, db: Session, admin_headers, member_with_pin):
+        tx = self._transaction(db, member_with_pin)
+
+        resp = client.get("/api/reports/export", headers=admin_headers)
+        assert resp.status_code == 200
+        lines = resp.text.splitlines()
+        assert lines[0] == "Date,Type,Method,Amount,Member ID,Notes"
+        assert lines[1] == f"{tx.created_at.isoformat()},payment,card,12.50,{member_with_pin.id},Swim"
+
+
+class TestRunBackup:
+    def test_local_backup(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+
+        result = run_backup(db)
+        assert result["success"] is True
+        assert result["filename"].endswith(".ndjson.gz")
+        assert result["row_counts"]["members"] == 1
+
+        backups = LocalBackupStorage(str(tmp_path)).list_backups()
+        assert [b["filename"] for b in backups] == [result["filename"]]
+        assert not list(tmp_path.glob(".*.part"))
+        manifest = json.loads((tmp_path / manifest_name(result["filename"])).read_text())
+        assert manifest["kind"] == "full"
+        assert manifest["base"] == result["filename"]
+        assert manifest["tables"]["members"]["rows"] == 1
+        assert manifest["bytes"] == backups[0]["size"]
+
+    def test_unchanged_full_backup_is_skipped(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        first = run_backup(db, kind="full")
+
+        second = run_backup(db, kind="full")
+        assert second["success"] is True
+        assert second["skipped"] is True
+        assert second["filename"] == first["filename"]
+        assert len(LocalBackupStorage(str(tmp_path)).list_backups()) == 1
+        assert not list(tmp_path.glob(".*.part"))
+
+        member_with_pin.first_name = "Changed"
+        db.commit()
+        assert run_backup(db, kind="full").get("skipped") is None
+
+
+class TestVerifyBackup:
+    def test_verify_passes_for_intact_backup(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        result = run_backup(db)
+
+        verified = verify_backup(LocalBackupStorage(str(tmp_path)), result["filename"])
+        assert verified["valid"] is True
+        assert verified["errors"] == []
+        assert set(verified["tables"]) == {name for name, _ in BACKUP_TABLES}
+
+    def test_verify_pinpoints_corrupted_table(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        result = run_backup(db)
+        manifest = json.loads((tmp_path / manifest_name(result["filename"])).read_text())
+        path = tmp_path / result["filename"]
+        data = bytearray(path.read_bytes())
+        data[manifest["tables"]["members"]["offset"] + 20] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        verified = verify_backup(LocalBackupStorage(str(tmp_path)), result["filename"])
+        assert verified["valid"] is False
+        assert verified["tables"]["members"] is False
+        assert verified["tables"]["plans"] is True
+        assert "File checksum mismatch" in verified["errors"]
+
+    def test_verify_endpoint(self, client, db: Session, tmp_path, admin_headers):
+        _use_local_storage(db, tmp_path)
+        result = run_backup(db)
+
+        resp = client.get("/api/backup/verify", params={"filename": result["filename"]}, headers=admin_headers)
+        assert resp.status_code == 200
+        assert resp.json()["valid"] is True
+
+        (tmp_path / manifest_name(result["filename"])).unlink()
+        resp = client.get("/api/backup/verify", params={"filename": result["filename"]}, headers=admin_headers)
+        assert resp.status_code == 400
+
+
+class TestBackupJobs:
+    def _sessions(self, db: Session):
+        return sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+
+    def test_job_runs_backup_and_records_progress(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        job = enqueue_backup_job(db, kind="full")
+        assert job.status == "queued"
+        assert enqueue_backup_job(db).id == job.id  # one backup at a time
+
+        assert process_next_job(self._sessions(db)) is True
+        db.refresh(job)
+        assert job.status == "succeeded"
+        assert job.progress == 100.0
+        assert job.bytes_written > 0
+        assert set(job.table_seconds) == {name for name, _ in BACKUP_TABLES}
+        assert job.result["filename"].endswith(".ndjson.gz")
+        assert process_next_job(self._sessions(db)) is False
+
+    def test_cancel_queued_and_running_jobs(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        queued = enqueue_backup_job(db)
+        assert request_cancel(db, queued).status == "cancelled"
+        assert process_next_job(self._sessions(db)) is False
+
+        running = enqueue_backup_job(db, kind="full")
+        running.cancel_requested = True  # as if requested just after the worker claimed it
+        db.commit()
+        process_next_job(self._sessions(db))
+        db.refresh(running)
+        assert running.status == "cancelled"
+        assert LocalBackupStorage(str(tmp_path)).list_backups() == []
+        assert not list(tmp_path.glob(".*.part"))
+
+    def test_recovery_fails_only_jobs_with_a_stale_heartbeat(self, db: Session):
+        now = datetime.utcnow()
+        live = BackupJob(status="running", started_at=now - timedelta(hours=2), heartbeat_at=now,
+                         owner="web-2:41")
+        dead = BackupJob(status="running", started_at=now - timedelta(hours=2),
+                         heartbeat_at=now - timedelta(seconds=JOB_STALE_SECONDS + 1), owner="web-1:17")
+        db.add_all([live, dead])
+        db.commit()
+
+        assert recover_interrupted_jobs(db, now=now) == 1
+        db.expire_all()
+        assert live.status == "running"
+        assert dead.status == "failed"
+        assert dead.error == "Interrupted by restart"
+
+    def test_heartbeat_outlives_slow_tables_and_takeover_is_kept(self, db: Session, monkeypatch):
+        job = enqueue_backup_job(db, kind="full")
+        sessions = self._sessions(db)
+        seen = {}
+
+        def slow_backup(backup_db, kind, on_progress):
+            # One long table export: no progress events while the heartbeat keeps beating
+            other = sessions()
+            started = other.get(BackupJob, job.id).heartbeat_at
+            time.sleep(0.3)
+            other.expire_all()
+            seen["refreshed"] = other.get(BackupJob, job.id).heartbeat_at > started
+            # Another worker gives up on the job before it finishes
+            other.get(BackupJob, job.id).status = "failed"
+            other.commit()
+            other.close()
+            return {"success": True, "filename": "late.ndjson.gz"}
+
+        monkeypatch.setattr(backup_jobs, "HEARTBEAT_SECONDS", 0.05)
+        monkeypatch.setattr(backup_jobs, "run_backup", slow_backup)
+        assert process_next_job(sessions) is True
+        assert seen["refreshed"]
+        db.expire_all()
+        assert job.status == "failed"
+        assert job.result is None
+
+    def test_run_endpoint_queues_job(self, client, db: Session, admin_headers):
+        resp = client.post("/api/backup/run", params={"kind": "full"}, headers=admin_headers)
+        assert resp.status_code == 202
+        job = resp.json()
+        assert job["status"] == "queued"
+
+        resp = client.get(f"/api/backup/jobs/{job['id']}", headers=admin_headers)
+        assert resp.status_code == 200
+        assert resp.json()["kind"] == "full"
+        assert client.get("/api/backup/status", headers=admin_headers).json()["active_job"]["id"] == job["id"]
+
+        resp = client.post(f"/api/backup/jobs/{job['id']}/cancel", headers=admin_headers)
+        assert resp.json()["status"] == "cancelled"
+        resp = client.post(f"/api/backup/jobs/{job['id']}/cancel", headers=admin_headers)
+        assert resp.status_code == 409
+
+
+class _FakeS3Client:
+    def __init__(self, fail_part_once: int | None = None):
+        self.parts: dict[int, bytes] = {}
+        self.completed = None
+        self.aborted = False
+        self._fail_part_once = fail_part_once
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, PartNumber, Body, **kwargs):
+        if PartNumber == self._fail_part_once:
+            self._fail_part_once = None
+            raise ConnectionError("reset by peer")
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, **kwargs):
+        self.aborted = True
+
+
+class TestStreamingUpload:
+    def test_part_writer_cuts_parts_and_retries(self, monkeypatch):
+        monkeypatch.setattr(backup_storage, "RETRY_BACKOFF_SECONDS", 0)
+        sent, progress, failures = [], [], [2]
+
+        def send_part(number, offset, data):
+            if failures and number == failures[0]:
+                failures.pop()
+                raise OSError("transient")
+            sent.append((number, offset, data))
+
+        writer = PartWriter(4, send_part, progress.append)
+        writer.write(b"abcdefghij")
+        writer.finish()
+
+        assert sent == [(1, 0, b"abcd"), (2, 4, b"efgh"), (3, 8, b"ij")]
+        assert progress == [4, 8, 10]
+
+    def test_s3_multipart_upload(self, db: Session, monkeypatch, member_with_pin):
+        monkeypatch.setattr(backup_storage, "S3_PART_SIZE", 64)
+        monkeypatch.setattr(backup_storage, "RETRY_BACKOFF_SECONDS", 0)
+        storage = S3BackupStorage("bucket", "backups", "key", "secret")
+        storage.client = _FakeS3Client(fail_part_once=2)
+
+        progress = []
+        location = storage.write("pool-backup-x.ndjson.gz", lambda out: write_backup_stream(db, out), progress.append)
+
+        assert location == "s3://bucket/backups/pool-backup-x.ndjson.gz"
+        assert [p["PartNumber"] for p in storage.client.completed] == sorted(storage.client.parts)
+        body = b"".join(storage.client.parts[n] for n in sorted(storage.client.parts))
+        assert progress[-1] == len(body)
+        header, records = open_backup(io.BytesIO(body))
+        assert any(table == "members" for table, _ in records)
+
+    def test_s3_upload_aborts_on_failure(self, db: Session):
+        storage = S3BackupStorage("bucket", "", "key", "secret")
+        storage.client = _FakeS3Client()
+
+        def failing_writer(out):
+            out.write(b"partial")
+            raise RuntimeError("export failed")
+
+        with pytest.raises(RuntimeError):
+            storage.write("pool-backup-x.ndjson.gz", failing_writer)
+        assert storage.client.aborted is True
+        assert storage.client.completed is None
+
+
+class _FakeListingS3Client:
+    """Bucket listing with the real 1,000-key page limit, counting LIST calls."""
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.list_calls = 0
+        self.deleted_batches = []
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix, StartAfter=""):
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > StartAfter]
+        for start in range(0, max(len(keys), 1), 1000):
+            self.list_calls += 1
+            yield {"Contents": [{"Key": k, "Size": 1, "LastModified": datetime(2026, 10, 1)}
+                                for k in keys[start:start + 1000]]}
+
+    def delete_objects(self, Bucket, Delete):
+        keys = {o["Key"] for o in Delete["Objects"]}
+        self.deleted_batches.append(len(keys))
+        self.keys = [k for k in self.keys if k not in keys]
+        return {}
+
+
+class TestStorageIndex:
+    def _names(self, count, day=1):
+        return [f"pool-backup-202610{day:02d}-{i // 3600:02d}{i // 60 % 60:02d}{i % 60:02d}.ndjson.gz"
+                for i in range(count)]
+
+    def test_s3_listing_pages_and_refreshes_incrementally(self):
+        storage = S3BackupStorage("bucket", "backups", "key", "secret")
+        names = self._names(2500)
+        storage.client = fake = _FakeListingS3Client(
+            [f"backups/{n}" for n in names] + [f"backups/{manifest_name(n)}" for n in names])
+
+        assert len(storage.list_backups()) == 2500
+        assert fake.list_calls == 5  # 5,000 keys
+
+        new = self._names(1, day=2)[0]
+        fake.keys.append(f"backups/{new}")
+        fake.list_calls = 0
+        backups = storage.list_backups()
+        assert backups[0]["filename"] == new
+        assert len(backups) == 2501
+        assert fake.list_calls == 1  # only keys after the newest known backup
+
+    def test_retention_deletes_in_batches_and_updates_index(self):
+        storage = S3BackupStorage("bucket", "", "key", "secret")
+        names = self._names(1200)
+        storage.client = fake = _FakeListingS3Client(names)
+
+        expired = cleanup_old_backups(storage, 200)
+        assert len(expired) == 1000
+        assert fake.deleted_batches == [1000, 1000]  # backups + their manifests
+        assert len(storage.list_backups()) == 200
+
+    def test_get_backup_storage_reuses_target_until_settings_change(self, db: Session, tmp_path):
+        _use_local_storage(db, tmp_path / "a")
+        with get_backup_storage(db) as first:
+            pass
+        with get_backup_storage(db) as again:
+            assert again is first
+
+        db.query(Setting).filter(Setting.key == "backup_local_path").update({"value": str(tmp_path / "b")})
+        db.commit()
+        with get_backup_storage(db) as replacement:
+            assert replacement is not first
+
+    def test_replaced_target_closes_only_after_its_last_user(self, db: Session, tmp_path):
+        _use_local_storage(db, tmp_path / "a")
+        closed = []
+        with get_backup_storage(db) as uploading:
+            uploading.close = lambda: closed.append(uploading)
+            db.query(Setting).filter(Setting.key == "backup_local_path").update({"value": str(tmp_path / "b")})
+            db.commit()
+            with get_backup_storage(db) as replacement:
+                assert replacement is not uploading
+            assert closed == []  # still in use by the upload
+        assert closed == [uploading]
+
+
+class TestRestore:
+    def test_full_roundtrip_restores_typed_values(self, db: Session, member_with_pin):
+        db.add(ActivityLog(action_type="member_update", entity_type="member",
+                           after_value={"first_name": "Jane"}))
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership, guest_count=2))
+        db.commit()
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+
+        db.query(Checkin).delete()
+        member_with_pin.first_name = "Changed"
+        db.commit()
+
+        out.seek(0)
+        header, records = open_backup(out)
+        counts = restore_backup(db, header, records)
+        db.commit()
+        db.expire_all()
+
+        assert counts["checkins"] == 1
+        assert db.query(Checkin).one().guest_count == 2
+        assert db.get(Member, member_with_pin.id).first_name == member_with_pin.first_name != "Changed"
+        assert db.query(ActivityLog).one().after_value == {"first_name": "Jane"}
+
+    def test_charge_ledger_and_outbox_roundtrip(self, db: Session, member_with_pin, monthly_plan):
+        card = SavedCard(member_id=member_with_pin.id, processor_token="tok_1", card_last4="4242")
+        run = AutoChargeRun(status="succeeded", processed=1, succeeded=1)
+        db.add_all([card, run])
+        db.flush()
+        attempt = ChargeAttempt(saved_card_id=card.id, period=date(2026, 10, 1), run_id=run.id,
+                                member_id=member_with_pin.id, plan_id=monthly_plan.id,
+                                amount=Decimal("50.00"), status="succeeded")
+        db.add(attempt)
+        db.flush()
+        db.add(ChargeAttemptEvent(attempt_id=attempt.id, run_id=run.id, attempt_number=1, outcome="succeeded"))
+        db.add(OutboxMessage(kind="auto_charge_receipt", payload={"member_id": str(member_with_pin.id)}))
+        db.commit()
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+
+        out.seek(0)
+        header, records = open_backup(out)
+        counts = restore_backup(db, header, records)
+        db.commit()
+        db.expire_all()
+
+        assert counts["charge_attempts"] == counts["charge_attempt_events"] == counts["outbox_messages"] == 1
+        restored = db.query(ChargeAttempt).one()
+        assert (restored.saved_card_id, restored.period, restored.status) == (card.id, date(2026, 10, 1), "succeeded")
+        assert restored.amount == Decimal("50.00")
+        assert db.query(ChargeAttemptEvent).one().run_id == run.id
+        assert db.query(AutoChargeRun).one().succeeded == 1
+        assert db.query(OutboxMessage).one().payload == {"member_id": str(member_with_pin.id)}
+
+
+class TestIncrementalBackup:
+    def test_increment_exports_only_recent_rows_and_restores_chain(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership,
+                       checked_in_at=datetime.utcnow() - timedelta(days=2)))
+        db.commit()
+
+        full = run_backup(db, kind="full")
+        assert full["success"] is True
+
+        recent = Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership, guest_count=1)
+        db.add(recent)
+        db.commit()
+
+        incr = run_backup(db, kind="incremental")
+        assert incr["success"] is True
+        assert incr["filename"].endswith("-incr.ndjson.gz")
+        assert incr["base"] == full["filename"]
+        assert incr["row_counts"]["checkins"] == 1  # the 2-day-old check-in is in the full only
+        manifest = json.loads((tmp_path / manifest_name(incr["filename"])).read_text())
+        assert manifest["previous"] == full["filename"]
+        assert manifest["since"] is not None
+
+        db.query(Checkin).delete()
+        db.commit()
+
+        result = restore_from_storage(db, incr["filename"])
+        assert result["chain"] == [full["filename"], incr["filename"]]
+        assert db.query(Checkin).count() == 2
+        # The restored data starts a new chain
+        assert choose_backup_kind(db, "local") == "full"
+
+    def test_auto_kind_follows_chain_state(self, db: Session, tmp_path, member_with_pin):
+        _use_local_storage(db, tmp_path)
+        db.add(Setting(key="backup_incremental_enabled", value="true"))
+        db.commit()
+
+        assert run_backup(db)["kind"] == "full"
+        assert choose_backup_kind(db, "local", now=datetime.now()) == "incremental"
+        assert choose_backup_kind(db, "s3") == "full"
+        assert choose_backup_kind(db, "local", now=datetime.now() + timedelta(hours=26)) == "full"
+
+    def test_retention_keeps_whole_chains(self):
+        names = [
+            "pool-backup-20261001-020000.ndjson.gz",
+            "pool-backup-20261001-080000-incr.ndjson.gz",
+            "pool-backup-20261002-020000.ndjson.gz",
+            "pool-backup-20261002-080000-incr.ndjson.gz",
+            "pool-backup-20261003-020000.ndjson.gz",
+        ]
+        assert select_expired_backups(names, 2) == names[:2]
+        assert select_expired_backups(names, 5) == []
+
+    def test_restore_endpoint_rejects_unknown_files(self, client, admin_headers):
+        resp = client.post("/api/backup/restore", params={"filename": "../etc/passwd"}, headers=admin_headers)
+        assert resp.status_code == 400
+
+
+class TestImportEndpoint:
+    def _upload(self, client, admin_headers, payload: bytes, **params):
+        return client.post(
+            "/api/backup/import",
+            params=params,
+            files={"file": ("backup.ndjson.gz", payload, "application/gzip")},
+            headers=admin_headers,
+        )
+
+    def test_streaming_import_of_ndjson_backup(self, client, db: Session, admin_headers, member_with_pin):
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership))
+        db.commit()
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+        db.query(Checkin).delete()
+        db.commit()
+
+        resp = self._upload(client, admin_headers, out.getvalue())
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["stats"]["checkins"] == 1
+        assert db.query(Checkin).count() == 1
+
+    def test_import_clears_report_cache(self, client, db: Session, admin_headers, member_with_pin):
+        visit = datetime(2024, 1, 10, 10, 0)
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership, checked_in_at=visit))
+        db.commit()
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+        db.query(Checkin).delete()
+        db.commit()
+        # A closed period stays cached until something invalidates it
+        assert get_swim_report(db, visit.date(), visit.date())["total_swims"] == 0
+
+        resp = self._upload(client, admin_headers, out.getvalue())
+        assert resp.status_code == 200, resp.text
+        assert get_swim_report(db, visit.date(), visit.date())["total_swims"] == 1
+
+    def test_legacy_import_loads_parents_first(self, client, db: Session, admin_headers, admin_user):
+        # Legacy exports list checkins before members
+        member_id = "6f1c8a4e-2f57-4c39-9d3b-2b8f6a1d2c11"
+        legacy = {
+            "export_version": "1.0",
+            "export_date": "2026-01-01T00:00:00",
+            "data": {
+                "users": [{"id": str(admin_user.id), "username": "admin", "password_hash": admin_user.password_hash}],
+                "checkins": [{"id": "0c6b1f8e-7c1a-4b0e-9a55-6f0d0b3f5e21", "member_id": member_id,
+                              "checkin_type": "membership", "guest_count": 0,
+                              "checked_in_at": "2026-01-01T10:00:00"}],
+                "members": [{"id": member_id, "first_name": "Old", "last_name": "Member",
+                             "credit_balance": "5.00", "is_active": True}],
+            },
+        }
+        resp = self._upload(client, admin_headers, json.dumps(legacy).encode())
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["stats"]["members"] == 1
+        assert db.query(Checkin).one().member.first_name == "Old"
+
+    def test_dry_run_reports_errors_without_writing(self, client, db: Session, admin_headers, member_with_pin):
+        legacy = {"export_version": "1.0", "data": {"members": [{"id": "not-a-uuid", "first_name": "X"}]}}
+        resp = self._upload(client, admin_headers, json.dumps(legacy).encode(), dry_run="true")
+        body = resp.json()
+        assert body["dry_run"] is True
+        assert body["valid"] is False
+        assert body["row_counts"] == {"members": 1}
+        assert db.query(Member).count() == 1
+
+    def test_rejects_garbage(self, client, admin_headers):
+        resp = self._upload(client, admin_headers, b"not a backup")
+        assert resp.status_code == 400
+
+    def test_truncated_upload_leaves_data_untouched(self, client, db: Session, admin_headers, member_with_pin):
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.membership))
+        db.commit()
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+        complete = gzip.decompress(out.getvalue()).splitlines(keepends=True)
+
+        # Cut after the last table, before the footer
+        resp = self._upload(client, admin_headers, b"".join(complete[:-1]))
+        assert resp.status_code == 400
+        assert "footer missing" in resp.json()["detail"]
+        # Cut in the middle of a gzip member
+        resp = self._upload(client, admin_headers, out.getvalue()[:-10])
+        assert resp.status_code == 400
+
+        db.expire_all()
+        assert db.query(Member).count() == 1
+        assert db.query(Checkin).count() == 1
+
+
+class TestCopyFormat:
+    def _archive(self) -> bytes:
+        raw = io.BytesIO()
+        with tarfile.open(fileobj=raw, mode="w") as tar:
+            for name, data in [
+                ("header.json", json.dumps({"export_version": "2.0", "format": "pgcopy", "tables": ["plans"],
+                                            "columns": {"plans": ["id", "name"]}}).encode()),
+                ("plans.csv", b'id,name\n1,"Day, pass"\n2,"Multi\nline"\n'),
+                ("footer.json", b'{"row_counts": {"plans": 2}}'),
+            ]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return gzip.compress(raw.getvalue())
+
+    def test_detects_and_validates_copy_archive(self):
+        stream = decompressed_stream(io.BytesIO(self._archive()))
+        assert is_copy_archive(stream)
+        result = validate_file(stream)
+        assert result["valid"] is True
+        assert result["row_counts"] == {"plans": 2}
+
+    def test_ndjson_is_not_a_copy_archive(self, db: Session):
+        out = io.BytesIO()
+        write_backup_stream(db, out)
+        out.seek(0)
+        assert not is_copy_archive(decompressed_stream(out))
+
+    def test_copy_restore_requires_postgres(self, db: Session):
+        with pytest.raises(ValueError):
+            restore_file(db, io.BytesIO(self._archive()))
+
+    def test_copy_format_falls_back_to_ndjson_off_postgres(self, db: Session, tmp_path):
+        _use_local_storage(db, tmp_path)
+        db.add(Setting(key="backup_format", value="pgcopy"))
+        db.commit()
+        result = run_backup(db, kind="full")
+        assert result["format"] == "ndjson"
+        assert result["filename"].endswith(".ndjson.gz")
@@ -1,5 +1,6 @@
 """Tests for payment endpoints (cash, card, split)."""
 
+import asyncio
 from decimal import Decimal
 
 import pytest
@@ -152,6 +153,46 @@ class TestCardPayment:
         assert saved is not None
         assert saved.friendly_name == "My MC"
 
+    def test_pin_check_and_database_work_run_off_the_event_loop(
+        self, client, db: Session, member_with_pin, single_swim_plan, seed_settings, monkeypatch
+    ):
+        from app.routers import kiosk
+        from app.services import payment_service
+
+        on_loop = []
+
+        def running_on_loop() -> bool:
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+        def checked(original):
+            def wrapper(*args, **kwargs):
+                on_loop.append(running_on_loop())
+                return original(*args, **kwargs)
+            return wrapper
+
+        monkeypatch.setattr(kiosk, "verify_member_pin", checked(kiosk.verify_member_pin))
+        monkeypatch.setattr(payment_service, "_record_card_payment", checked(payment_service._record_card_payment))
+
+        resp = client.post("/api/kiosk/pay/card", json={
+            "member_id": str(member_with_pin.id),
+            "plan_id": str(single_swim_plan.id),
+            "pin": "1234",
+        })
+        assert resp.status_code == 200
+        resp = client.post("/api/kiosk/saved-cards/tokenize", json={
+            "member_id": str(member_with_pin.id),
+            "pin": "1234",
+            "card_last4": "4242",
+            "card_brand": "Visa",
+        })
+        assert resp.status_code == 201, resp.text
+        assert resp.json()["card_last4"] == "4242"
+        assert on_loop == [False, False, False]
+
 
 class TestSplitPayment:
     def test_split_cash_and_card(self, client, db: Session, member_with_pin, monthly_plan, seed_settings):
@@ -223,3 +264,670 @@ class TestSplitPayment:
         })
         assert resp.status_code == 400
         assert "disabled" in resp.json()["detail"].lower()
+
+
+class TestAdapterRegistry:
+    def test_adapter_reused_until_config_changes(self, db: Session, seed_settings):
+        from app.services.payment_service import clear_payment_adapters, get_payment_adapter
+        from app.services.settings_service import set_setting
+
+        clear_payment_adapters()
+        set_setting(db, "payment_processor", "sola")
+        first = get_payment_adapter(db)
+        assert get_payment_adapter(db) is first
+
+        set_setting(db, "sola_api_key", "new-key")
+        rebuilt = get_payment_adapter(db)
+        assert rebuilt is not first
+        assert rebuilt.config["sola_api_key"] == "new-key"
+        assert get_payment_adapter(db) is rebuilt
+
+        # Settings for other processors don't invalidate the adapter
+        set_setting(db, "hitech_pin", "0000")
+        assert get_payment_adapter(db) is rebuilt
+        clear_payment_adapters()
+
+
+class TestGatewayHttp:
+    def test_client_shared_per_processor(self):
+        from app.payments.http import close_http_clients, get_http_client
+
+        client = get_http_client("usaepay")
+        assert get_http_client("usaepay") is client
+        assert get_http_client("hitech") is not client
+        close_http_clients()
+        assert client.is_closed
+        assert get_http_client("usaepay") is not client
+        close_http_clients()
+
+    def test_latency_recorded_per_processor(self, client, admin_headers):
+        import httpx
+
+        from app.payments.http import TimedTransport, latency_snapshot, reset_latency
+
+        reset_latency()
+        statuses = iter([200, 503])
+        transport = TimedTransport("sola", httpx.MockTransport(lambda request: httpx.Response(next(statuses))))
+        with httpx.Client(transport=transport) as http:
+            http.get("https://gateway.test/a")
+            http.get("https://gateway.test/b")
+
+        sola = latency_snapshot()["sola"]
+        assert sola["count"] == 2
+        assert sola["errors"] == 1
+        assert sola["buckets"]["+Inf"] == 2
+        assert sola["p50_seconds"] is not None
+
+        resp = client.get("/api/payments/latency", headers=admin_headers)
+        assert resp.status_code == 200
+        assert resp.json()["processors"]["sola"]["count"] == 2
+        reset_latency()
+
+
+class TestAsyncAdapters:
+    @staticmethod
+    def _mock_gateway(monkeypatch, handler):
+        import httpx
+
+        from app.payments import http
+
+        monkeypatch.setattr(
+            http, "build_async_http_client",
+            lambda processor: httpx.AsyncClient(
+                transport=http.TimedAsyncTransport(processor, httpx.MockTransport(handler))
+            ),
+        )
+
+    def test_usaepay_terminal_status_async(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        from app.payments.usaepay_adapter import UsaepayPaymentAdapter
+
+        def handler(request):
+            assert request.url.path.endswith("/paymentengine/payrequests/rk_1")
+            return httpx.Response(200, json={
+                "status": "transaction complete",
+                "complete": True,
+                "transaction": {
+                    "result_code": "A", "key": "tx_9", "authcode": "123",
+                    "creditcard": {"number": "4xxxxxxxxxxx1111", "type": "Visa"},
+                },
+            })
+
+        self._mock_gateway(monkeypatch, handler)
+        adapter = UsaepayPaymentAdapter({"usaepay_api_key": "k", "usaepay_api_pin": "p"})
+        result = asyncio.run(adapter.check_terminal_payment_status_async("rk_1"))
+        assert result.complete and result.approved
+        assert result.transaction_key == "tx_9"
+        assert result.card_last4 == "1111"
+
+    def test_hitech_saved_card_async(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        from app.payments.hitech_adapter import HiTechPaymentAdapter
+
+        def handler(request):
+            assert b"ssl_token=tok" in request.content
+            return httpx.Response(200, text="ssl_result=0\nssl_txn_id=T1\nssl_result_message=APPROVAL\n")
+
+        self._mock_gateway(monkeypatch, handler)
+        adapter = HiTechPaymentAdapter({"hitech_merchant_id": "1", "hitech_user_id": "u", "hitech_pin": "p"})
+        result = asyncio.run(adapter.charge_saved_card_async("tok", Decimal("12.00"), "m1", "Plan", customer_name="A B"))
+        assert result.success
+        assert result.reference_id == "T1"
+
+    def test_default_async_runs_sync_method(self):
+        import asyncio
+
+        from app.payments.cash import CashPaymentAdapter
+
+        result = asyncio.run(CashPaymentAdapter().charge_saved_card_async("tok", Decimal("5.00"), "m1", "Plan"))
+        assert result.success is False
+
+
+class _FakeTerminalAdapter:
+    """Terminal-capable adapter whose gateway answers are set by the test."""
+
+    def __init__(self, approved=True):
+        from app.payments.usaepay_adapter import TerminalPaymentResult
+
+        self.result_cls = TerminalPaymentResult
+        self.approved = approved
+        self.status_checks = 0
+
+    def has_terminal(self):
+        return True
+
+    def initiate_terminal_payment(self, **kwargs):
+        raise AssertionError("async route should await the async variant")
+
+    async def initiate_terminal_payment_async(self, amount, member_id, description, save_card=False, **kwargs):
+        return self.result_cls(request_key="rk_test", status="sent to device")
+
+    def check_terminal_payment_status(self, request_key):
+        raise AssertionError("async route should await the async variant")
+
+    async def check_terminal_payment_status_async(self, request_key):
+        self.status_checks += 1
+        return self.result_cls(
+            request_key=request_key, status="transaction complete", complete=True,
+            approved=self.approved, transaction_key="tx_gw_1" if self.approved else None,
+            card_last4="1111", card_brand="Visa", error=None if self.approved else "Declined",
+        )
+
+
+class TestTerminalSessions:
+    def _start(self, client, monkeypatch, member_with_pin, plan, adapter):
+        import app.routers.kiosk as kiosk
+
+        monkeypatch.setattr(kiosk, "get_payment_adapter", lambda db: adapter)
+        resp = client.post("/api/kiosk/terminal/pay", json={
+            "member_id": str(member_with_pin.id),
+            "plan_id": str(plan.id),
+            "pin": "1234",
+        })
+        assert resp.status_code == 200, resp.text
+        self.amount = Decimal(resp.json()["amount"])
+        return resp.json()["request_key"]
+
+    def _watch(self, db, monkeypatch, adapter, seconds_later=10):
+        """Run one watcher pass as if `seconds_later` seconds had passed."""
+        import asyncio
+        from datetime import datetime, timedelta
+
+        from sqlalchemy.orm import sessionmaker
+
+        import app.services.terminal_watcher as watcher
+
+        monkeypatch.setattr(watcher, "get_payment_adapter", lambda db: adapter)
+        now = datetime.utcnow() + timedelta(seconds=seconds_later)
+        checked = asyncio.run(watcher.poll_due_sessions(sessionmaker(bind=db.get_bind()), now=now))
+        db.expire_all()  # the watcher committed through its own sessions
+        return checked
+
+    def test_watcher_finalizes_once(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        from app.models.terminal_payment_session import TerminalPaymentSession
+        from app.services.terminal_watcher import apply_poll_result
+
+        adapter = _FakeTerminalAdapter()
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, adapter)
+        session = db.query(TerminalPaymentSession).filter_by(request_key=key).one()
+        assert session.state == "pending"
+        assert session.amount == self.amount
+
+        # Kiosk reads never reach the gateway
+        pending = client.get(f"/api/kiosk/terminal/status/{key}").json()
+        assert pending["complete"] is False
+        assert adapter.status_checks == 0
+
+        assert self._watch(db, monkeypatch, adapter) == 1
+        assert adapter.status_checks == 1
+        first = client.get(f"/api/kiosk/terminal/status/{key}").json()
+        assert first["complete"] is True
+        assert first["approved"] is True
+        assert first["transaction_id"] is not None
+
+        # A second process seeing the same approval changes nothing
+        result = adapter.result_cls(
+            request_key=key, status="transaction complete", complete=True, approved=True,
+            transaction_key="tx_gw_1", card_last4="1111", card_brand="Visa",
+        )
+        assert apply_poll_result(db, key, result) is True
+        second = client.get(f"/api/kiosk/terminal/status/{key}").json()
+        assert second["transaction_id"] == first["transaction_id"]
+        assert second["membership_id"] == first["membership_id"]
+
+        db.expire_all()
+        assert db.query(Membership).filter(Membership.member_id == member_with_pin.id).count() == 1
+        assert db.query(Transaction).filter(Transaction.reference_id == "tx_gw_1").count() == 1
+        assert db.query(TerminalPaymentSession).filter_by(request_key=key).one().state == "completed"
+
+        # Finished sessions are not polled again
+        assert self._watch(db, monkeypatch, adapter, seconds_later=60) == 0
+
+    def test_declined_payment_creates_nothing(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        from app.models.terminal_payment_session import TerminalPaymentSession
+
+        adapter = _FakeTerminalAdapter(approved=False)
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, adapter)
+        self._watch(db, monkeypatch, adapter)
+        resp = client.get(f"/api/kiosk/terminal/status/{key}?wait=5").json()
+        assert resp["complete"] is True
+        assert resp["approved"] is False
+        assert resp["transaction_id"] is None
+
+        db.expire_all()
+        session = db.query(TerminalPaymentSession).filter_by(request_key=key).one()
+        assert session.state == "declined"
+        assert db.query(Membership).filter(Membership.member_id == member_with_pin.id).count() == 0
+
+    def test_session_outlives_its_plan(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        from app.models.terminal_payment_session import TerminalPaymentSession
+
+        adapter = _FakeTerminalAdapter()
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, adapter)
+        # As a full restore does when it replaces the plans
+        db.delete(monthly_plan)
+        db.commit()
+
+        self._watch(db, monkeypatch, adapter)
+        session = db.query(TerminalPaymentSession).filter_by(request_key=key).one()
+        assert session.plan_id is None
+        assert session.state == "failed"
+        assert session.error == "Member or plan no longer exists"
+
+    def test_failed_finalize_leaves_session_retryable(self, db: Session, monkeypatch, member_with_pin, monthly_plan):
+        import app.services.terminal_payment_service as terminal_payments
+        from app.services.terminal_payment_service import create_session, finalize_session, get_session
+
+        create_session(db, "rk_fail", member_with_pin.id, monthly_plan.id, monthly_plan.price, Decimal("0.00"), False)
+        result = _FakeTerminalAdapter().result_cls(
+            request_key="rk_fail", status="transaction complete", complete=True, approved=True,
+            transaction_key="tx_gw_fail", card_last4="1111", card_brand="Visa",
+        )
+
+        def broken_transaction(**kwargs):
+            raise RuntimeError("insert failed")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(terminal_payments, "Transaction", broken_transaction)
+            with pytest.raises(RuntimeError):
+                finalize_session(db, "rk_fail", result)
+
+        db.expire_all()
+        assert get_session(db, "rk_fail").state == "pending"
+        assert db.query(Membership).filter(Membership.member_id == member_with_pin.id).count() == 0
+
+        # The next poll finalizes it
+        session = finalize_session(db, "rk_fail", result)
+        assert session.state == "completed"
+        assert session.transaction_id is not None
+        assert db.query(Membership).filter(Membership.member_id == member_with_pin.id).count() == 1
+
+    def test_claims_are_exclusive_and_back_off(self, db: Session, member_with_pin, monthly_plan):
+        from datetime import datetime, timedelta
+
+        from app.services.terminal_payment_service import create_session, get_session
+        from app.services.terminal_watcher import MAX_POLL_DELAY, SLOW_POLL_DELAY, claim_due_sessions, next_poll_delay
+
+        create_session(db, "rk_claim", member_with_pin.id, monthly_plan.id, monthly_plan.price, Decimal("0.00"), False)
+        assert claim_due_sessions(db) == []  # first poll waits for the customer to tap
+
+        now = datetime.utcnow() + timedelta(seconds=5)
+        assert claim_due_sessions(db, now) == ["rk_claim"]
+        assert claim_due_sessions(db, now) == []  # already claimed until its next poll
+        session = get_session(db, "rk_claim")
+        assert session.poll_count == 1
+        assert session.next_poll_at > now
+
+        assert next_poll_delay(0, 5) < next_poll_delay(3, 10) <= MAX_POLL_DELAY
+        assert next_poll_delay(50, 30) == MAX_POLL_DELAY
+        assert next_poll_delay(5, 300) == SLOW_POLL_DELAY
+
+    def test_long_poll_times_out_while_pending(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        import app.services.terminal_watcher as watcher
+
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, _FakeTerminalAdapter())
+        resp = client.get(f"/api/kiosk/terminal/status/{key}?wait=0.2")
+        assert resp.status_code == 200
+        assert resp.json()["complete"] is False
+        assert resp.json()["status"] == "pending"
+        assert key not in watcher._changed  # the timed-out waiter's event is not kept
+
+        assert client.get(f"/api/kiosk/terminal/status/{key}?wait=60").status_code == 422
+        assert client.get("/api/kiosk/terminal/status/rk_unknown").status_code == 404
+
+    def test_events_stream_ends_when_complete(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        import json
+
+        adapter = _FakeTerminalAdapter()
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, adapter)
+        self._watch(db, monkeypatch, adapter)
+
+        resp = client.get(f"/api/kiosk/terminal/events/{key}")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in resp.text.split("\n\n") if block.startswith("event: status")]
+        assert len(events) == 1
+        data = json.loads(events[0].split("data: ", 1)[1])
+        assert data["complete"] is True
+        assert data["transaction_id"] is not None
+
+    def test_sweeper_expires_abandoned_sessions(self, db: Session, member_with_pin, monthly_plan):
+        from datetime import datetime, timedelta
+
+        from app.services.terminal_payment_service import create_session, expire_stale_sessions, get_session
+
+        create_session(db, "rk_old", member_with_pin.id, monthly_plan.id, monthly_plan.price, Decimal("0.00"), False)
+        assert expire_stale_sessions(db) == 0
+        assert expire_stale_sessions(db, now=datetime.utcnow() + timedelta(hours=1)) == 1
+        assert get_session(db, "rk_old").state == "expired"
+
+    def test_expired_session_is_still_polled_and_finalized(self, client, db: Session, monkeypatch, member_with_pin, monthly_plan, seed_settings):
+        from datetime import datetime, timedelta
+
+        from app.services.terminal_payment_service import create_session, expire_stale_sessions, get_session
+        from app.services.terminal_watcher import EXPIRED_POLL_SECONDS, SLOW_POLL_DELAY, claim_due_sessions
+
+        adapter = _FakeTerminalAdapter()
+        key = self._start(client, monkeypatch, member_with_pin, monthly_plan, adapter)
+        assert expire_stale_sessions(db, now=datetime.utcnow() + timedelta(hours=1)) == 1
+        # The gateway approves it late: the watcher still finalizes it
+        assert self._watch(db, monkeypatch, adapter, seconds_later=3600) == 1
+        session = get_session(db, key)
+        assert session.state == "completed"
+        assert session.transaction_id is not None
+
+        create_session(db, "rk_gone", member_with_pin.id, monthly_plan.id, monthly_plan.price, Decimal("0.00"), False)
+        later = datetime.utcnow() + timedelta(hours=1)
+        assert expire_stale_sessions(db, now=later) == 1
+        assert claim_due_sessions(db, later) == ["rk_gone"]
+        assert get_session(db, "rk_gone").next_poll_at == later + timedelta(seconds=SLOW_POLL_DELAY)
+        # Past the window nobody polls it any more
+        assert claim_due_sessions(db, later + timedelta(seconds=EXPIRED_POLL_SECONDS)) == []
+
+
+class _FakeChargeAdapter:
+    """Saved-card gateway that declines tokens starting with 'bad' and tracks concurrency."""
+
+    def __init__(self, delay=0.02):
+        import threading
+
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    def charge_saved_card(self, token, amount, member_id, description, customer_name=None):
+        import time
+
+        from app.payments.base import SavedCardChargeResult
+
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if token.startswith("bad"):
+            return SavedCardChargeResult(success=False, message="Insufficient funds")
+        return SavedCardChargeResult(success=True, reference_id=f"ref_{token}")
+
+
+class TestAutoChargeEngine:
+    def _due_card(self, db, plan, name, token, active=True):
+        from datetime import date, timedelta
+
+        member = Member(first_name=name, last_name="Swimmer", email=f"{name.lower()}@example.com", is_active=active)
+        db.add(member)
+        db.flush()
+        card = SavedCard(
+            member_id=member.id, processor_token=token, card_last4="4242",
+            auto_charge_enabled=True, auto_charge_plan_id=plan.id,
+            next_charge_date=date.today() - timedelta(days=1),
+        )
+        db.add(card)
+        db.commit()
+        return card
+
+    def test_run_charges_concurrently_in_batches(self, db: Session, monkeypatch, monthly_plan, seed_settings):
+        from datetime import date, timedelta
+
+        import app.services.auto_charge_service as auto_charge
+        from app.models.auto_charge_run import AutoChargeRun
+        from app.models.outbox_message import OutboxMessage
+
+        cards = [self._due_card(db, monthly_plan, f"Good{i}", f"tok_{i}") for i in range(6)]
+        declined = self._due_card(db, monthly_plan, "Broke", "bad_tok")
+        inactive = self._due_card(db, monthly_plan, "Gone", "tok_gone", active=False)
+
+        adapter = _FakeChargeAdapter()
+        monkeypatch.setattr(auto_charge, "get_payment_adapter", lambda db: adapter)
+        monkeypatch.setattr(auto_charge, "COMMIT_BATCH_SIZE", 2)
+
+        report = auto_charge.process_due_charges(db, trigger="manual")
+
+        assert report["processed"] == 8
+        assert report["succeeded"] == 6
+        assert report["failed"] == 2
+        assert adapter.calls == 7  # the inactive member is never charged
+        assert 1 < adapter.max_in_flight <= auto_charge.processor_concurrency("stub")
+        assert report["batches"] == 4
+        assert report["latency"]["max_seconds"] >= adapter.delay
+        assert report["charges_per_second"] > 0
+
+        db.expire_all()
+        for card in cards:
+            assert db.get(SavedCard, card.id).next_charge_date == date.today() + timedelta(days=30)
+        assert db.get(SavedCard, declined.id).next_charge_date < date.today()
+        assert db.query(Transaction).filter(Transaction.notes == "Auto-charge").count() == 6
+        assert db.query(Membership).count() == 6
+
+        run = db.query(AutoChargeRun).one()
+        assert run.status == "succeeded"
+        assert run.trigger == "manual"
+        assert (run.processed, run.succeeded, run.failed) == (8, 6, 2)
+        assert run.report["workers"] == auto_charge.processor_concurrency("stub")
+
+        kinds = [m.kind for m in db.query(OutboxMessage).all()]
+        assert kinds.count("auto_charge_success") == 6
+        assert kinds.count("auto_charge_receipt") == 6
+        assert kinds.count("auto_charge_failed") == 2
+
+    def test_runs_endpoint(self, client, db: Session, admin_headers, monkeypatch, monthly_plan, seed_settings):
+        import app.services.auto_charge_service as auto_charge
+
+        self._due_card(db, monthly_plan, "Solo", "tok_solo")
+        monkeypatch.setattr(auto_charge, "get_payment_adapter", lambda db: _FakeChargeAdapter(delay=0))
+        auto_charge.process_due_charges(db)
+
+        resp = client.get("/api/payments/auto-charge/runs", headers=admin_headers)
+        assert resp.status_code == 200
+        runs = resp.json()
+        assert len(runs) == 1
+        assert runs[0]["succeeded"] == 1
+        assert runs[0]["report"]["processor"] == "stub"
+
+
+class TestOutbox:
+    def test_dispatch_delivers_and_retries(self, db: Session, monkeypatch):
+        from datetime import datetime, timedelta
+
+        from sqlalchemy.orm import sessionmaker
+
+        import app.services.outbox as outbox
+        from app.models.outbox_message import OutboxMessage
+
+        delivered = []
+
+        def flaky(db, **payload):
+            if payload.get("fail"):
+                raise RuntimeError("SMTP down")
+            delivered.append(payload)
+            return True
+
+        monkeypatch.setitem(outbox.HANDLERS, "auto_charge_receipt", flaky)
+        outbox.enqueue(db, "auto_charge_receipt", to_email="a@example.com")
+        outbox.enqueue(db, "auto_charge_receipt", fail=True)
+        db.commit()
+
+        with pytest.raises(ValueError):
+            outbox.enqueue(db, "no_such_kind")
+
+        factory = sessionmaker(bind=db.get_bind())
+        assert outbox.dispatch_pending(factory) == {"sent": 1, "retried": 1, "failed": 0}
+        assert delivered == [{"to_email": "a@example.com"}]
+        # The failed one waits for its backoff; the sent one is never redelivered
+        assert outbox.dispatch_pending(factory) == {"sent": 0, "retried": 0, "failed": 0}
+
+        later = datetime.utcnow() + timedelta(days=1)
+        for _ in range(outbox.MAX_ATTEMPTS - 1):
+            counts = outbox.dispatch_pending(factory, now=later)
+            later += timedelta(days=1)
+        assert counts["failed"] == 1
+
+        db.expire_all()
+        statuses = sorted(m.status for m in db.query(OutboxMessage).all())
+        assert statuses == ["failed", "sent"]
+
+
+class TestChargeLedger:
+    def _setup(self, db, monkeypatch, plan, count, delay=0):
+        import app.services.auto_charge_service as auto_charge
+
+        cards = [TestAutoChargeEngine()._due_card(db, plan, f"Member{i}", f"tok_{i}") for i in range(count)]
+        adapter = _FakeChargeAdapter(delay=delay)
+        monkeypatch.setattr(auto_charge, "get_payment_adapter", lambda db: adapter)
+        return auto_charge, cards, adapter
+
+    def test_period_is_claimed_once(self, db: Session, monkeypatch, monthly_plan, seed_settings):
+        import uuid as uuid_mod
+
+        from app.models.auto_charge_run import AutoChargeRun
+
+        auto_charge, cards, _ = self._setup(db, monkeypatch, monthly_plan, 1)
+        run_a, run_b = AutoChargeRun(), AutoChargeRun()
+        db.add_all([run_a, run_b])
+        db.commit()
+        charge = {"card_id": cards[0].id, "period": cards[0].next_charge_date, "member_id": cards[0].member_id,
+                  "plan_id": monthly_plan.id, "amount": monthly_plan.price}
+
+        first = auto_charge.claim_attempt(db, charge, run_a.id)
+        assert isinstance(first[0], uuid_mod.UUID)
+        assert first[1] == 1
+        assert auto_charge.claim_attempt(db, charge, run_b.id) is None
+        assert auto_charge.claim_attempt(db, charge, run_a.id) is None
+
+    def test_chunks_resume_and_crash_is_never_rebilled(self, db: Session, monkeypatch, monthly_plan, seed_settings):
+        from datetime import datetime, timedelta
+
+        from app.models.auto_charge_run import AutoChargeRun
+        from app.models.charge_attempt import ChargeAttempt
+
+        auto_charge, cards, adapter = self._setup(db, monkeypatch, monthly_plan, 5)
+        monkeypatch.setattr(auto_charge, "CHUNK_SIZE", 2)
+
+        # A run that died after claiming the first card, without recording the result
+        dead = AutoChargeRun(heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+        db.add(dead)
+        db.commit()
+        first = {"card_id": cards[0].id, "period": cards[0].next_charge_date, "member_id": cards[0].member_id,
+                 "plan_id": monthly_plan.id, "amount": monthly_plan.price}
+        crashed_attempt = auto_charge.claim_attempt(db, first, dead.id)[0]
+        db.commit()
+
+        report = auto_charge.process_due_charges(db)
+        assert report["reconciled"] == 1
+        assert report["processed"] == 4
+        assert report["succeeded"] == 4
+        assert report["chunks"] == 2
+        assert adapter.calls == 4
+
+        db.expire_all()
+        assert db.get(AutoChargeRun, dead.id).status == "interrupted"
+        assert db.get(ChargeAttempt, crashed_attempt).status == "unknown"
+        assert db.query(ChargeAttempt).filter_by(status="succeeded").count() == 4
+
+        # Reruns leave the unknown attempt alone until it is released
+        assert auto_charge.process_due_charges(db)["processed"] == 0
+        assert adapter.calls == 4
+        auto_charge.release_attempt(db, crashed_attempt)
+        report = auto_charge.process_due_charges(db)
+        assert report["succeeded"] == 1
+        assert adapter.calls == 5
+        db.expire_all()
+        assert db.get(ChargeAttempt, crashed_attempt).status == "succeeded"
+        assert db.get(ChargeAttempt, crashed_attempt).attempts == 2
+
+    def test_declined_period_follows_the_retry_schedule(self, db: Session, monkeypatch, monthly_plan, seed_settings):
+        from datetime import date, timedelta
+
+        from app.models.charge_attempt import ChargeAttempt, ChargeAttemptEvent
+        from app.services.settings_service import set_setting
+
+        set_setting(db, "auto_charge_retry_days", "1,3")
+        set_setting(db, "auto_charge_max_attempts", "3")
+        auto_charge, _, adapter = self._setup(db, monkeypatch, monthly_plan, 0)
+        card = TestAutoChargeEngine()._due_card(db, monthly_plan, "Broke", "bad_tok")
+        today = date.today()
+
+        assert auto_charge.process_due_charges(db)["failed"] == 1
+        attempt = db.query(ChargeAttempt).one()
+        assert attempt.status == "declined"
+        assert attempt.next_attempt_on == today + timedelta(days=1)
+
+        # Not due yet: the next run doesn't even look at the card
+        report = auto_charge.process_due_charges(db)
+        assert report["processed"] == 0
+        assert adapter.calls == 1
+
+        # Retries run when their day comes, then the period is exhausted
+        for expected_next in (today + timedelta(days=3), None):
+            attempt.next_attempt_on = today
+            db.commit()
+            report = auto_charge.process_due_charges(db)
+            assert report["retries"] == 1
+            db.expire_all()
+            attempt = db.query(ChargeAttempt).one()
+            assert attempt.next_attempt_on == expected_next
+
+        assert adapter.calls == 3
+        assert report["exhausted"] == 1
+        assert attempt.status == "exhausted"
+        assert attempt.attempts == 3
+        assert db.get(SavedCard, card.id).auto_charge_enabled is False
+        events = db.query(ChargeAttemptEvent).order_by(ChargeAttemptEvent.attempt_number).all()
+        assert [(e.attempt_number, e.outcome) for e in events] == [(1, "declined"), (2, "declined"), (3, "declined")]
+        assert all(e.latency_seconds is not None for e in events)
+
+    def test_retry_policy(self, db: Session, seed_settings):
+        from datetime import date
+
+        from app.services import dunning
+        from app.services.settings_service import set_setting
+
+        assert dunning.retry_policy(db) == ((1, 3, 7), 4)
+        with pytest.raises(ValueError):
+            dunning.parse_retry_days("3,1")
+        set_setting(db, "auto_charge_retry_days", "soon")
+        assert dunning.retry_policy(db)[0] == dunning.DEFAULT_RETRY_DAYS
+
+        first = date(2026, 3, 1)
+        policy = ((1, 3, 7), 4)
+        assert dunning.next_attempt_on(policy, 1, first, first) == date(2026, 3, 2)
+        assert dunning.next_attempt_on(policy, 3, first, date(2026, 3, 4)) == date(2026, 3, 8)
+        # A late run never schedules the retry for the same day
+        assert dunning.next_attempt_on(policy, 2, first, date(2026, 3, 10)) == date(2026, 3, 11)
+        assert dunning.next_attempt_on(policy, 4, first, first) is None
+        assert dunning.next_attempt_on(((1, 3, 7), 2), 2, first, first) is None
+
+    def test_attempts_endpoints(self, client, db: Session, admin_headers, monkeypatch, monthly_plan, seed_settings):
+        from datetime import datetime, timedelta
+
+        from app.models.auto_charge_run import AutoChargeRun
+
+        auto_charge, cards, _ = self._setup(db, monkeypatch, monthly_plan, 1)
+        dead = AutoChargeRun(heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+        db.add(dead)
+        db.commit()
+        charge = {"card_id": cards[0].id, "period": cards[0].next_charge_date, "member_id": cards[0].member_id,
+                  "plan_id": monthly_plan.id, "amount": monthly_plan.price}
+        attempt_id = auto_charge.claim_attempt(db, charge, dead.id)[0]
+        db.commit()
+        auto_charge.reconcile_interrupted_runs(db)
+
+        resp = client.get("/api/payments/auto-charge/attempts?status=unknown", headers=admin_headers)
+        assert resp.status_code == 200
+        assert [a["id"] for a in resp.json()] == [str(attempt_id)]
+
+        resp = client.post(f"/api/payments/auto-charge/attempts/{attempt_id}/release", headers=admin_headers)
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "released"
+        resp = client.post(f"/api/payments/auto-charge/attempts/{attempt_id}/release", headers=admin_headers)
+        assert resp.status_code == 400
@@ -0,0 +1,217 @@
+"""Tests for admin report endpoints."""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.models.attendance_forecast import AttendanceForecast
+from app.models.checkin import Checkin, CheckinType
+from app.models.membership import Membership
+from app.models.plan import PlanType
+from app.services.report_cache import report_cache
+from app.services.report_service import get_swim_report
+
+
+def _add_membership(db: Session, member, plan, valid_until=None, is_active=True) -> Membership:
+    membership = Membership(
+        member_id=member.id,
+        plan_id=plan.id,
+        plan_type=plan.plan_type,
+        valid_until=valid_until,
+        is_active=is_active,
+    )
+    db.add(membership)
+    db.commit()
+    return membership
+
+
+class TestMembershipReport:
+    def test_counts_by_plan_and_expiring(self, client, db: Session, admin_headers, member_with_pin, monthly_plan, swim_pass_plan):
+        today = date.today()
+        _add_membership(db, member_with_pin, monthly_plan, today + timedelta(days=3))
+        _add_membership(db, member_with_pin, monthly_plan, today + timedelta(days=30))
+        _add_membership(db, member_with_pin, swim_pass_plan)
+        _add_membership(db, member_with_pin, monthly_plan, today, is_active=False)
+
+        resp = client.get("/api/reports/memberships", headers=admin_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total_active"] == 3
+        assert data["by_plan"] == {"Monthly Pass": 2, "10-Swim Pack": 1}
+        assert data["expiring_soon"] == 1
+
+    def test_expiring_listing_is_paginated(self, client, db: Session, admin_headers, member_with_pin, monthly_plan):
+        today = date.today()
+        for offset in (5, 1, 3, 20):
+            _add_membership(db, member_with_pin, monthly_plan, today + timedelta(days=offset))
+
+        resp = client.get("/api/reports/memberships/expiring?days=7&per_page=2", headers=admin_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 3
+        assert [item["days_remaining"] for item in data["items"]] == [1, 3]
+        assert data["items"][0]["member_name"] == "Test Member"
+        assert data["items"][0]["plan_type"] == PlanType.monthly.value
+
+        resp = client.get("/api/reports/memberships/expiring?days=7&per_page=2&page=2", headers=admin_headers)
+        assert [item["days_remaining"] for item in resp.json()["items"]] == [5]
+
+
+class TestReportCache:
+    def _add_checkin(self, db: Session, member, when: datetime) -> None:
+        db.add(Checkin(member_id=member.id, checkin_type=CheckinType.free, checked_in_at=when))
+        db.commit()
+
+    def test_repeat_request_is_a_hit(self, client, db: Session, admin_headers):
+        params = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+        client.get("/api/reports/swims", params=params, headers=admin_headers)
+        client.get("/api/reports/swims", params=params, headers=admin_headers)
+
+        stats = client.get("/api/reports/cache", headers=admin_headers).json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_insert_invalidates_only_covering_ranges(self, client, db: Session, admin_headers, member_with_pin):
+        today = date.today()
+        closed = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+        current = {"start_date": str(today - timedelta(days=7)), "end_date": str(today)}
+        client.get("/api/reports/swims", params=closed, headers=admin_headers)
+        assert client.get("/api/reports/swims", params=current, headers=admin_headers).json()["total_swims"] == 0
+
+        self._add_checkin(db, member_with_pin, datetime.combine(today, datetime.min.time()))
+
+        assert client.get("/api/reports/swims", params=current, headers=admin_headers).json()["total_swims"] == 1
+        client.get("/api/reports/swims", params=closed, headers=admin_headers)
+
+        stats = client.get("/api/reports/cache", headers=admin_headers).json()
+        assert stats["hits"] == 1  # the closed period survived the insert
+        assert stats["misses"] == 3
+
+    def test_rollback_does_not_invalidate(self, db: Session, member_with_pin):
+        today = date.today()
+        get_swim_report(db, today, today)
+
+        db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.free))
+        db.flush()
+        db.rollback()
+
+        assert report_cache.stats()["entries"] == 1
+
+    def test_plan_rename_invalidates_membership_report(self, db: Session, member_with_pin, monthly_plan):
+        from app.services.report_service import get_membership_report
+
+        _add_membership(db, member_with_pin, monthly_plan, date.today() + timedelta(days=30))
+        assert monthly_plan.name in get_membership_report(db)["by_plan"]
+
+        monthly_plan.name = "Monthly Plus"
+        db.commit()
+        assert "Monthly Plus" in get_membership_report(db)["by_plan"]
+
+    def test_entries_for_a_past_day_are_evicted(self, db: Session, monkeypatch):
+        yesterday = date.today() - timedelta(days=1)
+        report_cache.get_or_compute("dashboard", (yesterday,), yesterday, yesterday, (), lambda: 1, valid_on=yesterday)
+        report_cache.get_or_compute("swims", (1,), yesterday, yesterday, (), lambda: 2)
+        assert report_cache.stats()["entries"] == 2
+
+        # First lookup of a new day
+        monkeypatch.setattr(report_cache, "_expired_before", yesterday)
+        report_cache.get_or_compute("swims", (1,), yesterday, yesterday, (), lambda: 2)
+        assert report_cache.stats()["entries"] == 1
+
+    def test_invalidation_from_another_process(self, db: Session):
+        from app.services.report_cache import ALL_SOURCES, _decode, _encode, _on_remote_invalidation
+
+        today = date.today()
+        get_swim_report(db, today, today)
+        get_swim_report(db, date(2024, 1, 1), date(2024, 1, 31))
+        writes = {("checkins", today), ("memberships", None)}
+        assert _decode(_encode(writes)) == writes
+
+        _on_remote_invalidation(_encode({("checkins", today)}))
+        assert report_cache.stats()["entries"] == 1
+        # Another process restored a backup
+        _on_remote_invalidation(_encode({(ALL_SOURCES, None)}))
+        assert report_cache.stats()["entries"] == 0
+        get_swim_report(db, date(2024, 1, 1), date(2024, 1, 31))
+        # After the listener reconnects, anything may have been missed
+        _on_remote_invalidation(None)
+        assert report_cache.stats()["entries"] == 0
+
+
+class TestRetentionReport:
+    def test_cohorts_and_churn(self, client, db: Session, admin_headers, member_with_pin, monthly_plan):
+        from app.models.member import Member
+
+        lapsed = Member(first_name="Lapsed", last_name="Swimmer")
+        db.add(lapsed)
+        db.commit()
+        _add_membership(db, member_with_pin, monthly_plan, date.today() + timedelta(days=20))
+        _add_membership(db, lapsed, monthly_plan, date.today() + timedelta(days=20))
+        for days_ago in (0, 1, 2):
+            db.add(Checkin(
+                member_id=member_with_pin.id,
+                checkin_type=CheckinType.membership,
+                checked_in_at=datetime.utcnow() - timedelta(days=days_ago),
+            ))
+        db.commit()
+
+        resp = client.get("/api/reports/retention?months=3", headers=admin_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+
+        current = data["cohorts"][-1]
+        assert current["size"] == 2
+        assert current["retention"][0] == 0.5
+        assert data["churn_risk"]["active"] == 1
+        assert data["churn_risk"]["lapsed"] == 1
+        assert data["visit_frequency"]["2-3"] == 1
+        assert data["visit_frequency"]["0"] == 1
+        assert [m["member_name"] for m in data["at_risk_members"]] == ["Lapsed Swimmer"]
+
+        # Cached for the day in the shared report cache, check-ins notwithstanding
+        db.add(Checkin(member_id=lapsed.id, checkin_type=CheckinType.membership))
+        db.commit()
+        assert client.get("/api/reports/retention?months=3", headers=admin_headers).json()["churn_risk"]["lapsed"] == 1
+        stats = client.get("/api/reports/cache", headers=admin_headers).json()
+        assert stats["hits"] == 1
+
+
+class TestAttendanceForecast:
+    def test_forecast_projects_weekday_profile(self, client, db: Session, admin_headers, member_with_pin):
+        from datetime import time
+
+        from app.models.pool_schedule import PoolSchedule, ScheduleOverride, ScheduleType
+        from app.models.setting import Setting
+        from app.services.forecast_service import compute_forecast
+
+        db.add(Setting(key="timezone", value="UTC"))
+        target = date(2026, 6, 1)
+        db.add(PoolSchedule(
+            name="Morning Swim", schedule_type=ScheduleType.open, day_of_week=target.weekday(),
+            start_time=time(9, 0), end_time=time(11, 0),
+        ))
+        for weeks_ago in (1, 2, 3):
+            visit = datetime.combine(target - timedelta(weeks=weeks_ago), time(9, 30))
+            db.add(Checkin(member_id=member_with_pin.id, checkin_type=CheckinType.free, checked_in_at=visit, guest_count=1))
+        db.add(ScheduleOverride(
+            name="Pump repair", schedule_type=ScheduleType.maintenance,
+            start_datetime=datetime.combine(target + timedelta(weeks=1), time(0, 0)),
+            end_datetime=datetime.combine(target + timedelta(weeks=1), time(23, 0)),
+        ))
+        db.commit()
+
+        compute_forecast(db, today=target)
+
+        resp = client.get("/api/reports/forecast", params={"start_date": str(target)}, headers=admin_headers)
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+        assert [item["forecast_date"] for item in items] == [str(target), str(target + timedelta(weeks=1))]
+        assert items[0]["expected_attendance"] == 2.0
+        assert items[1]["expected_attendance"] == 0.0
+        assert items[1]["closed_by_override"] is True
+
+        # The next night's run drops the day that has passed
+        compute_forecast(db, today=target + timedelta(days=1))
+        dates = [f.forecast_date for f in db.query(AttendanceForecast).all()]
+        assert target not in dates
+        assert min(dates) > target
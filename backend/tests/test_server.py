@@ -0,0 +1,30 @@
+"""Tests for the multi-worker startup checks."""
+
+import pytest
+
+from app import startup_checks
+
+
+def test_single_worker_always_starts(monkeypatch):
+    monkeypatch.setattr(startup_checks, "relay_available", lambda: False)
+    startup_checks.check_multi_worker(1)
+
+
+def test_multi_worker_refused_while_state_is_process_local(monkeypatch):
+    monkeypatch.setattr(startup_checks.settings, "rate_limit_storage_uri", "memory://")
+    monkeypatch.setattr(startup_checks.settings, "web_background_jobs", True)
+    monkeypatch.setattr(startup_checks, "relay_available", lambda: False)
+
+    with pytest.raises(RuntimeError) as exc:
+        startup_checks.check_multi_worker(4)
+    assert "rate limiter" in str(exc.value)
+    assert "LISTEN/NOTIFY" in str(exc.value)
+    assert "WEB_BACKGROUND_JOBS=false" in str(exc.value)
+
+    monkeypatch.setattr(startup_checks.settings, "rate_limit_storage_uri", "redis://redis:6379")
+    monkeypatch.setattr(startup_checks, "relay_available", lambda: True)
+    with pytest.raises(RuntimeError, match="WEB_BACKGROUND_JOBS"):
+        startup_checks.check_multi_worker(4)
+
+    monkeypatch.setattr(startup_checks.settings, "web_background_jobs", False)
+    startup_checks.check_multi_worker(4)
@@ -2,7 +2,7 @@ import { useEffect, useRef, useState } from "react";
 import { AlertTriangle, Calendar, Check, Clock, Database, Download, Eye, EyeOff, HardDrive, Monitor, Play, RefreshCw, Save, Send, Server, Settings2, CreditCard, Bell, Upload, X } from "lucide-react";
 import toast from "react-hot-toast";
 import { getSettings, updateSettings, testWebhook, testPaymentConnection, testEmail, testSipCall, uploadKioskBackground, revealSetting } from "../../../api/settings";
-import { exportSystem, importSystem, runBackupNow, getBackupStatus, listBackups, testBackupConnection } from "../../../api/backup";
+import { exportSystem, importSystem, runBackupNow, getBackupJob, cancelBackupJob, getBackupStatus, listBackups, testBackupConnection } from "../../../api/backup";
 import Button from "../../../shared/Button";
 import Card, { CardHeader } from "../../../shared/Card";
 import PageHeader from "../../../shared/PageHeader";
@@ -165,6 +165,8 @@ const settingGroups = [
       { key: "guest_visit_enabled", label: "Guest Visits", type: "toggle", helpText: "Allow walk-in guests without accounts" },
       { key: "split_payment_enabled", label: "Split Payments", type: "toggle", helpText: "Allow splitting between cash and card" },
       { key: "auto_charge_enabled", label: "Auto-Charge / Recurring", type: "toggle", helpText: "Allow members to set up recurring billing" },
+      { key: "auto_charge_retry_days", label: "Auto-Charge Retry Days", type: "text", helpText: "Retry a failed charge this many days after the first attempt, e.g. 1,3,7" },
+      { key: "auto_charge_max_attempts", label: "Auto-Charge Max Attempts", type: "number", helpText: "Attempts per billing period (first one included) before auto-charge is turned off" },
     ],
   },
   {
@@ -751,12 +753,37 @@ function AutomaticBackupSection({ settings, onSettingsChange }) {
   const [backups, setBackups] = useState([]);
   const [loading, setLoading] = useState(true);
   const [testing, setTesting] = useState(false);
-  const [runningBackup, setRunningBackup] = useState(false);
+  const [backupJob, setBackupJob] = useState(null);
+  const pollTimer = useRef(null);
+  const runningBackup = backupJob && ["queued", "running"].includes(backupJob.status);
 
   useEffect(() => {
     loadStatus();
+    return () => clearTimeout(pollTimer.current);
   }, []);
 
+  const pollJob = async (jobId) => {
+    try {
+      const job = await getBackupJob(jobId);
+      setBackupJob(job);
+      if (["queued", "running"].includes(job.status)) {
+        pollTimer.current = setTimeout(() => pollJob(jobId), 2000);
+        return;
+      }
+      if (job.status === "succeeded") {
+        toast.success(job.result?.skipped ? "Backup skipped: nothing changed" : `Backup completed: ${job.result?.filename}`);
+      } else if (job.status === "cancelled") {
+        toast("Backup cancelled");
+      } else {
+        toast.error(job.error || "Backup failed");
+      }
+      loadStatus();
+    } catch (err) {
+      toast.error(err.response?.data?.detail || "Failed to check backup progress");
+      setBackupJob(null);
+    }
+  };
+
   const loadStatus = async () => {
     try {
       const [statusData, backupsData] = await Promise.all([
@@ -765,6 +792,10 @@ function AutomaticBackupSection({ settings, onSettingsChange }) {
       ]);
       setStatus(statusData);
       setBackups(backupsData.backups || []);
+      if (statusData.active_job && !pollTimer.current) {
+        setBackupJob(statusData.active_job);
+        pollTimer.current = setTimeout(() => pollJob(statusData.active_job.id), 2000);
+      }
     } catch (err) {
       console.error("Failed to load backup status", err);
     } finally {
@@ -789,15 +820,21 @@ function AutomaticBackupSection({ settings, onSettingsChange }) {
   };
 
   const handleRunBackup = async () => {
-    setRunningBackup(true);
     try {
-      const result = await runBackupNow();
-      toast.success(`Backup completed: ${result.filename}`);
-      loadStatus();
+      const job = await runBackupNow();
+      setBackupJob(job);
+      clearTimeout(pollTimer.current);
+      pollTimer.current = setTimeout(() => pollJob(job.id), 1000);
     } catch (err) {
       toast.error(err.response?.data?.detail || "Backup failed");
-    } finally {
-      setRunningBackup(false);
+    }
+  };
+
+  const handleCancelBackup = async () => {
+    try {
+      setBackupJob(await cancelBackupJob(backupJob.id));
+    } catch (err) {
+      toast.error(err.response?.data?.detail || "Failed to cancel backup");
     }
   };
 
@@ -891,6 +928,49 @@ function AutomaticBackupSection({ settings, onSettingsChange }) {
           </p>
         </div>
 
+        {/* Format */}
+        <div>
+          <label className="mb-1.5 block text-sm font-medium text-gray-700 dark:text-gray-300">
+            Full Backup Format
+          </label>
+          <select
+            value={settings.backup_format || "ndjson"}
+            onChange={(e) => onSettingsChange("backup_format", e.target.value)}
+            className="block w-full rounded-lg border-0 px-3.5 py-2.5 text-sm shadow-sm ring-1 ring-inset ring-gray-300 dark:ring-gray-600 focus:ring-2 focus:ring-brand-600 dark:bg-gray-800 dark:text-gray-100 sm:max-w-xs"
+          >
+            <option value="ndjson">Portable (compressed JSON)</option>
+            <option value="pgcopy">PostgreSQL COPY (fastest)</option>
+          </select>
+          <p className="mt-1 text-xs text-gray-500 dark:text-gray-400">
+            COPY backups can only be restored into PostgreSQL
+          </p>
+        </div>
+
+        {/* Incremental */}
+        <div className="flex items-center justify-between">
+          <div>
+            <label className="text-sm font-medium text-gray-700 dark:text-gray-300">
+              Incremental Backups
+            </label>
+            <p className="text-xs text-gray-500 dark:text-gray-400">
+              Full backup nightly at the selected hour; other runs save only changes since the last backup
+            </p>
+          </div>
+          <button
+            type="button"
+            onClick={() => onSettingsChange("backup_incremental_enabled", settings.backup_incremental_enabled === "true" ? "false" : "true")}
+            className={`relative inline-flex h-6 w-11 shrink-0 cursor-pointer rounded-full border-2 border-transparent transition-colors duration-200 ease-in-out focus:outline-none focus:ring-2 focus:ring-brand-500 focus:ring-offset-2 ${
+              settings.backup_incremental_enabled === "true" ? "bg-brand-600" : "bg-gray-200 dark:bg-gray-700"
+            }`}
+          >
+            <span
+              className={`pointer-events-none inline-block h-5 w-5 transform rounded-full bg-white shadow ring-0 transition duration-200 ease-in-out ${
+                settings.backup_incremental_enabled === "true" ? "translate-x-5" : "translate-x-0"
+              }`}
+            />
+          </button>
+        </div>
+
         {/* Storage Type */}
         <div>
           <label className="mb-1.5 block text-sm font-medium text-gray-700 dark:text-gray-300">
@@ -1093,8 +1173,13 @@ function AutomaticBackupSection({ settings, onSettingsChange }) {
             Test Connection
           </Button>
           <Button variant="secondary" icon={Play} onClick={handleRunBackup} loading={runningBackup}>
-            Run Backup Now
+            {runningBackup ? `Backing up… ${Math.round(backupJob.progress)}%` : "Run Backup Now"}
           </Button>
+          {runningBackup && (
+            <Button variant="danger" icon={X} onClick={handleCancelBackup} disabled={backupJob.cancel_requested}>
+              Cancel Backup
+            </Button>
+          )}
         </div>
 
         {/* Status */}
@@ -5,17 +5,38 @@ export async function exportSystem() {
   return data;
 }
 
-export async function importSystem(file) {
+export async function importSystem(file, { dryRun = false } = {}) {
   const formData = new FormData();
   formData.append("file", file);
   const { data } = await client.post("/backup/import", formData, {
     headers: { "Content-Type": "multipart/form-data" },
+    params: dryRun ? { dry_run: true } : {},
   });
   return data;
 }
 
-export async function runBackupNow() {
-  const { data } = await client.post("/backup/run");
+export async function runBackupNow(kind) {
+  const { data } = await client.post("/backup/run", null, { params: kind ? { kind } : {} });
+  return data;
+}
+
+export async function getBackupJob(jobId) {
+  const { data } = await client.get(`/backup/jobs/${jobId}`);
+  return data;
+}
+
+export async function cancelBackupJob(jobId) {
+  const { data } = await client.post(`/backup/jobs/${jobId}/cancel`);
+  return data;
+}
+
+export async function restoreBackup(filename) {
+  const { data } = await client.post("/backup/restore", null, { params: { filename } });
+  return data;
+}
+
+export async function verifyBackup(filename) {
+  const { data } = await client.get("/backup/verify", { params: { filename } });
   return data;
 }
 
@@ -250,8 +250,8 @@ export async function initiateTerminalPayment(member_id, plan_id, pin, save_card
   return data;
 }
 
-export async function checkTerminalPaymentStatus(request_key) {
-  const { data } = await kiosk.get(`/terminal/status/${request_key}`);
+export async function checkTerminalPaymentStatus(request_key, wait = 0) {
+  const { data } = await kiosk.get(`/terminal/status/${request_key}`, { params: wait ? { wait } : undefined });
   return data;
 }
 
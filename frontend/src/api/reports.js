@@ -12,6 +12,18 @@ export const getSwimReport = (params) =>
 export const getMembershipReport = () =>
   client.get("/reports/memberships").then((r) => r.data);
 
+export const getExpiringMemberships = (params) =>
+  client.get("/reports/memberships/expiring", { params }).then((r) => r.data);
+
+export const getRetentionReport = (params) =>
+  client.get("/reports/retention", { params }).then((r) => r.data);
+
+export const getAttendanceForecast = (params) =>
+  client.get("/reports/forecast", { params }).then((r) => r.data);
+
+export const refreshAttendanceForecast = () =>
+  client.post("/reports/forecast/refresh").then((r) => r.data);
+
 export const exportCsv = (params) =>
   client
     .get("/reports/export", { params, responseType: "blob" })
@@ -8,8 +8,12 @@ import {
   cancelTerminalPayment,
 } from "../../api/kiosk";
 
-const POLL_INTERVAL_MS = 1500;
-const MAX_POLL_ATTEMPTS = 80; // ~2 minutes
+// The server watches the terminal; each status request waits up to this long for a change
+const LONG_POLL_WAIT_SECONDS = 20;
+const PAYMENT_TIMEOUT_MS = 150000; // terminal gives up after 2 minutes
+const RETRY_DELAY_MS = 1500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 export default function TerminalPaymentScreen({ member, goTo, context, settings }) {
   const plan = context.plan;
@@ -25,52 +29,48 @@ export default function TerminalPaymentScreen({ member, goTo, context, settings
   const [requestKey, setRequestKey] = useState(null);
   const [error, setError] = useState(null);
   const [cardInfo, setCardInfo] = useState(null);
-  const pollCountRef = useRef(0);
-  const pollIntervalRef = useRef(null);
+  const pollingRef = useRef(false);
   const requestKeyRef = useRef(null);
 
   const cleanup = useCallback(() => {
-    if (pollIntervalRef.current) {
-      clearInterval(pollIntervalRef.current);
-      pollIntervalRef.current = null;
-    }
+    pollingRef.current = false;
   }, []);
 
-  const pollStatus = useCallback(async () => {
-    if (!requestKeyRef.current) return;
+  const pollStatus = useCallback(async (key) => {
+    const deadline = Date.now() + PAYMENT_TIMEOUT_MS;
 
-    pollCountRef.current++;
-    if (pollCountRef.current > MAX_POLL_ATTEMPTS) {
-      cleanup();
-      setStatus("failed");
-      setError("Terminal payment timed out. Please try again.");
-      return;
-    }
+    while (pollingRef.current && requestKeyRef.current === key) {
+      if (Date.now() > deadline) {
+        cleanup();
+        setStatus("failed");
+        setError("Terminal payment timed out. Please try again.");
+        return;
+      }
 
-    try {
-      const result = await checkTerminalPaymentStatus(requestKeyRef.current);
+      try {
+        const result = await checkTerminalPaymentStatus(key, LONG_POLL_WAIT_SECONDS);
+        if (!pollingRef.current || requestKeyRef.current !== key) return;
 
-      if (result.complete) {
-        cleanup();
-        if (result.approved) {
-          setStatus("success");
-          setCardInfo({
-            last4: result.card_last4,
-            brand: result.card_brand,
-          });
-        } else {
-          setStatus("failed");
-          setError(result.error || "Payment was declined");
+        if (result.complete) {
+          cleanup();
+          if (result.approved) {
+            setStatus("success");
+            setCardInfo({
+              last4: result.card_last4,
+              brand: result.card_brand,
+            });
+          } else {
+            setStatus("failed");
+            setError(result.error || "Payment was declined");
+          }
+          return;
         }
-      } else if (result.status === "error") {
-        cleanup();
-        setStatus("failed");
-        setError(result.error || "Terminal error occurred");
+        // Otherwise wait for the next change
+      } catch (err) {
+        // Network error - keep trying
+        console.error("Poll error:", err);
+        await sleep(RETRY_DELAY_MS);
       }
-      // Otherwise keep polling
-    } catch (err) {
-      // Network error - keep trying
-      console.error("Poll error:", err);
     }
   }, [cleanup]);
 
@@ -97,9 +97,9 @@ export default function TerminalPaymentScreen({ member, goTo, context, settings
       requestKeyRef.current = result.request_key;
       setStatus("waiting");
 
-      // Start polling
-      pollCountRef.current = 0;
-      pollIntervalRef.current = setInterval(pollStatus, POLL_INTERVAL_MS);
+      // Wait for the result
+      pollingRef.current = true;
+      pollStatus(result.request_key);
     } catch (err) {
       setStatus("failed");
       setError(err.response?.data?.detail || "Failed to initiate terminal payment");